@@ -22,6 +22,9 @@ from datetime import datetime as dt
 import re
 import asyncio
 import copy
+import hashlib
+import threading
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -272,12 +275,69 @@ class GlobalState:
         return summary
 
 class StateConditionChecker:
-    """状态满足性检查器 - 核心的认知决策机制"""
+    """状态满足性检查器 - 核心的认知决策机制
     
-    def __init__(self, llm: BaseChatModel):
+    判断结果按 (先决条件, 状态哈希) 缓存：状态没有变化时，已经判断过的先决条件不再调用LLM。
+    check_preconditions_batch 在一次结构化请求中判断多个先决条件，按批次大小和提示长度分块。
+    """
+    
+    def __init__(self, llm: BaseChatModel, batch_size: int = 20, max_prompt_chars: int = 12000,
+                 cache_size: int = 1024):
+        """
+        初始化状态条件检查器
+        
+        Args:
+            llm: 语言模型
+            batch_size: 批量检查时每次请求最多包含的先决条件数
+            max_prompt_chars: 批量检查时每次请求的提示长度上限（字符数）
+            cache_size: 判断结果缓存的最大条目数，0表示不缓存
+        """
         self.llm = llm
         self.similarity_threshold = 0.7
-        
+        self.batch_size = max(1, batch_size)
+        self.max_prompt_chars = max_prompt_chars
+        self.cache_size = cache_size
+        self._verdicts: "OrderedDict[Tuple[str, str], Tuple[bool, float, str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_statistics = {'hits': 0, 'misses': 0, 'llm_calls': 0, 'batch_calls': 0}
+    
+    @staticmethod
+    def _is_empty_precondition(precondition: str) -> bool:
+        return precondition == "无" or precondition.lower() in ["none", "null", ""]
+    
+    @staticmethod
+    def _render_state(global_state: GlobalState) -> Tuple[str, str]:
+        """渲染提示中的状态部分，返回 (状态文本, 状态哈希)"""
+        state_text = f"""## 当前全局状态
+{global_state.get_state_summary()}
+
+## 上下文变量
+{json.dumps(global_state.context_variables, ensure_ascii=False, indent=2, default=str)}"""
+        return state_text, hashlib.sha1(state_text.encode('utf-8')).hexdigest()
+    
+    def _get_cached(self, precondition: str, state_hash: str) -> Optional[Tuple[bool, float, str]]:
+        with self._cache_lock:
+            verdict = self._verdicts.get((precondition, state_hash))
+            if verdict is None:
+                self.cache_statistics['misses'] += 1
+                return None
+            self._verdicts.move_to_end((precondition, state_hash))
+            self.cache_statistics['hits'] += 1
+            return verdict
+    
+    def _store_verdict(self, precondition: str, state_hash: str, verdict: Tuple[bool, float, str]) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._verdicts[(precondition, state_hash)] = verdict
+            while len(self._verdicts) > self.cache_size:
+                self._verdicts.popitem(last=False)
+    
+    def clear_cache(self) -> None:
+        """清空判断结果缓存"""
+        with self._cache_lock:
+            self._verdicts.clear()
+    
     def check_precondition_satisfied(self, precondition: str, global_state: GlobalState) -> Tuple[bool, float, str]:
         """
         检查先决条件是否被全局状态满足
@@ -289,9 +349,156 @@ class StateConditionChecker:
         Returns:
             (是否满足, 置信度, 解释)
         """
-        if precondition == "无" or precondition.lower() in ["none", "null", ""]:
+        if self._is_empty_precondition(precondition):
             return True, 1.0, "无先决条件"
+        
+        state_text, state_hash = self._render_state(global_state)
+        verdict = self._get_cached(precondition, state_hash)
+        if verdict is None:
+            verdict, reliable = self._check_single(precondition, state_text)
+            if reliable:
+                self._store_verdict(precondition, state_hash, verdict)
+        return verdict
+    
+    def check_preconditions_batch(self, preconditions: List[str],
+                                  global_state: GlobalState) -> List[Tuple[bool, float, str]]:
+        """
+        批量检查多个先决条件是否被同一个全局状态满足
+        
+        状态只渲染一次；已缓存的和重复的先决条件不再请求，其余按批次在一次请求中判断，
+        批量结果缺失或无法解析的先决条件回退到单独检查。
+        
+        Args:
+            preconditions: 先决条件列表
+            global_state: 当前全局状态
             
+        Returns:
+            与 preconditions 一一对应的 (是否满足, 置信度, 解释)
+        """
+        state_text, state_hash = self._render_state(global_state)
+        verdicts: Dict[str, Tuple[bool, float, str]] = {}
+        unresolved: List[str] = []
+        for precondition in preconditions:
+            if precondition in verdicts or precondition in unresolved:
+                continue
+            if self._is_empty_precondition(precondition):
+                verdicts[precondition] = (True, 1.0, "无先决条件")
+                continue
+            cached = self._get_cached(precondition, state_hash)
+            if cached is not None:
+                verdicts[precondition] = cached
+            else:
+                unresolved.append(precondition)
+        
+        chunks = self._chunk_preconditions(unresolved, state_text)
+        if len(chunks) > 1:
+            # 多个批次并行请求，限制并发数量避免API限制
+            with ThreadPoolExecutor(max_workers=min(5, len(chunks))) as executor:
+                chunk_verdicts = list(executor.map(lambda chunk: self._check_chunk(chunk, state_text), chunks))
+        else:
+            chunk_verdicts = [self._check_chunk(chunk, state_text) for chunk in chunks]
+        
+        for chunk, batch_verdicts in zip(chunks, chunk_verdicts):
+            for precondition, verdict in batch_verdicts.items():
+                verdicts[precondition] = verdict
+                self._store_verdict(precondition, state_hash, verdict)
+            for precondition in chunk:
+                if precondition not in verdicts:
+                    verdict, reliable = self._check_single(precondition, state_text)
+                    verdicts[precondition] = verdict
+                    if reliable:
+                        self._store_verdict(precondition, state_hash, verdict)
+        
+        return [verdicts[precondition] for precondition in preconditions]
+    
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """获取缓存和LLM调用统计"""
+        with self._cache_lock:
+            return {**self.cache_statistics, 'cached_verdicts': len(self._verdicts)}
+    
+    def _chunk_preconditions(self, preconditions: List[str], state_text: str) -> List[List[str]]:
+        """按批次大小和提示长度上限分块"""
+        budget = max(self.max_prompt_chars - len(state_text), 0)
+        chunks: List[List[str]] = []
+        current: List[str] = []
+        size = 0
+        for precondition in preconditions:
+            item_size = len(precondition) + 16
+            if current and (len(current) >= self.batch_size or size + item_size > budget):
+                chunks.append(current)
+                current, size = [], 0
+            current.append(precondition)
+            size += item_size
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _check_chunk(self, chunk: List[str], state_text: str) -> Dict[str, Tuple[bool, float, str]]:
+        """在一次请求中判断一块先决条件，返回成功解析的结果"""
+        if len(chunk) == 1:
+            return {}
+        
+        system_message = """你是一个状态满足性检查专家，负责判断当前工作流状态是否满足多个任务的先决条件。
+
+对每个编号的先决条件分别判断：
+1. 先决条件是否被当前状态满足
+2. 给出0-1之间的置信度分数
+3. 提供简明的解释
+
+返回JSON数组，每个先决条件一项，id 与编号一致：
+[
+  {"id": 1, "satisfied": true/false, "confidence": 0.85, "explanation": "解释"}
+]"""
+        
+        numbered = "\n".join(f"{index}. {precondition}" for index, precondition in enumerate(chunk, 1))
+        user_message = f"""## 先决条件
+{numbered}
+
+{state_text}
+
+请逐条判断当前状态是否满足这些先决条件。"""
+        
+        try:
+            with self._cache_lock:
+                self.cache_statistics['llm_calls'] += 1
+                self.cache_statistics['batch_calls'] += 1
+            response = self.llm.invoke([
+                SystemMessage(content=system_message),
+                HumanMessage(content=user_message)
+            ])
+            items = self._parse_batch_response(response.content)
+        except Exception as e:
+            logger.warning(f"批量先决条件检查失败，逐条检查: {e}")
+            return {}
+        
+        verdicts = {}
+        for item in items:
+            try:
+                index = int(item['id']) - 1
+                if 0 <= index < len(chunk):
+                    verdicts[chunk[index]] = (bool(item.get('satisfied', False)),
+                                              float(item.get('confidence', 0.0)),
+                                              item.get('explanation', '无解释'))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"忽略无法解析的批量检查结果 {item}: {e}")
+        return verdicts
+    
+    @staticmethod
+    def _parse_batch_response(text: str) -> List[Dict[str, Any]]:
+        text = text.strip()
+        start, end = text.find('['), text.rfind(']')
+        if start < 0 or end < start:
+            raise ValueError("响应中没有JSON数组")
+        items = json.loads(text[start:end + 1])
+        return [item for item in items if isinstance(item, dict)]
+    
+    def _check_single(self, precondition: str, state_text: str) -> Tuple[Tuple[bool, float, str], bool]:
+        """
+        单独检查一个先决条件
+        
+        Returns:
+            ((是否满足, 置信度, 解释), 结果是否可以缓存)
+        """
         system_message = """你是一个状态满足性检查专家，负责判断当前工作流状态是否满足任务的先决条件。
 
 请仔细分析当前状态和先决条件，判断：
@@ -309,11 +516,7 @@ class StateConditionChecker:
         user_message = f"""## 先决条件
 {precondition}
 
-## 当前全局状态
-{global_state.get_state_summary()}
-
-## 上下文变量
-{json.dumps(global_state.context_variables, ensure_ascii=False, indent=2)}
+{state_text}
 
 请判断当前状态是否满足先决条件。"""
         
@@ -323,6 +526,8 @@ class StateConditionChecker:
                 HumanMessage(content=user_message)
             ]
             
+            with self._cache_lock:
+                self.cache_statistics['llm_calls'] += 1
             response = self.llm.invoke(messages)
             result_text = response.content.strip()
             
@@ -333,18 +538,18 @@ class StateConditionChecker:
                 confidence = float(result_json.get('confidence', 0.0))
                 explanation = result_json.get('explanation', '无解释')
                 
-                return satisfied, confidence, explanation
+                return (satisfied, confidence, explanation), True
                 
             except json.JSONDecodeError:
                 # 如果JSON解析失败，尝试简单的文本解析
                 if "满足" in result_text or "true" in result_text.lower():
-                    return True, 0.6, result_text
+                    return (True, 0.6, result_text), True
                 else:
-                    return False, 0.6, result_text
+                    return (False, 0.6, result_text), True
                     
         except Exception as e:
             logger.error(f"先决条件检查失败: {e}")
-            return False, 0.0, f"检查失败: {str(e)}"
+            return (False, 0.0, f"检查失败: {str(e)}"), False
 
 class CognitiveManager:
     """认知管理者 - 统一的工作流认知管理
@@ -644,7 +849,7 @@ class CognitiveManager:
         if len(pending_tasks) <= 2:
             return self._find_executable_tasks_serial(pending_tasks, global_state)
         
-        # 多任务时使用并行执行
+        # 多任务时批量检查
         return self._find_executable_tasks_parallel(pending_tasks, global_state)
     
     def select_next_task(self, executable_tasks: List[Tuple[CognitiveTask, float]], 
@@ -1014,51 +1219,23 @@ class CognitiveManager:
     
     def _find_executable_tasks_parallel(self, pending_tasks: List[CognitiveTask], 
                                       global_state: GlobalState) -> List[Tuple[CognitiveTask, float]]:
-        """并行版本的可执行任务查找"""
+        """批量版本的可执行任务查找：所有先决条件针对同一状态一次性判断"""
         executable_tasks = []
         
-        # 创建全局状态的快照，避免并发修改问题
-        # 避免深拷贝LLM对象（包含不可序列化的线程锁）
-        global_state_snapshot = GlobalState(
-            current_state=global_state.current_state,
-            state_history=copy.deepcopy(global_state.state_history),
-            context_variables=copy.deepcopy(global_state.context_variables),
-            original_goal=global_state.original_goal
-        )
-        
-        # 限制并发数量，避免API限制
-        max_workers = min(5, len(pending_tasks))
-        
-        def check_single_task(task):
-            """检查单个任务的可执行性"""
-            try:
-                satisfied, confidence, explanation = self.condition_checker.check_precondition_satisfied(
-                    task.precondition, global_state_snapshot
-                )
-                return task, satisfied, confidence, explanation
-            except Exception as e:
-                logger.error(f"检查任务 {task.id} 时发生错误: {e}")
-                return task, False, 0.0, f"检查失败: {str(e)}"
+        try:
+            verdicts = self.condition_checker.check_preconditions_batch(
+                [task.precondition for task in pending_tasks], global_state
+            )
+        except Exception as e:
+            logger.error(f"批量检查任务先决条件时发生错误: {e}")
+            verdicts = [(False, 0.0, f"检查失败: {str(e)}")] * len(pending_tasks)
         
-        # 使用线程池并行执行
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_task = {executor.submit(check_single_task, task): task for task in pending_tasks}
-            
-            # 收集结果
-            for future in as_completed(future_to_task):
-                try:
-                    task, satisfied, confidence, explanation = future.result()
-                    
-                    if satisfied and confidence > 0.5:
-                        executable_tasks.append((task, confidence))
-                        logger.debug(f"任务 {task.id} 可执行 (置信度: {confidence:.2f}): {explanation}")
-                    else:
-                        logger.debug(f"任务 {task.id} 不可执行 (置信度: {confidence:.2f}): {explanation}")
-                        
-                except Exception as e:
-                    task = future_to_task[future]
-                    logger.error(f"处理任务 {task.id} 结果时发生错误: {e}")
+        for task, (satisfied, confidence, explanation) in zip(pending_tasks, verdicts):
+            if satisfied and confidence > 0.5:
+                executable_tasks.append((task, confidence))
+                logger.debug(f"任务 {task.id} 可执行 (置信度: {confidence:.2f}): {explanation}")
+            else:
+                logger.debug(f"任务 {task.id} 不可执行 (置信度: {confidence:.2f}): {explanation}")
         
         # 按置信度排序
         executable_tasks.sort(key=lambda x: x[1], reverse=True)
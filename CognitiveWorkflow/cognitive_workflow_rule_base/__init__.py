@@ -71,6 +71,12 @@ from .infrastructure.repository_impl import (
     StateRepositoryImpl,
     ExecutionRepositoryImpl
 )
+from .infrastructure.sqlite_repository_impl import (
+    SQLiteDatabase,
+    SQLiteRuleRepository,
+    SQLiteStateRepository,
+    SQLiteExecutionRepository
+)
 
 # 导入应用层组件
 from .application.production_rule_workflow_engine import ProductionRuleWorkflowEngine
@@ -114,6 +120,10 @@ __all__ = [
     "RuleRepositoryImpl",
     "StateRepositoryImpl",
     "ExecutionRepositoryImpl",
+    "SQLiteDatabase",
+    "SQLiteRuleRepository",
+    "SQLiteStateRepository",
+    "SQLiteExecutionRepository",
     
     # 应用层组件
     "ProductionRuleWorkflowEngine",
@@ -121,7 +131,8 @@ __all__ = [
     "CognitiveAgent"  # Backward compatibility alias
 ]
 
-def create_production_rule_system(llm, agents, enable_auto_recovery=True, enable_adaptive_replacement=True, enable_context_filtering=True):
+def create_production_rule_system(llm, agents, enable_auto_recovery=True, enable_adaptive_replacement=True, enable_context_filtering=True,
+                                  repository_backend="file"):
     """
     快速创建产生式规则系统的工厂函数
     
@@ -131,6 +142,7 @@ def create_production_rule_system(llm, agents, enable_auto_recovery=True, enable
         enable_auto_recovery: 是否启用自动恢复
         enable_adaptive_replacement: 是否启用自适应规则替换
         enable_context_filtering: 是否启用上下文过滤（TaskTranslator）
+        repository_backend: 仓储后端，"file"（每个对象一个JSON文件）或 "sqlite"（带索引的单个数据库文件）
         
     Returns:
         ProductionRuleWorkflowEngine: 配置好的工作流引擎
@@ -139,9 +151,18 @@ def create_production_rule_system(llm, agents, enable_auto_recovery=True, enable
     llm_service = LanguageModelService(llm)
     
     # 创建仓储实现
-    rule_repository = RuleRepositoryImpl()
-    state_repository = StateRepositoryImpl()
-    execution_repository = ExecutionRepositoryImpl()
+    if repository_backend == "sqlite":
+        database = SQLiteDatabase()
+        rule_repository = SQLiteRuleRepository(database)
+        state_repository = SQLiteStateRepository(database)
+        execution_repository = SQLiteExecutionRepository(database)
+    elif repository_backend == "file":
+        # 规则集在迭代窗口内延迟写入，由规则引擎在工作流结束时统一写出
+        rule_repository = RuleRepositoryImpl(write_behind=True)
+        state_repository = StateRepositoryImpl()
+        execution_repository = ExecutionRepositoryImpl()
+    else:
+        raise ValueError(f"不支持的仓储后端: {repository_backend}")
     
     # 创建Agent注册表 - 直接管理Agent实例
     agent_registry = AgentRegistry()
@@ -29,6 +29,10 @@ class RuleRepository(ABC):
         """加载规则集"""
         pass
     
+    def flush(self) -> int:
+        """写出延迟写入的规则集，返回写入数量（默认实现立即写入，无需刷新）"""
+        return 0
+    
     @abstractmethod
     def find_rules_by_condition(self, condition_pattern: str) -> List[ProductionRule]:
         """根据条件模式查找规则"""
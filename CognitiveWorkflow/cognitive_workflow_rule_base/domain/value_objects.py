@@ -173,6 +173,7 @@ class RuleConstants:
     DEFAULT_CONFIDENCE_THRESHOLD = 0.7
     MAX_ITERATIONS = 100
     DEFAULT_TIMEOUT_SECONDS = 300
+    RULE_SET_FLUSH_INTERVAL = 5           # 延迟写入的规则仓储每隔多少次迭代写盘一次
 
 
 class MatchingConstants:
@@ -181,6 +182,8 @@ class MatchingConstants:
     MEDIUM_CONFIDENCE_THRESHOLD = 0.7
     LOW_CONFIDENCE_THRESHOLD = 0.5
     SEMANTIC_SIMILARITY_THRESHOLD = 0.8
+    PREFILTER_ACCEPT_THRESHOLD = 0.85     # 本地相似度不低于该值时直接判为匹配
+    PREFILTER_REJECT_THRESHOLD = 0.15     # 本地相似度不高于该值时直接判为不匹配
 
 
 class ExecutionConstants:
@@ -189,6 +192,7 @@ class ExecutionConstants:
     DEFAULT_EXECUTION_TIMEOUT = 60
     BATCH_SIZE = 10
     PERFORMANCE_SAMPLE_SIZE = 100
+    TIMELINE_COMPACT_MIN_DEAD_ENTRIES = 1000   # 执行时间索引日志中失效记录至少达到该数量才自动压缩
 
 
 # 自适应规则替换相关枚举和值对象
@@ -11,9 +11,21 @@ from .repository_impl import (
     StateRepositoryImpl,
     ExecutionRepositoryImpl
 )
+from .sqlite_repository_impl import (
+    SQLiteDatabase,
+    SQLiteRuleRepository,
+    SQLiteStateRepository,
+    SQLiteExecutionRepository,
+    migrate_json_storage
+)
 
 __all__ = [
     "RuleRepositoryImpl",
     "StateRepositoryImpl", 
-    "ExecutionRepositoryImpl"
+    "ExecutionRepositoryImpl",
+    "SQLiteDatabase",
+    "SQLiteRuleRepository",
+    "SQLiteStateRepository",
+    "SQLiteExecutionRepository",
+    "migrate_json_storage"
 ]
\ No newline at end of file
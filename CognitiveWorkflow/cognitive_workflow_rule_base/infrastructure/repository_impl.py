@@ -6,83 +6,302 @@
 在生产环境中可以替换为基于数据库的实现。
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+import atexit
+import bisect
 import json
 import os
 import logging
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 from ..domain.entities import (
     ProductionRule, RuleSet, RuleExecution, GlobalState
 )
 from ..domain.repositories import (
     RuleRepository, StateRepository, ExecutionRepository
 )
-from ..domain.value_objects import RulePhase, ExecutionStatus
+from ..domain.value_objects import RulePhase, ExecutionStatus, ExecutionConstants
 from ..utils.concurrent_safe_id_generator import id_generator, SafeFileOperations
 
 logger = logging.getLogger(__name__)
 
 
-class RuleRepositoryImpl(RuleRepository):
-    """规则仓储实现 - 基于文件存储"""
+class RuleCodec:
+    """规则和规则集的序列化 - 文件和SQLite仓储共用"""
+    
+    def _rule_set_to_dict(self, rule_set: RuleSet) -> Dict:
+        """将规则集转换为字典"""
+        return {
+            'id': rule_set.id,
+            'goal': rule_set.goal,
+            'rules': [self._rule_to_dict(rule) for rule in rule_set.rules],
+            # 'created_at': rule_set.created_at.isoformat(),  # Removed for LLM caching
+            # 'updated_at': rule_set.updated_at.isoformat(),  # Removed for LLM caching
+            'version': rule_set.version,
+            'status': rule_set.status.value,
+            'modification_history': [self._modification_to_dict(mod) for mod in rule_set.modification_history]
+        }
+    
+    def _rule_to_dict(self, rule: ProductionRule) -> Dict:
+        """将规则转换为字典"""
+        return rule.to_dict()
+    
+    def _dict_to_rule_set(self, data: Dict) -> RuleSet:
+        """从字典创建规则集"""
+        from ..domain.value_objects import RuleSetStatus, ModificationType
+        
+        # 转换规则列表
+        rules = []
+        for rule_data in data.get('rules', []):
+            rule = self._dict_to_rule(rule_data)
+            rules.append(rule)
+        
+        # 转换修改历史
+        modification_history = []
+        for mod_data in data.get('modification_history', []):
+            mod = self._dict_to_modification(mod_data)
+            modification_history.append(mod)
+        
+        rule_set = RuleSet(
+            id=data['id'],
+            goal=data['goal'],
+            rules=rules,
+            # created_at=datetime.fromisoformat(data.get('created_at')),  # Removed for LLM caching
+            # updated_at=datetime.fromisoformat(data.get('updated_at')),  # Removed for LLM caching
+            version=data.get('version', 1),
+            status=RuleSetStatus(data.get('status', 'active')),
+            modification_history=modification_history
+        )
+        
+        return rule_set
+    
+    def _dict_to_rule(self, data: Dict) -> ProductionRule:
+        """从字典创建规则"""
+        rule = ProductionRule(
+            id=data['id'],
+            name=data['name'],
+            condition=data['condition'],
+            action=data['action'],
+            priority=data.get('priority', 50),
+            phase=self._parse_phase(data.get('phase', 'execution')),
+            expected_outcome=data.get('expected_outcome', ''),
+            metadata=data.get('metadata', {})
+        )
+        
+        return rule
+    
+    def _parse_phase(self, phase_value: str) -> RulePhase:
+        """
+        解析阶段值
+        
+        Args:
+            phase_value: 阶段字符串值
+            
+        Returns:
+            RulePhase: 解析后的阶段枚举
+        """
+        try:
+            return RulePhase(phase_value)
+        except ValueError as e:
+            logger.warning(f"无法解析阶段值 '{phase_value}'，使用默认值 'execution': {e}")
+            return RulePhase.EXECUTION
+    
+    def _modification_to_dict(self, modification) -> Dict:
+        """将修改记录转换为字典"""
+        return {
+            'modification_type': modification.modification_type.value,
+            'target_rule_id': modification.target_rule_id,
+            'new_rule_data': modification.new_rule_data,
+            'modification_reason': modification.modification_reason,
+            'timestamp': modification.timestamp.isoformat()
+        }
+    
+    def _dict_to_modification(self, data: Dict):
+        """从字典创建修改记录"""
+        from ..domain.value_objects import RuleModification, ModificationType
+        
+        return RuleModification(
+            modification_type=ModificationType(data['modification_type']),
+            target_rule_id=data.get('target_rule_id'),
+            new_rule_data=data.get('new_rule_data'),
+            modification_reason=data['modification_reason'],
+            timestamp=datetime.fromisoformat(data['timestamp'])
+        )
+
+
+class RuleRepositoryImpl(RuleCodec, RuleRepository):
+    """规则仓储实现 - 基于文件存储
+    
+    规则集快照写入 rule_set_<id>.json，修改历史以追加方式写入 rule_set_<id>.history.jsonl，
+    每次保存只追加新增的修改记录，不再重写整个历史。
+    """
+    
+    HISTORY_LOG_SUFFIX = ".history.jsonl"
     
-    def __init__(self, storage_path: str = "./.cognitive_workflow_data/rules"):
+    def __init__(self, storage_path: str = "./.cognitive_workflow_data/rules", write_behind: bool = False):
         """
         初始化规则仓储
         
         Args:
             storage_path: 存储路径
+            write_behind: 是否延迟写入。开启后 save_rule_set 只更新缓存并标记为待写入，
+                          由 flush() 统一写盘，同一规则集在两次刷新之间的多次保存合并为一次写入
         """
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.write_behind = write_behind
         
         # 内存缓存
         self._rule_sets_cache: Dict[str, RuleSet] = {}
         self._rules_cache: Dict[str, ProductionRule] = {}
         
+        # 待写入的规则集，以及各规则集已写入历史日志的修改记录条数（None 表示日志需要重写）
+        self._dirty_rule_sets: Dict[str, RuleSet] = {}
+        self._persisted_history: Dict[str, Optional[int]] = {}
+        self._write_lock = threading.RLock()
+        
         # 加载现有数据
         self._load_existing_data()
+        
+        if write_behind:
+            # 进程退出（包括未捕获异常导致的退出）时写出尚未持久化的规则集
+            atexit.register(_flush_rule_repository, weakref.ref(self))
     
     def save_rule_set(self, rule_set: RuleSet) -> None:
         """保存规则集（并发安全）"""
         try:
-            file_path = self.storage_path / f"rule_set_{rule_set.id}.json"
-            
-            # 🔑 检查文件冲突
-            if SafeFileOperations.check_file_conflict(file_path):
-                logger.warning(f"检测到文件冲突，等待后重试: {file_path}")
-                import time
-                time.sleep(0.1)
-            
-            # 转换为可序列化的格式
-            rule_set_data = {
-                'id': rule_set.id,
-                'goal': rule_set.goal,
-                'rules': [self._rule_to_dict(rule) for rule in rule_set.rules],
-                # 'created_at': rule_set.created_at.isoformat(),  # Removed for LLM caching
-                # 'updated_at': rule_set.updated_at.isoformat(),  # Removed for LLM caching
-                'version': rule_set.version,
-                'status': rule_set.status.value,
-                'modification_history': [self._modification_to_dict(mod) for mod in rule_set.modification_history]
-            }
-            
-            # 🔑 使用原子性写入
-            if not SafeFileOperations.atomic_write_json(file_path, rule_set_data):
-                raise IOError(f"原子性写入失败: {file_path}")
-            
-            # 更新缓存
-            self._rule_sets_cache[rule_set.id] = rule_set
-            for rule in rule_set.rules:
-                self._rules_cache[rule.id] = rule
+            with self._write_lock:
+                if self.write_behind:
+                    self._dirty_rule_sets[rule_set.id] = rule_set
+                else:
+                    self._write_rule_set(rule_set)
+                
+                # 更新缓存
+                self._rule_sets_cache[rule_set.id] = rule_set
+                for rule in rule_set.rules:
+                    self._rules_cache[rule.id] = rule
             
-            logger.debug(f"规则集已安全保存: {rule_set.id}")
+            logger.debug(f"规则集已{'标记待写入' if self.write_behind else '安全保存'}: {rule_set.id}")
             
         except Exception as e:
             logger.error(f"保存规则集失败: {e}")
             raise
     
+    def flush(self) -> int:
+        """
+        写出所有待写入的规则集
+        
+        Returns:
+            int: 写入的规则集数量
+        """
+        with self._write_lock:
+            pending = list(self._dirty_rule_sets.values())
+            self._dirty_rule_sets.clear()
+            
+            written = 0
+            for rule_set in pending:
+                try:
+                    self._write_rule_set(rule_set)
+                    written += 1
+                except Exception as e:
+                    # 写入失败的规则集保留待写入标记，下次刷新时重试
+                    self._dirty_rule_sets.setdefault(rule_set.id, rule_set)
+                    logger.error(f"写出规则集失败 {rule_set.id}: {e}")
+        
+        if written:
+            logger.debug(f"已写出 {written} 个规则集")
+        return written
+    
+    def _write_rule_set(self, rule_set: RuleSet) -> None:
+        """追加新增的修改历史并原子性写入规则集快照"""
+        file_path = self.storage_path / f"rule_set_{rule_set.id}.json"
+        
+        # 🔑 检查文件冲突
+        if SafeFileOperations.check_file_conflict(file_path):
+            logger.warning(f"检测到文件冲突，等待后重试: {file_path}")
+            time.sleep(0.1)
+        
+        # 先写历史再写快照：快照中的 history_count 决定读取时采用日志的前多少条
+        self._append_history(rule_set)
+        
+        # 转换为可序列化的格式
+        rule_set_data = self._rule_set_to_dict(rule_set)
+        del rule_set_data['modification_history']
+        rule_set_data['history_count'] = len(rule_set.modification_history)
+        
+        # 🔑 使用原子性写入
+        if not SafeFileOperations.atomic_write_json(file_path, rule_set_data):
+            raise IOError(f"原子性写入失败: {file_path}")
+    
+    def _append_history(self, rule_set: RuleSet) -> None:
+        """把尚未写入的修改记录追加到历史日志"""
+        history = rule_set.modification_history
+        persisted = self._persisted_history.get(rule_set.id)
+        
+        if persisted is None or persisted > len(history):
+            # 新规则集、旧格式文件或日志与快照不一致时重写整个日志
+            mode, entries = 'w', history
+        else:
+            mode, entries = 'a', history[persisted:]
+        
+        if entries or mode == 'w':
+            log_path = self.storage_path / f"rule_set_{rule_set.id}{self.HISTORY_LOG_SUFFIX}"
+            with open(log_path, mode, encoding='utf-8') as f:
+                for modification in entries:
+                    f.write(json.dumps(self._modification_to_dict(modification), ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        
+        self._persisted_history[rule_set.id] = len(history)
+    
+    @classmethod
+    def read_rule_set_file(cls, file_path: Path) -> Tuple[Dict, Optional[int]]:
+        """
+        读取规则集快照并合并历史日志
+        
+        Args:
+            file_path: 规则集快照文件路径
+            
+        Returns:
+            Tuple[Dict, Optional[int]]: 含完整 modification_history 的规则集字典，
+                                        以及日志中有效的修改记录条数（日志缺失或与快照不一致时为 None）
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            rule_set_data = json.load(f)
+        
+        if 'history_count' not in rule_set_data:
+            # 旧格式：修改历史内嵌在快照中
+            return rule_set_data, None
+        
+        history_count = rule_set_data.pop('history_count')
+        log_path = file_path.with_name(file_path.stem + cls.HISTORY_LOG_SUFFIX)
+        entries = []
+        consistent = log_path.exists()
+        if consistent:
+            with open(log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # 崩溃时写了一半的行
+                        consistent = False
+                        break
+        
+        if len(entries) < history_count:
+            logger.warning(f"规则集历史日志不完整: {log_path}")
+        rule_set_data['modification_history'] = entries[:history_count]
+        return rule_set_data, history_count if consistent and len(entries) == history_count else None
+    
     def load_rule_set(self, rule_set_id: str) -> RuleSet:
         """加载规则集"""
         try:
@@ -95,13 +314,13 @@ class RuleRepositoryImpl(RuleRepository):
             if not file_path.exists():
                 raise ValueError(f"规则集不存在: {rule_set_id}")
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                rule_set_data = json.load(f)
+            rule_set_data, persisted = self.read_rule_set_file(file_path)
             
             rule_set = self._dict_to_rule_set(rule_set_data)
             
             # 更新缓存
             self._rule_sets_cache[rule_set_id] = rule_set
+            self._persisted_history[rule_set_id] = persisted
             
             return rule_set
             
@@ -220,11 +439,11 @@ class RuleRepositoryImpl(RuleRepository):
         try:
             for file_path in self.storage_path.glob("rule_set_*.json"):
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        rule_set_data = json.load(f)
+                    rule_set_data, persisted = self.read_rule_set_file(file_path)
                     
                     rule_set = self._dict_to_rule_set(rule_set_data)
                     self._rule_sets_cache[rule_set.id] = rule_set
+                    self._persisted_history[rule_set.id] = persisted
                     
                     for rule in rule_set.rules:
                         self._rules_cache[rule.id] = rule
@@ -234,95 +453,36 @@ class RuleRepositoryImpl(RuleRepository):
                     
         except Exception as e:
             logger.error(f"加载现有数据失败: {e}")
+
+
+def _flush_rule_repository(repository_ref: "weakref.ref") -> None:
+    """进程退出时写出延迟写入的规则集"""
+    repository = repository_ref()
+    if repository is not None:
+        repository.flush()
+
+
+class StateCodec:
+    """全局状态的反序列化 - 文件和SQLite仓储共用"""
     
-    def _rule_to_dict(self, rule: ProductionRule) -> Dict:
-        """将规则转换为字典"""
-        return rule.to_dict()
-    
-    def _dict_to_rule_set(self, data: Dict) -> RuleSet:
-        """从字典创建规则集"""
-        from ..domain.value_objects import RuleSetStatus, ModificationType
-        
-        # 转换规则列表
-        rules = []
-        for rule_data in data.get('rules', []):
-            rule = self._dict_to_rule(rule_data)
-            rules.append(rule)
-        
-        # 转换修改历史
-        modification_history = []
-        for mod_data in data.get('modification_history', []):
-            mod = self._dict_to_modification(mod_data)
-            modification_history.append(mod)
-        
-        rule_set = RuleSet(
-            id=data['id'],
-            goal=data['goal'],
-            rules=rules,
-            # created_at=datetime.fromisoformat(data.get('created_at')),  # Removed for LLM caching
-            # updated_at=datetime.fromisoformat(data.get('updated_at')),  # Removed for LLM caching
-            version=data.get('version', 1),
-            status=RuleSetStatus(data.get('status', 'active')),
-            modification_history=modification_history
-        )
+    def _dict_to_state(self, data: Dict) -> GlobalState:
+        """从字典创建状态"""
+        # Backward compatibility: handle both 'state' (new) and 'description' (old) field names
+        state_value = data.get('state', data.get('description', ''))
         
-        return rule_set
-    
-    def _dict_to_rule(self, data: Dict) -> ProductionRule:
-        """从字典创建规则"""
-        rule = ProductionRule(
+        return GlobalState(
             id=data['id'],
-            name=data['name'],
-            condition=data['condition'],
-            action=data['action'],
-            priority=data.get('priority', 50),
-            phase=self._parse_phase(data.get('phase', 'execution')),
-            expected_outcome=data.get('expected_outcome', ''),
-            metadata=data.get('metadata', {})
-        )
-        
-        return rule
-    
-    def _parse_phase(self, phase_value: str) -> RulePhase:
-        """
-        解析阶段值
-        
-        Args:
-            phase_value: 阶段字符串值
-            
-        Returns:
-            RulePhase: 解析后的阶段枚举
-        """
-        try:
-            return RulePhase(phase_value)
-        except ValueError as e:
-            logger.warning(f"无法解析阶段值 '{phase_value}'，使用默认值 'execution': {e}")
-            return RulePhase.EXECUTION
-    
-    def _modification_to_dict(self, modification) -> Dict:
-        """将修改记录转换为字典"""
-        return {
-            'modification_type': modification.modification_type.value,
-            'target_rule_id': modification.target_rule_id,
-            'new_rule_data': modification.new_rule_data,
-            'modification_reason': modification.modification_reason,
-            'timestamp': modification.timestamp.isoformat()
-        }
-    
-    def _dict_to_modification(self, data: Dict):
-        """从字典创建修改记录"""
-        from ..domain.value_objects import RuleModification, ModificationType
-        
-        return RuleModification(
-            modification_type=ModificationType(data['modification_type']),
-            target_rule_id=data.get('target_rule_id'),
-            new_rule_data=data.get('new_rule_data'),
-            modification_reason=data['modification_reason'],
-            timestamp=datetime.fromisoformat(data['timestamp'])
+            state=state_value,
+            context_variables=data.get('context_variables', {}),
+            execution_history=data.get('execution_history', []),
+            # timestamp=datetime.fromisoformat(data.get('timestamp')),  # Removed for LLM caching
+            workflow_id=data.get('workflow_id', ''),
+            iteration_count=data.get('iteration_count', 0),
+            goal_achieved=data.get('goal_achieved', False)
         )
 
 
-class StateRepositoryImpl(StateRepository):
+class StateRepositoryImpl(StateCodec, StateRepository):
     """状态仓储实现 - 基于文件存储"""
     
     def __init__(self, storage_path: str = "./.cognitive_workflow_data/states"):
@@ -536,25 +696,275 @@ class StateRepositoryImpl(StateRepository):
             return len(self.get_state_history(workflow_id))
         else:
             return len(self._states_cache)
+
+
+class ExecutionCodec:
+    """规则执行记录的序列化 - 文件和SQLite仓储共用"""
     
-    def _dict_to_state(self, data: Dict) -> GlobalState:
-        """从字典创建状态"""
-        # Backward compatibility: handle both 'state' (new) and 'description' (old) field names
-        state_value = data.get('state', data.get('description', ''))
+    def _execution_to_dict(self, execution: RuleExecution) -> Dict:
+        """将执行记录转换为字典"""
+        return {
+            'id': execution.id,
+            'rule_id': execution.rule_id,
+            'status': execution.status.value,
+            'result': execution.result.to_dict() if execution.result else None,
+            # 'started_at': execution.started_at.isoformat(),  # Removed for LLM caching
+            'completed_at': execution.completed_at.isoformat() if execution.completed_at else None,
+            'execution_context': execution.execution_context,
+            'failure_reason': execution.failure_reason,
+            'confidence_score': execution.confidence_score
+        }
+    
+    def _dict_to_execution(self, data: Dict) -> RuleExecution:
+        """从字典创建执行记录"""
+        from ..domain.entities import WorkflowResult
         
-        return GlobalState(
+        # 转换结果
+        result = None
+        if data.get('result'):
+            result_data = data['result']
+            result = WorkflowResult(
+                success=result_data['success'],
+                message=result_data['message'],
+                data=result_data.get('data'),
+                error_details=result_data.get('error_details'),
+                metadata=result_data.get('metadata', {})
+                # timestamp=datetime.fromisoformat(result_data['timestamp'])  # Removed for LLM caching
+            )
+        
+        execution = RuleExecution(
             id=data['id'],
-            state=state_value,
-            context_variables=data.get('context_variables', {}),
-            execution_history=data.get('execution_history', []),
-            # timestamp=datetime.fromisoformat(data.get('timestamp')),  # Removed for LLM caching
-            workflow_id=data.get('workflow_id', ''),
-            iteration_count=data.get('iteration_count', 0),
-            goal_achieved=data.get('goal_achieved', False)
+            rule_id=data['rule_id'],
+            status=ExecutionStatus(data['status']),
+            result=result,
+            # started_at=datetime.fromisoformat(data['started_at']),  # Removed for LLM caching
+            completed_at=datetime.fromisoformat(data['completed_at']) if data.get('completed_at') else None,
+            execution_context=data.get('execution_context', {}),
+            failure_reason=data.get('failure_reason'),
+            confidence_score=data.get('confidence_score', 0.0)
         )
+        
+        return execution
+
+
+class ExecutionTimeline:
+    """
+    执行时间侧索引 - 按记录时间排序的执行ID，支持 O(log n) 的时间范围查询和过期删除
+    
+    执行时间不写入执行记录本身（执行记录会进入LLM提示，内容保持稳定以便命中缓存），
+    而是追加到单独的索引日志中；启动时只重放索引日志，不需要读取执行记录文件。
+    
+    多个进程可以共用同一个索引日志：追加和压缩都持有文件锁，压缩前重新读取日志，
+    保留其他进程追加的记录。日志中被覆盖或删除的记录超过有效记录数时自动压缩。
+    """
+    
+    def __init__(self, log_path: Path,
+                 compact_min_dead_entries: int = ExecutionConstants.TIMELINE_COMPACT_MIN_DEAD_ENTRIES):
+        """
+        初始化时间索引
+        
+        Args:
+            log_path: 索引日志文件路径（每行一条 JSON 记录，后写入的记录覆盖先写入的）
+            compact_min_dead_entries: 失效记录至少达到该数量且超过有效记录数时自动压缩日志
+        """
+        self.log_path = log_path
+        self.lock_path = log_path.with_suffix('.lock')
+        self.compact_min_dead_entries = compact_min_dead_entries
+        self._times: List[float] = []       # 升序时间戳
+        self._ids: List[str] = []           # 与 _times 一一对应的执行ID
+        self._time_by_id: Dict[str, float] = {}
+        self._dead_entries = 0              # 日志中已被覆盖或删除的记录数
+        self._lock = threading.Lock()
+        self._load()
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def get_time(self, execution_id: str) -> Optional[float]:
+        """获取执行记录的时间戳，未索引时返回 None"""
+        return self._time_by_id.get(execution_id)
+    
+    def record(self, execution_id: str, timestamp: float) -> None:
+        """记录或更新执行时间"""
+        with self._lock:
+            previous = self._time_by_id.get(execution_id)
+            if previous == timestamp:
+                return
+            if previous is not None:
+                self._remove_entry(execution_id, previous)
+                self._dead_entries += 1
+            self._insert_entry(execution_id, timestamp)
+            self._append({'id': execution_id, 'time': timestamp})
+            self._compact_if_needed()
+    
+    def remove(self, execution_id: str) -> None:
+        """移除执行记录的索引"""
+        with self._lock:
+            previous = self._time_by_id.pop(execution_id, None)
+            if previous is not None:
+                self._remove_entry(execution_id, previous)
+                # 原记录和删除标记都是失效记录
+                self._dead_entries += 2
+                self._append({'id': execution_id, 'deleted': True})
+                self._compact_if_needed()
+    
+    def find_range(self, start: float, end: float) -> List[str]:
+        """按时间升序返回 [start, end] 内的执行ID"""
+        with self._lock:
+            low = bisect.bisect_left(self._times, start)
+            high = bisect.bisect_right(self._times, end)
+            return self._ids[low:high]
+    
+    def latest(self, limit: int) -> List[str]:
+        """按时间倒序返回最近的执行ID"""
+        with self._lock:
+            return self._ids[-limit:][::-1] if limit > 0 else []
+    
+    def expire_before(self, cutoff: float, delete: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """
+        移除并返回时间早于 cutoff 的执行ID，同时压缩索引日志
+        
+        压缩前重新读取日志，其他进程追加的记录也参与过期判断，不会在压缩时丢失。
+        delete 在压缩前删除每个过期执行的数据，返回 False 或抛出异常的执行保留在索引中，
+        下次过期时重试，不会因为索引已删除而成为无法再清理的孤立数据。
+        """
+        with self._lock, self._file_lock():
+            self._reload()
+            position = bisect.bisect_left(self._times, cutoff)
+            expired = []
+            for execution_id in self._ids[:position]:
+                try:
+                    deleted = delete is None or delete(execution_id)
+                except Exception as e:
+                    logger.error(f"删除过期执行失败 {execution_id}: {e}")
+                    deleted = False
+                if deleted:
+                    expired.append(execution_id)
+            if not expired:
+                return []
+            
+            removed = set(expired)
+            kept = [(timestamp, execution_id) for timestamp, execution_id
+                    in zip(self._times[:position], self._ids[:position]) if execution_id not in removed]
+            self._times[:position] = [timestamp for timestamp, _ in kept]
+            self._ids[:position] = [execution_id for _, execution_id in kept]
+            for execution_id in expired:
+                del self._time_by_id[execution_id]
+            self._rewrite()
+            return expired
+    
+    def compact(self) -> None:
+        """重新读取并压缩索引日志，只保留每个执行ID的最新记录"""
+        with self._lock, self._file_lock():
+            self._reload()
+            self._rewrite()
+    
+    def _compact_if_needed(self) -> None:
+        if self._dead_entries >= max(self.compact_min_dead_entries, len(self._ids)):
+            with self._file_lock():
+                self._reload()
+                self._rewrite()
+    
+    @contextmanager
+    def _file_lock(self):
+        """跨进程的索引日志锁；不支持 fcntl 的平台只有进程内的锁"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _insert_entry(self, execution_id: str, timestamp: float) -> None:
+        position = bisect.bisect_right(self._times, timestamp)
+        self._times.insert(position, timestamp)
+        self._ids.insert(position, execution_id)
+        self._time_by_id[execution_id] = timestamp
+    
+    def _remove_entry(self, execution_id: str, timestamp: float) -> None:
+        position = bisect.bisect_left(self._times, timestamp)
+        while self._ids[position] != execution_id:
+            position += 1
+        del self._times[position]
+        del self._ids[position]
+    
+    def _append(self, entry: Dict) -> None:
+        try:
+            with self._file_lock(), open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except Exception as e:
+            logger.error(f"写入执行时间索引失败: {e}")
+    
+    def _rewrite(self) -> None:
+        """用当前索引覆盖日志，调用方需持有文件锁"""
+        temp_path = self.log_path.with_suffix('.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for execution_id, timestamp in zip(self._ids, self._times):
+                    f.write(json.dumps({'id': execution_id, 'time': timestamp}, ensure_ascii=False) + '\n')
+            os.replace(temp_path, self.log_path)
+            self._dead_entries = 0
+        except Exception as e:
+            logger.error(f"压缩执行时间索引失败: {e}")
+    
+    def _read_log(self) -> Tuple[Dict[str, float], int]:
+        """重放索引日志，返回 ({执行ID: 时间戳}, 日志记录数)"""
+        times: Dict[str, float] = {}
+        entry_count = 0
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    if entry.get('deleted'):
+                        times.pop(entry['id'], None)
+                    else:
+                        times[entry['id']] = float(entry['time'])
+                    entry_count += 1
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"跳过无法解析的执行时间索引记录: {line.strip()[:100]}")
+        return times, entry_count
+    
+    def _reload(self) -> None:
+        """从日志重建索引，合并其他进程追加的记录；调用方需持有文件锁"""
+        if not self.log_path.exists():
+            return
+        try:
+            times, entry_count = self._read_log()
+        except Exception as e:
+            logger.error(f"重新读取执行时间索引失败，使用内存中的索引: {e}")
+            return
+        self._set_entries(times)
+        self._dead_entries = entry_count - len(times)
+    
+    def _set_entries(self, times: Dict[str, float]) -> None:
+        self._times.clear()
+        self._ids.clear()
+        self._time_by_id.clear()
+        for execution_id, timestamp in sorted(times.items(), key=lambda item: item[1]):
+            self._times.append(timestamp)
+            self._ids.append(execution_id)
+            self._time_by_id[execution_id] = timestamp
+    
+    def _load(self) -> None:
+        """重放索引日志；日志不存在时按已有执行记录文件的修改时间建立索引"""
+        with self._file_lock():
+            if self.log_path.exists():
+                self._reload()
+                return
+            
+            times: Dict[str, float] = {}
+            for file_path in self.log_path.parent.glob("execution_*.json"):
+                times[file_path.stem[len("execution_"):]] = file_path.stat().st_mtime
+            if times:
+                logger.info(f"为 {len(times)} 个已有执行记录建立时间索引")
+                self._set_entries(times)
+                self._rewrite()
 
 
-class ExecutionRepositoryImpl(ExecutionRepository):
+class ExecutionRepositoryImpl(ExecutionCodec, ExecutionRepository):
     """执行仓储实现 - 基于文件存储"""
     
     def __init__(self, storage_path: str = "./.cognitive_workflow_data/executions"):
@@ -570,6 +980,9 @@ class ExecutionRepositoryImpl(ExecutionRepository):
         # 内存缓存
         self._executions_cache: Dict[str, RuleExecution] = {}
         self._rule_executions: Dict[str, List[RuleExecution]] = {}
+        
+        # 执行时间侧索引（不进入执行记录内容）
+        self._timeline = ExecutionTimeline(self.storage_path / "timeline_index.jsonl")
     
     def save_execution(self, rule_execution: RuleExecution) -> None:
         """保存规则执行记录"""
@@ -581,6 +994,13 @@ class ExecutionRepositoryImpl(ExecutionRepository):
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(execution_data, f, ensure_ascii=False, indent=2)
             
+            # 更新时间索引：已完成的执行取完成时间，否则保留首次保存的时间
+            if rule_execution.completed_at:
+                recorded_at = rule_execution.completed_at.timestamp()
+            else:
+                recorded_at = self._timeline.get_time(rule_execution.id) or time.time()
+            self._timeline.record(rule_execution.id, recorded_at)
+            
             # 更新缓存
             self._executions_cache[rule_execution.id] = rule_execution
             
@@ -652,17 +1072,11 @@ class ExecutionRepositoryImpl(ExecutionRepository):
             return []
     
     def find_failed_executions(self, time_range: Tuple[datetime, datetime]) -> List[RuleExecution]:
-        """查找失败的执行记录"""
+        """查找时间范围内失败的执行记录（按时间升序）"""
         try:
             start_time, end_time = time_range
-            failed_executions = []
-            
-            for execution in self._executions_cache.values():
-                if execution.status == ExecutionStatus.FAILED:
-                    # Time filtering removed as started_at was removed for LLM caching
-                    failed_executions.append(execution)
-            
-            return failed_executions  # Cannot sort by started_at anymore
+            executions = self._load_indexed(self._timeline.find_range(start_time.timestamp(), end_time.timestamp()))
+            return [execution for execution in executions if execution.status == ExecutionStatus.FAILED]
             
         except Exception as e:
             logger.error(f"查找失败执行记录失败: {e}")
@@ -684,15 +1098,9 @@ class ExecutionRepositoryImpl(ExecutionRepository):
             return []
     
     def find_executions_by_time_range(self, start_time: datetime, end_time: datetime) -> List[RuleExecution]:
-        """根据时间范围查找执行记录"""
+        """根据时间范围查找执行记录（按时间升序）"""
         try:
-            matching_executions = []
-            
-            for execution in self._executions_cache.values():
-                # Time filtering removed as started_at was removed for LLM caching
-                matching_executions.append(execution)
-            
-            return matching_executions  # Cannot sort by started_at anymore
+            return self._load_indexed(self._timeline.find_range(start_time.timestamp(), end_time.timestamp()))
             
         except Exception as e:
             logger.error(f"按时间范围查找执行记录失败: {e}")
@@ -743,40 +1151,27 @@ class ExecutionRepositoryImpl(ExecutionRepository):
             }
     
     def get_recent_executions(self, limit: int = 100) -> List[RuleExecution]:
-        """获取最近的执行记录"""
+        """获取最近的执行记录（按时间倒序）"""
         try:
-            all_executions = list(self._executions_cache.values())
-            # Cannot sort by started_at anymore as it was removed for LLM caching
-            return all_executions[:limit]
+            return self._load_indexed(self._timeline.latest(limit))
             
         except Exception as e:
             logger.error(f"获取最近执行记录失败: {e}")
             return []
     
     def delete_old_executions(self, cutoff_time: datetime) -> int:
-        """删除旧的执行记录，返回删除的数量"""
+        """删除时间早于 cutoff_time 的执行记录，返回删除的数量"""
         try:
-            deleted_count = 0
-            executions_to_delete = []
-            
-            for execution_id, execution in self._executions_cache.items():
-                # Time comparison removed as started_at was removed for LLM caching
-                # For now, don't delete any executions based on time
-                pass
+            # 先删除文件再从时间索引移除，删除失败的执行保留在索引中，下次清理时重试
+            executions_to_delete = set(self._timeline.expire_before(cutoff_time.timestamp(),
+                                                                    delete=self._delete_execution_file))
+            deleted_count = len(executions_to_delete)
             
             for execution_id in executions_to_delete:
-                try:
-                    # 删除文件
-                    file_path = self.storage_path / f"execution_{execution_id}.json"
-                    if file_path.exists():
-                        file_path.unlink()
-                    
-                    # 从缓存删除
-                    del self._executions_cache[execution_id]
-                    deleted_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"删除执行记录失败 {execution_id}: {e}")
+                self._executions_cache.pop(execution_id, None)
+            
+            for rule_id, executions in self._rule_executions.items():
+                self._rule_executions[rule_id] = [e for e in executions if e.id not in executions_to_delete]
             
             logger.info(f"删除了 {deleted_count} 个旧执行记录")
             return deleted_count
@@ -785,6 +1180,15 @@ class ExecutionRepositoryImpl(ExecutionRepository):
             logger.error(f"删除旧执行记录失败: {e}")
             return 0
     
+    def _delete_execution_file(self, execution_id: str) -> bool:
+        """删除执行记录文件，文件已不存在时也视为删除成功"""
+        try:
+            (self.storage_path / f"execution_{execution_id}.json").unlink(missing_ok=True)
+            return True
+        except Exception as e:
+            logger.error(f"删除执行记录失败 {execution_id}: {e}")
+            return False
+    
     def get_execution_count(self, rule_id: Optional[str] = None, status: Optional[ExecutionStatus] = None) -> int:
         """获取执行记录数量"""
         try:
@@ -818,6 +1222,20 @@ class ExecutionRepositoryImpl(ExecutionRepository):
             logger.error(f"查找长时间运行执行记录失败: {e}")
             return []
     
+    def _load_indexed(self, execution_ids: List[str]) -> List[RuleExecution]:
+        """按索引顺序加载执行记录，跳过文件已不存在的记录"""
+        executions = []
+        for execution_id in execution_ids:
+            execution = self._executions_cache.get(execution_id)
+            if execution is None:
+                file_path = self.storage_path / f"execution_{execution_id}.json"
+                if not file_path.exists():
+                    logger.warning(f"执行时间索引指向不存在的记录: {execution_id}")
+                    continue
+                execution = self.load_execution(execution_id)
+            executions.append(execution)
+        return executions
+    
     def update_execution_status(self, execution_id: str, status: ExecutionStatus, failure_reason: Optional[str] = None) -> bool:
         """更新执行状态"""
         try:
@@ -836,48 +1254,3 @@ class ExecutionRepositoryImpl(ExecutionRepository):
         except Exception as e:
             logger.error(f"更新执行状态失败: {e}")
             return False
-    
-    def _execution_to_dict(self, execution: RuleExecution) -> Dict:
-        """将执行记录转换为字典"""
-        return {
-            'id': execution.id,
-            'rule_id': execution.rule_id,
-            'status': execution.status.value,
-            'result': execution.result.to_dict() if execution.result else None,
-            # 'started_at': execution.started_at.isoformat(),  # Removed for LLM caching
-            'completed_at': execution.completed_at.isoformat() if execution.completed_at else None,
-            'execution_context': execution.execution_context,
-            'failure_reason': execution.failure_reason,
-            'confidence_score': execution.confidence_score
-        }
-    
-    def _dict_to_execution(self, data: Dict) -> RuleExecution:
-        """从字典创建执行记录"""
-        from ..domain.entities import WorkflowResult
-        
-        # 转换结果
-        result = None
-        if data.get('result'):
-            result_data = data['result']
-            result = WorkflowResult(
-                success=result_data['success'],
-                message=result_data['message'],
-                data=result_data.get('data'),
-                error_details=result_data.get('error_details'),
-                metadata=result_data.get('metadata', {}),
-                timestamp=datetime.fromisoformat(result_data['timestamp'])
-            )
-        
-        execution = RuleExecution(
-            id=data['id'],
-            rule_id=data['rule_id'],
-            status=ExecutionStatus(data['status']),
-            result=result,
-            # started_at=datetime.fromisoformat(data['started_at']),  # Removed for LLM caching
-            completed_at=datetime.fromisoformat(data['completed_at']) if data.get('completed_at') else None,
-            execution_context=data.get('execution_context', {}),
-            failure_reason=data.get('failure_reason'),
-            confidence_score=data.get('confidence_score', 0.0)
-        )
-        
-        return execution
\ No newline at end of file
@@ -0,0 +1,611 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite仓储实现
+
+把规则集、状态和执行记录保存在同一个 SQLite 文件中，替代每个对象一个 JSON 文件的存储方式。
+按 rule_id、workflow_id、status 和记录时间建立二级索引，查询只读取命中的行；
+启动时不加载任何数据，对象在查询时才反序列化。多次保存可以放在同一个事务中批量提交。
+
+序列化格式与文件仓储相同（见 repository_impl 中的编解码类），
+已有的 JSON 数据可以用 migrate_json_storage 一次性导入。
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from ..domain.entities import (
+    ProductionRule, RuleSet, RuleExecution, GlobalState
+)
+from ..domain.repositories import (
+    RuleRepository, StateRepository, ExecutionRepository
+)
+from ..domain.value_objects import RulePhase, ExecutionStatus
+from .repository_impl import RuleCodec, StateCodec, ExecutionCodec, RuleRepositoryImpl
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rule_sets (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rules (
+    id TEXT PRIMARY KEY,
+    rule_set_id TEXT,
+    phase TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    condition TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rules_rule_set ON rules (rule_set_id);
+CREATE INDEX IF NOT EXISTS idx_rules_phase ON rules (phase);
+CREATE INDEX IF NOT EXISTS idx_rules_priority ON rules (priority);
+
+CREATE TABLE IF NOT EXISTS states (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    workflow_id TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_states_workflow ON states (workflow_id, seq);
+CREATE INDEX IF NOT EXISTS idx_states_time ON states (recorded_at);
+
+CREATE TABLE IF NOT EXISTS state_snapshots (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS executions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    rule_id TEXT NOT NULL,
+    workflow_id TEXT,
+    status TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_executions_rule ON executions (rule_id, seq);
+CREATE INDEX IF NOT EXISTS idx_executions_workflow ON executions (workflow_id, seq);
+CREATE INDEX IF NOT EXISTS idx_executions_status ON executions (status, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_executions_time ON executions (recorded_at);
+"""
+
+
+class SQLiteDatabase:
+    """SQLite 连接 - 三个仓储共用一个数据库文件和事务"""
+
+    def __init__(self, path: str = "./.cognitive_workflow_data/repository.db"):
+        """
+        初始化数据库
+
+        Args:
+            path: 数据库文件路径，":memory:" 表示只保存在内存中（用于测试）
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        # 手动管理事务，以便把多次保存合并为一次提交
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        开启事务，可以嵌套：只有最外层事务结束时才提交，出错时整体回滚
+
+        用法:
+            with database.transaction():
+                for execution in executions:
+                    execution_repository.save_execution(execution)
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._connection.execute("BEGIN")
+            self._depth += 1
+            try:
+                yield self._connection
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._connection.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._connection.execute("COMMIT")
+
+    def query(self, sql: str, params: Tuple = ()) -> List[tuple]:
+        """执行查询并返回所有行"""
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._connection.close()
+
+
+class SQLiteRuleRepository(RuleCodec, RuleRepository):
+    """规则仓储实现 - 基于SQLite存储"""
+
+    def __init__(self, database: SQLiteDatabase):
+        """
+        初始化规则仓储
+
+        Args:
+            database: 共享的SQLite数据库
+        """
+        self.database = database
+
+    def save_rule_set(self, rule_set: RuleSet) -> None:
+        """保存规则集，规则集中的规则同时写入规则索引"""
+        try:
+            with self.database.transaction() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO rule_sets (id, data, updated_at) VALUES (?, ?, ?)",
+                    (rule_set.id, json.dumps(self._rule_set_to_dict(rule_set), ensure_ascii=False), time.time())
+                )
+                connection.execute("DELETE FROM rules WHERE rule_set_id = ?", (rule_set.id,))
+                self._insert_rules(connection, rule_set.rules, rule_set.id)
+
+            logger.debug(f"规则集已保存: {rule_set.id}")
+
+        except Exception as e:
+            logger.error(f"保存规则集失败: {e}")
+            raise
+
+    def load_rule_set(self, rule_set_id: str) -> RuleSet:
+        """加载规则集"""
+        rows = self.database.query("SELECT data FROM rule_sets WHERE id = ?", (rule_set_id,))
+        if not rows:
+            raise ValueError(f"规则集不存在: {rule_set_id}")
+        return self._dict_to_rule_set(json.loads(rows[0][0]))
+
+    def find_rules_by_condition(self, condition_pattern: str) -> List[ProductionRule]:
+        """根据条件模式查找规则"""
+        return self._query_rules("WHERE instr(lower(condition), lower(?)) > 0", (condition_pattern,))
+
+    def find_rules_by_phase(self, phase: RulePhase) -> List[ProductionRule]:
+        """根据阶段查找规则"""
+        return self._query_rules("WHERE phase = ?", (phase.value,))
+
+    def save_rule(self, rule: ProductionRule) -> None:
+        """保存单个规则（不属于任何规则集时 rule_set_id 为空），所属规则集的内容同时更新"""
+        try:
+            with self.database.transaction() as connection:
+                row = connection.execute("SELECT rule_set_id FROM rules WHERE id = ?", (rule.id,)).fetchone()
+                rule_set_id = row[0] if row else None
+                self._insert_rules(connection, [rule], rule_set_id)
+                if rule_set_id is not None:
+                    self._update_rule_set_rules(connection, rule_set_id, rule.id, self._rule_to_dict(rule))
+
+        except Exception as e:
+            logger.error(f"保存规则失败: {e}")
+            raise
+
+    def load_rule(self, rule_id: str) -> ProductionRule:
+        """加载单个规则"""
+        rules = self._query_rules("WHERE id = ?", (rule_id,))
+        if not rules:
+            raise ValueError(f"规则不存在: {rule_id}")
+        return rules[0]
+
+    def delete_rule(self, rule_id: str) -> bool:
+        """删除规则"""
+        try:
+            with self.database.transaction() as connection:
+                row = connection.execute("SELECT rule_set_id FROM rules WHERE id = ?", (rule_id,)).fetchone()
+                if row is None:
+                    return False
+                connection.execute("DELETE FROM rules WHERE id = ?", (rule_id,))
+                if row[0] is not None:
+                    self._update_rule_set_rules(connection, row[0], rule_id, None)
+                return True
+
+        except Exception as e:
+            logger.error(f"删除规则失败: {e}")
+            return False
+
+    def find_rules_by_agent_capability(self, agent_name: str) -> List[ProductionRule]:
+        """根据智能体名称查找规则（保持方法名兼容性）"""
+        return self.find_rules_by_agent_name(agent_name)
+
+    def find_rules_by_agent_name(self, agent_name: str) -> List[ProductionRule]:
+        """根据智能体名称查找规则"""
+        # 智能体已移至实例层(RuleExecution.assigned_agent)，规则本身不再记录智能体
+        return []
+
+    def find_rules_by_priority_range(self, min_priority: int, max_priority: int) -> List[ProductionRule]:
+        """根据优先级范围查找规则"""
+        return self._query_rules("WHERE priority BETWEEN ? AND ?", (min_priority, max_priority))
+
+    def get_rule_count(self) -> int:
+        """获取规则总数"""
+        return self.database.query("SELECT COUNT(*) FROM rules")[0][0]
+
+    def list_all_rule_sets(self) -> List[RuleSet]:
+        """列出所有规则集"""
+        rows = self.database.query("SELECT data FROM rule_sets ORDER BY updated_at")
+        return [self._dict_to_rule_set(json.loads(row[0])) for row in rows]
+
+    def _insert_rules(self, connection: sqlite3.Connection, rules: Iterable[ProductionRule],
+                      rule_set_id: Optional[str]) -> None:
+        connection.executemany(
+            "INSERT OR REPLACE INTO rules (id, rule_set_id, phase, priority, condition, data) VALUES (?, ?, ?, ?, ?, ?)",
+            [(rule.id, rule_set_id, rule.phase.value, rule.priority, rule.condition,
+              json.dumps(self._rule_to_dict(rule), ensure_ascii=False)) for rule in rules]
+        )
+
+    @staticmethod
+    def _update_rule_set_rules(connection: sqlite3.Connection, rule_set_id: str, rule_id: str,
+                               rule_data: Optional[Dict]) -> None:
+        """在规则集内容中替换（rule_data 为 None 时删除）一个规则，保持与规则索引一致"""
+        row = connection.execute("SELECT data FROM rule_sets WHERE id = ?", (rule_set_id,)).fetchone()
+        if row is None:
+            return
+        data = json.loads(row[0])
+        rules = [existing for existing in data.get('rules', []) if existing.get('id') != rule_id]
+        if rule_data is not None:
+            positions = [index for index, existing in enumerate(data.get('rules', []))
+                         if existing.get('id') == rule_id]
+            rules.insert(positions[0] if positions else len(rules), rule_data)
+        data['rules'] = rules
+        connection.execute("UPDATE rule_sets SET data = ? WHERE id = ?",
+                           (json.dumps(data, ensure_ascii=False), rule_set_id))
+
+    def _query_rules(self, where: str, params: Tuple) -> List[ProductionRule]:
+        try:
+            rows = self.database.query(f"SELECT data FROM rules {where}", params)
+            return [self._dict_to_rule(json.loads(row[0])) for row in rows]
+
+        except Exception as e:
+            logger.error(f"查找规则失败: {e}")
+            return []
+
+
+class SQLiteStateRepository(StateCodec, StateRepository):
+    """状态仓储实现 - 基于SQLite存储"""
+
+    def __init__(self, database: SQLiteDatabase):
+        """
+        初始化状态仓储
+
+        Args:
+            database: 共享的SQLite数据库
+        """
+        self.database = database
+
+    def save_state(self, global_state: GlobalState) -> None:
+        """保存状态，重复保存同一个状态时更新内容并保留原有顺序"""
+        try:
+            with self.database.transaction() as connection:
+                connection.execute(
+                    "INSERT INTO states (id, workflow_id, recorded_at, data) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET workflow_id = excluded.workflow_id, data = excluded.data",
+                    (global_state.id, global_state.workflow_id or "", time.time(),
+                     json.dumps(global_state.to_dict(), ensure_ascii=False, default=str))
+                )
+
+            logger.debug(f"状态已保存: {global_state.id}")
+
+        except Exception as e:
+            logger.error(f"保存状态失败: {e}")
+            raise
+
+    def save_states(self, states: Iterable[GlobalState]) -> None:
+        """在一个事务中批量保存状态"""
+        with self.database.transaction():
+            for state in states:
+                self.save_state(state)
+
+    def load_state(self, state_id: str) -> GlobalState:
+        """加载状态"""
+        states = self._query_states("WHERE id = ?", (state_id,))
+        if not states:
+            raise ValueError(f"状态不存在: {state_id}")
+        return states[0]
+
+    def get_state_history(self, workflow_id: str) -> List[GlobalState]:
+        """获取工作流的状态历史（按保存顺序）"""
+        return self._query_states("WHERE workflow_id = ? ORDER BY seq", (workflow_id,))
+
+    def save_state_snapshot(self, state: GlobalState, snapshot_name: str) -> None:
+        """保存状态快照"""
+        try:
+            state_data = state.to_dict()
+            state_data['snapshot_name'] = snapshot_name
+            state_data['snapshot_timestamp'] = datetime.now().isoformat()
+
+            with self.database.transaction() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO state_snapshots (name, data, created_at) VALUES (?, ?, ?)",
+                    (snapshot_name, json.dumps(state_data, ensure_ascii=False, default=str), time.time())
+                )
+
+            logger.debug(f"状态快照已保存: {snapshot_name}")
+
+        except Exception as e:
+            logger.error(f"保存状态快照失败: {e}")
+            raise
+
+    def load_state_snapshot(self, snapshot_name: str) -> GlobalState:
+        """加载状态快照"""
+        rows = self.database.query("SELECT data FROM state_snapshots WHERE name = ?", (snapshot_name,))
+        if not rows:
+            raise ValueError(f"状态快照不存在: {snapshot_name}")
+        return self._dict_to_state(json.loads(rows[0][0]))
+
+    def find_states_by_workflow(self, workflow_id: str) -> List[GlobalState]:
+        """根据工作流ID查找状态"""
+        return self.get_state_history(workflow_id)
+
+    def find_states_by_time_range(self, start_time: datetime, end_time: datetime) -> List[GlobalState]:
+        """根据保存时间范围查找状态"""
+        return self._query_states("WHERE recorded_at BETWEEN ? AND ? ORDER BY seq",
+                                  (start_time.timestamp(), end_time.timestamp()))
+
+    def get_latest_state(self, workflow_id: str) -> Optional[GlobalState]:
+        """获取工作流的最新状态"""
+        states = self._query_states("WHERE workflow_id = ? ORDER BY seq DESC LIMIT 1", (workflow_id,))
+        return states[0] if states else None
+
+    def delete_old_states(self, cutoff_time: datetime) -> int:
+        """删除保存时间早于 cutoff_time 的状态，返回删除的数量"""
+        try:
+            with self.database.transaction() as connection:
+                deleted_count = connection.execute(
+                    "DELETE FROM states WHERE recorded_at < ?", (cutoff_time.timestamp(),)
+                ).rowcount
+
+            logger.info(f"删除了 {deleted_count} 个旧状态")
+            return deleted_count
+
+        except Exception as e:
+            logger.error(f"删除旧状态失败: {e}")
+            return 0
+
+    def get_state_count(self, workflow_id: Optional[str] = None) -> int:
+        """获取状态数量"""
+        if workflow_id:
+            return self.database.query("SELECT COUNT(*) FROM states WHERE workflow_id = ?", (workflow_id,))[0][0]
+        return self.database.query("SELECT COUNT(*) FROM states")[0][0]
+
+    def _query_states(self, where: str, params: Tuple) -> List[GlobalState]:
+        try:
+            rows = self.database.query(f"SELECT data FROM states {where}", params)
+            return [self._dict_to_state(json.loads(row[0])) for row in rows]
+
+        except Exception as e:
+            logger.error(f"查找状态失败: {e}")
+            return []
+
+
+class SQLiteExecutionRepository(ExecutionCodec, ExecutionRepository):
+    """执行仓储实现 - 基于SQLite存储"""
+
+    def __init__(self, database: SQLiteDatabase):
+        """
+        初始化执行仓储
+
+        Args:
+            database: 共享的SQLite数据库
+        """
+        self.database = database
+
+    def save_execution(self, rule_execution: RuleExecution) -> None:
+        """保存规则执行记录，记录时间取完成时间，未完成时取保存时间"""
+        try:
+            recorded_at = (rule_execution.completed_at.timestamp()
+                           if rule_execution.completed_at else time.time())
+            with self.database.transaction() as connection:
+                connection.execute(
+                    "INSERT INTO executions (id, rule_id, workflow_id, status, recorded_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                    "rule_id = excluded.rule_id, workflow_id = excluded.workflow_id, status = excluded.status, "
+                    "recorded_at = excluded.recorded_at, data = excluded.data",
+                    (rule_execution.id, rule_execution.rule_id,
+                     rule_execution.execution_context.get('workflow_id'), rule_execution.status.value,
+                     recorded_at,
+                     json.dumps(self._execution_to_dict(rule_execution), ensure_ascii=False, default=str))
+                )
+
+            logger.debug(f"执行记录已保存: {rule_execution.id}")
+
+        except Exception as e:
+            logger.error(f"保存执行记录失败: {e}")
+            raise
+
+    def save_executions(self, executions: Iterable[RuleExecution]) -> None:
+        """在一个事务中批量保存执行记录"""
+        with self.database.transaction():
+            for execution in executions:
+                self.save_execution(execution)
+
+    def load_execution(self, execution_id: str) -> RuleExecution:
+        """加载规则执行记录"""
+        executions = self._query_executions("WHERE id = ?", (execution_id,))
+        if not executions:
+            raise ValueError(f"执行记录不存在: {execution_id}")
+        return executions[0]
+
+    def find_executions_by_rule(self, rule_id: str) -> List[RuleExecution]:
+        """根据规则ID查找执行记录（按保存顺序）"""
+        return self._query_executions("WHERE rule_id = ? ORDER BY seq", (rule_id,))
+
+    def find_executions_by_workflow(self, workflow_id: str) -> List[RuleExecution]:
+        """根据工作流ID（execution_context['workflow_id']）查找执行记录"""
+        return self._query_executions("WHERE workflow_id = ? ORDER BY seq", (workflow_id,))
+
+    def find_failed_executions(self, time_range: Tuple[datetime, datetime]) -> List[RuleExecution]:
+        """查找时间范围内失败的执行记录"""
+        start_time, end_time = time_range
+        return self._query_executions(
+            "WHERE status = ? AND recorded_at BETWEEN ? AND ? ORDER BY recorded_at",
+            (ExecutionStatus.FAILED.value, start_time.timestamp(), end_time.timestamp())
+        )
+
+    def find_executions_by_status(self, status: ExecutionStatus) -> List[RuleExecution]:
+        """根据状态查找执行记录"""
+        return self._query_executions("WHERE status = ? ORDER BY seq", (status.value,))
+
+    def find_executions_by_time_range(self, start_time: datetime, end_time: datetime) -> List[RuleExecution]:
+        """根据记录时间范围查找执行记录"""
+        return self._query_executions("WHERE recorded_at BETWEEN ? AND ? ORDER BY recorded_at",
+                                      (start_time.timestamp(), end_time.timestamp()))
+
+    def get_execution_statistics(self, rule_id: Optional[str] = None) -> dict:
+        """获取执行统计信息"""
+        try:
+            where, params = ("WHERE rule_id = ?", (rule_id,)) if rule_id else ("", ())
+            total_executions = self.database.query(f"SELECT COUNT(*) FROM executions {where}", params)[0][0]
+            # 成功与否还取决于结果内容，只需要反序列化已完成的记录
+            completed = self._query_executions(
+                f"{where} {'AND' if where else 'WHERE'} status = ?", params + (ExecutionStatus.COMPLETED.value,)
+            )
+            successful_executions = sum(1 for e in completed if e.is_successful())
+            execution_times = [d for d in (e.get_execution_duration() for e in completed) if d is not None]
+
+            return {
+                'total_executions': total_executions,
+                'successful_executions': successful_executions,
+                'failed_executions': total_executions - successful_executions,
+                'success_rate': successful_executions / total_executions if total_executions > 0 else 0.0,
+                'average_execution_time': (sum(execution_times) / len(execution_times)) if execution_times else 0.0,
+                'total_execution_time': sum(execution_times),
+                'rule_match_accuracy': 0.85  # 简化实现，与文件仓储一致
+            }
+
+        except Exception as e:
+            logger.error(f"获取执行统计失败: {e}")
+            return {
+                'total_executions': 0,
+                'successful_executions': 0,
+                'failed_executions': 0,
+                'success_rate': 0.0,
+                'average_execution_time': 0.0,
+                'total_execution_time': 0.0,
+                'rule_match_accuracy': 0.0
+            }
+
+    def get_recent_executions(self, limit: int = 100) -> List[RuleExecution]:
+        """获取最近的执行记录（按记录时间倒序）"""
+        return self._query_executions("ORDER BY recorded_at DESC, seq DESC LIMIT ?", (limit,))
+
+    def delete_old_executions(self, cutoff_time: datetime) -> int:
+        """删除记录时间早于 cutoff_time 的执行记录，返回删除的数量"""
+        try:
+            with self.database.transaction() as connection:
+                deleted_count = connection.execute(
+                    "DELETE FROM executions WHERE recorded_at < ?", (cutoff_time.timestamp(),)
+                ).rowcount
+
+            logger.info(f"删除了 {deleted_count} 个旧执行记录")
+            return deleted_count
+
+        except Exception as e:
+            logger.error(f"删除旧执行记录失败: {e}")
+            return 0
+
+    def get_execution_count(self, rule_id: Optional[str] = None, status: Optional[ExecutionStatus] = None) -> int:
+        """获取执行记录数量"""
+        conditions, params = [], []
+        if rule_id:
+            conditions.append("rule_id = ?")
+            params.append(rule_id)
+        if status:
+            conditions.append("status = ?")
+            params.append(status.value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.database.query(f"SELECT COUNT(*) FROM executions {where}", tuple(params))[0][0]
+
+    def find_long_running_executions(self, threshold_seconds: int = 300) -> List[RuleExecution]:
+        """查找长时间运行的执行记录"""
+        # 执行开始时间已不再记录（LLM缓存优化），无法计算持续时间，与文件仓储一致
+        return []
+
+    def update_execution_status(self, execution_id: str, status: ExecutionStatus, failure_reason: Optional[str] = None) -> bool:
+        """更新执行状态"""
+        try:
+            with self.database.transaction():
+                executions = self._query_executions("WHERE id = ?", (execution_id,))
+                if not executions:
+                    return False
+
+                execution = executions[0]
+                execution.status = status
+                if failure_reason:
+                    execution.failure_reason = failure_reason
+                self.save_execution(execution)
+                return True
+
+        except Exception as e:
+            logger.error(f"更新执行状态失败: {e}")
+            return False
+
+    def _query_executions(self, where: str, params: Tuple) -> List[RuleExecution]:
+        try:
+            rows = self.database.query(f"SELECT data FROM executions {where}", params)
+            return [self._dict_to_execution(json.loads(row[0])) for row in rows]
+
+        except Exception as e:
+            logger.error(f"查找执行记录失败: {e}")
+            return []
+
+
+def _read_json_file(file_path: Path) -> Dict:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def migrate_json_storage(data_root: str, database: SQLiteDatabase) -> Dict[str, int]:
+    """
+    把文件仓储的 JSON 数据导入SQLite数据库
+
+    Args:
+        data_root: 文件仓储的根目录（包含 rules、states、executions 子目录）
+        database: 目标数据库
+
+    Returns:
+        Dict[str, int]: 各类数据导入的数量
+    """
+    root = Path(data_root)
+    rule_repository = SQLiteRuleRepository(database)
+    state_repository = SQLiteStateRepository(database)
+    execution_repository = SQLiteExecutionRepository(database)
+    sources = [
+        # 规则集的修改历史保存在单独的日志文件中，需要合并后导入
+        ('rule_sets', root / "rules", "rule_set_*.json",
+         lambda path: RuleRepositoryImpl.read_rule_set_file(path)[0],
+         lambda data: rule_repository.save_rule_set(rule_repository._dict_to_rule_set(data))),
+        ('states', root / "states", "state_*.json", _read_json_file,
+         lambda data: state_repository.save_state(state_repository._dict_to_state(data))),
+        ('executions', root / "executions", "execution_*.json", _read_json_file,
+         lambda data: execution_repository.save_execution(execution_repository._dict_to_execution(data))),
+    ]
+
+    counts = {}
+    for name, directory, pattern, read, save in sources:
+        counts[name] = 0
+        with database.transaction():
+            for file_path in sorted(directory.glob(pattern)):
+                try:
+                    save(read(file_path))
+                    counts[name] += 1
+                except Exception as e:
+                    logger.error(f"导入文件失败 {file_path}: {e}")
+
+    logger.info(f"JSON数据已导入SQLite: {counts}")
+    return counts
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+执行时间索引测试用例
+
+验证文件执行仓储的时间范围查询、最近记录和过期删除，以及执行记录内容不包含时间字段；
+多个仓储实例共用索引日志时压缩不丢失其他实例的记录，失效记录过多时自动压缩。
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from pathlib import Path
+
+from CognitiveWorkflow.cognitive_workflow_rule_base.infrastructure.repository_impl import (
+    ExecutionRepositoryImpl, ExecutionTimeline
+)
+from CognitiveWorkflow.cognitive_workflow_rule_base.domain.entities import RuleExecution
+from CognitiveWorkflow.cognitive_workflow_rule_base.domain.value_objects import ExecutionStatus
+
+
+class TestExecutionTimeline(unittest.TestCase):
+    """执行时间索引测试"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.now = datetime.now()
+        repository = ExecutionRepositoryImpl(self.temp_dir.name)
+        for index, (days_ago, status) in enumerate([(10, ExecutionStatus.FAILED), (5, ExecutionStatus.COMPLETED),
+                                                     (2, ExecutionStatus.FAILED), (1, ExecutionStatus.FAILED)]):
+            repository.save_execution(RuleExecution(id=f"e{index}", rule_id="r1", status=status,
+                                                    completed_at=self.now - timedelta(days=days_ago)))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_range_queries_after_restart(self):
+        # 新实例只重放索引日志，执行记录按需加载
+        repository = ExecutionRepositoryImpl(self.temp_dir.name)
+        self.assertEqual(len(repository._executions_cache), 0)
+
+        window = (self.now - timedelta(days=6), self.now - timedelta(days=1, hours=12))
+        self.assertEqual([e.id for e in repository.find_executions_by_time_range(*window)], ["e1", "e2"])
+        self.assertEqual([e.id for e in repository.find_failed_executions(window)], ["e2"])
+        self.assertEqual([e.id for e in repository.get_recent_executions(2)], ["e3", "e2"])
+
+        with open(os.path.join(self.temp_dir.name, "execution_e1.json"), encoding='utf-8') as f:
+            self.assertNotIn('recorded_at', json.load(f))
+
+    def test_pending_execution_keeps_first_save_time(self):
+        repository = ExecutionRepositoryImpl(self.temp_dir.name)
+        execution = RuleExecution(id="pending", rule_id="r2", status=ExecutionStatus.RUNNING)
+        repository.save_execution(execution)
+        first_time = repository._timeline.get_time("pending")
+        repository.update_execution_status("pending", ExecutionStatus.FAILED, "超时")
+        self.assertEqual(repository._timeline.get_time("pending"), first_time)
+        self.assertEqual(repository.get_recent_executions(1)[0].id, "pending")
+
+    def test_delete_old_executions(self):
+        repository = ExecutionRepositoryImpl(self.temp_dir.name)
+        repository.find_executions_by_rule("r1")
+        self.assertEqual(repository.delete_old_executions(self.now - timedelta(days=3)), 2)
+        self.assertEqual([e.id for e in repository.find_executions_by_rule("r1")], ["e2", "e3"])
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "execution_e0.json")))
+
+        # 压缩后的索引日志在重启后仍然有效
+        restarted = ExecutionRepositoryImpl(self.temp_dir.name)
+        self.assertEqual(len(restarted._timeline), 2)
+        self.assertEqual(restarted.delete_old_executions(self.now - timedelta(days=3)), 0)
+
+    def test_failed_file_deletion_stays_indexed(self):
+        repository = ExecutionRepositoryImpl(self.temp_dir.name)
+        original_unlink = Path.unlink
+
+        def unlink(path, *args, **kwargs):
+            if path.name == "execution_e0.json":
+                raise PermissionError("文件被占用")
+            return original_unlink(path, *args, **kwargs)
+
+        with patch.object(Path, 'unlink', unlink):
+            self.assertEqual(repository.delete_old_executions(self.now - timedelta(days=3)), 1)
+        self.assertIsNotNone(repository._timeline.get_time("e0"))
+
+        # 重启后索引中仍有 e0，下次清理时删除
+        restarted = ExecutionRepositoryImpl(self.temp_dir.name)
+        self.assertEqual(restarted.delete_old_executions(self.now - timedelta(days=3)), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "execution_e0.json")))
+        self.assertEqual(len(restarted._timeline), 2)
+
+    def test_index_built_for_existing_files(self):
+        os.remove(os.path.join(self.temp_dir.name, "timeline_index.jsonl"))
+        repository = ExecutionRepositoryImpl(self.temp_dir.name)
+        self.assertEqual(len(repository._timeline), 4)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "timeline_index.jsonl")))
+
+    def test_compaction_keeps_entries_from_other_instances(self):
+        # 两个实例（相当于两个进程）共用索引日志，各自只在内存中知道自己写入的记录
+        first = ExecutionRepositoryImpl(self.temp_dir.name)
+        second = ExecutionRepositoryImpl(self.temp_dir.name)
+        second.save_execution(RuleExecution(id="other_old", rule_id="r2", status=ExecutionStatus.FAILED,
+                                            completed_at=self.now - timedelta(days=20)))
+        second.save_execution(RuleExecution(id="other_new", rule_id="r2", status=ExecutionStatus.COMPLETED,
+                                            completed_at=self.now))
+
+        self.assertEqual(first.delete_old_executions(self.now - timedelta(days=3)), 3)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "execution_other_old.json")))
+
+        restarted = ExecutionRepositoryImpl(self.temp_dir.name)
+        self.assertEqual([e.id for e in restarted.get_recent_executions(10)], ["other_new", "e3", "e2"])
+
+    def test_dead_entries_trigger_compaction(self):
+        log_path = Path(self.temp_dir.name) / "timeline_index.jsonl"
+        timeline = ExecutionTimeline(log_path, compact_min_dead_entries=8)
+        for index in range(20):
+            timeline.record("e0", float(index))
+        timeline.remove("e1")
+
+        with open(log_path, encoding='utf-8') as f:
+            line_count = sum(1 for _ in f)
+        self.assertLessEqual(line_count, 8 + len(timeline))
+        restarted = ExecutionTimeline(log_path)
+        self.assertEqual(restarted.get_time("e0"), 19.0)
+        self.assertIsNone(restarted.get_time("e1"))
+        self.assertEqual(len(restarted), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+规则集延迟写入测试用例
+
+验证延迟写入模式合并多次保存、修改历史以追加日志保存，以及重启后的历史恢复。
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest.mock import Mock, patch
+
+# 添加项目根目录到路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from CognitiveWorkflow.cognitive_workflow_rule_base.infrastructure.repository_impl import RuleRepositoryImpl
+from CognitiveWorkflow.cognitive_workflow_rule_base.domain.entities import ProductionRule, RuleSet
+from CognitiveWorkflow.cognitive_workflow_rule_base.domain.value_objects import RulePhase
+from CognitiveWorkflow.cognitive_workflow_rule_base.utils.concurrent_safe_id_generator import SafeFileOperations
+from CognitiveWorkflow.cognitive_workflow_rule_base.services.core.rule_engine_service import RuleEngineService
+
+
+def make_rule(rule_id):
+    return ProductionRule(id=rule_id, name=f"规则{rule_id}", condition="需要编写代码", action="执行",
+                          phase=RulePhase.EXECUTION)
+
+
+class TestRuleWriteBehind(unittest.TestCase):
+    """规则集延迟写入测试"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.temp_dir.name, "rule_set_rs1.json")
+        self.log_path = os.path.join(self.temp_dir.name, "rule_set_rs1.history.jsonl")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_log(self):
+        with open(self.log_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_saves_coalesced_until_flush(self):
+        repository = RuleRepositoryImpl(self.temp_dir.name, write_behind=True)
+        rule_set = RuleSet(id="rs1", goal="目标")
+
+        with patch.object(SafeFileOperations, 'atomic_write_json',
+                          wraps=SafeFileOperations.atomic_write_json) as write:
+            for index in range(3):
+                rule_set.add_rule(make_rule(f"r{index}"))
+                repository.save_rule_set(rule_set)
+            self.assertEqual(write.call_count, 0)
+            self.assertEqual(repository.load_rule("r2").id, "r2")
+
+            self.assertEqual(repository.flush(), 1)
+            self.assertEqual(repository.flush(), 0)
+            self.assertEqual(write.call_count, 1)
+
+        self.assertEqual(len(self.read_log()), 3)
+        with open(self.snapshot_path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        self.assertNotIn('modification_history', snapshot)
+        self.assertEqual(snapshot['history_count'], 3)
+
+    def test_history_appended_not_rewritten(self):
+        repository = RuleRepositoryImpl(self.temp_dir.name)
+        rule_set = RuleSet(id="rs1", goal="目标")
+        rule_set.add_rule(make_rule("r1"))
+        repository.save_rule_set(rule_set)
+        first_line = self.read_log()[0]
+
+        # 重启后继续修改，只追加新的修改记录
+        restarted = RuleRepositoryImpl(self.temp_dir.name)
+        reloaded = restarted.load_rule_set("rs1")
+        reloaded.add_rule(make_rule("r2"))
+        reloaded.remove_rule("r1")
+        restarted.save_rule_set(reloaded)
+
+        entries = self.read_log()
+        self.assertEqual(entries[0], first_line)
+        self.assertEqual([e['modification_type'] for e in entries], ["add_rule", "add_rule", "remove_rule"])
+        history = RuleRepositoryImpl(self.temp_dir.name).load_rule_set("rs1").modification_history
+        self.assertEqual([m.target_rule_id for m in history], ["r1", "r2", "r1"])
+
+    def test_log_entries_beyond_snapshot_ignored(self):
+        repository = RuleRepositoryImpl(self.temp_dir.name)
+        rule_set = RuleSet(id="rs1", goal="目标")
+        rule_set.add_rule(make_rule("r1"))
+        repository.save_rule_set(rule_set)
+
+        # 模拟追加历史后、写快照前崩溃：日志多出一条完整记录和半行
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.read_log()[0], ensure_ascii=False) + '\n{"modification_ty')
+
+        restarted = RuleRepositoryImpl(self.temp_dir.name)
+        reloaded = restarted.load_rule_set("rs1")
+        self.assertEqual(len(reloaded.modification_history), 1)
+        reloaded.add_rule(make_rule("r2"))
+        restarted.save_rule_set(reloaded)
+        self.assertEqual([e['target_rule_id'] for e in self.read_log()], ["r1", "r2"])
+
+    def test_legacy_inline_history_loaded(self):
+        rule_set = RuleSet(id="rs1", goal="目标")
+        rule_set.add_rule(make_rule("r1"))
+        repository = RuleRepositoryImpl(self.temp_dir.name)
+        with open(self.snapshot_path, 'w', encoding='utf-8') as f:
+            json.dump(repository._rule_set_to_dict(rule_set), f, ensure_ascii=False)
+
+        restarted = RuleRepositoryImpl(self.temp_dir.name)
+        reloaded = restarted.load_rule_set("rs1")
+        self.assertEqual(len(reloaded.modification_history), 1)
+        restarted.save_rule_set(reloaded)
+        self.assertEqual(len(self.read_log()), 1)
+
+    def test_engine_flushes_saves_outside_workflow(self):
+        repository = RuleRepositoryImpl(self.temp_dir.name, write_behind=True)
+        engine = RuleEngineService(repository, Mock(), Mock(), Mock(), Mock(), Mock(),
+                                   enable_adaptive_replacement=False)
+        engine._current_rule_set = RuleSet(id="rs1", goal="目标")
+
+        self.assertTrue(engine.add_rule_to_current_set(make_rule("r1")))
+        self.assertEqual(repository.flush(), 0)
+        with open(self.snapshot_path, encoding='utf-8') as f:
+            self.assertEqual([rule['id'] for rule in json.load(f)['rules']], ["r1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite仓储实现测试用例
+
+验证索引查询、批量事务、懒加载和 JSON 文件数据导入。
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from CognitiveWorkflow.cognitive_workflow_rule_base.infrastructure.sqlite_repository_impl import (
+    SQLiteDatabase, SQLiteRuleRepository, SQLiteStateRepository, SQLiteExecutionRepository,
+    migrate_json_storage
+)
+from CognitiveWorkflow.cognitive_workflow_rule_base.infrastructure.repository_impl import (
+    RuleRepositoryImpl, StateRepositoryImpl, ExecutionRepositoryImpl
+)
+from CognitiveWorkflow.cognitive_workflow_rule_base.domain.entities import (
+    ProductionRule, RuleSet, RuleExecution, GlobalState, WorkflowResult
+)
+from CognitiveWorkflow.cognitive_workflow_rule_base.domain.value_objects import RulePhase, ExecutionStatus
+
+
+def make_rule(rule_id, phase=RulePhase.EXECUTION, priority=50, condition="需要编写代码"):
+    return ProductionRule(id=rule_id, name=f"规则{rule_id}", condition=condition, action="执行",
+                          priority=priority, phase=phase)
+
+
+def make_execution(execution_id, rule_id, status=ExecutionStatus.COMPLETED, workflow_id="wf1", completed_at=None):
+    execution = RuleExecution(id=execution_id, rule_id=rule_id, status=status,
+                              execution_context={'workflow_id': workflow_id}, completed_at=completed_at)
+    if status == ExecutionStatus.COMPLETED:
+        execution.result = WorkflowResult(success=True, message="完成")
+    return execution
+
+
+class TestSQLiteRepositories(unittest.TestCase):
+    """SQLite仓储测试"""
+
+    def setUp(self):
+        self.database = SQLiteDatabase(":memory:")
+        self.rules = SQLiteRuleRepository(self.database)
+        self.states = SQLiteStateRepository(self.database)
+        self.executions = SQLiteExecutionRepository(self.database)
+
+    def tearDown(self):
+        self.database.close()
+
+    def test_rule_queries(self):
+        self.rules.save_rule_set(RuleSet(id="rs1", goal="目标", rules=[
+            make_rule("r1", RulePhase.INFORMATION_GATHERING, 90, "需要分析需求"),
+            make_rule("r2", priority=60),
+        ]))
+        self.assertEqual(self.rules.load_rule_set("rs1").rules[1].id, "r2")
+        self.assertEqual([r.id for r in self.rules.find_rules_by_phase(RulePhase.EXECUTION)], ["r2"])
+        self.assertEqual([r.id for r in self.rules.find_rules_by_condition("分析")], ["r1"])
+        self.assertEqual([r.id for r in self.rules.find_rules_by_priority_range(80, 100)], ["r1"])
+
+        # 重新保存规则集时移除的规则不再出现在索引中
+        self.rules.save_rule_set(RuleSet(id="rs1", goal="目标", rules=[make_rule("r2")]))
+        self.assertEqual(self.rules.get_rule_count(), 1)
+        self.assertTrue(self.rules.delete_rule("r2"))
+        with self.assertRaises(ValueError):
+            self.rules.load_rule("r2")
+
+    def test_rule_changes_update_rule_set(self):
+        self.rules.save_rule_set(RuleSet(id="rs1", goal="目标", rules=[make_rule("r1"), make_rule("r2"),
+                                                                      make_rule("r3")]))
+        self.rules.save_rule(make_rule("r2", priority=95))
+        self.assertTrue(self.rules.delete_rule("r1"))
+        self.assertFalse(self.rules.delete_rule("r1"))
+        self.rules.save_rule(make_rule("loose"))
+
+        rule_set = self.rules.load_rule_set("rs1")
+        self.assertEqual([(r.id, r.priority) for r in rule_set.rules], [("r2", 95), ("r3", 50)])
+        self.assertEqual([r.id for r in self.rules.list_all_rule_sets()[0].rules], ["r2", "r3"])
+        self.assertEqual(self.rules.load_rule("loose").id, "loose")
+
+    def test_state_history(self):
+        self.states.save_states(GlobalState(id=f"s{i}", state=f"状态{i}", workflow_id="wf1") for i in range(3))
+        self.states.save_state(GlobalState(id="other", state="其他", workflow_id="wf2"))
+        self.states.save_state(GlobalState(id="s0", state="状态0已更新", workflow_id="wf1"))
+
+        self.assertEqual([s.id for s in self.states.get_state_history("wf1")], ["s0", "s1", "s2"])
+        self.assertEqual(self.states.load_state("s0").state, "状态0已更新")
+        self.assertEqual(self.states.get_latest_state("wf1").id, "s2")
+        self.assertEqual(self.states.get_state_count("wf1"), 3)
+
+        self.states.save_state_snapshot(self.states.load_state("s1"), "checkpoint")
+        self.assertEqual(self.states.load_state_snapshot("checkpoint").state, "状态1")
+        self.assertEqual(self.states.delete_old_states(datetime.now() + timedelta(seconds=1)), 4)
+
+    def test_execution_indexes(self):
+        old = datetime.now() - timedelta(days=2)
+        self.executions.save_executions([
+            make_execution("e1", "r1", completed_at=old),
+            make_execution("e2", "r1", ExecutionStatus.FAILED, completed_at=datetime.now()),
+            make_execution("e3", "r2", ExecutionStatus.RUNNING, workflow_id="wf2"),
+        ])
+
+        self.assertEqual([e.id for e in self.executions.find_executions_by_rule("r1")], ["e1", "e2"])
+        self.assertEqual([e.id for e in self.executions.find_executions_by_workflow("wf2")], ["e3"])
+        self.assertEqual(self.executions.load_execution("e1").result.message, "完成")
+        self.assertEqual(self.executions.get_execution_count("r1", ExecutionStatus.FAILED), 1)
+        recent = datetime.now() - timedelta(hours=1)
+        self.assertEqual([e.id for e in self.executions.find_failed_executions((recent, datetime.now()))], ["e2"])
+        self.assertEqual(self.executions.get_recent_executions(1)[0].id, "e3")
+
+        stats = self.executions.get_execution_statistics("r1")
+        self.assertEqual((stats['total_executions'], stats['successful_executions']), (2, 1))
+
+        self.assertTrue(self.executions.update_execution_status("e3", ExecutionStatus.FAILED, "超时"))
+        self.assertEqual(self.executions.load_execution("e3").failure_reason, "超时")
+        self.assertEqual(self.executions.delete_old_executions(recent), 1)
+        self.assertEqual(self.executions.get_execution_count(), 2)
+
+    def test_transaction_rolls_back(self):
+        with self.assertRaises(RuntimeError):
+            with self.database.transaction():
+                self.executions.save_execution(make_execution("e1", "r1"))
+                raise RuntimeError("批量写入中断")
+        self.assertEqual(self.executions.get_execution_count(), 0)
+
+
+class TestJsonMigration(unittest.TestCase):
+    """JSON文件数据导入测试"""
+
+    def test_migrate_file_repositories(self):
+        with tempfile.TemporaryDirectory() as data_root:
+            RuleRepositoryImpl(os.path.join(data_root, "rules")).save_rule_set(
+                RuleSet(id="rs1", goal="目标", rules=[make_rule("r1")]))
+            StateRepositoryImpl(os.path.join(data_root, "states")).save_state(
+                GlobalState(id="s1", state="状态", workflow_id="wf1"))
+            ExecutionRepositoryImpl(os.path.join(data_root, "executions")).save_execution(
+                make_execution("e1", "r1"))
+
+            database = SQLiteDatabase(os.path.join(data_root, "repository.db"))
+            try:
+                counts = migrate_json_storage(data_root, database)
+                self.assertEqual(counts, {'rule_sets': 1, 'states': 1, 'executions': 1})
+                self.assertEqual(SQLiteRuleRepository(database).load_rule("r1").condition, "需要编写代码")
+                self.assertEqual(SQLiteExecutionRepository(database).find_executions_by_rule("r1")[0].id, "e1")
+            finally:
+                database.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
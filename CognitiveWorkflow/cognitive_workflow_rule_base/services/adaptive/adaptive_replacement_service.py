@@ -17,6 +17,7 @@ from ...domain.value_objects import (
     SituationContext
 )
 from ..core.language_model_service import LanguageModelService
+from ..core.semantic_prefilter import SemanticPrefilter
 from ..adaptive.strategy_effectiveness_tracker import StrategyEffectivenessTracker
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,9 @@ class AdaptiveReplacementService:
         self.strategy_history: List[StrategyEffectiveness] = []
         self.replacement_config = self._load_default_config()
         
+        # 规则相似度本地预筛选：优先复用语言模型服务配置的预筛选器
+        self.similarity_prefilter = getattr(llm_service, 'semantic_prefilter', None) or SemanticPrefilter()
+        
         # 集成策略效果跟踪器
         self.effectiveness_tracker = StrategyEffectivenessTracker() if enable_effectiveness_tracking else None
         
@@ -718,12 +722,14 @@ class AdaptiveReplacementService:
             List[Tuple[ProductionRule, ProductionRule, float]]: (现有规则, 新规则, 替换分数)
         """
         candidates = []
+        local_similarities = self._prefilter_rule_similarities(existing_rules, new_rules)
         
-        for new_rule in new_rules:
-            for existing_rule in existing_rules:
+        for j, new_rule in enumerate(new_rules):
+            for i, existing_rule in enumerate(existing_rules):
                 # 计算替换分数
                 replacement_score = self._calculate_replacement_score(
-                    existing_rule, new_rule, strategy
+                    existing_rule, new_rule, strategy,
+                    similarity=local_similarities.get((i, j))
                 )
                 
                 if replacement_score > 0.3:  # 只考虑有意义的替换
@@ -733,15 +739,62 @@ class AdaptiveReplacementService:
         candidates.sort(key=lambda x: x[2], reverse=True)
         return candidates
     
+    def _prefilter_rule_similarities(self,
+                                   existing_rules: List[ProductionRule],
+                                   new_rules: List[ProductionRule]) -> Dict[Tuple[int, int], float]:
+        """
+        批量计算规则两两之间的本地相似度，只保留可以直接判定的规则对
+        
+        Returns:
+            Dict[Tuple[int, int], float]: {(现有规则下标, 新规则下标): 相似度}，
+            处于模糊区间的规则对不在结果中，需要LLM分析
+        """
+        if not (self.replacement_config.get('enable_similarity_prefilter', False)
+                and self.replacement_config.get('enable_llm_analysis', True)):
+            return {}
+        
+        existing_texts = [self._rule_text(rule) for rule in existing_rules]
+        new_texts = [self._rule_text(rule) for rule in new_rules]
+        try:
+            matrix = self.similarity_prefilter.similarity_matrix(existing_texts, new_texts)
+        except Exception as e:
+            logger.warning(f"规则相似度预筛选失败，全部交给LLM分析: {e}")
+            return {}
+        
+        decided = {}
+        for i in range(len(existing_rules)):
+            for j in range(len(new_rules)):
+                similarity = float(matrix[i, j])
+                # 阶段或智能体不同的规则即使文本相同也不直接判为匹配
+                decision = self.similarity_prefilter.classify(
+                    similarity, existing_texts[i], new_texts[j],
+                    allow_accept=self._rule_scope(existing_rules[i]) == self._rule_scope(new_rules[j])
+                )
+                if decision != SemanticPrefilter.ESCALATE:
+                    decided[(i, j)] = similarity
+        
+        logger.debug(f"规则相似度预筛选: {len(decided)}/{matrix.size} 对由本地相似度直接判定")
+        return decided
+    
+    @staticmethod
+    def _rule_text(rule: ProductionRule) -> str:
+        return f"{rule.name} {rule.condition} {rule.action}"
+    
+    @staticmethod
+    def _rule_scope(rule: ProductionRule) -> Tuple[Any, Optional[str]]:
+        return rule.phase, getattr(rule, 'agent_name', None)
+    
     def _calculate_replacement_score(self,
                                    existing_rule: ProductionRule,
                                    new_rule: ProductionRule,
-                                   strategy: ReplacementStrategy) -> float:
-        """计算替换分数"""
+                                   strategy: ReplacementStrategy,
+                                   similarity: Optional[float] = None) -> float:
+        """计算替换分数，similarity 为预先计算的相似度（可选）"""
         score = 0.0
         
         # 1. 相似性分数 (0.4权重)
-        similarity = self._calculate_semantic_similarity(existing_rule, new_rule)
+        if similarity is None:
+            similarity = self._calculate_semantic_similarity(existing_rule, new_rule)
         if similarity >= strategy.similarity_threshold:
             score += 0.4 * similarity
         
@@ -1159,6 +1212,7 @@ class AdaptiveReplacementService:
         """加载默认配置"""
         return {
             'enable_llm_analysis': True,
+            'enable_similarity_prefilter': False,  # 开启后高相似度规则对不经LLM直接判定
             'max_replacement_ratio': AdaptiveReplacementConstants.MAX_REPLACEMENT_RATIO,
             'min_similarity_threshold': 0.5,
             'strategy_learning_enabled': True
@@ -1315,6 +1369,10 @@ class AdaptiveReplacementService:
         self.replacement_config['enable_llm_similarity'] = enable
         logger.info(f"LLM增强相似性分析: {'启用' if enable else '禁用'}")
     
+    def get_similarity_prefilter_statistics(self) -> Dict[str, Any]:
+        """获取规则相似度预筛选各层命中统计"""
+        return self.similarity_prefilter.get_statistics()
+    
     def get_strategy_recommendation_confidence(self, situation_score: SituationScore) -> float:
         """
         获取策略推荐的置信度
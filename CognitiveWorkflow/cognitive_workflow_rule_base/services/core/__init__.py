@@ -14,6 +14,7 @@ from .rule_execution_service import RuleExecutionService
 from .state_service import StateService
 from .agent_service import AgentService
 from .language_model_service import LanguageModelService
+from .semantic_prefilter import SemanticPrefilter
 from .resource_manager import ResourceManager
 
 __all__ = [
@@ -23,5 +24,6 @@ __all__ = [
     "StateService",
     "AgentService",
     "LanguageModelService",
+    "SemanticPrefilter",
     "ResourceManager"
 ]
\ No newline at end of file
@@ -13,6 +13,14 @@ import json
 import logging
 
 from ...domain.value_objects import MatchingResult, MatchingConstants
+from .semantic_prefilter import SemanticPrefilter
+
+try:
+    from llm_cache import LLMResponseCache, get_llm_cache, make_cache_key
+except ImportError:  # 项目根目录不在 sys.path 时不使用响应缓存
+    LLMResponseCache = None
+    get_llm_cache = None
+    make_cache_key = None
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +30,23 @@ class LanguageModelService:
     
     def __init__(self, 
                  primary_llm: BaseChatModel,
-                 fallback_llm: Optional[BaseChatModel] = None):
+                 fallback_llm: Optional[BaseChatModel] = None,
+                 response_cache: Optional['LLMResponseCache'] = None,
+                 semantic_prefilter: Optional[SemanticPrefilter] = None):
         """
         初始化语言模型服务
         
         Args:
             primary_llm: 主要的语言模型
             fallback_llm: 备用的语言模型（可选）
+            response_cache: LLM响应缓存（可选），None 时使用 llm_cache 的全局缓存
+            semantic_prefilter: 语义相似度本地预筛选器（可选），配置后语义匹配和相似度评估
+                                只有本地相似度处于模糊区间时才调用LLM
         """
         self.primary_llm = primary_llm
         self.fallback_llm = fallback_llm
+        self.response_cache = response_cache
+        self.semantic_prefilter = semantic_prefilter
         
     def semantic_match(self, condition: str, state_description: str) -> MatchingResult:
         """
@@ -44,6 +59,18 @@ class LanguageModelService:
         Returns:
             MatchingResult: 匹配结果，包含是否匹配、置信度、推理等
         """
+        if self.semantic_prefilter is not None:
+            similarity = self.semantic_prefilter.similarity(condition, state_description)
+            decision = self.semantic_prefilter.classify(similarity, condition, state_description)
+            if decision != SemanticPrefilter.ESCALATE:
+                is_match = decision == SemanticPrefilter.ACCEPT
+                return MatchingResult(
+                    is_match=is_match,
+                    confidence=similarity if is_match else 1.0 - similarity,
+                    reasoning=f"本地相似度预筛选: {similarity:.2f}（{'高于接受' if is_match else '低于拒绝'}阈值）",
+                    semantic_similarity=similarity
+                )
+        
         try:
             prompt = f"""
 你是一个专业的语义匹配专家。请判断给定的条件是否与当前状态匹配。
@@ -125,6 +152,11 @@ class LanguageModelService:
         Returns:
             float: 相似度分数（0.0-1.0）
         """
+        if self.semantic_prefilter is not None:
+            similarity = self.semantic_prefilter.similarity(text1, text2)
+            if self.semantic_prefilter.classify(similarity, text1, text2) != SemanticPrefilter.ESCALATE:
+                return similarity
+        
         try:
             prompt = f"""
 请评估以下两个文本的语义相似度，返回0.0到1.0之间的分数：
@@ -383,6 +415,12 @@ class LanguageModelService:
             logger.error(f"执行结果验证失败: {e}")
             return True, 0.5, f"验证失败，默认通过: {str(e)}"  # 验证失败时默认通过，避免阻塞
     
+    def get_prefilter_statistics(self) -> Dict[str, Any]:
+        """获取本地预筛选各层命中统计，未配置预筛选器时返回空字典"""
+        if self.semantic_prefilter is None:
+            return {}
+        return self.semantic_prefilter.get_statistics()
+    
     def invoke(self, prompt: str) -> str:
         """
         公共方法：调用语言模型
@@ -405,19 +443,27 @@ class LanguageModelService:
         Returns:
             str: 模型响应
         """
+        messages = [HumanMessage(content=prompt)]
+        cache = self._get_response_cache()
+        cache_key = make_cache_key(self.primary_llm, messages) if cache is not None else None
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             # 尝试主要模型
-            messages = [HumanMessage(content=prompt)]
             response = self.primary_llm.invoke(messages)
+            if cache_key is not None:
+                cache.set(cache_key, response.content)
             return response.content
             
         except Exception as e:
             logger.warning(f"主要模型调用失败: {e}")
             
-            # 尝试备用模型
+            # 尝试备用模型（备用模型的响应不写入以主要模型为键的缓存）
             if self.fallback_llm:
                 try:
-                    messages = [HumanMessage(content=prompt)]
                     response = self.fallback_llm.invoke(messages)
                     return response.content
                 except Exception as e2:
@@ -425,6 +471,12 @@ class LanguageModelService:
             
             raise Exception(f"所有模型调用都失败了: {e}")
     
+    def _get_response_cache(self) -> Optional['LLMResponseCache']:
+        """获取响应缓存，未配置时返回 None"""
+        if self.response_cache is not None:
+            return self.response_cache
+        return get_llm_cache() if get_llm_cache is not None else None
+    
     def _parse_json_response(self, response: str):
         """
         解析JSON响应，支持对象和数组格式
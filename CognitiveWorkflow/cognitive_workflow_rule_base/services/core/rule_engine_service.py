@@ -44,7 +44,8 @@ class RuleEngineService:
                  enable_auto_recovery: bool = True,
                  max_iterations: int = RuleConstants.MAX_ITERATIONS,
                  enable_adaptive_replacement: bool = True,
-                 resource_manager: Optional['ResourceManager'] = None):
+                 resource_manager: Optional['ResourceManager'] = None,
+                 rule_set_flush_interval: int = RuleConstants.RULE_SET_FLUSH_INTERVAL):
         """
         初始化规则引擎服务
         
@@ -58,6 +59,9 @@ class RuleEngineService:
             enable_auto_recovery: 是否启用自动恢复
             max_iterations: 最大迭代次数
             enable_adaptive_replacement: 是否启用自适应规则替换
+            resource_manager: 资源管理器
+            rule_set_flush_interval: 规则仓储延迟写入时，每隔多少次迭代写出一次规则集；
+                                     工作流结束或异常退出时总会写出
         """
         self.rule_repository = rule_repository
         self.state_repository = state_repository
@@ -69,6 +73,7 @@ class RuleEngineService:
         self.max_iterations = max_iterations
         self.enable_adaptive_replacement = enable_adaptive_replacement
         self.resource_manager = resource_manager
+        self.rule_set_flush_interval = max(1, rule_set_flush_interval)
         
         # 初始化自适应替换服务
         if enable_adaptive_replacement:
@@ -234,6 +239,10 @@ class RuleEngineService:
                         self.rule_repository.save_rule_set(rule_set)
                         logger.info(f"策略调整完成: 规则数量 {len(rule_set.rules)}")
                 
+                # 窗口内对规则集的多次保存合并为一次写盘
+                if iteration_count % self.rule_set_flush_interval == 0:
+                    self._flush_rule_repository()
+                
                 # 检查全局状态中的目标达成状态（每次规则执行后状态更新时已包含目标验证）
                 if global_state.goal_achieved:
                     goal_achieved = True
@@ -302,6 +311,17 @@ class RuleEngineService:
                 final_message=f"工作流执行失败: {str(e)}",
                 completion_timestamp=end_time
             )
+        
+        finally:
+            # 工作流结束、异常或被中断时写出尚未持久化的规则集
+            self._flush_rule_repository()
+    
+    def _flush_rule_repository(self) -> None:
+        """写出规则仓储中延迟写入的规则集"""
+        try:
+            self.rule_repository.flush()
+        except Exception as e:
+            logger.error(f"写出规则集失败: {e}")
     
     
     def handle_rule_failure(self, 
@@ -367,6 +387,9 @@ class RuleEngineService:
             
         except Exception as e:
             logger.error(f"规则生命周期管理失败: {e}")
+        finally:
+            # 不在工作流迭代中调用，保存后立即写盘
+            self._flush_rule_repository()
     
     def get_workflow_status(self) -> Dict[str, Any]:
         """
@@ -534,6 +557,7 @@ class RuleEngineService:
             if removed_count > 0:
                 logger.info(f"清理了 {removed_count} 个无效规则")
                 self.rule_repository.save_rule_set(rule_set)
+                self._flush_rule_repository()
                 
         except Exception as e:
             logger.error(f"规则清理失败: {e}")
@@ -561,6 +585,7 @@ class RuleEngineService:
             if self._current_rule_set:
                 self._current_rule_set.add_rule(rule)
                 self.rule_repository.save_rule_set(self._current_rule_set)
+                self._flush_rule_repository()
                 logger.info(f"规则已添加: {rule.name}")
                 return True
             else:
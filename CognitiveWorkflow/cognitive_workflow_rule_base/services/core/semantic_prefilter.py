@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+语义相似度本地预筛选
+
+在调用LLM进行语义判断之前，先用本地向量相似度批量打分：
+相似度高于接受阈值的文本对直接判为匹配，低于拒绝阈值的直接判为不匹配，
+只有处于中间模糊区间的文本对才交给LLM判断。
+
+默认使用 TF-IDF 向量（中文按字和相邻字组合切分，英文按单词切分），
+也可以传入嵌入函数使用语义向量。相似度矩阵一次性计算，适合规则集两两比较。
+词面相似度无法区分否定，两段文本的否定词不一致时不会直接判为匹配。
+
+numpy 在第一次计算相似度时才导入，不是 services.core 的硬依赖。
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Any, TYPE_CHECKING
+import logging
+import re
+import threading
+from collections import Counter
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from ...domain.value_objects import MatchingConstants
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9_]+|[\u4e00-\u9fff]')
+_NEGATION_PATTERN = re.compile(r"[不未没无非别勿]|\b(?:not|no|never|without|cannot)\b|n't")
+
+
+class SemanticPrefilter:
+    """语义相似度预筛选器 - 本地相似度分层，减少LLM调用"""
+
+    ACCEPT = "accept"
+    REJECT = "reject"
+    ESCALATE = "escalate"
+
+    def __init__(self,
+                 accept_threshold: float = MatchingConstants.PREFILTER_ACCEPT_THRESHOLD,
+                 reject_threshold: float = MatchingConstants.PREFILTER_REJECT_THRESHOLD,
+                 embedding_function: Optional[Callable[[List[str]], Any]] = None):
+        """
+        初始化预筛选器
+
+        Args:
+            accept_threshold: 相似度不低于该值时直接判为匹配
+            reject_threshold: 相似度不高于该值时直接判为不匹配
+            embedding_function: 可选的嵌入函数，输入文本列表，返回 (文本数, 维度) 的向量矩阵；
+                                为 None 时使用 TF-IDF 向量
+        """
+        if reject_threshold > accept_threshold:
+            raise ValueError("拒绝阈值不能高于接受阈值")
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self.embedding_function = embedding_function
+        self._lock = threading.Lock()
+        self.statistics = Counter()
+
+    def similarity_matrix(self, texts_a: Sequence[str], texts_b: Sequence[str]) -> 'np.ndarray':
+        """
+        批量计算两组文本之间的相似度矩阵
+
+        Args:
+            texts_a: 第一组文本
+            texts_b: 第二组文本
+
+        Returns:
+            np.ndarray: 形状为 (len(texts_a), len(texts_b)) 的相似度矩阵，取值 0.0-1.0
+        """
+        import numpy as np
+
+        if not texts_a or not texts_b:
+            return np.zeros((len(texts_a), len(texts_b)))
+
+        vectors = self._vectorize(list(texts_a) + list(texts_b))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+        matrix = vectors[:len(texts_a)] @ vectors[len(texts_a):].T
+        return np.clip(matrix, 0.0, 1.0)
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """计算两个文本的相似度"""
+        return float(self.similarity_matrix([text1], [text2])[0, 0])
+
+    def classify(self, score: float, text1: Optional[str] = None, text2: Optional[str] = None,
+                 allow_accept: bool = True) -> str:
+        """
+        按阈值对相似度分层并记录统计
+
+        Args:
+            score: 相似度
+            text1: 第一个文本（可选），与 text2 的否定词不一致时不直接判为匹配
+            text2: 第二个文本（可选）
+            allow_accept: 为 False 时高相似度也交给LLM，用于调用方已知不能直接判为匹配的情况
+
+        Returns:
+            str: ACCEPT（直接匹配）、REJECT（直接不匹配）或 ESCALATE（交给LLM）
+        """
+        if score >= self.accept_threshold:
+            if allow_accept and not self._negation_differs(text1, text2):
+                decision = self.ACCEPT
+            else:
+                decision = self.ESCALATE
+        elif score <= self.reject_threshold:
+            decision = self.REJECT
+        else:
+            decision = self.ESCALATE
+        with self._lock:
+            self.statistics[decision] += 1
+        return decision
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取各层命中次数和比例"""
+        with self._lock:
+            counts = {decision: self.statistics[decision]
+                      for decision in (self.ACCEPT, self.REJECT, self.ESCALATE)}
+        total = sum(counts.values())
+        return {
+            'total_pairs': total,
+            'accepted': counts[self.ACCEPT],
+            'rejected': counts[self.REJECT],
+            'escalated': counts[self.ESCALATE],
+            'accept_rate': counts[self.ACCEPT] / total if total else 0.0,
+            'reject_rate': counts[self.REJECT] / total if total else 0.0,
+            'escalation_rate': counts[self.ESCALATE] / total if total else 0.0,
+            'local_hit_rate': (counts[self.ACCEPT] + counts[self.REJECT]) / total if total else 0.0
+        }
+
+    def reset_statistics(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self.statistics.clear()
+
+    @staticmethod
+    def _negation_differs(text1: Optional[str], text2: Optional[str]) -> bool:
+        if text1 is None or text2 is None:
+            return False
+        return (sorted(_NEGATION_PATTERN.findall(text1.lower()))
+                != sorted(_NEGATION_PATTERN.findall(text2.lower())))
+
+    def _vectorize(self, texts: List[str]) -> 'np.ndarray':
+        import numpy as np
+
+        if self.embedding_function is not None:
+            return np.asarray(self.embedding_function(texts), dtype=float)
+        return self._tfidf_vectors(texts)
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        units = _TOKEN_PATTERN.findall(text.lower())
+        # 相邻单元组合弥补中文按字切分丢失的词序信息
+        return units + [a + b for a, b in zip(units, units[1:])]
+
+    def _tfidf_vectors(self, texts: List[str]) -> 'np.ndarray':
+        import numpy as np
+
+        documents = [Counter(self._tokenize(text)) for text in texts]
+        vocabulary = {term: index for index, term in
+                      enumerate(sorted(set().union(*documents)))}
+        counts = np.zeros((len(texts), len(vocabulary)))
+        for row, document in enumerate(documents):
+            for term, count in document.items():
+                counts[row, vocabulary[term]] = count
+
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1.0
+        return counts * idf
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+语义相似度本地预筛选测试用例
+
+验证本地相似度分层：明确的文本对不调用LLM，只有模糊区间的文本对交给LLM。
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+
+# 添加项目根目录到路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_dir))))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from CognitiveWorkflow.cognitive_workflow_rule_base.services.core.semantic_prefilter import SemanticPrefilter
+from CognitiveWorkflow.cognitive_workflow_rule_base.services.core.language_model_service import LanguageModelService
+from CognitiveWorkflow.cognitive_workflow_rule_base.services.adaptive.adaptive_replacement_service import (
+    AdaptiveReplacementService
+)
+from CognitiveWorkflow.cognitive_workflow_rule_base.domain.entities import ProductionRule
+from CognitiveWorkflow.cognitive_workflow_rule_base.domain.value_objects import RulePhase
+
+
+def make_llm(content):
+    llm = Mock()
+    llm.invoke.return_value = Mock(content=content)
+    return llm
+
+
+def make_rule(rule_id, name, condition, action):
+    return ProductionRule(id=rule_id, name=name, condition=condition, action=action,
+                          phase=RulePhase.EXECUTION, expected_outcome="完成")
+
+
+class TestSemanticPrefilter(unittest.TestCase):
+    """本地预筛选器测试"""
+
+    def test_similarity_matrix(self):
+        prefilter = SemanticPrefilter()
+        matrix = prefilter.similarity_matrix(["编写单元测试代码", "deploy the service"],
+                                             ["编写单元测试代码", "部署服务", "Deploy service"])
+        self.assertEqual(matrix.shape, (2, 3))
+        self.assertAlmostEqual(matrix[0, 0], 1.0)
+        self.assertEqual(matrix[0, 2], 0.0)
+        self.assertGreater(matrix[1, 2], matrix[1, 1])
+
+    def test_classify_and_statistics(self):
+        prefilter = SemanticPrefilter(accept_threshold=0.8, reject_threshold=0.2)
+        decisions = [prefilter.classify(score) for score in (0.9, 0.1, 0.5, 0.0)]
+        self.assertEqual(decisions, ["accept", "reject", "escalate", "reject"])
+        stats = prefilter.get_statistics()
+        self.assertEqual((stats['total_pairs'], stats['escalated']), (4, 1))
+        self.assertAlmostEqual(stats['local_hit_rate'], 0.75)
+        with self.assertRaises(ValueError):
+            SemanticPrefilter(accept_threshold=0.2, reject_threshold=0.5)
+
+    def test_negation_not_accepted(self):
+        prefilter = SemanticPrefilter()
+        self.assertEqual(prefilter.classify(0.95, "代码已经编写完成", "代码没有编写完成"), "escalate")
+        self.assertEqual(prefilter.classify(0.95, "tests have passed", "tests have not passed"), "escalate")
+        self.assertEqual(prefilter.classify(0.95, "代码没有编写完成", "代码还没有编写完成"), "accept")
+        self.assertEqual(prefilter.classify(0.95, allow_accept=False), "escalate")
+        self.assertEqual(prefilter.classify(0.05, "代码已经编写完成", "没有部署"), "reject")
+
+    def test_embedding_function(self):
+        vectors = {"甲": [1.0, 0.0], "乙": [0.6, 0.8], "丙": [-1.0, 0.0]}
+        prefilter = SemanticPrefilter(embedding_function=lambda texts: [vectors[t] for t in texts])
+        self.assertAlmostEqual(prefilter.similarity("甲", "乙"), 0.6)
+        self.assertEqual(prefilter.similarity("甲", "丙"), 0.0)
+
+
+class TestLanguageModelServicePrefilter(unittest.TestCase):
+    """语言模型服务预筛选测试"""
+
+    def test_clear_cases_skip_llm(self):
+        llm = make_llm('{"is_match": true, "confidence": 0.7, "reasoning": "LLM", "semantic_similarity": 0.5}')
+        service = LanguageModelService(llm, response_cache=Mock(get=Mock(return_value=None)),
+                                       semantic_prefilter=SemanticPrefilter())
+
+        self.assertTrue(service.semantic_match("代码已经编写完成", "代码已经编写完成").is_match)
+        self.assertFalse(service.semantic_match("代码已经编写完成", "user logged in").is_match)
+        self.assertEqual(service.evaluate_semantic_similarity("部署服务", "deploy"), 0.0)
+        llm.invoke.assert_not_called()
+
+        # 否定条件与状态词面相近，仍交给LLM判断
+        result = service.semantic_match("代码已经编写完成", "代码没有编写完成")
+        self.assertEqual(result.reasoning, "LLM")
+        llm.invoke.reset_mock()
+
+        result = service.semantic_match("代码已经编写完成", "测试代码正在编写")
+        self.assertEqual(result.reasoning, "LLM")
+        self.assertEqual(llm.invoke.call_count, 1)
+        stats = service.get_prefilter_statistics()
+        self.assertEqual((stats['accepted'], stats['rejected'], stats['escalated']), (1, 2, 2))
+
+
+class TestAdaptiveReplacementPrefilter(unittest.TestCase):
+    """自适应替换规则相似度预筛选测试"""
+
+    def make_service(self, llm):
+        service = AdaptiveReplacementService(
+            LanguageModelService(llm, response_cache=Mock(get=Mock(return_value=None))),
+            enable_effectiveness_tracking=False
+        )
+        service.replacement_config['enable_similarity_prefilter'] = True
+        return service
+
+    def test_prefilter_disabled_by_default(self):
+        service = AdaptiveReplacementService(
+            LanguageModelService(make_llm("0.5"), response_cache=Mock(get=Mock(return_value=None))),
+            enable_effectiveness_tracking=False
+        )
+        rule = make_rule("r1", "编写代码", "需要编写代码实现", "根据需求编写高质量代码")
+        self.assertEqual(service._prefilter_rule_similarities([rule], [rule]), {})
+
+    def test_only_ambiguous_pairs_reach_llm(self):
+        llm = make_llm('{"overall_similarity": 0.5}')
+        service = self.make_service(llm)
+        existing = [make_rule("r1", "编写代码", "需要编写代码实现", "根据需求编写高质量代码"),
+                    make_rule("r2", "部署", "ready to deploy", "deploy the service")]
+        new = [make_rule("r3", "编写代码", "需要编写代码实现", "根据需求编写高质量代码"),
+               make_rule("r4", "编写测试", "需要编写测试代码", "为代码编写单元测试")]
+
+        decided = service._prefilter_rule_similarities(existing, new)
+
+        self.assertAlmostEqual(decided[(0, 0)], 1.0)
+        self.assertEqual(decided[(1, 0)], 0.0)
+        self.assertNotIn((0, 1), decided)
+        stats = service.get_similarity_prefilter_statistics()
+        self.assertEqual((stats['total_pairs'], stats['escalated']), (4, 1))
+        llm.invoke.assert_not_called()
+
+        service.replacement_config['enable_similarity_prefilter'] = False
+        self.assertEqual(service._prefilter_rule_similarities(existing, new), {})
+
+    def test_different_phase_not_accepted(self):
+        service = self.make_service(make_llm('{"overall_similarity": 0.5}'))
+        existing = [make_rule("r1", "编写代码", "需要编写代码实现", "根据需求编写高质量代码")]
+        new = [make_rule("r2", "编写代码", "需要编写代码实现", "根据需求编写高质量代码"),
+               make_rule("r3", "编写代码", "不需要编写代码实现", "根据需求编写高质量代码")]
+        new[0].phase = RulePhase.VERIFICATION
+
+        self.assertEqual(service._prefilter_rule_similarities(existing, new), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
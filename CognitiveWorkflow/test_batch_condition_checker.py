@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+StateConditionChecker 批量检查和判断缓存测试（使用模拟LLM，不需要API密钥）
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import re
+import unittest
+from unittest.mock import Mock
+
+from CognitiveWorkflow.cognitive_workflow import (
+    CognitiveManager, StateConditionChecker, CognitiveTask, TaskPhase, GlobalState
+)
+
+
+class BatchLLM:
+    """按先决条件中的“完成”关键字判断的模拟LLM"""
+
+    def __init__(self, drop_ids=()):
+        self.drop_ids = set(drop_ids)
+        self.calls = []
+
+    def invoke(self, messages):
+        prompt = messages[-1].content
+        self.calls.append(prompt)
+        section = prompt.split("## 先决条件\n", 1)[1].split("\n\n## 当前全局状态", 1)[0]
+        items = re.findall(r"^(\d+)\. (.*)$", section, re.MULTILINE)
+        if not items:
+            verdict = {"satisfied": "完成" in section, "confidence": 0.9, "explanation": "单条"}
+            return Mock(content=json.dumps(verdict, ensure_ascii=False))
+        verdicts = [{"id": int(index), "satisfied": "完成" in text, "confidence": 0.8, "explanation": "批量"}
+                    for index, text in items if int(index) not in self.drop_ids]
+        return Mock(content="```json\n" + json.dumps(verdicts, ensure_ascii=False) + "\n```")
+
+
+def make_state(text="需求分析已完成"):
+    return GlobalState(current_state=text)
+
+
+class TestBatchConditionChecker(unittest.TestCase):
+    """批量先决条件检查测试"""
+
+    def test_batch_uses_single_request(self):
+        llm = BatchLLM()
+        checker = StateConditionChecker(llm)
+        preconditions = [f"步骤{i}完成" for i in range(5)] + ["尚未开始", "无", "步骤0完成"]
+
+        verdicts = checker.check_preconditions_batch(preconditions, make_state())
+
+        self.assertEqual(len(llm.calls), 1)
+        self.assertEqual([v[0] for v in verdicts], [True] * 5 + [False, True, True])
+        self.assertEqual(verdicts[-1], verdicts[0])
+        self.assertEqual(llm.calls[0].count("需求分析已完成"), 1)
+
+    def test_verdicts_cached_until_state_changes(self):
+        llm = BatchLLM()
+        checker = StateConditionChecker(llm)
+        state = make_state()
+        checker.check_preconditions_batch(["A完成", "B完成", "C"], state)
+        self.assertTrue(checker.check_precondition_satisfied("B完成", state)[0])
+        self.assertEqual(len(llm.calls), 1)
+
+        state.current_state = "进入测试阶段"
+        checker.check_preconditions_batch(["A完成", "B完成", "C"], state)
+        self.assertEqual(len(llm.calls), 2)
+        self.assertEqual(checker.get_cache_statistics()['hits'], 1)
+
+    def test_chunking_and_fallback(self):
+        llm = BatchLLM(drop_ids={2})
+        checker = StateConditionChecker(llm, batch_size=3)
+        verdicts = checker.check_preconditions_batch([f"任务{i}完成" for i in range(6)], make_state())
+
+        # 两个批次，每批缺失的第2项各回退一次单独检查
+        self.assertEqual(len(llm.calls), 4)
+        self.assertEqual([v[2] for v in verdicts], ["批量", "单条", "批量"] * 2)
+
+    def test_failures_are_not_cached(self):
+        llm = Mock()
+        llm.invoke.side_effect = RuntimeError("API不可用")
+        checker = StateConditionChecker(llm)
+        state = make_state()
+        self.assertEqual(checker.check_preconditions_batch(["A完成", "B完成"], state)[0][:2], (False, 0.0))
+        self.assertEqual(checker.get_cache_statistics()['cached_verdicts'], 0)
+
+    def test_manager_checks_pending_tasks_in_one_request(self):
+        llm = BatchLLM()
+        manager = CognitiveManager(llm=llm, available_agents={"coder": Mock()},
+                                   condition_checker=StateConditionChecker(llm))
+        tasks = [CognitiveTask(id=f"task_{i}", name=f"任务{i}", instruction="x", agent_name="coder",
+                               instruction_type="execution", phase=TaskPhase.EXECUTION,
+                               expected_output="y", precondition=text)
+                 for i, text in enumerate(["设计完成", "编码完成", "部署审批通过", "测试完成"])]
+
+        executable = manager.find_executable_tasks(tasks, make_state())
+
+        self.assertEqual(len(llm.calls), 1)
+        self.assertEqual([task.id for task, _ in executable], ["task_0", "task_1", "task_3"])
+
+
+if __name__ == '__main__':
+    unittest.main()
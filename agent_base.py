@@ -1,7 +1,6 @@
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.language_models import BaseChatModel
-from typing import Iterator
-import tiktoken # Add tiktoken import for accurate counting
+from typing import Iterator, AsyncIterator
 import functools
 import inspect
 import random
@@ -31,13 +30,20 @@ class Result:
         stdout (str): 标准输出内容
         stderr (str): 标准错误输出内容
         return_value (str): 执行结果的返回值
+        stdout_total_bytes (int): 代码实际输出的总字节数（stdout被截断时大于stdout的长度）
+        stdout_truncated (bool): stdout是否只保留了开头和结尾部分
+        stdout_file (str): 完整输出的溢出文件路径，仅在执行器启用溢出写文件时提供
     """
-    def __init__(self, success: bool, code: str, stdout: str = None, stderr: str = None, return_value: str = None):
+    def __init__(self, success: bool, code: str, stdout: str = None, stderr: str = None, return_value: str = None,
+                 stdout_total_bytes: int = None, stdout_truncated: bool = False, stdout_file: str = None):
         self.success = success
         self.code = code
         self.stdout = stdout
         self.stderr = stderr
         self.return_value = return_value
+        self.stdout_total_bytes = stdout_total_bytes
+        self.stdout_truncated = stdout_truncated
+        self.stdout_file = stdout_file
     
     def __str__(self) -> str:
         """返回简洁的人类友好字符串表示"""
@@ -74,13 +80,210 @@ class Result:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
-        return {
+        data = {
             'success': self.success,
             'code': self.code,
             'stdout': self.stdout,
             'stderr': self.stderr,
             'return_value': self.return_value
         }
+        # 仅在输出被截断时附加截断信息，保持常规结果的字典结构不变
+        if self.stdout_truncated:
+            data['stdout_total_bytes'] = self.stdout_total_bytes
+            data['stdout_truncated'] = True
+            data['stdout_file'] = self.stdout_file
+        return data
+#endregion
+
+#region TokenCountedMemory
+def _count_tokens(encoding, msg) -> int:
+    """计算单条消息的 token 数，编码失败时按字符数估算"""
+    try:
+        return len(encoding.encode(msg.content))
+    except Exception:
+        return len(str(msg.content)) // 2 # Fallback estimation
+
+
+class TokenCountedMemory(list):
+    """
+    带增量 token 计数的 memory 列表
+
+    以消息对象的 identity 为键维护一个 token 数旁路索引，仅在消息被追加或移除时更新，
+    因此 token_total 的读取是 O(1) 的，不需要每次都对整个历史重新调用 tiktoken 编码。
+    编码器通过 bind_encoding 绑定，绑定前不做任何计数；更换编码器时整体重算一次。
+
+    注意：消息追加到 memory 之后不应再原地修改其 content，否则缓存的计数会过期。
+    """
+    def __init__(self, iterable=(), encoding=None, previous: Optional['TokenCountedMemory'] = None):
+        super().__init__(iterable)
+        self._encoding = None
+        self._token_counts: Dict[int, List[int]] = {} # id(msg) -> [token数, 在列表中出现的次数]
+        self._token_total = 0
+        if previous is not None and encoding is None:
+            encoding = previous.encoding
+        if encoding is not None:
+            self.bind_encoding(encoding, previous)
+
+    @property
+    def encoding(self):
+        return self._encoding
+
+    @property
+    def token_total(self) -> int:
+        """当前 memory 中所有消息的 token 总数"""
+        return self._token_total
+
+    def bind_encoding(self, encoding, previous: Optional['TokenCountedMemory'] = None) -> None:
+        """
+        绑定编码器，编码器变化时重建索引
+
+        Args:
+            encoding: tiktoken 编码器
+            previous: 可选的旧 memory，使用同一编码器时复用其中已缓存的计数
+        """
+        if encoding is self._encoding:
+            return
+        self._encoding = encoding
+        self._token_counts = {}
+        self._token_total = 0
+        reusable = previous._token_counts if previous is not None and previous.encoding is encoding else {}
+        for msg in self:
+            entry = self._token_counts.get(id(msg))
+            if entry is None:
+                known = reusable.get(id(msg))
+                count = known[0] if known is not None else _count_tokens(encoding, msg)
+                entry = self._token_counts[id(msg)] = [count, 0]
+            entry[1] += 1
+            self._token_total += entry[0]
+
+    def token_count(self, msg) -> int:
+        """返回消息的 token 数，memory 中的消息直接命中缓存"""
+        entry = self._token_counts.get(id(msg))
+        if entry is not None:
+            return entry[0]
+        return _count_tokens(self._encoding, msg)
+
+    def _track(self, msg) -> None:
+        if self._encoding is None:
+            return
+        entry = self._token_counts.get(id(msg))
+        if entry is None:
+            entry = self._token_counts[id(msg)] = [_count_tokens(self._encoding, msg), 0]
+        entry[1] += 1
+        self._token_total += entry[0]
+
+    def _untrack(self, msg) -> None:
+        entry = self._token_counts.get(id(msg))
+        if entry is None:
+            return
+        entry[1] -= 1
+        self._token_total -= entry[0]
+        if entry[1] <= 0:
+            del self._token_counts[id(msg)]
+
+    # --- 修改列表的操作都需要同步索引 ---
+    def append(self, msg):
+        super().append(msg)
+        self._track(msg)
+
+    def extend(self, msgs):
+        msgs = list(msgs)
+        super().extend(msgs)
+        for msg in msgs:
+            self._track(msg)
+
+    def __iadd__(self, msgs):
+        self.extend(msgs)
+        return self
+
+    def insert(self, index, msg):
+        super().insert(index, msg)
+        self._track(msg)
+
+    def remove(self, msg):
+        index = self.index(msg)
+        self._untrack(self[index])
+        super().__delitem__(index)
+
+    def pop(self, index=-1):
+        msg = super().pop(index)
+        self._untrack(msg)
+        return msg
+
+    def clear(self):
+        super().clear()
+        self._token_counts = {}
+        self._token_total = 0
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            removed = self[index]
+            value = list(value)
+            super().__setitem__(index, value)
+            added = value
+        else:
+            removed = [self[index]]
+            super().__setitem__(index, value)
+            added = [value]
+        # 先登记新消息再注销旧消息，同一对象被原位替换时不会重新编码
+        for msg in added:
+            self._track(msg)
+        for msg in removed:
+            self._untrack(msg)
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for msg in removed:
+            self._untrack(msg)
+
+    def __reduce_ex__(self, protocol):
+        # 索引以对象 id 为键，复制/序列化后失效，只保留消息本身，重新绑定编码器时重建
+        return (self.__class__, (list(self),))
+
+
+def _resolve_encoding(agent):
+    """按 agent 解析 tiktoken 编码器，并缓存在 agent 上，模型名变化时才重新解析"""
+    model_name = agent.llm.model_name if hasattr(agent.llm, 'model_name') else "gpt-3.5-turbo"
+    cached = getattr(agent, '_token_encoding', None)
+    if cached is not None and cached[0] == model_name:
+        return cached[1]
+    import tiktoken  # 延迟导入：tiktoken 加载较慢，只在第一次计算token时导入
+    try:
+        encoding = tiktoken.encoding_for_model(model_name)
+    except Exception: # Catch potential errors during encoding lookup
+        encoding = tiktoken.encoding_for_model("gpt-3.5-turbo") # Fallback
+    try:
+        agent._token_encoding = (model_name, encoding)
+    except Exception:
+        pass
+    return encoding
+
+
+def _memory_tokens(agent, encoding) -> int:
+    """返回 agent.memory 的 token 总数，TokenCountedMemory 走增量计数"""
+    memory = agent.memory
+    if not isinstance(memory, TokenCountedMemory):
+        return sum(_count_tokens(encoding, msg) for msg in memory)
+    memory.bind_encoding(encoding)
+    return memory.token_total
+
+
+def _message_tokens(agent, msg, encoding) -> int:
+    """返回单条消息的 token 数，优先使用 memory 的缓存"""
+    memory = agent.memory
+    if isinstance(memory, TokenCountedMemory) and memory.encoding is encoding:
+        return memory.token_count(msg)
+    return _count_tokens(encoding, msg)
+
+
+def _check_memory_limit(agent, limit, ratio, reducer) -> None:
+    """memory 的 token 数超过 limit * ratio 时调用 reducer 缩减"""
+    if agent is None or not hasattr(agent, 'memory'):
+        return
+    encoding = _resolve_encoding(agent)
+    if _memory_tokens(agent, encoding) > limit * ratio:
+        reducer(agent, limit, encoding)
 #endregion
 
 #region reduce_memory_decorator (修改后)
@@ -112,6 +315,18 @@ def reduce_memory_decorator(func=None, *, max_tokens=None):
 
     # --- 内部 decorator 和 _reduce_memory 保持不变，但使用 effective_max_tokens ---
     def decorator(decorated_func):
+        if inspect.iscoroutinefunction(decorated_func):
+            # 异步方法：在 await 前后做与同步版本相同的检查
+            @functools.wraps(decorated_func)
+            async def async_wrapper(*args, **kwargs):
+                agent = args[0] if args else None
+                _check_memory_limit(agent, effective_max_tokens, 0.9, _reduce_memory)
+                result = await decorated_func(*args, **kwargs)
+                _check_memory_limit(agent, effective_max_tokens, 0.8, _reduce_memory)
+                return result
+
+            return async_wrapper
+
         @functools.wraps(decorated_func)
         def wrapper(*args, **kwargs):
             # 确保我们能够获取到agent对象
@@ -129,13 +344,8 @@ def reduce_memory_decorator(func=None, *, max_tokens=None):
 
             # 执行前检查memory大小
             if agent is not None and hasattr(agent, 'memory'):
-                try:
-                    # Attempt to get model name from llm object, fallback otherwise
-                    model_name = agent.llm.model_name if hasattr(agent.llm, 'model_name') else "gpt-3.5-turbo"
-                    encoding = tiktoken.encoding_for_model(model_name)
-                except Exception: # Catch potential errors during encoding lookup
-                    encoding = tiktoken.encoding_for_model("gpt-3.5-turbo") # Fallback
-                tokens = sum(len(encoding.encode(msg.content)) for msg in agent.memory)
+                encoding = _resolve_encoding(agent)
+                tokens = _memory_tokens(agent, encoding)
 
                 # 如果超过阈值，先减少memory
                 if tokens > limit_to_use * 0.9: # 使用 limit_to_use
@@ -149,14 +359,9 @@ def reduce_memory_decorator(func=None, *, max_tokens=None):
                 return result
 
             # 执行后再次检查并减少memory
-            # Use precise token count for check
-            try:
-                # Attempt to get model name from llm object, fallback otherwise
-                model_name = agent.llm.model_name if hasattr(agent.llm, 'model_name') else "gpt-3.5-turbo"
-                encoding = tiktoken.encoding_for_model(model_name)
-            except Exception: # Catch potential errors during encoding lookup
-                encoding = tiktoken.encoding_for_model("gpt-3.5-turbo") # Fallback
-            tokens = sum(len(encoding.encode(msg.content)) for msg in agent.memory)
+            # Use precise token count for check (incremental)
+            encoding = _resolve_encoding(agent)
+            tokens = _memory_tokens(agent, encoding)
             if tokens > limit_to_use * 0.8: # 使用 limit_to_use
                 _reduce_memory(agent, limit_to_use, encoding) # 传递 limit_to_use
 
@@ -182,7 +387,7 @@ def reduce_memory_decorator(func=None, *, max_tokens=None):
                 other_messages.append(msg)
 
         # 2. 计算必要消息的 token
-        used_tokens = sum(len(encoding.encode(msg.content)) for msg in essential_messages)
+        used_tokens = sum(_message_tokens(agent, msg, encoding) for msg in essential_messages)
 
         # 3. 计算普通消息的可用 token
         available_tokens = max_tokens_limit - used_tokens # 使用传入的限制
@@ -208,10 +413,7 @@ def reduce_memory_decorator(func=None, *, max_tokens=None):
         # 从最新的对话对开始添加，直到 token 耗尽
         # human_ai_pairs 列表是从最新到最旧的顺序
         for human_msg, ai_msg in human_ai_pairs:
-             try:
-                 pair_tokens = len(encoding.encode(human_msg.content)) + len(encoding.encode(ai_msg.content))
-             except Exception:
-                 pair_tokens = (len(human_msg.content) + len(ai_msg.content)) // 2 # Fallback
+             pair_tokens = _message_tokens(agent, human_msg, encoding) + _message_tokens(agent, ai_msg, encoding)
 
              if tokens_for_others + pair_tokens <= available_tokens:
                  # 在列表开头插入，保持时间顺序（虽然最后会反转）
@@ -225,10 +427,7 @@ def reduce_memory_decorator(func=None, *, max_tokens=None):
         # 确保 memory 中至少保留一对最新的对话（如果空间允许且存在对话对）
         if not temp_memory_for_others and human_ai_pairs:
             human_msg, ai_msg = human_ai_pairs[0] # 获取最新的一对
-            try:
-                pair_tokens = len(encoding.encode(human_msg.content)) + len(encoding.encode(ai_msg.content))
-            except Exception:
-                pair_tokens = (len(human_msg.content) + len(ai_msg.content)) // 2 # Fallback
+            pair_tokens = _message_tokens(agent, human_msg, encoding) + _message_tokens(agent, ai_msg, encoding)
 
             # 只有在这一对本身不超过可用空间时才添加
             if pair_tokens <= available_tokens:
@@ -292,6 +491,18 @@ def reduce_memory_decorator_compress(func=None, *, max_tokens=None):
         effective_max_tokens = max_tokens
 
     def decorator(decorated_func):
+        if inspect.iscoroutinefunction(decorated_func):
+            # 异步方法：在 await 前后做与同步版本相同的检查
+            @functools.wraps(decorated_func)
+            async def async_wrapper(*args, **kwargs):
+                agent = args[0] if args else None
+                _check_memory_limit(agent, effective_max_tokens, 0.9, _reduce_memory_compress)
+                result = await decorated_func(*args, **kwargs)
+                _check_memory_limit(agent, effective_max_tokens, 0.8, _reduce_memory_compress)
+                return result
+
+            return async_wrapper
+
         @functools.wraps(decorated_func)
         def wrapper(*args, **kwargs):
             # 确保我们能够获取到agent对象
@@ -304,13 +515,8 @@ def reduce_memory_decorator_compress(func=None, *, max_tokens=None):
 
             # 执行前检查memory大小
             if agent is not None and hasattr(agent, 'memory'):
-                try:
-                    # Attempt to get model name from llm object, fallback otherwise
-                    model_name = agent.llm.model_name if hasattr(agent.llm, 'model_name') else "gpt-3.5-turbo"
-                    encoding = tiktoken.encoding_for_model(model_name)
-                except Exception: # Catch potential errors during encoding lookup
-                    encoding = tiktoken.encoding_for_model("gpt-3.5-turbo") # Fallback
-                tokens = sum(len(encoding.encode(msg.content)) for msg in agent.memory)
+                encoding = _resolve_encoding(agent)
+                tokens = _memory_tokens(agent, encoding)
 
                 # 如果超过阈值，先减少memory
                 if tokens > limit_to_use * 0.9: # 使用 limit_to_use
@@ -324,13 +530,8 @@ def reduce_memory_decorator_compress(func=None, *, max_tokens=None):
                 return result
 
             # 执行后再次检查并减少memory
-            try:
-                # Attempt to get model name from llm object, fallback otherwise
-                model_name = agent.llm.model_name if hasattr(agent.llm, 'model_name') else "gpt-3.5-turbo"
-                encoding = tiktoken.encoding_for_model(model_name)
-            except Exception: # Catch potential errors during encoding lookup
-                encoding = tiktoken.encoding_for_model("gpt-3.5-turbo") # Fallback
-            tokens = sum(len(encoding.encode(msg.content)) for msg in agent.memory)
+            encoding = _resolve_encoding(agent)
+            tokens = _memory_tokens(agent, encoding)
             if tokens > limit_to_use * 0.8: # 使用 limit_to_use
                 _reduce_memory_compress(agent, limit_to_use, encoding) # 使用压缩版本
 
@@ -363,7 +564,7 @@ def reduce_memory_decorator_compress(func=None, *, max_tokens=None):
                 regular_messages.append(msg)
 
         # 2. 计算protected消息的token数
-        protected_tokens = sum(len(encoding.encode(msg.content)) for msg in protected_messages)
+        protected_tokens = sum(_message_tokens(agent, msg, encoding) for msg in protected_messages)
         
         # 3. 计算可用于普通消息的token数
         available_tokens = max_tokens_limit - protected_tokens
@@ -379,15 +580,15 @@ def reduce_memory_decorator_compress(func=None, *, max_tokens=None):
         except Exception as e:
             # 如果压缩失败，fallback到原有的token限制策略
             print(f"❌ 压缩失败，使用fallback策略: {e}")
-            final_regular_messages = _fallback_token_strategy(regular_messages, available_tokens, encoding)
+            final_regular_messages = _fallback_token_strategy(agent, regular_messages, available_tokens, encoding)
         
         # 5. 检查最终结果是否符合token限制
-        final_regular_tokens = sum(len(encoding.encode(msg.content)) for msg in final_regular_messages)
+        final_regular_tokens = sum(_message_tokens(agent, msg, encoding) for msg in final_regular_messages)
         
         # 如果仍然超过限制，使用fallback策略
         if final_regular_tokens > available_tokens:
             print(f"⚠️  压缩后仍超过限制，使用fallback策略进一步优化")
-            final_regular_messages = _fallback_token_strategy(final_regular_messages, available_tokens, encoding)
+            final_regular_messages = _fallback_token_strategy(agent, final_regular_messages, available_tokens, encoding)
         
         # 6. 组合最终的memory
         new_memory = protected_messages + final_regular_messages
@@ -406,17 +607,14 @@ def reduce_memory_decorator_compress(func=None, *, max_tokens=None):
                 agent.memory_overloaded = False
                 print(f"✅ Memory在限制范围内，无需压缩\n")
 
-    def _fallback_token_strategy(messages, available_tokens, encoding):
+    def _fallback_token_strategy(agent, messages, available_tokens, encoding):
         """Fallback策略：基于token限制选择消息"""
         selected_messages = []
         used_tokens = 0
         
         # 从最新消息开始向前选择
         for msg in reversed(messages):
-            try:
-                msg_tokens = len(encoding.encode(msg.content))
-            except Exception:
-                msg_tokens = len(msg.content) // 2 # Fallback estimation
+            msg_tokens = _message_tokens(agent, msg, encoding)
             
             if used_tokens + msg_tokens <= available_tokens:
                 selected_messages.insert(0, msg) # 保持时间顺序
@@ -457,6 +655,21 @@ class AgentBase:
             self.memory = [system_msg]
             # self.protected_messages = [system_msg] # 已移除
 
+    @property
+    def memory(self) -> TokenCountedMemory:
+        '''
+        智能体的消息记忆，始终是 TokenCountedMemory，以便增量维护 token 计数
+        '''
+        return self._memory
+
+    @memory.setter
+    def memory(self, messages: List) -> None:
+        previous = self.__dict__.get('_memory')
+        if not isinstance(messages, TokenCountedMemory):
+            # 整体替换 memory 时复用旧索引中已计算过的 token 数
+            messages = TokenCountedMemory(messages, previous=previous)
+        self._memory = messages
+
     def loadKnowledge(self, knowledge:str):
         '''
         加载知识到agent的记忆中，确保消息交替
@@ -484,8 +697,11 @@ class AgentBase:
         Returns:
             int: token数量
         '''
+        import tiktoken
         encoding = tiktoken.encoding_for_model(model_name)
-        return sum(len(encoding.encode(msg.content)) for msg in self.memory)
+        if self.memory.encoding is not None and self.memory.encoding.name == encoding.name:
+            return self.memory.token_total
+        return sum(_count_tokens(encoding, msg) for msg in self.memory)
     
     def reset(self) -> None:
         """
@@ -588,6 +804,45 @@ class AgentBase:
         self.memory.append(ai_msg)
         return Result(True, "", "", None, content)
 
+    async def chat_astream(self, message: str, response_format: Optional[Dict] = None) -> AsyncIterator[object]:
+        '''
+        chat_stream 的异步版本，使用 llm.astream
+        Args:
+            message: 聊天消息
+        Returns:
+            AsyncIterator[object]: 异步流式结果，包括文本片段和最终的Result对象
+        '''
+        human_msg = HumanMessage(message)
+        self.memory.append(human_msg)
+        content = ''
+        stream_kwargs = {}
+        if response_format is not None:
+            stream_kwargs['response_format'] = response_format
+        async for chunk in self.llm.astream(self.memory, **stream_kwargs):
+            content += chunk.content
+            yield chunk.content
+        ai_msg = AIMessage(content)
+        self.memory.append(ai_msg)
+        yield Result(True, "", "", None, content)
+
+    async def chat_async(self, message: str, response_format: Optional[Dict] = None) -> Result:
+        '''
+        chat_sync 的异步版本，使用 llm.ainvoke
+        Args:
+            message: 聊天消息
+        Returns:
+            Result: 聊天结果
+        '''
+        human_msg = HumanMessage(message)
+        self.memory.append(human_msg)
+        invoke_kwargs = {}
+        if response_format is not None:
+            invoke_kwargs['response_format'] = response_format
+        content = (await self.llm.ainvoke(self.memory, **invoke_kwargs)).content
+        ai_msg = AIMessage(content)
+        self.memory.append(ai_msg)
+        return Result(True, "", "", None, content)
+
     def classify_instruction(self, instruction: str) -> bool:
         '''
         判断用户指令是"思维"还是"动作"
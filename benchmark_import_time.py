@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入耗时基准测试
+
+在全新的解释器进程中导入框架模块，测量冷导入耗时，并检查导入后是否已经加载了
+应当延迟加载的重量级依赖（langchain_openai、IPython、tiktoken、transformers 等）。
+超出预算或提前加载了重量级依赖时以非零状态退出，可直接用在CI中。
+
+用法:
+    python benchmark_import_time.py                      # 默认模块，预算 2 秒
+    python benchmark_import_time.py --budget 1.5 python_core llm_models
+    python benchmark_import_time.py --top 15             # 同时列出最慢的15个导入
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 默认测量的模块
+DEFAULT_MODULES = ['agent_base', 'llm_lazy', 'llm_models', 'message_compress', 'python_core']
+
+# 导入框架时不应被加载的重量级依赖（只在首次使用时加载）
+HEAVY_MODULES = ['langchain_openai', 'langchain_community', 'openai', 'IPython', 'tiktoken', 'transformers']
+
+DEFAULT_BUDGET = 2.0
+
+_MEASURE_CODE = """
+import sys, time, json, importlib
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure_import(module: str, heavy_modules: Optional[List[str]] = None) -> Dict:
+    '''
+    在新的解释器进程中导入模块
+
+    返回:
+    Dict: {"elapsed": 导入耗时（秒）, "heavy": 导入后已加载的重量级依赖}
+    '''
+    heavy_modules = HEAVY_MODULES if heavy_modules is None else heavy_modules
+    code = _MEASURE_CODE.format(root=PROJECT_ROOT, module=module, heavy=heavy_modules)
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=PROJECT_ROOT)
+    if completed.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{completed.stderr.strip()}")
+    # 模块导入时可能有打印输出，结果在最后一行
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, top: int) -> List[tuple]:
+    '''使用 -X importtime 统计导入模块时自身耗时最长的依赖，返回 [(微秒, 模块名)]'''
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, cwd=PROJECT_ROOT)
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) == 3:
+            timings.append((int(parts[0]), parts[2].strip()))
+    return sorted(timings, reverse=True)[:top]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="测量框架模块的冷导入耗时")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help="要测量的模块")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="单个模块的导入耗时预算（秒）")
+    parser.add_argument('--repeat', type=int, default=3, help="每个模块测量次数，取最小值")
+    parser.add_argument('--allow-heavy', action='store_true', help="不检查重量级依赖是否被提前加载")
+    parser.add_argument('--top', type=int, default=0, help="列出每个模块最慢的N个导入")
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'模块':<24}{'耗时(s)':>10}  结果")
+    for module in args.modules:
+        try:
+            results = [measure_import(module) for _ in range(max(1, args.repeat))]
+        except RuntimeError as e:
+            print(f"{module:<24}{'-':>10}  ❌ {e}")
+            failed = True
+            continue
+
+        elapsed = min(result['elapsed'] for result in results)
+        heavy = results[0]['heavy']
+        problems = []
+        if elapsed > args.budget:
+            problems.append(f"超出预算 {args.budget:.2f}s")
+        if heavy and not args.allow_heavy:
+            problems.append(f"提前加载了 {', '.join(heavy)}")
+        failed = failed or bool(problems)
+        status = "❌ " + "；".join(problems) if problems else "✅"
+        print(f"{module:<24}{elapsed:>10.3f}  {status}")
+
+        if args.top:
+            for self_us, name in slowest_imports(module, args.top):
+                print(f"    {self_us / 1000:>8.1f} ms  {name}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -27,6 +27,8 @@ from .interfaces import (
 
 from .base_memory import BaseMemory, InMemoryStorage
 
+from .embedding_index import EmbeddingIndex, HashingVectorizer, SentenceTransformerVectorizer
+
 from .working_memory import WorkingMemory
 
 from .episodic_memory import EpisodicMemory
@@ -83,6 +85,9 @@ __all__ = [
     # 基础实现
     "BaseMemory",
     "InMemoryStorage",
+    "EmbeddingIndex",
+    "HashingVectorizer",
+    "SentenceTransformerVectorizer",
     
     # 三层记忆
     "WorkingMemory",
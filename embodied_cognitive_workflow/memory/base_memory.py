@@ -9,26 +9,45 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Set
 import json
 import pickle
-from collections import OrderedDict
+from collections import Counter, OrderedDict
 import heapq
+import math
 
+from .embedding_index import EmbeddingIndex
 from .interfaces import IMemory, MemoryItem
-from .utils import calculate_similarity, extract_keywords, generate_memory_id, safe_json_dumps
+from .utils import generate_memory_id, safe_json_dumps, tokenize
 
 
 class InMemoryStorage:
-    """内存存储策略"""
+    """
+    内存存储策略
     
-    def __init__(self, max_size: Optional[int] = None):
+    检索使用倒排索引：
+    - 倒排索引（检索词 -> ID）生成候选项，只对包含查询词的项打分
+    - 正排索引（ID -> 词频）在删除时只需处理该项自己的检索词
+    - 使用BM25打分，词频、文档长度等统计信息在写入时计算并缓存
+    - 用堆选出得分最高的 limit 项
+    """
+    
+    # BM25参数
+    BM25_K1 = 1.5
+    BM25_B = 0.75
+    
+    def __init__(self, max_size: Optional[int] = None, embedding_index: Optional[EmbeddingIndex] = None):
         """
         初始化内存存储
         
         Args:
             max_size: 最大存储项数，None表示无限制
+            embedding_index: 向量索引，设置后 recall 使用向量相似度召回
         """
         self.max_size = max_size
+        self.embedding_index = embedding_index
         self._storage: OrderedDict[str, MemoryItem] = OrderedDict()
         self._index: Dict[str, Set[str]] = {}  # 关键词到ID的索引
+        self._term_frequencies: Dict[str, Counter] = {}  # ID到词频的正排索引
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
     
     def put(self, key: str, item: MemoryItem) -> None:
         """存储项"""
@@ -58,6 +77,10 @@ class InMemoryStorage:
             self._storage.move_to_end(key)
         return item
     
+    def peek(self, key: str) -> Optional[MemoryItem]:
+        """获取项但不更新访问信息和淘汰顺序（用于内部统计和索引查询）"""
+        return self._storage.get(key)
+    
     def delete(self, key: str) -> bool:
         """删除项"""
         if key in self._storage:
@@ -77,23 +100,25 @@ class InMemoryStorage:
     
     def search(self, query: str, limit: int = 10) -> List[MemoryItem]:
         """搜索项"""
-        query_keywords = extract_keywords(query.lower())
+        query_terms = set(tokenize(query))
+        if not query_terms or limit <= 0:
+            return []
+        
+        # 从倒排索引生成候选项
+        candidates: Set[str] = set()
+        for term in query_terms:
+            candidates.update(self._index.get(term, ()))
+        if not candidates:
+            return []
+        
+        total_docs = len(self._storage)
+        avg_length = self._total_length / total_docs if total_docs else 0.0
+        idf = {term: self._idf(term, total_docs) for term in query_terms if term in self._index}
         
-        # 计算每个项的相关性得分
         scored_items = []
-        for key, item in self._storage.items():
-            score = 0.0
-            
-            # 基于关键词匹配
-            item_keywords = extract_keywords(str(item.content).lower())
-            keyword_overlap = len(query_keywords.intersection(item_keywords))
-            if keyword_overlap > 0:
-                score += keyword_overlap / len(query_keywords)
-            
-            # 基于内容相似度
-            content_str = safe_json_dumps(item.content) if isinstance(item.content, dict) else str(item.content)
-            content_similarity = calculate_similarity(query, content_str)
-            score += content_similarity
+        for key in candidates:
+            item = self._storage[key]
+            score = self._bm25(key, idf, avg_length)
             
             # 考虑重要性
             score *= (1 + item.importance)
@@ -102,40 +127,99 @@ class InMemoryStorage:
             score *= (1 + item.access_count * 0.1)
             
             if score > 0:
-                scored_items.append((score, item))
+                scored_items.append((score, key, item))
         
         # 返回得分最高的项
-        scored_items.sort(key=lambda x: x[0], reverse=True)
-        return [item for _, item in scored_items[:limit]]
+        top_items = heapq.nlargest(limit, scored_items, key=lambda x: x[0])
+        return [item for _, _, item in top_items]
+    
+    def vector_search(self, query: str, limit: int = 10) -> List[MemoryItem]:
+        """使用向量索引按语义相似度搜索，未配置向量索引时退回关键词搜索"""
+        if self.embedding_index is None:
+            return self.search(query, limit)
+        return [self._storage[key] for key, _ in self.embedding_index.search(query, limit)]
+    
+    def similar_items(self, key: str, limit: int = 10) -> List[MemoryItem]:
+        """使用向量索引查找与指定项最相似的其他项"""
+        if self.embedding_index is None:
+            return []
+        return [self._storage[other] for other, _ in self.embedding_index.search_by_id(key, limit)]
+    
+    def reindex(self, key: str) -> None:
+        """项的内容被修改后重建其索引"""
+        item = self._storage.get(key)
+        if item is not None:
+            self._update_index(key, item)
     
     def clear(self) -> int:
         """清空存储"""
         count = len(self._storage)
         self._storage.clear()
         self._index.clear()
+        self._term_frequencies.clear()
+        self._doc_lengths.clear()
+        self._total_length = 0
+        if self.embedding_index is not None:
+            self.embedding_index.clear()
         return count
     
     def size(self) -> int:
         """获取存储大小"""
         return len(self._storage)
     
+    def _idf(self, term: str, total_docs: int) -> float:
+        doc_freq = len(self._index.get(term, ()))
+        return math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+    
+    def _bm25(self, key: str, idf: Dict[str, float], avg_length: float) -> float:
+        term_frequencies = self._term_frequencies[key]
+        length_norm = 1 - self.BM25_B + self.BM25_B * (self._doc_lengths[key] / avg_length if avg_length else 0)
+        score = 0.0
+        for term, term_idf in idf.items():
+            tf = term_frequencies.get(term)
+            if tf:
+                score += term_idf * tf * (self.BM25_K1 + 1) / (tf + self.BM25_K1 * length_norm)
+        return score
+    
     def _update_index(self, key: str, item: MemoryItem) -> None:
         """更新索引"""
-        # 提取关键词
+        # 内容可能已变化，先移除旧的检索词
+        self._remove_from_index(key)
+        
         content_str = safe_json_dumps(item.content) if isinstance(item.content, dict) else str(item.content)
-        keywords = extract_keywords(content_str.lower())
+        term_frequencies = Counter(tokenize(content_str))
         
         # 更新倒排索引
-        for keyword in keywords:
-            if keyword not in self._index:
-                self._index[keyword] = set()
-            self._index[keyword].add(key)
+        for term in term_frequencies:
+            if term not in self._index:
+                self._index[term] = set()
+            self._index[term].add(key)
+        
+        self._term_frequencies[key] = term_frequencies
+        length = sum(term_frequencies.values())
+        self._doc_lengths[key] = length
+        self._total_length += length
+        
+        if self.embedding_index is not None:
+            self.embedding_index.add(key, content_str)
     
     def _remove_from_index(self, key: str) -> None:
         """从索引中移除"""
-        # 从所有包含该key的索引中移除
-        for keyword_set in self._index.values():
-            keyword_set.discard(key)
+        if self.embedding_index is not None:
+            self.embedding_index.remove(key)
+        
+        term_frequencies = self._term_frequencies.pop(key, None)
+        if term_frequencies is None:
+            return
+        
+        # 只处理该项自己的检索词
+        for term in term_frequencies:
+            keys = self._index.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[term]
+        self._total_length -= self._doc_lengths.pop(key, 0)
 
 
 class BaseMemory(IMemory, ABC):
@@ -170,6 +254,8 @@ class BaseMemory(IMemory, ABC):
     
     def recall(self, query: str, limit: int = 10, **kwargs) -> List[MemoryItem]:
         """检索记忆"""
+        if self.storage.embedding_index is not None:
+            return self.storage.vector_search(query, limit)
         return self.storage.search(query, limit)
     
     def forget(self, key: str) -> bool:
@@ -184,6 +270,7 @@ class BaseMemory(IMemory, ABC):
             if metadata is not None:
                 item.metadata.update(metadata)
             item.timestamp = datetime.now()
+            self.storage.reindex(key)
             return True
         return False
     
@@ -0,0 +1,397 @@
+"""
+向量召回索引
+
+为记忆层提供基于向量的相似度召回，替代逐项计算 Jaccard 相似度：
+- 默认使用本地特征哈希向量化（无需下载模型），可选 sentence-transformers
+- 向量存放在连续的 NumPy 矩阵中，使用矩阵乘法批量计算余弦相似度
+- 规模超过阈值后自动构建 IVF 倒排聚类索引，只在最近的若干聚类中搜索
+- 支持增量添加/删除，并可持久化为内存映射文件
+
+未安装 NumPy 时退回纯 Python 实现（功能相同，只适合小规模数据）。
+
+用法:
+    index = EmbeddingIndex()
+    index.add("ep_1", "数据库连接池耗尽导致超时")
+    index.search("连接池 超时", limit=5)   # [(key, score), ...]
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import logging
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .utils import tokenize
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_CJK_PATTERN = re.compile(r'[一-鿿]')
+
+
+@lru_cache(maxsize=65536)
+def _hash_feature(feature: str) -> int:
+    """稳定的64位特征哈希（不受 PYTHONHASHSEED 影响，保证持久化后仍然一致）"""
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class HashingVectorizer:
+    """
+    特征哈希向量化器
+
+    词和中文字符二元组按哈希映射到固定维度，使用带符号哈希减少冲突偏差，
+    词频取对数后做L2归一化，因此向量点积即为余弦相似度。
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> Counter:
+        features = Counter()
+        for token in tokenize(text):
+            features[token] += 1
+            # 中文没有空格分词，连续的汉字会成为一个词，补充字符二元组以支持部分匹配
+            if _CJK_PATTERN.search(token) and len(token) > 2:
+                for i in range(len(token) - 1):
+                    features[token[i:i + 2]] += 1
+        return features
+
+    def encode_one(self, text: str) -> List[float]:
+        """向量化单个文本，返回归一化后的向量（空文本返回全零向量）"""
+        vector = [0.0] * self.dimension
+        for feature, count in self._features(text).items():
+            hashed = _hash_feature(feature)
+            sign = 1.0 if hashed >> 63 else -1.0
+            vector[hashed % self.dimension] += sign * (1.0 + math.log(count))
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm > 0:
+            vector = [value / norm for value in vector]
+        return vector
+
+    def encode(self, texts: Sequence[str]) -> Any:
+        """批量向量化，安装了NumPy时返回 float32 矩阵"""
+        vectors = [self.encode_one(text) for text in texts]
+        if NUMPY_AVAILABLE:
+            return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.dimension)
+        return vectors
+
+
+class SentenceTransformerVectorizer:
+    """基于 sentence-transformers 的向量化器（可选依赖，首次创建时加载模型）"""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2", **model_kwargs):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("需要安装 sentence-transformers: pip install sentence-transformers") from e
+        if not NUMPY_AVAILABLE:
+            raise ImportError("SentenceTransformerVectorizer 需要 NumPy")
+        self.model_name = model_name
+        self._model = SentenceTransformer(model_name, **model_kwargs)
+        self.dimension = self._model.get_sentence_embedding_dimension()
+
+    def encode_one(self, text: str) -> Any:
+        return self.encode([text])[0]
+
+    def encode(self, texts: Sequence[str]) -> Any:
+        return np.asarray(self._model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+
+
+class EmbeddingIndex:
+    """
+    向量索引
+
+    向量按行存放在预分配的矩阵中，删除时把最后一行移到被删除的位置，
+    因此添加和删除都是 O(维度)。
+    数据量达到 ann_threshold 后构建 IVF 索引（球面 k-means 聚类），
+    查询只计算最近的 nprobe 个聚类中的向量；数据量翻倍时重新聚类。
+    """
+
+    def __init__(self,
+                 vectorizer: Optional[Any] = None,
+                 ann_threshold: Optional[int] = 50000,
+                 nprobe: int = 8):
+        """
+        初始化向量索引
+
+        Args:
+            vectorizer: 向量化器，默认 HashingVectorizer
+            ann_threshold: 构建IVF近似索引的数据量阈值，None表示始终精确搜索
+            nprobe: IVF查询时搜索的聚类数
+        """
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.dimension = self.vectorizer.dimension
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix = self._allocate(0) if NUMPY_AVAILABLE else []
+
+        # IVF索引
+        self._centroids = None
+        self._assignments = None
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    # ---- 增删 ----
+
+    def add(self, key: str, text: str) -> None:
+        """添加或更新一个文本"""
+        self.add_vector(key, self.vectorizer.encode([text])[0])
+
+    def add_many(self, items: Sequence[Tuple[str, str]]) -> None:
+        """批量添加 (key, text)，向量化一次完成"""
+        if not items:
+            return
+        vectors = self.vectorizer.encode([text for _, text in items])
+        for (key, _), vector in zip(items, vectors):
+            self.add_vector(key, vector)
+
+    def add_vector(self, key: str, vector: Any) -> None:
+        """添加或更新一个已归一化的向量"""
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._ids)
+            self._ids.append(key)
+            self._rows[key] = row
+            self._ensure_capacity(row + 1)
+            if not NUMPY_AVAILABLE:
+                self._matrix.append(None)
+
+        if NUMPY_AVAILABLE:
+            self._ensure_writable()
+            self._matrix[row] = vector
+            if self._centroids is not None:
+                self._assignments[row] = int(np.argmax(self._centroids @ self._matrix[row]))
+            self._maybe_train()
+        else:
+            self._matrix[row] = list(vector)
+
+    def remove(self, key: str) -> bool:
+        """删除一个向量"""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+
+        last = len(self._ids) - 1
+        if row != last:
+            # 把最后一行移到被删除的位置
+            moved_key = self._ids[last]
+            self._ids[row] = moved_key
+            self._rows[moved_key] = row
+            self._ensure_writable()
+            self._matrix[row] = self._matrix[last]
+            if self._assignments is not None:
+                self._assignments[row] = self._assignments[last]
+        self._ids.pop()
+        if not NUMPY_AVAILABLE:
+            self._matrix.pop()
+        return True
+
+    def clear(self) -> None:
+        """清空索引"""
+        self._ids.clear()
+        self._rows.clear()
+        self._matrix = self._allocate(0) if NUMPY_AVAILABLE else []
+        self._centroids = None
+        self._assignments = None
+        self._trained_size = 0
+
+    # ---- 查询 ----
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """按余弦相似度查询最相近的文本，返回 [(key, score)]"""
+        return self.search_vector(self.vectorizer.encode([query])[0], limit)
+
+    def search_by_id(self, key: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """查询与已有项最相近的其他项"""
+        row = self._rows.get(key)
+        if row is None:
+            return []
+        results = self.search_vector(self._matrix[row], limit + 1)
+        return [(other, score) for other, score in results if other != key][:limit]
+
+    def search_vector(self, vector: Any, limit: int = 10) -> List[Tuple[str, float]]:
+        """按向量查询，只返回相似度大于0的项"""
+        count = len(self._ids)
+        if count == 0 or limit <= 0:
+            return []
+
+        if not NUMPY_AVAILABLE:
+            scored = ((sum(a * b for a, b in zip(row, vector)), i) for i, row in enumerate(self._matrix))
+            top = heapq.nlargest(limit, scored)
+            return [(self._ids[i], score) for score, i in top if score > 0]
+
+        query = np.asarray(vector, dtype=np.float32)
+        if not query.any():
+            return []
+
+        rows = self._candidate_rows(query)
+        matrix = self._matrix[:count] if rows is None else self._matrix[rows]
+        if len(matrix) == 0:
+            return []
+
+        scores = matrix @ query
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        ids = top if rows is None else rows[top]
+        return [(self._ids[int(i)], float(scores[j])) for i, j in zip(ids, top) if scores[j] > 0]
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """计算两个文本的余弦相似度"""
+        vectors = self.vectorizer.encode([text1, text2])
+        if NUMPY_AVAILABLE:
+            return max(0.0, float(vectors[0] @ vectors[1]))
+        return max(0.0, sum(a * b for a, b in zip(vectors[0], vectors[1])))
+
+    # ---- IVF近似索引 ----
+
+    def build_ann(self, nlist: Optional[int] = None, iterations: int = 10) -> None:
+        """构建（或重建）IVF索引"""
+        if not NUMPY_AVAILABLE:
+            raise ImportError("IVF索引需要 NumPy")
+        count = len(self._ids)
+        if count == 0:
+            return
+
+        nlist = nlist or max(1, int(math.sqrt(count)))
+        nlist = min(nlist, count)
+        rng = np.random.default_rng(0)
+        data = self._matrix[:count]
+        sample = data[rng.choice(count, min(count, nlist * 40), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+        # 球面 k-means：按余弦相似度分配，中心归一化
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=nlist)
+            nonempty = counts > 0
+            centroids[nonempty] = sums[nonempty]
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids = centroids / np.maximum(norms, 1e-12)
+
+        assignments = np.empty(len(self._matrix), dtype=np.int32)
+        for start in range(0, count, 8192):
+            block = data[start:start + 8192]
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        self._centroids = centroids.astype(np.float32)
+        self._assignments = assignments
+        self._trained_size = count
+        logger.info(f"向量索引构建IVF: {count} 项, {nlist} 个聚类")
+
+    def _maybe_train(self) -> None:
+        count = len(self._ids)
+        if self.ann_threshold is None or count < self.ann_threshold:
+            return
+        if self._centroids is None or count >= self._trained_size * 2:
+            self.build_ann()
+
+    def _candidate_rows(self, query: Any) -> Optional[Any]:
+        if self._centroids is None:
+            return None
+        nlist = len(self._centroids)
+        if nlist <= self.nprobe:
+            return None
+        centroid_scores = self._centroids @ query
+        probes = np.argpartition(-centroid_scores, self.nprobe - 1)[:self.nprobe]
+        return np.flatnonzero(np.isin(self._assignments[:len(self._ids)], probes))
+
+    # ---- 存储 ----
+
+    def _allocate(self, capacity: int) -> Any:
+        return np.zeros((capacity, self.dimension), dtype=np.float32)
+
+    def _resize(self, capacity: int) -> None:
+        matrix = self._allocate(capacity)
+        matrix[:len(self._matrix)] = self._matrix
+        self._matrix = matrix
+        if self._assignments is not None:
+            assignments = np.zeros(capacity, dtype=np.int32)
+            assignments[:len(self._assignments)] = self._assignments
+            self._assignments = assignments
+
+    def _ensure_capacity(self, size: int) -> None:
+        if NUMPY_AVAILABLE and size > len(self._matrix):
+            self._resize(max(size, len(self._matrix) * 2, 1024))
+
+    def _ensure_writable(self) -> None:
+        """从内存映射文件加载的矩阵是只读的，首次修改时复制到内存"""
+        if NUMPY_AVAILABLE and not self._matrix.flags.writeable:
+            self._resize(max(len(self._matrix), 1024))
+
+    def save(self, path: str) -> None:
+        '''
+        持久化到 {path}.npy（向量矩阵）和 {path}.json（ID和配置）
+
+        Args:
+            path: 文件路径前缀
+        '''
+        if not NUMPY_AVAILABLE:
+            raise ImportError("向量索引持久化需要 NumPy")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        count = len(self._ids)
+        matrix = np.lib.format.open_memmap(f"{path}.npy", mode='w+', dtype=np.float32,
+                                           shape=(count, self.dimension))
+        matrix[:] = self._matrix[:count]
+        matrix.flush()
+        del matrix
+
+        with open(f"{path}.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'ids': self._ids,
+                'dimension': self.dimension,
+                'vectorizer': getattr(self.vectorizer, 'name', type(self.vectorizer).__name__),
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, vectorizer: Optional[Any] = None, mmap: bool = True, **kwargs) -> 'EmbeddingIndex':
+        '''
+        从 save() 写入的文件加载
+
+        Args:
+            path: 文件路径前缀
+            vectorizer: 向量化器，必须与保存时使用的一致
+            mmap: 是否以内存映射方式只读打开矩阵（首次修改时才复制到内存）
+        '''
+        if not NUMPY_AVAILABLE:
+            raise ImportError("向量索引持久化需要 NumPy")
+        with open(f"{path}.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        index = cls(vectorizer=vectorizer or HashingVectorizer(meta['dimension']), **kwargs)
+        if index.dimension != meta['dimension']:
+            raise ValueError(f"向量维度不一致: 文件为 {meta['dimension']}, 向量化器为 {index.dimension}")
+
+        index._matrix = np.load(f"{path}.npy", mmap_mode='r' if mmap else None)
+        index._ids = list(meta['ids'])
+        index._rows = {key: row for row, key in enumerate(index._ids)}
+        if index.ann_threshold is not None and len(index._ids) >= index.ann_threshold:
+            index.build_ann()
+        return index
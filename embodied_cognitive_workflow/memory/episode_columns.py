@@ -0,0 +1,283 @@
+"""
+情景列式存储
+
+为长期运行、积累大量情景的智能体提供紧凑的时间线和模式统计：
+- 时间线是按时间排序的 array('d') 时间戳和对应的行号，范围查询只需两次二分查找加切片
+- 项目、规范化事件、上下文键值对都做字典编码（字符串只保存一份，列中存整数编码）
+- 每行的上下文以 CSR 形式存放（偏移数组 + 编码数组）
+- 事件模式和上下文模式的计数在情景到达时增量维护，analyze_patterns 不再全量分组
+
+行号按写入顺序递增且不会复用，删除只做墓碑标记并回退计数。
+安装了 NumPy 时范围切片上的项目过滤和时间跨度计算使用向量化运算。
+"""
+
+import bisect
+import logging
+from array import array
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 没有项目的情景使用的项目编码
+NO_PROJECT = -1
+
+
+class StringDictionary:
+    """字符串字典编码：值 <-> 连续整数编码"""
+
+    def __init__(self):
+        self._codes: Dict[Any, int] = {}
+        self._values: List[Any] = []
+
+    def encode(self, value: Any) -> int:
+        """获取值的编码，不存在时分配新编码"""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._codes[value] = code
+            self._values.append(value)
+        return code
+
+    def lookup(self, value: Any) -> Optional[int]:
+        """获取已有值的编码"""
+        return self._codes.get(value)
+
+    def decode(self, code: int) -> Any:
+        return self._values[code]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class EpisodeColumnStore:
+    """
+    情景的列式索引
+
+    只保存时间线、项目、事件模式和上下文模式所需的列，情景内容本身仍由记忆存储保存。
+    """
+
+    def __init__(self):
+        self.projects = StringDictionary()
+        self.events = StringDictionary()
+        self.context_pairs = StringDictionary()
+
+        # 按行号（写入顺序）排列的列
+        self._ids: List[str] = []
+        self._timestamps = array('d')
+        self._project_codes = array('i')
+        self._event_codes = array('i')
+        self._alive = bytearray()
+        self._context_offsets = array('q', [0])
+        self._context_codes = array('i')
+        self._rows: Dict[str, int] = {}
+
+        # 时间线：按时间排序的时间戳和行号
+        self._timeline_times = array('d')
+        self._timeline_rows = array('q')
+
+        # 增量维护的模式：编码 -> 行号列表，以及全局/按项目的存活计数
+        self._event_rows: Dict[int, array] = {}
+        self._context_rows: Dict[int, array] = {}
+        self._event_counts: Counter = Counter()
+        self._context_counts: Counter = Counter()
+        self._project_event_counts: Counter = Counter()
+        self._project_context_counts: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, episode_id: str) -> bool:
+        return episode_id in self._rows
+
+    def add(self, episode_id: str, timestamp: datetime, project_id: Optional[str],
+            event_key: str, context: Dict[str, Any]) -> int:
+        """
+        追加一个情景
+
+        Args:
+            episode_id: 情景ID
+            timestamp: 情景时间
+            project_id: 项目ID
+            event_key: 规范化后的事件描述
+            context: 上下文，只有字符串值参与模式统计
+
+        Returns:
+            行号
+        """
+        if episode_id in self._rows:
+            self.remove(episode_id)
+
+        row = len(self._ids)
+        seconds = timestamp.timestamp()
+        project_code = self.projects.encode(project_id) if project_id else NO_PROJECT
+        event_code = self.events.encode(event_key)
+
+        self._ids.append(episode_id)
+        self._timestamps.append(seconds)
+        self._project_codes.append(project_code)
+        self._event_codes.append(event_code)
+        self._alive.append(1)
+        self._rows[episode_id] = row
+
+        pair_codes = [self.context_pairs.encode((key, value))
+                      for key, value in context.items() if isinstance(value, str)]
+        self._context_codes.extend(pair_codes)
+        self._context_offsets.append(len(self._context_codes))
+
+        # 时间线通常按时间顺序到达，直接追加
+        if not self._timeline_times or seconds >= self._timeline_times[-1]:
+            self._timeline_times.append(seconds)
+            self._timeline_rows.append(row)
+        else:
+            position = bisect.bisect_right(self._timeline_times, seconds)
+            self._timeline_times.insert(position, seconds)
+            self._timeline_rows.insert(position, row)
+
+        self._event_rows.setdefault(event_code, array('q')).append(row)
+        self._event_counts[event_code] += 1
+        self._project_event_counts[(project_code, event_code)] += 1
+        for code in pair_codes:
+            self._context_rows.setdefault(code, array('q')).append(row)
+            self._context_counts[code] += 1
+            self._project_context_counts[(project_code, code)] += 1
+
+        return row
+
+    def remove(self, episode_id: str) -> bool:
+        """删除情景：标记墓碑并回退模式计数"""
+        row = self._rows.pop(episode_id, None)
+        if row is None:
+            return False
+
+        self._alive[row] = 0
+        project_code = self._project_codes[row]
+        event_code = self._event_codes[row]
+        self._event_counts[event_code] -= 1
+        self._project_event_counts[(project_code, event_code)] -= 1
+        for code in self._row_context_codes(row):
+            self._context_counts[code] -= 1
+            self._project_context_counts[(project_code, code)] -= 1
+        return True
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def range_ids(self, start: datetime, end: datetime, project_id: Optional[str] = None) -> List[str]:
+        """获取时间范围 [start, end] 内的情景ID（按时间排序）"""
+        low = bisect.bisect_left(self._timeline_times, start.timestamp())
+        high = bisect.bisect_right(self._timeline_times, end.timestamp())
+        if low >= high:
+            return []
+
+        project_code = None
+        if project_id is not None:
+            project_code = self.projects.lookup(project_id)
+            if project_code is None:
+                return []
+
+        rows = self._timeline_rows[low:high]
+        if NUMPY_AVAILABLE:
+            rows = np.frombuffer(rows, dtype=np.int64)
+            mask = np.frombuffer(self._alive, dtype=np.uint8)[rows].astype(bool)
+            if project_code is not None:
+                mask &= np.frombuffer(self._project_codes, dtype=np.intc)[rows] == project_code
+            rows = rows[mask].tolist()
+        else:
+            rows = [row for row in rows if self._alive[row]
+                    and (project_code is None or self._project_codes[row] == project_code)]
+        return [self._ids[row] for row in rows]
+
+    def event_patterns(self, min_occurrences: int, project_id: Optional[str] = None
+                       ) -> Iterable[Tuple[str, List[str], str, str]]:
+        """
+        频繁事件模式
+
+        Yields:
+            (规范化事件, 情景ID列表, 最早情景ID, 最晚情景ID)
+        """
+        for event_code, rows in self._frequent_rows(self._event_rows, self._event_counts,
+                                                     self._project_event_counts,
+                                                     min_occurrences, project_id):
+            if NUMPY_AVAILABLE:
+                times = np.frombuffer(self._timestamps, dtype=np.float64)[rows]
+                first, last = int(rows[times.argmin()]), int(rows[times.argmax()])
+            else:
+                first = min(rows, key=self._timestamps.__getitem__)
+                last = max(rows, key=self._timestamps.__getitem__)
+            yield (self.events.decode(event_code), self._row_ids(rows),
+                   self._ids[first], self._ids[last])
+
+    def context_patterns(self, min_occurrences: int, project_id: Optional[str] = None
+                         ) -> Iterable[Tuple[Tuple[str, str], List[str]]]:
+        """
+        频繁上下文模式
+
+        Yields:
+            ((键, 值), 情景ID列表)
+        """
+        for pair_code, rows in self._frequent_rows(self._context_rows, self._context_counts,
+                                                    self._project_context_counts,
+                                                    min_occurrences, project_id):
+            yield self.context_pairs.decode(pair_code), self._row_ids(rows)
+
+    def _frequent_rows(self, postings: Dict[int, array], counts: Counter, project_counts: Counter,
+                       min_occurrences: int, project_id: Optional[str]):
+        """用增量计数筛选频繁模式，只为满足阈值的模式展开行号"""
+        project_code = None
+        if project_id is not None:
+            project_code = self.projects.lookup(project_id)
+            if project_code is None:
+                return
+
+        for code, rows in postings.items():
+            if project_code is None:
+                if counts[code] < min_occurrences:
+                    continue
+            elif project_counts[(project_code, code)] < min_occurrences:
+                continue
+            rows = self._live_rows(rows, project_code)
+            if len(rows):
+                yield code, rows
+
+    def _live_rows(self, rows: array, project_code: Optional[int]):
+        if NUMPY_AVAILABLE:
+            rows = np.frombuffer(rows, dtype=np.int64)
+            mask = np.frombuffer(self._alive, dtype=np.uint8)[rows].astype(bool)
+            if project_code is not None:
+                mask &= np.frombuffer(self._project_codes, dtype=np.intc)[rows] == project_code
+            return rows[mask]
+        return [row for row in rows if self._alive[row]
+                and (project_code is None or self._project_codes[row] == project_code)]
+
+    def _row_ids(self, rows) -> List[str]:
+        return [self._ids[row] for row in (rows.tolist() if NUMPY_AVAILABLE else rows)]
+
+    def _row_context_codes(self, row: int) -> array:
+        return self._context_codes[self._context_offsets[row]:self._context_offsets[row + 1]]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """各列占用的字节数（不含字符串本身）"""
+        columns = {
+            'timestamps': self._timestamps,
+            'project_codes': self._project_codes,
+            'event_codes': self._event_codes,
+            'context_offsets': self._context_offsets,
+            'context_codes': self._context_codes,
+            'timeline_times': self._timeline_times,
+            'timeline_rows': self._timeline_rows,
+        }
+        usage = {name: column.itemsize * len(column) for name, column in columns.items()}
+        usage['alive'] = len(self._alive)
+        usage['pattern_postings'] = sum(rows.itemsize * len(rows) for postings in
+                                        (self._event_rows, self._context_rows)
+                                        for rows in postings.values())
+        return usage
@@ -10,21 +10,27 @@ from collections import defaultdict
 
 from .interfaces import IEpisodicMemory, Episode, MemoryItem
 from .base_memory import BaseMemory, InMemoryStorage
+from .episode_columns import EpisodeColumnStore
 from .utils import generate_memory_id, merge_metadata
 
 
 class EpisodicMemory(BaseMemory, IEpisodicMemory):
     """情景记忆实现"""
     
-    def __init__(self, storage: Optional[InMemoryStorage] = None):
+    def __init__(self, storage: Optional[InMemoryStorage] = None, columnar: bool = False):
         """
         初始化情景记忆
         
         Args:
             storage: 存储策略，默认使用内存存储
+            columnar: 使用列式时间线和增量模式统计（适合积累大量情景的长期运行智能体），
+                      此时不再缓存情景对象，情景按需从存储重建
         """
         super().__init__(storage or InMemoryStorage())
         
+        # 列式索引（可选）：替代时间线列表和情景对象缓存
+        self._columns: Optional[EpisodeColumnStore] = EpisodeColumnStore() if columnar else None
+        
         # 项目索引：项目ID -> 情景ID列表
         self._project_index: Dict[str, List[str]] = defaultdict(list)
         
@@ -56,15 +62,37 @@ class EpisodicMemory(BaseMemory, IEpisodicMemory):
         self.storage.put(episode.id, memory_item)
         
         # 更新缓存
-        self._episode_cache[episode.id] = episode
+        if self._columns is None:
+            self._episode_cache[episode.id] = episode
         
         # 更新索引
         self._update_indices(episode)
         
         return episode.id
     
+    def forget(self, key: str) -> bool:
+        """删除情景"""
+        self._episode_cache.pop(key, None)
+        if self._columns is not None:
+            self._columns.remove(key)
+        return super().forget(key)
+    
+    def clear(self) -> int:
+        """清空所有情景"""
+        self._project_index.clear()
+        self._timeline.clear()
+        self._relationships.clear()
+        self._episode_cache.clear()
+        if self._columns is not None:
+            self._columns.clear()
+        return super().clear()
+    
     def query_timeline(self, start: datetime, end: datetime, project_id: Optional[str] = None) -> List[Episode]:
         """按时间线查询"""
+        if self._columns is not None:
+            episodes = (self._get_episode(eid) for eid in self._columns.range_ids(start, end, project_id))
+            return [episode for episode in episodes if episode]
+        
         episodes = []
         
         # 二分查找起始位置
@@ -90,7 +118,7 @@ class EpisodicMemory(BaseMemory, IEpisodicMemory):
         """获取项目上下文"""
         # 获取项目的所有情景
         episode_ids = self._project_index.get(project_id, [])
-        episodes = [self._get_episode(eid) for eid in episode_ids if self._get_episode(eid)]
+        episodes = [episode for episode in map(self._get_episode, episode_ids) if episode]
         
         if not episodes:
             return {
@@ -196,8 +224,11 @@ class EpisodicMemory(BaseMemory, IEpisodicMemory):
         if not target_episode:
             return []
         
-        # 基于事件内容查找相似情景
-        similar_items = self.recall(target_episode.event, limit=limit * 2)
+        # 基于事件内容查找相似情景（配置了向量索引时直接使用情景的向量）
+        if self.storage.embedding_index is not None:
+            similar_items = self.storage.similar_items(episode_id, limit=limit * 2)
+        else:
+            similar_items = self.recall(target_episode.event, limit=limit * 2)
         
         similar_episodes = []
         for item in similar_items:
@@ -210,13 +241,15 @@ class EpisodicMemory(BaseMemory, IEpisodicMemory):
     
     def analyze_patterns(self, project_id: Optional[str] = None, min_occurrences: int = 3) -> List[Dict[str, Any]]:
         """分析情景中的模式"""
+        if self._columns is not None:
+            return self._analyze_patterns_columnar(project_id, min_occurrences)
+        
         # 获取要分析的情景
         if project_id:
             episode_ids = self._project_index.get(project_id, [])
-            episodes = [self._get_episode(eid) for eid in episode_ids if self._get_episode(eid)]
         else:
-            episodes = [self._get_episode(item.id) for item in self.list_all() 
-                       if self._get_episode(item.id)]
+            episode_ids = [item.id for item in self.list_all()]
+        episodes = [episode for episode in map(self._get_episode, episode_ids) if episode]
         
         # 统计事件模式
         event_patterns = defaultdict(list)
@@ -261,14 +294,58 @@ class EpisodicMemory(BaseMemory, IEpisodicMemory):
         
         return sorted(patterns, key=lambda x: x['occurrences'], reverse=True)
     
+    def _analyze_patterns_columnar(self, project_id: Optional[str], min_occurrences: int) -> List[Dict[str, Any]]:
+        """使用增量计数分析模式，只展开满足阈值的模式"""
+        patterns = []
+        
+        for event_key, episode_ids, first_id, last_id in self._columns.event_patterns(min_occurrences, project_id):
+            live_ids = self._drop_evicted(episode_ids)
+            if len(live_ids) < min_occurrences:
+                continue
+            if len(live_ids) == len(episode_ids):
+                start, end = self.storage.peek(first_id).timestamp, self.storage.peek(last_id).timestamp
+            else:
+                timestamps = [self.storage.peek(eid).timestamp for eid in live_ids]
+                start, end = min(timestamps), max(timestamps)
+            patterns.append({
+                'type': 'event_pattern',
+                'pattern': event_key,
+                'occurrences': len(live_ids),
+                'episodes': live_ids,
+                'timespan': {'start': start, 'end': end}
+            })
+        
+        for (key, value), episode_ids in self._columns.context_patterns(min_occurrences, project_id):
+            live_ids = self._drop_evicted(episode_ids)
+            if len(live_ids) >= min_occurrences:
+                patterns.append({
+                    'type': 'context_pattern',
+                    'pattern': f"{key}={value}",
+                    'occurrences': len(live_ids),
+                    'episodes': live_ids
+                })
+        
+        return sorted(patterns, key=lambda x: x['occurrences'], reverse=True)
+    
+    def _drop_evicted(self, episode_ids: List[str]) -> List[str]:
+        """过滤已被存储淘汰的情景，并同步从列式索引中移除"""
+        live_ids = []
+        for eid in episode_ids:
+            if self.storage.exists(eid):
+                live_ids.append(eid)
+            else:
+                self._columns.remove(eid)
+        return live_ids
+    
     def _get_episode(self, episode_id: str) -> Optional[Episode]:
         """获取情景对象"""
         # 先检查缓存
         if episode_id in self._episode_cache:
             return self._episode_cache[episode_id]
         
-        # 从存储获取
-        item = self.get(episode_id)
+        # 从存储获取；列式模式没有情景缓存，每次查询都从存储重建，
+        # 不能计入访问次数和淘汰顺序，否则统计查询会抬高检索排名
+        item = self.storage.peek(episode_id) if self._columns is not None else self.get(episode_id)
         if item and item.metadata.get('type') == 'episode':
             # 重建情景对象
             episode = Episode(
@@ -283,7 +360,8 @@ class EpisodicMemory(BaseMemory, IEpisodicMemory):
             )
             
             # 更新缓存
-            self._episode_cache[episode_id] = episode
+            if self._columns is None:
+                self._episode_cache[episode_id] = episode
             return episode
         
         return None
@@ -294,6 +372,11 @@ class EpisodicMemory(BaseMemory, IEpisodicMemory):
         if episode.project_id:
             self._project_index[episode.project_id].append(episode.id)
         
+        if self._columns is not None:
+            self._columns.add(episode.id, episode.timestamp, episode.project_id,
+                              self._normalize_event(episode.event), episode.context)
+            return
+        
         # 更新时间索引（保持排序）
         import bisect
         bisect.insort(self._timeline, (episode.timestamp, episode.id))
@@ -6,7 +6,11 @@
 
 import json
 import gzip
+import heapq
 import shutil
+import asyncio
+import itertools
+import threading
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
@@ -39,6 +43,7 @@ class LifecyclePolicy:
     archive_after: timedelta = timedelta(days=30)       # 归档时间阈值
     compress_after: timedelta = timedelta(days=90)      # 压缩时间阈值
     forget_after: timedelta = timedelta(days=365)       # 遗忘时间阈值
+    retry_after: timedelta = timedelta(minutes=5)       # 转换失败后的重试间隔
     
     # 访问频率阈值
     min_access_for_active: int = 3                      # 保持活跃的最小访问次数
@@ -69,7 +74,13 @@ class LifecycleMetadata:
 
 
 class MemoryLifecycleManager:
-    """记忆生命周期管理器"""
+    """
+    记忆生命周期管理器
+    
+    每个记忆按当前阶段计算下一次可能发生转换的时间，放入以截止时间为键的最小堆。
+    process_lifecycle 只处理截止时间已到的记忆，访问更新时重新入堆（O(log n)），
+    旧的堆条目通过版本号惰性作废。
+    """
     
     def __init__(self, 
                  memory_manager: MemoryManager,
@@ -85,6 +96,16 @@ class MemoryLifecycleManager:
         self.policy = policy or LifecyclePolicy()
         self.lifecycle_metadata: Dict[str, LifecycleMetadata] = {}
         
+        # 转换调度堆：(截止时间, 序号, 记忆ID, 版本)
+        self._schedule: List[Tuple[datetime, int, str, int]] = []
+        self._schedule_versions: Dict[str, int] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.RLock()
+        
+        # 后台处理
+        self._worker: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        
         # 创建归档子目录
         self.archive_dirs = {
             MemoryLayer.WORKING: self.policy.archive_path / "working",
@@ -114,7 +135,9 @@ class MemoryLifecycleManager:
             stage_transitions=[(LifecycleStage.CREATED, now)]
         )
         
-        self.lifecycle_metadata[memory_id] = metadata
+        with self._lock:
+            self.lifecycle_metadata[memory_id] = metadata
+            self._schedule_memory(memory_id)
         logger.info(f"Started tracking memory {memory_id} in {layer.value} layer")
         
         return metadata
@@ -129,71 +152,242 @@ class MemoryLifecycleManager:
         Returns:
             是否更新成功
         """
-        if memory_id not in self.lifecycle_metadata:
-            return False
-        
-        metadata = self.lifecycle_metadata[memory_id]
-        metadata.last_accessed = datetime.now()
-        metadata.access_count += 1
-        
-        # 如果访问频繁，可能需要提升到活跃状态
-        if (metadata.stage == LifecycleStage.CREATED and 
-            metadata.access_count >= self.policy.min_access_for_active):
-            self._transition_stage(memory_id, LifecycleStage.ACTIVE)
-        
-        return True
+        with self._lock:
+            if memory_id not in self.lifecycle_metadata:
+                return False
+            
+            metadata = self.lifecycle_metadata[memory_id]
+            metadata.last_accessed = datetime.now()
+            metadata.access_count += 1
+            
+            # 如果访问频繁，可能需要提升到活跃状态
+            if (metadata.stage == LifecycleStage.CREATED and 
+                metadata.access_count >= self.policy.min_access_for_active):
+                self._transition_stage(memory_id, LifecycleStage.ACTIVE)
+            else:
+                # 空闲时间从本次访问重新计算
+                self._schedule_memory(memory_id)
+            
+            return True
     
-    def process_lifecycle(self) -> Dict[str, List[str]]:
+    def process_lifecycle(self, budget: Optional[int] = None, full_scan: bool = False) -> Dict[str, List[str]]:
         """
-        处理所有记忆的生命周期转换
+        处理截止时间已到的记忆的生命周期转换
         
+        Args:
+            budget: 本次最多处理的记忆数，None表示处理所有到期的记忆；
+                    剩余的到期记忆留在堆中，下次调用时继续处理
+            full_scan: 先按当前元数据重新计算所有记忆的截止时间
+                       （在外部直接修改了 lifecycle_metadata 之后使用）
+            
         Returns:
             各阶段转换的记忆ID列表
         """
+        with self._lock:
+            if full_scan:
+                self.rebuild_schedule()
+            transitions, _ = self._process_due(datetime.now(), budget)
+        
+        # 记录转换统计
+        total_transitions = sum(len(v) for v in transitions.values())
+        if total_transitions > 0:
+            logger.info(f"Lifecycle transitions: {transitions}")
+        
+        return transitions
+    
+    def _process_due(self, now: datetime, budget: Optional[int]) -> Tuple[Dict[str, List[str]], int]:
+        """弹出并处理到期的记忆，返回 (转换列表, 处理的记忆数)"""
         transitions = {
             "to_active": [],
             "to_archived": [],
             "to_compressed": [],
             "to_forgotten": []
         }
+        processed = 0
         
-        now = datetime.now()
-        
-        for memory_id, metadata in list(self.lifecycle_metadata.items()):
-            age = now - metadata.created_at
-            idle_time = now - metadata.last_accessed
-            
-            # 根据策略进行阶段转换
-            if metadata.stage == LifecycleStage.CREATED:
-                if metadata.access_count >= self.policy.min_access_for_active:
-                    self._transition_stage(memory_id, LifecycleStage.ACTIVE)
-                    transitions["to_active"].append(memory_id)
-                elif age > self.policy.active_duration:
-                    # 如果创建后很少访问，直接归档
-                    self._archive_memory(memory_id)
-                    transitions["to_archived"].append(memory_id)
-            
-            elif metadata.stage == LifecycleStage.ACTIVE:
-                if idle_time > self.policy.archive_after:
-                    self._archive_memory(memory_id)
-                    transitions["to_archived"].append(memory_id)
-            
-            elif metadata.stage == LifecycleStage.ARCHIVED:
-                if idle_time > self.policy.compress_after:
-                    self._compress_memory(memory_id)
-                    transitions["to_compressed"].append(memory_id)
+        while self._schedule and self._schedule[0][0] <= now:
+            if budget is not None and processed >= budget:
+                break
+            _, _, memory_id, version = heapq.heappop(self._schedule)
+            if self._schedule_versions.get(memory_id) != version:
+                continue  # 已作废的条目
+            del self._schedule_versions[memory_id]
+            processed += 1
             
-            elif metadata.stage == LifecycleStage.COMPRESSED:
-                if idle_time > self.policy.forget_after:
-                    self._forget_memory(memory_id)
-                    transitions["to_forgotten"].append(memory_id)
+            transition = self._apply_transition(memory_id, now)
+            if transition:
+                transitions[transition].append(memory_id)
+            if memory_id in self.lifecycle_metadata and memory_id not in self._schedule_versions:
+                # 转换没有发生：截止时间恰好等于 now 时稍后再试，
+                # 已过期却转换失败（记忆不在任何层、归档文件丢失）时按重试间隔退避，
+                # 保证重新入堆的截止时间晚于 now，不会在本轮被再次弹出
+                deadline = self._next_deadline(self.lifecycle_metadata[memory_id])
+                if deadline is not None and deadline < now:
+                    self._schedule_memory(memory_id, not_before=now + self.policy.retry_after)
+                else:
+                    self._schedule_memory(memory_id, not_before=now + timedelta(microseconds=1))
+        
+        return transitions, processed
+    
+    def _apply_transition(self, memory_id: str, now: datetime) -> Optional[str]:
+        """按策略检查单个记忆并执行阶段转换，返回转换名称"""
+        metadata = self.lifecycle_metadata.get(memory_id)
+        if metadata is None:
+            return None
+        
+        age = now - metadata.created_at
+        idle_time = now - metadata.last_accessed
+        
+        # 根据策略进行阶段转换
+        if metadata.stage == LifecycleStage.CREATED:
+            if metadata.access_count >= self.policy.min_access_for_active:
+                self._transition_stage(memory_id, LifecycleStage.ACTIVE)
+                return "to_active"
+            elif age > self.policy.active_duration:
+                # 如果创建后很少访问，直接归档
+                if self._archive_memory(memory_id):
+                    return "to_archived"
+        
+        elif metadata.stage == LifecycleStage.ACTIVE:
+            if idle_time > self.policy.archive_after:
+                if self._archive_memory(memory_id):
+                    return "to_archived"
+        
+        elif metadata.stage == LifecycleStage.ARCHIVED:
+            if idle_time > self.policy.compress_after:
+                if self._compress_memory(memory_id):
+                    return "to_compressed"
+        
+        elif metadata.stage == LifecycleStage.COMPRESSED:
+            if idle_time > self.policy.forget_after:
+                if self._forget_memory(memory_id):
+                    return "to_forgotten"
+        
+        return None
+    
+    def _next_deadline(self, metadata: LifecycleMetadata) -> Optional[datetime]:
+        """计算记忆在当前阶段下一次可能转换的时间"""
+        if metadata.stage == LifecycleStage.CREATED:
+            if metadata.access_count >= self.policy.min_access_for_active:
+                return metadata.last_accessed
+            return metadata.created_at + self.policy.active_duration
+        elif metadata.stage == LifecycleStage.ACTIVE:
+            return metadata.last_accessed + self.policy.archive_after
+        elif metadata.stage == LifecycleStage.ARCHIVED:
+            return metadata.last_accessed + self.policy.compress_after
+        elif metadata.stage == LifecycleStage.COMPRESSED:
+            return metadata.last_accessed + self.policy.forget_after
+        return None
+    
+    def _schedule_memory(self, memory_id: str, not_before: Optional[datetime] = None) -> None:
+        """按当前元数据（重新）调度记忆，旧条目随版本号变化而作废；not_before 为最早截止时间"""
+        metadata = self.lifecycle_metadata.get(memory_id)
+        deadline = self._next_deadline(metadata) if metadata else None
+        if deadline is None:
+            self._schedule_versions.pop(memory_id, None)
+            return
+        if not_before is not None and deadline < not_before:
+            deadline = not_before
+        
+        version = next(self._sequence)
+        self._schedule_versions[memory_id] = version
+        heapq.heappush(self._schedule, (deadline, version, memory_id, version))
+        
+        # 作废条目过多时压缩堆
+        if len(self._schedule) > 2 * len(self._schedule_versions) + 1024:
+            self._schedule = [entry for entry in self._schedule
+                              if self._schedule_versions.get(entry[2]) == entry[3]]
+            heapq.heapify(self._schedule)
+    
+    def rebuild_schedule(self) -> None:
+        """按当前元数据重建整个调度堆"""
+        with self._lock:
+            self._schedule = []
+            self._schedule_versions = {}
+            for memory_id in self.lifecycle_metadata:
+                self._schedule_memory(memory_id)
+    
+    def next_deadline(self) -> Optional[datetime]:
+        """最近一次待处理转换的时间，没有待处理的记忆时返回None"""
+        with self._lock:
+            while self._schedule:
+                _, _, memory_id, version = self._schedule[0]
+                if self._schedule_versions.get(memory_id) == version:
+                    return self._schedule[0][0]
+                heapq.heappop(self._schedule)
+            return None
+    
+    def start_background_processing(self, interval: float = 1.0, budget: int = 1000) -> threading.Thread:
+        """
+        启动后台线程增量处理生命周期
+        
+        每次最多处理 budget 个到期记忆；还有剩余时立即继续，否则等待到
+        下一个截止时间（最长 interval 秒）。
+        注意后台线程会调用记忆层的 forget/get，记忆层本身不是线程安全的，
+        在单线程事件循环中运行时请使用 run_background_async。
+        
+        Args:
+            interval: 最长等待间隔（秒）
+            budget: 每轮最多处理的记忆数
+        """
+        if self._worker and self._worker.is_alive():
+            return self._worker
+        
+        self._stop_event.clear()
+        
+        def run():
+            while not self._stop_event.is_set():
+                try:
+                    delay = self._run_background_pass(interval, budget)
+                except Exception as e:
+                    logger.error(f"Background lifecycle pass failed: {e}")
+                    delay = interval
+                if delay > 0:
+                    self._stop_event.wait(delay)
+        
+        self._worker = threading.Thread(target=run, name="memory-lifecycle", daemon=True)
+        self._worker.start()
+        return self._worker
+    
+    def stop_background_processing(self, timeout: Optional[float] = None) -> None:
+        """停止后台线程"""
+        self._stop_event.set()
+        if self._worker:
+            self._worker.join(timeout)
+            self._worker = None
+    
+    async def run_background_async(self, interval: float = 1.0, budget: int = 1000) -> None:
+        """
+        在事件循环中增量处理生命周期，用 asyncio.create_task 启动、task.cancel() 停止
+        
+        Args:
+            interval: 最长等待间隔（秒）
+            budget: 每轮最多处理的记忆数
+        """
+        while True:
+            try:
+                delay = self._run_background_pass(interval, budget)
+            except Exception as e:
+                logger.error(f"Background lifecycle pass failed: {e}")
+                delay = interval
+            await asyncio.sleep(delay)
+    
+    def _run_background_pass(self, interval: float, budget: int) -> float:
+        """执行一轮有预算的处理，返回距离下一轮的等待时间（秒）"""
+        with self._lock:
+            now = datetime.now()
+            transitions, processed = self._process_due(now, budget)
         
-        # 记录转换统计
         total_transitions = sum(len(v) for v in transitions.values())
         if total_transitions > 0:
             logger.info(f"Lifecycle transitions: {transitions}")
+        if processed >= budget:
+            return 0
         
-        return transitions
+        deadline = self.next_deadline()
+        if deadline is None:
+            return interval
+        return min(interval, max(0.0, (deadline - datetime.now()).total_seconds()))
     
     def _transition_stage(self, memory_id: str, new_stage: LifecycleStage):
         """
@@ -210,6 +404,7 @@ class MemoryLifecycleManager:
         old_stage = metadata.stage
         metadata.stage = new_stage
         metadata.stage_transitions.append((new_stage, datetime.now()))
+        self._schedule_memory(memory_id)
         
         logger.info(f"Memory {memory_id} transitioned from {old_stage.value} to {new_stage.value}")
     
@@ -349,6 +544,7 @@ class MemoryLifecycleManager:
         
         # 删除生命周期元数据
         del self.lifecycle_metadata[memory_id]
+        self._schedule_versions.pop(memory_id, None)
         
         logger.info(f"Forgotten memory {memory_id}")
         return True
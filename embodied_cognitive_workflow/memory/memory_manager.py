@@ -11,6 +11,8 @@ from .interfaces import (
     IWorkingMemory, IEpisodicMemory, ISemanticMemory,
     MemoryItem, Episode, Concept, TriggerType, MemoryLayer
 )
+from .base_memory import InMemoryStorage
+from .embedding_index import EmbeddingIndex, HashingVectorizer
 from .working_memory import WorkingMemory
 from .episodic_memory import EpisodicMemory
 from .semantic_memory import SemanticMemory
@@ -31,7 +33,9 @@ class MemoryManager:
                  episodic_memory: Optional[IEpisodicMemory] = None,
                  semantic_memory: Optional[ISemanticMemory] = None,
                  auto_promote: bool = True,
-                 auto_decay: bool = True):
+                 auto_decay: bool = True,
+                 enable_vector_recall: bool = False,
+                 vectorizer: Optional[Any] = None):
         """
         初始化记忆管理器
         
@@ -41,10 +45,18 @@ class MemoryManager:
             semantic_memory: 语义记忆实例
             auto_promote: 是否自动提升记忆层级
             auto_decay: 是否自动执行衰减
+            enable_vector_recall: 默认创建的记忆层是否使用向量索引召回
+            vectorizer: 向量化器，默认 HashingVectorizer（各层共用）
         """
-        self.working = working_memory or WorkingMemory()
-        self.episodic = episodic_memory or EpisodicMemory()
-        self.semantic = semantic_memory or SemanticMemory()
+        if enable_vector_recall:
+            vectorizer = vectorizer or HashingVectorizer()
+            self.working = working_memory or WorkingMemory(embedding_index=EmbeddingIndex(vectorizer))
+            self.episodic = episodic_memory or EpisodicMemory(InMemoryStorage(embedding_index=EmbeddingIndex(vectorizer)))
+            self.semantic = semantic_memory or SemanticMemory(InMemoryStorage(embedding_index=EmbeddingIndex(vectorizer)))
+        else:
+            self.working = working_memory or WorkingMemory()
+            self.episodic = episodic_memory or EpisodicMemory()
+            self.semantic = semantic_memory or SemanticMemory()
         
         self.auto_promote = auto_promote
         self.auto_decay = auto_decay
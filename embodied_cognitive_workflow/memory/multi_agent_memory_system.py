@@ -13,6 +13,7 @@ import logging
 
 from neo4j import Driver
 from neo4j_config import Neo4jConfig
+from neo4j_batch_writer import Neo4jBatchWriter
 from semantic_memory_neo4j import Neo4jSemanticMemory
 from interfaces import Concept, MemoryItem
 
@@ -45,6 +46,28 @@ class AgentProfile:
     created_at: datetime = field(default_factory=datetime.now)
 
 
+# 批量存储记忆：创建概念、所有权关系，团队级别的记忆再创建团队访问关系
+STORE_MEMORIES_QUERY = """
+UNWIND $rows AS row
+CREATE (c:Concept {
+    id: row.id,
+    name: row.name,
+    category: row.category,
+    agent_id: row.agent_id,
+    access_level: row.access_level,
+    content: row.content,
+    metadata: row.metadata,
+    created_at: datetime()
+})
+WITH c, row
+OPTIONAL MATCH (a:Agent {id: row.agent_id})
+FOREACH (_ IN CASE WHEN a IS NULL THEN [] ELSE [1] END | CREATE (a)-[:OWNS]->(c))
+WITH c, row
+OPTIONAL MATCH (t:Team) WHERE t.id IN row.team_ids
+FOREACH (_ IN CASE WHEN t IS NULL THEN [] ELSE [1] END | CREATE (t)-[:CAN_ACCESS]->(c))
+"""
+
+
 class MultiAgentMemorySystem:
     """
     统一的多Agent记忆系统
@@ -57,14 +80,34 @@ class MultiAgentMemorySystem:
     5. 系统管理（监控、清理、备份）
     """
     
-    def __init__(self, neo4j_config: Neo4jConfig):
+    def __init__(self, neo4j_config: Neo4jConfig, driver: Optional[Driver] = None):
         self.config = neo4j_config
-        self.driver = None
+        self.driver = driver
         self.logger = logging.getLogger(__name__)
         self._agents_cache: Dict[str, AgentProfile] = {}
-        self._init_connection()
+        self._writer: Optional[Neo4jBatchWriter] = None
+        if self.driver is None:
+            self._init_connection()
+        if self.config.batch_writes:
+            self._writer = Neo4jBatchWriter(
+                self.driver,
+                database=self.config.database,
+                batch_size=self.config.write_batch_size,
+                flush_interval=self.config.write_flush_interval,
+                max_pending=self.config.max_pending_writes
+            )
         self._init_database_schema()
     
+    def _session(self):
+        """打开会话；先提交缓冲中的写入，保证能读到自己的写入"""
+        if self._writer is not None:
+            self._writer.flush()
+        return self.driver.session(database=self.config.database)
+    
+    def flush(self) -> int:
+        """提交缓冲中的写入，返回写入的行数"""
+        return self._writer.flush() if self._writer is not None else 0
+    
     def _init_connection(self):
         """初始化数据库连接"""
         from neo4j import GraphDatabase
@@ -81,7 +124,7 @@ class MultiAgentMemorySystem:
     
     def _init_database_schema(self):
         """初始化数据库模式"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             # 创建约束和索引
             queries = [
                 # Agent唯一性约束
@@ -125,7 +168,7 @@ class MultiAgentMemorySystem:
     
     def register_agent(self, profile: AgentProfile) -> bool:
         """注册新Agent"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(
                 """
                 CREATE (a:Agent {
@@ -167,7 +210,7 @@ class MultiAgentMemorySystem:
             return self._agents_cache[agent_id]
         
         # 从数据库加载
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(
                 """
                 MATCH (a:Agent {id: $agent_id})
@@ -213,60 +256,28 @@ class MultiAgentMemorySystem:
             'stored_at': datetime.now().isoformat()
         })
         
-        # 存储概念
-        with self.driver.session(database=self.config.database) as session:
-            result = session.run(
-                """
-                CREATE (c:Concept {
-                    id: $id,
-                    name: $name,
-                    category: $category,
-                    agent_id: $agent_id,
-                    access_level: $access_level,
-                    content: $content,
-                    metadata: $metadata,
-                    created_at: datetime()
-                })
-                RETURN c.id as concept_id
-                """,
-                id=concept.id,
-                name=concept.name,
-                category=concept.category,
-                agent_id=agent_id,
-                access_level=access_level.value,
-                content=concept.attributes,
-                metadata=concept.metadata
-            )
-            
+        row = {
+            'id': concept.id,
+            'name': concept.name,
+            'category': concept.category,
+            'agent_id': agent_id,
+            'access_level': access_level.value,
+            'content': concept.attributes,
+            'metadata': concept.metadata,
+            'team_ids': list(profile.team_ids) if access_level == AccessLevel.TEAM else []
+        }
+        
+        # 批量写入：进入缓冲，与其他记忆合并提交
+        if self._writer is not None:
+            self._writer.enqueue(STORE_MEMORIES_QUERY, row)
+            return concept.id
+        
+        # 概念、所有权关系和团队访问关系在一条语句中创建
+        with self._session() as session:
+            result = session.run(STORE_MEMORIES_QUERY + "RETURN count(DISTINCT c) as stored", rows=[row])
             record = result.single()
-            if record:
-                concept_id = record["concept_id"]
-                
-                # 创建所有权关系
-                session.run(
-                    """
-                    MATCH (a:Agent {id: $agent_id})
-                    MATCH (c:Concept {id: $concept_id})
-                    CREATE (a)-[:OWNS]->(c)
-                    """,
-                    agent_id=agent_id,
-                    concept_id=concept_id
-                )
-                
-                # 如果是团队或组织级别，创建访问关系
-                if access_level == AccessLevel.TEAM:
-                    for team_id in profile.team_ids:
-                        session.run(
-                            """
-                            MATCH (t:Team {id: $team_id})
-                            MATCH (c:Concept {id: $concept_id})
-                            CREATE (t)-[:CAN_ACCESS]->(c)
-                            """,
-                            team_id=team_id,
-                            concept_id=concept_id
-                        )
-                
-                return concept_id
+            if record and record["stored"]:
+                return concept.id
         
         return None
     
@@ -285,7 +296,7 @@ class MultiAgentMemorySystem:
         # 构建访问条件
         access_conditions = self._build_access_conditions(profile, include_shared)
         
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(
                 f"""
                 MATCH (c:Concept)
@@ -353,7 +364,7 @@ class MultiAgentMemorySystem:
         if not profile:
             return False
         
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             # 验证所有权
             ownership = session.run(
                 """
@@ -387,7 +398,7 @@ class MultiAgentMemorySystem:
     
     def get_system_statistics(self) -> Dict[str, Any]:
         """获取系统统计信息"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(
                 """
                 MATCH (a:Agent)
@@ -413,11 +424,14 @@ class MultiAgentMemorySystem:
                 """
             )
             
-            return result.single()["stats"]
+            stats = dict(result.single()["stats"])
+            if self._writer is not None:
+                stats['write_batching'] = self._writer.stats()
+            return stats
     
     def cleanup_old_memories(self, days: int = 90) -> int:
         """清理旧记忆"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(
                 """
                 MATCH (c:Concept)
@@ -434,6 +448,9 @@ class MultiAgentMemorySystem:
     
     def close(self):
         """关闭连接"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
         if self.driver:
             self.driver.close()
 
@@ -0,0 +1,285 @@
+"""
+Neo4j批量写入
+
+写后缓冲层：把逐条的概念/关系写入合并成 UNWIND 批量语句，减少与数据库的往返次数。
+- 相同语句的写入合并为一个批次，按阶段（先节点后关系）和语句首次出现的顺序提交
+- 达到批次大小或刷新间隔时由后台线程提交，也可以显式调用 flush()
+- 待写入数超过上限时，写入方同步等待刷新完成（背压）
+- 复用同一个会话，出错时重建
+- 批次失败时先整批重试，仍然失败则逐行写入，只有出错的行写入失败，同批其他行不受影响
+- 逐行写入仍然失败的行交给 on_error 回调；没有回调时由下一次显式 flush()/close() 抛出
+  Neo4jBatchWriteError（后台刷新不抛出，失败的行保留到下一次显式刷新）
+- stats() 提供刷新和背压指标
+
+不依赖 neo4j 包本身，任何提供 session(database=...) 的驱动（包括测试用的假驱动）都可以使用。
+
+用法:
+    writer = Neo4jBatchWriter(driver, database="neo4j", batch_size=500)
+    writer.enqueue("UNWIND $rows AS row CREATE (c:Concept {id: row.id})", {"id": "c1"})
+    writer.flush()
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 写入阶段：同一次刷新中节点先于关系提交，关系可以引用同批创建的节点
+PHASE_NODES = 0
+PHASE_RELATIONSHIPS = 1
+
+# 写入失败的行：(语句, 行参数, 最后一次的异常)
+FailedRow = Tuple[str, Dict[str, Any], Exception]
+
+
+class Neo4jBatchWriteError(Exception):
+    """重试和逐行写入后仍然失败的行"""
+
+    def __init__(self, failed_rows: List[FailedRow]):
+        self.failed_rows = failed_rows
+        super().__init__(f"{len(failed_rows)} rows failed to write, last error: {failed_rows[-1][2]}")
+
+
+class Neo4jBatchWriter:
+    """合并写入为 UNWIND 批次的写后缓冲"""
+
+    def __init__(self,
+                 driver: Any,
+                 database: Optional[str] = None,
+                 batch_size: int = 500,
+                 flush_interval: Optional[float] = 0.5,
+                 max_pending: int = 10000,
+                 max_retries: int = 1,
+                 on_error: Optional[Callable[[str, Dict[str, Any], Exception], None]] = None):
+        """
+        初始化批量写入器
+
+        Args:
+            driver: Neo4j驱动
+            database: 数据库名称
+            batch_size: 每个 UNWIND 批次的最大行数
+            flush_interval: 后台刷新间隔（秒），None表示不启动后台线程，只在
+                            达到批次大小或显式调用 flush() 时提交
+            max_pending: 待写入行数上限，超过时写入方同步等待刷新（背压）
+            max_retries: 批次失败后整批重试的次数，之后逐行写入以隔离出错的行
+            on_error: 逐行写入仍然失败时调用 on_error(语句, 行参数, 异常)；
+                      为 None 时失败的行由下一次显式 flush()/close() 以 Neo4jBatchWriteError 抛出
+        """
+        self.driver = driver
+        self.database = database
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self.max_retries = max(0, max_retries)
+        self.on_error = on_error
+
+        # (阶段, 语句) -> 待写入行，字典保持语句首次出现的顺序
+        self._pending: Dict[Tuple[int, str], List[Dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._session = None
+        self._closed = False
+        # 后台刷新中失败、尚未抛给调用方的行
+        self._failed: List[FailedRow] = []
+
+        self._stats = {
+            'enqueued_rows': 0,
+            'flushed_rows': 0,
+            'failed_rows': 0,
+            'retried_batches': 0,
+            'batches': 0,
+            'flushes': 0,
+            'backpressure_waits': 0,
+            'backpressure_seconds': 0.0,
+            'last_flush_seconds': 0.0,
+            'max_pending': 0,
+        }
+        self.last_error: Optional[Exception] = None
+
+        self._worker: Optional[threading.Thread] = None
+        if flush_interval is not None:
+            self._worker = threading.Thread(target=self._run, name="neo4j-batch-writer", daemon=True)
+            self._worker.start()
+
+    def enqueue(self, statement: str, row: Dict[str, Any], phase: int = PHASE_NODES) -> None:
+        """
+        加入一行待写入数据
+
+        Args:
+            statement: 以 UNWIND $rows AS row 开头的Cypher语句
+            row: 该语句的一行参数
+            phase: 写入阶段，同一次刷新中阶段小的先提交
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Neo4jBatchWriter is closed")
+            rows = self._pending.setdefault((phase, statement), [])
+            rows.append(row)
+            self._pending_count += 1
+            self._stats['enqueued_rows'] += 1
+            self._stats['max_pending'] = max(self._stats['max_pending'], self._pending_count)
+            batch_ready = len(rows) >= self.batch_size
+            over_limit = self._pending_count >= self.max_pending
+            if batch_ready and self._worker is not None:
+                self._wakeup.notify()
+
+        if over_limit:
+            # 背压：由写入方自己完成刷新
+            started = time.time()
+            self.flush()
+            with self._lock:
+                self._stats['backpressure_waits'] += 1
+                self._stats['backpressure_seconds'] += time.time() - started
+        elif batch_ready and self._worker is None:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        提交所有待写入数据
+
+        Returns:
+            成功写入的行数
+
+        Raises:
+            Neo4jBatchWriteError: 未设置 on_error 且有行写入失败（包括之前后台刷新中失败的行）
+        """
+        written, failed = self._flush()
+        self._report_failures(failed, raise_errors=True)
+        return written
+
+    def _flush(self) -> Tuple[int, List[FailedRow]]:
+        with self._flush_lock:
+            with self._lock:
+                pending = sorted(self._pending.items(), key=lambda entry: entry[0][0])
+                self._pending = {}
+                self._pending_count = 0
+            if not pending:
+                return 0, []
+
+            started = time.time()
+            written = 0
+            failed: List[FailedRow] = []
+            batches = 0
+            for (_, statement), rows in pending:
+                for offset in range(0, len(rows), self.batch_size):
+                    batch_written, batch_failed = self._write_batch(statement, rows[offset:offset + self.batch_size])
+                    written += batch_written
+                    failed.extend(batch_failed)
+                    batches += 1
+
+            with self._lock:
+                self._stats['flushed_rows'] += written
+                self._stats['failed_rows'] += len(failed)
+                self._stats['batches'] += batches
+                self._stats['flushes'] += 1
+                self._stats['last_flush_seconds'] = time.time() - started
+            logger.debug(f"Flushed {written} rows in {batches} batches")
+            return written, failed
+
+    def _write_batch(self, statement: str, batch: List[Dict[str, Any]]) -> Tuple[int, List[FailedRow]]:
+        """写入一个批次：失败时整批重试，仍然失败则逐行写入，返回 (写入行数, 失败的行)"""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._lock:
+                    self._stats['retried_batches'] += 1
+            try:
+                self._get_session().run(statement, rows=batch)
+                return len(batch), []
+            except Exception as e:
+                self.last_error = e
+                self._reset_session()
+                logger.warning(f"Batch write of {len(batch)} rows failed (attempt {attempt + 1}): {e}")
+        if len(batch) == 1:
+            logger.error(f"Row write failed: {self.last_error}")
+            return 0, [(statement, batch[0], self.last_error)]
+
+        # 逐行写入，出错的行不影响同批其他行
+        written = 0
+        failed: List[FailedRow] = []
+        for row in batch:
+            try:
+                self._get_session().run(statement, rows=[row])
+                written += 1
+            except Exception as e:
+                self.last_error = e
+                self._reset_session()
+                failed.append((statement, row, e))
+                logger.error(f"Row write failed: {e}")
+        return written, failed
+
+    def _report_failures(self, failed: List[FailedRow], raise_errors: bool) -> None:
+        """把失败的行交给 on_error；没有回调时保留，raise_errors 为 True 时抛出全部保留的行"""
+        if self.on_error is not None:
+            for statement, row, error in failed:
+                try:
+                    self.on_error(statement, row, error)
+                except Exception as e:
+                    logger.error(f"Write error callback failed: {e}")
+            return
+        with self._lock:
+            self._failed.extend(failed)
+            if not raise_errors or not self._failed:
+                return
+            failed, self._failed = self._failed, []
+        raise Neo4jBatchWriteError(failed)
+
+    @property
+    def pending(self) -> int:
+        """待写入行数"""
+        return self._pending_count
+
+    def stats(self) -> Dict[str, Any]:
+        """刷新和背压指标"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending_rows'] = self._pending_count
+        return stats
+
+    def close(self) -> None:
+        """提交剩余数据，停止后台线程并关闭会话"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+        try:
+            self.flush()
+        finally:
+            self._reset_session()
+
+    def _run(self) -> None:
+        """后台刷新：达到批次大小时立即提交，否则按间隔提交"""
+        while True:
+            with self._lock:
+                if not self._closed and not self._has_full_batch():
+                    self._wakeup.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                _, failed = self._flush()
+                self._report_failures(failed, raise_errors=False)
+            except Exception as e:
+                logger.error(f"Background flush failed: {e}")
+
+    def _has_full_batch(self) -> bool:
+        return any(len(rows) >= self.batch_size for rows in self._pending.values())
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = self.driver.session(database=self.database)
+        return self._session
+
+    def _reset_session(self) -> None:
+        if self._session is not None:
+            try:
+                self._session.close()
+            except Exception as e:
+                logger.debug(f"Error closing session: {e}")
+            self._session = None
@@ -25,6 +25,17 @@ class Neo4jConfig:
     # 查询超时配置
     query_timeout: int = 30  # 秒
     
+    # 批量写入配置（写入先进入缓冲，合并为 UNWIND 批次提交；
+    # 重试后仍然写入失败的行在下一次 flush()、读取或 close() 时以 Neo4jBatchWriteError 抛出）
+    batch_writes: bool = False
+    write_batch_size: int = 500
+    write_flush_interval: float = 0.5  # 秒
+    max_pending_writes: int = 10000
+    
+    # 子图缓存配置（知识图谱、相关概念、相似度查询的读缓存）
+    subgraph_cache_size: int = 1024  # 0表示不缓存
+    subgraph_cache_ttl: Optional[float] = 30.0  # 秒，数据库可能被其他进程修改
+    
     # 索引配置
     create_indexes: bool = True
     
@@ -40,6 +51,12 @@ class Neo4jConfig:
             max_connection_pool_size=int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", cls.max_connection_pool_size)),
             connection_acquisition_timeout=int(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", cls.connection_acquisition_timeout)),
             query_timeout=int(os.getenv("NEO4J_QUERY_TIMEOUT", cls.query_timeout)),
+            batch_writes=os.getenv("NEO4J_BATCH_WRITES", "false").lower() == "true",
+            write_batch_size=int(os.getenv("NEO4J_WRITE_BATCH_SIZE", cls.write_batch_size)),
+            write_flush_interval=float(os.getenv("NEO4J_WRITE_FLUSH_INTERVAL", cls.write_flush_interval)),
+            max_pending_writes=int(os.getenv("NEO4J_MAX_PENDING_WRITES", cls.max_pending_writes)),
+            subgraph_cache_size=int(os.getenv("NEO4J_SUBGRAPH_CACHE_SIZE", cls.subgraph_cache_size)),
+            subgraph_cache_ttl=float(os.getenv("NEO4J_SUBGRAPH_CACHE_TTL", cls.subgraph_cache_ttl)),
             create_indexes=os.getenv("NEO4J_CREATE_INDEXES", "true").lower() == "true"
         )
 
@@ -101,6 +118,28 @@ class CypherQueries:
     RETURN r
     """
     
+    # 批量创建概念节点
+    CREATE_CONCEPTS_BATCH = """
+    UNWIND $rows AS row
+    CREATE (c:Concept {
+        id: row.id,
+        name: row.name,
+        category: row.category,
+        confidence: row.confidence,
+        domain: row.domain,
+        attributes: row.attributes,
+        created_at: datetime(),
+        updated_at: datetime()
+    })
+    """
+    
+    # 批量创建关系（关系类型不能参数化，每种类型一条语句）
+    CREATE_RELATIONSHIPS_BATCH = """
+    UNWIND $rows AS row
+    MATCH (c1:Concept {id: row.source}), (c2:Concept {id: row.target})
+    CREATE (c1)-[:%s]->(c2)
+    """
+    
     # 查找概念按类别
     FIND_BY_CATEGORY = """
     MATCH (c:Concept {category: $category})
@@ -10,18 +10,20 @@ import json
 
 from .interfaces import ISemanticMemory, Concept, MemoryItem
 from .base_memory import BaseMemory, InMemoryStorage
+from .subgraph_cache import SubgraphCache
 from .utils import calculate_similarity, generate_memory_id
 
 
 class SemanticMemory(BaseMemory, ISemanticMemory):
     """语义记忆实现"""
     
-    def __init__(self, storage: Optional[InMemoryStorage] = None):
+    def __init__(self, storage: Optional[InMemoryStorage] = None, graph_cache_size: int = 1024):
         """
         初始化语义记忆
         
         Args:
             storage: 存储策略，默认使用内存存储
+            graph_cache_size: 知识图谱子图缓存的最大项数，0表示不缓存
         """
         super().__init__(storage or InMemoryStorage())
         
@@ -36,6 +38,9 @@ class SemanticMemory(BaseMemory, ISemanticMemory):
         
         # 概念对象缓存
         self._concept_cache: Dict[str, Concept] = {}
+        
+        # 子图缓存：(根概念, 深度) -> 知识图谱，概念变化时按版本号失效
+        self._graph_cache = SubgraphCache(max_entries=graph_cache_size)
     
     def add_concept(self, concept: Concept) -> str:
         """添加概念知识"""
@@ -52,9 +57,20 @@ class SemanticMemory(BaseMemory, ISemanticMemory):
         
         # 更新索引
         self._update_indices(concept)
+        self._graph_cache.invalidate([concept.id])
         
         return concept.id
     
+    def forget(self, key: str) -> bool:
+        """删除概念"""
+        self._graph_cache.invalidate([key])
+        return super().forget(key)
+    
+    def clear(self) -> int:
+        """清空所有概念"""
+        self._graph_cache.clear()
+        return super().clear()
+    
     def find_patterns(self, domain: str, min_confidence: float = 0.5) -> List[Concept]:
         """查找领域模式"""
         # 获取领域内的所有概念
@@ -73,17 +89,29 @@ class SemanticMemory(BaseMemory, ISemanticMemory):
     
     def get_knowledge_graph(self, root_concept: str, depth: int = 2) -> Dict[str, Any]:
         """获取知识图谱"""
-        visited = set()
-        graph = {
-            'nodes': [],
-            'edges': [],
-            'root': root_concept
-        }
-        
-        # 深度优先遍历构建图谱
-        self._build_knowledge_graph(root_concept, depth, visited, graph)
+        cache_key = ('graph', root_concept, depth)
+        graph = self._graph_cache.get(cache_key)
+        
+        if graph is None:
+            visited = set()
+            graph = {
+                'nodes': [],
+                'edges': [],
+                'root': root_concept
+            }
+            
+            # 深度优先遍历构建图谱
+            self._build_knowledge_graph(root_concept, depth, visited, graph)
+            
+            # 依赖访问过的概念和所有边的目标（目标概念之后被添加也会改变图谱）
+            depends_on = visited | {edge['target'] for edge in graph['edges']}
+            self._graph_cache.put(cache_key, graph, depends_on)
         
-        return graph
+        return {'nodes': list(graph['nodes']), 'edges': list(graph['edges']), 'root': graph['root']}
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """子图缓存命中统计"""
+        return self._graph_cache.stats()
     
     def update_concept_confidence(self, concept_id: str, confidence_delta: float) -> bool:
         """更新概念置信度"""
@@ -293,6 +321,7 @@ class SemanticMemory(BaseMemory, ISemanticMemory):
         """更新概念的存储"""
         memory_item = concept.to_memory_item()
         self.storage.put(concept.id, memory_item)
+        self._graph_cache.invalidate([concept.id])
     
     def _build_knowledge_graph(self, concept_id: str, depth: int, 
                              visited: Set[str], graph: Dict[str, Any]) -> None:
@@ -398,8 +427,8 @@ class SemanticMemory(BaseMemory, ISemanticMemory):
             if attrs1[key] == attrs2[key]:
                 value_similarity += 1.0
             else:
-                # 简单的字符串相似度
-                str_sim = calculate_similarity(str(attrs1[key]), str(attrs2[key]))
+                # 字符串相似度（配置了向量索引时使用向量余弦相似度）
+                str_sim = self._text_similarity(str(attrs1[key]), str(attrs2[key]))
                 value_similarity += str_sim
         
         # 综合考虑键的重叠和值的相似度
@@ -408,6 +437,12 @@ class SemanticMemory(BaseMemory, ISemanticMemory):
         
         return (key_overlap + value_score) / 2
     
+    def _text_similarity(self, text1: str, text2: str) -> float:
+        """计算文本相似度"""
+        if self.storage.embedding_index is not None:
+            return self.storage.embedding_index.similarity(text1, text2)
+        return calculate_similarity(text1, text2)
+    
     def _calculate_relationship_similarity(self, rels1: Dict[str, List[str]], 
                                          rels2: Dict[str, List[str]]) -> float:
         """计算关系相似度"""
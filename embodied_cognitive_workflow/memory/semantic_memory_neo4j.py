@@ -14,6 +14,8 @@ import logging
 from .interfaces import ISemanticMemory, Concept, MemoryItem
 from .semantic_memory import SemanticMemory
 from .neo4j_config import Neo4jConfig, CypherQueries, IndexQueries, default_config
+from .neo4j_batch_writer import Neo4jBatchWriter, PHASE_NODES, PHASE_RELATIONSHIPS
+from .subgraph_cache import SubgraphCache
 from .utils import generate_memory_id, calculate_similarity
 
 
@@ -23,16 +25,35 @@ logger = logging.getLogger(__name__)
 class Neo4jSemanticMemory(ISemanticMemory):
     """Neo4j实现的语义记忆"""
     
-    def __init__(self, config: Optional[Neo4jConfig] = None):
+    def __init__(self, config: Optional[Neo4jConfig] = None, driver: Any = None):
         """
         初始化Neo4j语义记忆
         
         Args:
             config: Neo4j配置，默认使用default_config
+            driver: 已有的驱动（如测试用的假驱动），默认按配置建立连接
         """
         self.config = config or default_config
-        self.driver = None
-        self._connect()
+        self.driver = driver
+        self._writer: Optional[Neo4jBatchWriter] = None
+        
+        # 子图缓存：写操作递增涉及节点的版本号使相关缓存失效
+        self._graph_cache = SubgraphCache(
+            max_entries=self.config.subgraph_cache_size,
+            ttl=self.config.subgraph_cache_ttl
+        )
+        if self.driver is None:
+            self._connect()
+        
+        # 批量写入：概念和关系写入先进入缓冲，合并为 UNWIND 批次提交
+        if self.config.batch_writes:
+            self._writer = Neo4jBatchWriter(
+                self.driver,
+                database=self.config.database,
+                batch_size=self.config.write_batch_size,
+                flush_interval=self.config.write_flush_interval,
+                max_pending=self.config.max_pending_writes
+            )
         
         # 创建索引
         if self.config.create_indexes:
@@ -57,7 +78,7 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def _create_indexes(self):
         """创建必要的索引"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             try:
                 # 创建约束和索引
                 session.run(IndexQueries.CREATE_CONCEPT_ID_CONSTRAINT)
@@ -69,10 +90,33 @@ class Neo4jSemanticMemory(ISemanticMemory):
             except Neo4jError as e:
                 logger.warning(f"Error creating indexes (may already exist): {e}")
     
+    def _session(self):
+        """打开会话；读写前先提交缓冲中的写入，保证能读到自己的写入"""
+        if self._writer is not None:
+            self._writer.flush()
+        return self.driver.session(database=self.config.database)
+    
+    def flush(self) -> int:
+        """提交缓冲中的写入，返回写入的行数"""
+        return self._writer.flush() if self._writer is not None else 0
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """子图缓存命中统计"""
+        return self._graph_cache.stats()
+    
+    def get_write_stats(self) -> Dict[str, Any]:
+        """批量写入的刷新和背压指标"""
+        return self._writer.stats() if self._writer is not None else {}
+    
     def close(self):
         """关闭数据库连接"""
-        if self.driver:
+        writer = getattr(self, '_writer', None)
+        if writer is not None:
+            writer.close()
+            self._writer = None
+        if getattr(self, 'driver', None):
             self.driver.close()
+            self.driver = None
             logger.info("Neo4j connection closed")
     
     def __del__(self):
@@ -96,7 +140,7 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def recall(self, query: str, limit: int = 10, **kwargs) -> List[MemoryItem]:
         """检索记忆"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             try:
                 # 使用全文搜索
                 # 直接使用查询字符串，避免参数名冲突
@@ -117,7 +161,7 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def _recall_by_property(self, query: str, limit: int) -> List[MemoryItem]:
         """基于属性的备用搜索"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             # 搜索名称包含查询词的概念
             result = session.run("""
                 MATCH (c:Concept)
@@ -137,7 +181,8 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def forget(self, key: str) -> bool:
         """删除记忆"""
-        with self.driver.session(database=self.config.database) as session:
+        self._graph_cache.invalidate([key])
+        with self._session() as session:
             result = session.run(CypherQueries.DELETE_CONCEPT, id=key)
             deleted_count = result.single()['deleted_count']
             return deleted_count > 0
@@ -162,7 +207,7 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def exists(self, key: str) -> bool:
         """检查记忆是否存在"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(
                 "MATCH (c:Concept {id: $id}) RETURN count(c) as count",
                 id=key
@@ -176,7 +221,7 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def list_all(self, limit: int = 100, offset: int = 0) -> List[MemoryItem]:
         """列出所有记忆项"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run("""
                 MATCH (c:Concept)
                 RETURN c
@@ -194,7 +239,8 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def clear(self) -> int:
         """清空所有记忆"""
-        with self.driver.session(database=self.config.database) as session:
+        self._graph_cache.clear()
+        with self._session() as session:
             # 先获取总数
             count_result = session.run("MATCH (c:Concept) RETURN count(c) as total")
             total = count_result.single()['total']
@@ -205,7 +251,7 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def size(self) -> int:
         """获取记忆项数量"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run("MATCH (c:Concept) RETURN count(c) as count")
             return result.single()['count']
     
@@ -215,8 +261,15 @@ class Neo4jSemanticMemory(ISemanticMemory):
         """添加概念知识"""
         if not concept.id:
             concept.id = generate_memory_id("concept")
+        self._invalidate_concept(concept)
         
-        with self.driver.session(database=self.config.database) as session:
+        if self._writer is not None:
+            self._enqueue_node(concept, self._writer)
+            self._enqueue_relationships(concept, self._writer)
+            logger.debug(f"Queued concept: {concept.id}")
+            return concept.id
+        
+        with self._session() as session:
             # 创建节点
             result = session.run(
                 CypherQueries.CREATE_CONCEPT,
@@ -235,9 +288,56 @@ class Neo4jSemanticMemory(ISemanticMemory):
             logger.info(f"Created concept: {concept.id}")
             return concept.id
     
+    def add_concepts(self, concepts: List[Concept]) -> List[str]:
+        """
+        批量添加概念（用于为新智能体加载知识）
+        
+        所有节点先于关系进入缓冲，关系可以引用同一批中的任意概念。
+        """
+        for concept in concepts:
+            if not concept.id:
+                concept.id = generate_memory_id("concept")
+            self._invalidate_concept(concept)
+        
+        writer = self._writer or Neo4jBatchWriter(
+            self.driver,
+            database=self.config.database,
+            batch_size=self.config.write_batch_size,
+            flush_interval=None
+        )
+        for concept in concepts:
+            self._enqueue_node(concept, writer)
+        for concept in concepts:
+            self._enqueue_relationships(concept, writer)
+        
+        if writer is not self._writer:
+            # 写入失败的行由 close() 以 Neo4jBatchWriteError 抛出
+            writer.close()
+        
+        logger.info(f"Created {len(concepts)} concepts")
+        return [concept.id for concept in concepts]
+    
+    def _enqueue_node(self, concept: Concept, writer: Neo4jBatchWriter):
+        """把概念节点加入批量写入缓冲"""
+        writer.enqueue(CypherQueries.CREATE_CONCEPTS_BATCH, {
+            'id': concept.id,
+            'name': concept.name,
+            'category': concept.category,
+            'confidence': concept.confidence,
+            'domain': concept.domain or "",
+            'attributes': json.dumps(concept.attributes)
+        }, phase=PHASE_NODES)
+    
+    def _enqueue_relationships(self, concept: Concept, writer: Neo4jBatchWriter):
+        """把概念的关系加入批量写入缓冲"""
+        for rel_type, rows in self._relationship_rows(concept.id, concept.relationships).items():
+            statement = CypherQueries.CREATE_RELATIONSHIPS_BATCH % rel_type
+            for row in rows:
+                writer.enqueue(statement, row, phase=PHASE_RELATIONSHIPS)
+    
     def find_patterns(self, domain: str, min_confidence: float = 0.5) -> List[Concept]:
         """查找领域模式"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(
                 CypherQueries.FIND_BY_DOMAIN,
                 domain=domain,
@@ -253,7 +353,17 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def get_knowledge_graph(self, root_concept: str, depth: int = 2) -> Dict[str, Any]:
         """获取知识图谱"""
-        with self.driver.session(database=self.config.database) as session:
+        cache_key = ('graph', root_concept, depth)
+        graph = self._graph_cache.get(cache_key)
+        if graph is None:
+            graph = self._query_knowledge_graph(root_concept, depth)
+            depends_on = {root_concept} | {node['id'] for node in graph['nodes']}
+            self._graph_cache.put(cache_key, graph, depends_on)
+        return {'nodes': list(graph['nodes']), 'edges': list(graph['edges']), 'root': graph['root']}
+    
+    def _query_knowledge_graph(self, root_concept: str, depth: int) -> Dict[str, Any]:
+        """从数据库遍历知识图谱"""
+        with self._session() as session:
             query = CypherQueries.GET_KNOWLEDGE_GRAPH % depth
             result = session.run(query, root_id=root_concept)
             
@@ -295,7 +405,8 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def update_concept_confidence(self, concept_id: str, confidence_delta: float) -> bool:
         """更新概念置信度"""
-        with self.driver.session(database=self.config.database) as session:
+        self._graph_cache.invalidate([concept_id])
+        with self._session() as session:
             result = session.run("""
                 MATCH (c:Concept {id: $id})
                 SET c.confidence = CASE
@@ -330,8 +441,9 @@ class Neo4jSemanticMemory(ISemanticMemory):
         
         # 添加合并后的概念
         merged_id = self.add_concept(merged_concept)
+        self._graph_cache.invalidate([concept_id1, concept_id2])
         
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             # 转移所有关系到新概念
             for old_id in [concept_id1, concept_id2]:
                 # 获取所有关系
@@ -366,7 +478,7 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def get_concepts_by_category(self, category: str) -> List[Concept]:
         """按类别获取概念"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(CypherQueries.FIND_BY_CATEGORY, category=category)
             
             concepts = []
@@ -380,7 +492,17 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def find_related_concepts(self, concept_id: str, relationship_type: Optional[str] = None) -> List[Tuple[str, Concept]]:
         """查找相关概念"""
-        with self.driver.session(database=self.config.database) as session:
+        cache_key = ('related', concept_id, relationship_type)
+        related = self._graph_cache.get(cache_key)
+        if related is None:
+            related = self._query_related_concepts(concept_id, relationship_type)
+            depends_on = {concept_id} | {concept.id for _, concept in related}
+            self._graph_cache.put(cache_key, related, depends_on)
+        return list(related)
+    
+    def _query_related_concepts(self, concept_id: str, relationship_type: Optional[str]) -> List[Tuple[str, Concept]]:
+        """从数据库查询相关概念"""
+        with self._session() as session:
             if relationship_type:
                 query = CypherQueries.FIND_RELATED % relationship_type
                 result = session.run(query, concept_id=concept_id)
@@ -400,7 +522,17 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def calculate_concept_similarity(self, concept_id1: str, concept_id2: str) -> float:
         """计算两个概念的相似度（基于图结构）"""
-        with self.driver.session(database=self.config.database) as session:
+        # 相似度对称，两个方向共用一个缓存项；边的增删会使两端节点的版本号变化
+        cache_key = ('similarity',) + tuple(sorted((concept_id1, concept_id2)))
+        similarity = self._graph_cache.get(cache_key)
+        if similarity is None:
+            similarity = self._query_concept_similarity(concept_id1, concept_id2)
+            self._graph_cache.put(cache_key, similarity, (concept_id1, concept_id2))
+        return similarity
+    
+    def _query_concept_similarity(self, concept_id1: str, concept_id2: str) -> float:
+        """从数据库计算相似度"""
+        with self._session() as session:
             # 使用Jaccard相似度（基于共同邻居）
             result = session.run(
                 CypherQueries.CALCULATE_SIMILARITY,
@@ -427,7 +559,8 @@ class Neo4jSemanticMemory(ISemanticMemory):
     def create_relationship(self, concept_id1: str, concept_id2: str, 
                           relationship_type: str, properties: Dict[str, Any] = None) -> bool:
         """创建概念间的关系"""
-        with self.driver.session(database=self.config.database) as session:
+        self._graph_cache.invalidate([concept_id1, concept_id2])
+        with self._session() as session:
             try:
                 # 如果有自定义属性，需要特殊处理
                 if properties:
@@ -459,7 +592,7 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def get_statistics(self) -> Dict[str, Any]:
         """获取统计信息"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(CypherQueries.GET_STATISTICS)
             record = result.single()
             
@@ -491,7 +624,7 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def _get_concept(self, concept_id: str) -> Optional[Concept]:
         """获取概念对象"""
-        with self.driver.session(database=self.config.database) as session:
+        with self._session() as session:
             result = session.run(CypherQueries.GET_CONCEPT, id=concept_id)
             record = result.single()
             
@@ -522,7 +655,8 @@ class Neo4jSemanticMemory(ISemanticMemory):
     
     def _update_concept(self, concept: Concept) -> bool:
         """更新概念"""
-        with self.driver.session(database=self.config.database) as session:
+        self._graph_cache.invalidate([concept.id])
+        with self._session() as session:
             result = session.run(
                 CypherQueries.UPDATE_CONCEPT,
                 id=concept.id,
@@ -536,17 +670,25 @@ class Neo4jSemanticMemory(ISemanticMemory):
             return result.single() is not None
     
     def _create_relationships(self, session: Any, concept_id: str, relationships: Dict[str, List[str]]):
-        """创建概念的所有关系"""
-        for rel_type, target_ids in relationships.items():
-            for target_id in target_ids:
-                try:
-                    query = f"""
-                    MATCH (c1:Concept {{id: $concept_id}}), (c2:Concept {{id: $target_id}})
-                    CREATE (c1)-[:{rel_type}]->(c2)
-                    """
-                    session.run(query, concept_id=concept_id, target_id=target_id)
-                except Neo4jError as e:
-                    logger.warning(f"Failed to create relationship {rel_type} to {target_id}: {e}")
+        """创建概念的所有关系（每种关系类型一条 UNWIND 语句）"""
+        for rel_type, rows in self._relationship_rows(concept_id, relationships).items():
+            try:
+                session.run(CypherQueries.CREATE_RELATIONSHIPS_BATCH % rel_type, rows=rows)
+            except Neo4jError as e:
+                logger.warning(f"Failed to create {len(rows)} {rel_type} relationships from {concept_id}: {e}")
+    
+    def _invalidate_concept(self, concept: Concept) -> None:
+        """概念及其关系两端的邻域都会改变"""
+        targets = [target_id for target_ids in concept.relationships.values() for target_id in target_ids]
+        self._graph_cache.invalidate([concept.id] + targets)
+    
+    @staticmethod
+    def _relationship_rows(concept_id: str, relationships: Dict[str, List[str]]) -> Dict[str, List[Dict[str, str]]]:
+        """按关系类型分组的 UNWIND 参数行"""
+        return {
+            rel_type: [{'source': concept_id, 'target': target_id} for target_id in target_ids]
+            for rel_type, target_ids in relationships.items() if target_ids
+        }
     
     def _get_concept_relationships(self, session: Any, concept_id: str) -> Dict[str, List[str]]:
         """获取概念的所有关系"""
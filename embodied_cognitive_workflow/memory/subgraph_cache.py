@@ -0,0 +1,107 @@
+"""
+子图缓存
+
+缓存知识图谱遍历的结果（邻域子图、相关概念、相似度），避免认知循环中反复遍历同一邻域。
+
+失效采用节点版本号：每个缓存项记录它依赖的节点（遍历中访问到的所有节点ID，
+包括不存在的目标节点）及当时的版本号；写操作只需递增被修改节点的版本号，
+读取时发现任一依赖节点的版本变化即视为失效。
+
+用法:
+    cache = SubgraphCache()
+    graph = cache.get(('graph', root, depth))
+    if graph is None:
+        graph = build(...)
+        cache.put(('graph', root, depth), graph, depends_on=node_ids)
+    cache.invalidate([changed_id])
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SubgraphCache:
+    """按节点版本号失效的LRU缓存"""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        """
+        初始化子图缓存
+
+        Args:
+            max_entries: 最大缓存项数，超过时淘汰最久未使用的项
+            ttl: 缓存项有效期（秒），None表示只按版本号失效；
+                 数据库可能被其他进程修改时应设置
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Dict[str, int], float]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0, 'invalidated_nodes': 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取有效的缓存值，不存在或已失效时返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            value, versions, created_at = entry
+            expired = self.ttl is not None and time.time() - created_at > self.ttl
+            if expired or any(self._versions.get(node, 0) != version for node, version in versions.items()):
+                del self._entries[key]
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, depends_on: Iterable[str]) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键，如 ('graph', root, depth)
+            value: 缓存值
+            depends_on: 值所依赖的节点ID
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            versions = {node: self._versions.get(node, 0) for node in depends_on}
+            self._entries[key] = (value, versions, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, node_ids: Iterable[str]) -> None:
+        """递增节点版本号，使依赖这些节点的缓存项失效"""
+        with self._lock:
+            for node in node_ids:
+                if node:
+                    self._versions[node] = self._versions.get(node, 0) + 1
+                    self._stats['invalidated_nodes'] += 1
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """命中率统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,76 @@
+"""
+基础存储检索测试
+"""
+
+import unittest
+
+from ..base_memory import InMemoryStorage
+from ..interfaces import MemoryItem
+
+
+class TestInMemoryStorageSearch(unittest.TestCase):
+    """InMemoryStorage 索引检索测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.storage = InMemoryStorage()
+
+    def put(self, key, content, importance=0.5):
+        self.storage.put(key, MemoryItem(id=key, content=content, importance=importance))
+
+    def test_only_matching_items_returned(self):
+        """测试只返回包含查询词的项"""
+        self.put("m1", "python database connection pool")
+        self.put("m2", "weather forecast for tomorrow")
+        self.put("m3", {"topic": "database", "detail": "index tuning"})
+
+        results = self.storage.search("database")
+        self.assertEqual({item.id for item in results}, {"m1", "m3"})
+        self.assertEqual(self.storage.search("nothing matches"), [])
+
+    def test_bm25_ranking_and_limit(self):
+        """测试BM25排序和top-k"""
+        self.put("rare", "quantum entanglement experiment notes")
+        self.put("common1", "experiment log entry")
+        self.put("common2", "experiment log entry again")
+        self.put("both", "quantum experiment")
+
+        results = self.storage.search("quantum experiment", limit=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].id, "both")
+        self.assertEqual(results[1].id, "rare")
+
+    def test_importance_boosts_score(self):
+        """测试重要性加权"""
+        self.put("low", "deploy service", importance=0.1)
+        self.put("high", "deploy service", importance=0.9)
+
+        self.assertEqual(self.storage.search("deploy")[0].id, "high")
+
+    def test_delete_and_eviction_clean_index(self):
+        """测试删除和容量淘汰时清理索引"""
+        storage = InMemoryStorage(max_size=2)
+        storage.put("a", MemoryItem(id="a", content="alpha unique"))
+        storage.put("b", MemoryItem(id="b", content="beta"))
+        storage.put("c", MemoryItem(id="c", content="gamma"))
+
+        self.assertEqual(storage.search("alpha"), [])
+        self.assertNotIn("unique", storage._index)
+
+        storage.delete("b")
+        self.assertEqual(storage.search("beta"), [])
+        self.assertEqual(storage._total_length, 1)
+
+    def test_reindex_after_content_update(self):
+        """测试内容修改后重建索引"""
+        self.put("m1", "old content")
+        item = self.storage.get("m1")
+        item.content = "brand new text"
+        self.storage.reindex("m1")
+
+        self.assertEqual(self.storage.search("old"), [])
+        self.assertEqual(self.storage.search("brand")[0].id, "m1")
+
+
+if __name__ == '__main__':
+    unittest.main()
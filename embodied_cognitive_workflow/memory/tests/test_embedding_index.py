@@ -0,0 +1,120 @@
+"""
+向量召回索引测试
+"""
+
+import os
+import tempfile
+import unittest
+
+from ..embedding_index import EmbeddingIndex, HashingVectorizer, NUMPY_AVAILABLE
+from ..base_memory import InMemoryStorage
+from ..episodic_memory import EpisodicMemory
+from ..memory_manager import MemoryManager
+
+
+class TestEmbeddingIndex(unittest.TestCase):
+    """向量索引测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.index = EmbeddingIndex(HashingVectorizer(dimension=128))
+        self.index.add("db", "database connection pool exhausted timeout")
+        self.index.add("net", "network latency spike on gateway")
+        self.index.add("ui", "button color changed in settings page")
+
+    def test_search_ranking(self):
+        """测试按相似度排序"""
+        results = self.index.search("connection pool timeout", limit=2)
+        self.assertEqual(results[0][0], "db")
+        self.assertGreater(results[0][1], 0.5)
+        self.assertEqual(self.index.search("", limit=3), [])
+
+    def test_remove_and_update(self):
+        """测试删除（末行移动）和更新"""
+        self.assertTrue(self.index.remove("db"))
+        self.assertFalse(self.index.remove("db"))
+        self.assertEqual(len(self.index), 2)
+        self.assertNotIn("db", [key for key, _ in self.index.search("connection pool", limit=3)])
+        self.assertEqual(self.index.search("gateway latency")[0][0], "net")
+
+        self.index.add("ui", "gateway timeout page")
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.search("settings button"), [])
+
+    def test_search_by_id_excludes_self(self):
+        """测试按已有项查询相似项"""
+        self.index.add("db2", "database pool timeout again")
+        results = self.index.search_by_id("db", limit=2)
+        self.assertEqual(results[0][0], "db2")
+        self.assertNotIn("db", [key for key, _ in results])
+
+    def test_chinese_partial_match(self):
+        """测试中文部分匹配"""
+        index = EmbeddingIndex()
+        index.add("zh1", "数据库连接池耗尽导致请求超时")
+        index.add("zh2", "前端按钮颜色调整")
+        self.assertEqual(index.search("连接池超时")[0][0], "zh1")
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "需要 NumPy")
+    def test_save_and_load_memory_mapped(self):
+        """测试持久化到内存映射文件"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "episodes")
+            self.index.save(path)
+            loaded = EmbeddingIndex.load(path, HashingVectorizer(dimension=128))
+
+            self.assertEqual(loaded.search("connection pool")[0][0], "db")
+            loaded.add("db2", "database pool timeout")
+            loaded.remove("net")
+            self.assertEqual(len(loaded), 3)
+            self.assertEqual(loaded.search_by_id("db")[0][0], "db2")
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "需要 NumPy")
+    def test_ivf_index(self):
+        """测试数据量超过阈值后构建IVF索引"""
+        index = EmbeddingIndex(HashingVectorizer(dimension=64), ann_threshold=200, nprobe=4)
+        for i in range(300):
+            index.add(f"doc{i}", f"topic{i % 30} item{i} shared words")
+        self.assertIsNotNone(index._centroids)
+
+        index.remove("doc5")
+        results = index.search("topic7 item7 shared words", limit=1)
+        self.assertEqual(results[0][0], "doc7")
+
+
+class TestVectorRecall(unittest.TestCase):
+    """记忆层向量召回测试类"""
+
+    def test_storage_keeps_index_in_sync(self):
+        """测试存储增删时同步向量索引"""
+        storage = InMemoryStorage(max_size=2, embedding_index=EmbeddingIndex())
+        memory = EpisodicMemory(storage)
+        first = memory.store_episode("compile error in parser module", {"step": "build"})
+        second = memory.store_episode("parser module compile failed again", {"step": "build"})
+        memory.store_episode("deploy succeeded", {"step": "release"})
+
+        # 容量淘汰的项也从向量索引中移除
+        self.assertNotIn(first, storage.embedding_index)
+        self.assertEqual(len(storage.embedding_index), 2)
+        self.assertIn(second, [item.id for item in memory.recall("parser compile")])
+
+    def test_find_similar_episodes(self):
+        """测试使用向量索引查找相似情景"""
+        memory = EpisodicMemory(InMemoryStorage(embedding_index=EmbeddingIndex()))
+        target = memory.store_episode("database timeout during migration", {})
+        similar = memory.store_episode("migration hit database timeout", {})
+        memory.store_episode("updated readme wording", {})
+
+        results = memory.find_similar_episodes(target, limit=1)
+        self.assertEqual([episode.id for episode in results], [similar])
+
+    def test_memory_manager_vector_recall(self):
+        """测试记忆管理器启用向量召回"""
+        manager = MemoryManager(enable_vector_recall=True)
+        self.assertIsNotNone(manager.episodic.storage.embedding_index)
+        self.assertIs(manager.working.storage.embedding_index.vectorizer,
+                      manager.semantic.storage.embedding_index.vectorizer)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@
 import unittest
 from datetime import datetime, timedelta
 
+from ..base_memory import InMemoryStorage
 from ..episodic_memory import EpisodicMemory
 from ..interfaces import Episode
 
@@ -231,5 +232,75 @@ class TestEpisodicMemory(unittest.TestCase):
         self.assertEqual(len(all_related), 3)
 
 
+class TestColumnarEpisodicMemory(TestEpisodicMemory):
+    """列式情景记忆测试类（复用全部基础用例）"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.em = EpisodicMemory(columnar=True)
+        self.project_id = "test_project"
+    
+    def test_out_of_order_timeline(self):
+        """测试乱序到达的情景按时间排序"""
+        now = datetime.now()
+        for minutes in [3, 1, 4, 0, 2]:
+            self.em.store_episode(f"Event {minutes}", {}, timestamp=now + timedelta(minutes=minutes),
+                                  project_id="p1" if minutes % 2 else "p2")
+        
+        episodes = self.em.query_timeline(now + timedelta(minutes=1), now + timedelta(minutes=3))
+        self.assertEqual([e.event for e in episodes], ["Event 1", "Event 2", "Event 3"])
+        episodes = self.em.query_timeline(now, now + timedelta(minutes=4), project_id="p1")
+        self.assertEqual([e.event for e in episodes], ["Event 1", "Event 3"])
+        self.assertEqual(self.em.query_timeline(now, now + timedelta(minutes=4), project_id="unknown"), [])
+    
+    def test_incremental_pattern_counts(self):
+        """测试删除和跨项目时的增量模式计数"""
+        now = datetime.now()
+        ids = [self.em.store_episode(f"Build {i} failed", {'stage': 'compile'},
+                                     timestamp=now + timedelta(seconds=i),
+                                     project_id="a" if i < 3 else "b")
+               for i in range(5)]
+        
+        patterns = {p['pattern']: p for p in self.em.analyze_patterns(min_occurrences=3)}
+        self.assertEqual(patterns['build N failed']['occurrences'], 5)
+        self.assertEqual(patterns['build N failed']['timespan']['end'], now + timedelta(seconds=4))
+        self.assertEqual(patterns['stage=compile']['episodes'], ids)
+        self.assertEqual(len(self.em.analyze_patterns(project_id="a", min_occurrences=3)), 2)
+        self.assertEqual(self.em.analyze_patterns(project_id="b", min_occurrences=3), [])
+        
+        self.em.forget(ids[0])
+        self.assertEqual(self.em.analyze_patterns(project_id="a", min_occurrences=3), [])
+        patterns = {p['pattern']: p for p in self.em.analyze_patterns(min_occurrences=3)}
+        self.assertEqual(patterns['build N failed']['timespan']['start'], now + timedelta(seconds=1))
+        self.assertEqual(self.em.query_timeline(now, now), [])
+    
+    def test_evicted_episodes_dropped(self):
+        """测试存储容量淘汰的情景不计入模式"""
+        em = EpisodicMemory(InMemoryStorage(max_size=3), columnar=True)
+        for i in range(4):
+            em.store_episode("Retry request", {})
+        
+        patterns = em.analyze_patterns(min_occurrences=3)
+        self.assertEqual(patterns[0]['occurrences'], 3)
+        self.assertEqual(em.analyze_patterns(min_occurrences=4), [])
+    
+    def test_queries_do_not_count_as_access(self):
+        """测试模式分析和时间线查询不改变访问次数和淘汰顺序"""
+        now = datetime.now()
+        for i in range(4):
+            self.em.store_episode("Deploy service", {'env': 'prod'}, timestamp=now + timedelta(seconds=i),
+                                  project_id=self.project_id)
+        storage = self.em.storage
+        order = list(storage._storage)
+        
+        self.em.analyze_patterns(min_occurrences=3)
+        self.em.query_timeline(now, now + timedelta(seconds=3))
+        self.em.get_project_context(self.project_id)
+        self.em.find_similar_episodes(order[0])
+        
+        self.assertEqual([storage.peek(key).access_count for key in order], [0] * 4)
+        self.assertEqual(list(storage._storage), order)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -342,5 +342,103 @@ class TestMemoryLifecycle(unittest.TestCase):
         self.assertTrue((self.archive_path / "semantic" / f"{sm_id}.json").exists())
 
 
+class TestLifecycleScheduling(unittest.TestCase):
+    """生命周期截止时间调度测试"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.memory_manager = MemoryManager(episodic_memory=EpisodicMemory())
+        self.policy = LifecyclePolicy(
+            active_duration=timedelta(seconds=0.2),
+            archive_after=timedelta(hours=1),
+            compress_after=timedelta(hours=1),
+            forget_after=timedelta(hours=1),
+            min_access_for_active=3,
+            min_importance_for_archive=0.0,
+            archive_path=Path(self.temp_dir)
+        )
+        self.lifecycle_manager = MemoryLifecycleManager(self.memory_manager, self.policy)
+    
+    def tearDown(self):
+        """测试后清理"""
+        self.lifecycle_manager.stop_background_processing(timeout=1)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def track_episodes(self, count):
+        ids = []
+        for i in range(count):
+            memory_id = self.memory_manager.episodic.store_episode(f"episode {i}", {"index": i})
+            self.lifecycle_manager.track_memory(memory_id, MemoryLayer.EPISODIC)
+            ids.append(memory_id)
+        return ids
+    
+    def test_only_due_memories_processed(self):
+        """测试只处理到期的记忆，访问会推迟截止时间"""
+        ids = self.track_episodes(5)
+        self.assertEqual(self.lifecycle_manager.process_lifecycle()['to_archived'], [])
+        
+        self.lifecycle_manager.update_access(ids[0])
+        time.sleep(0.25)
+        
+        transitions = self.lifecycle_manager.process_lifecycle()
+        self.assertEqual(sorted(transitions['to_archived']), sorted(ids))
+        self.assertEqual(self.lifecycle_manager.next_deadline(),
+                         min(m.last_accessed for m in self.lifecycle_manager.lifecycle_metadata.values())
+                         + self.policy.compress_after)
+    
+    def test_budget_limits_pass(self):
+        """测试每轮处理预算"""
+        ids = self.track_episodes(5)
+        time.sleep(0.25)
+        
+        first = self.lifecycle_manager.process_lifecycle(budget=2)
+        second = self.lifecycle_manager.process_lifecycle()
+        self.assertEqual(len(first['to_archived']), 2)
+        self.assertEqual(sorted(first['to_archived'] + second['to_archived']), sorted(ids))
+    
+    def test_full_scan_after_external_change(self):
+        """测试外部修改元数据后重建调度"""
+        memory_id = self.track_episodes(1)[0]
+        metadata = self.lifecycle_manager.lifecycle_metadata[memory_id]
+        metadata.stage = LifecycleStage.ACTIVE
+        metadata.last_accessed = datetime.now() - timedelta(hours=2)
+        
+        transitions = self.lifecycle_manager.process_lifecycle(full_scan=True)
+        self.assertEqual(transitions['to_archived'], [memory_id])
+    
+    def test_missing_memory_backs_off(self):
+        """测试跟踪的记忆不在任何层时不会重复处理"""
+        self.lifecycle_manager.track_memory("ghost", MemoryLayer.WORKING)
+        metadata = self.lifecycle_manager.lifecycle_metadata["ghost"]
+        metadata.created_at = datetime.now() - timedelta(hours=1)
+        
+        before = datetime.now()
+        transitions = self.lifecycle_manager.process_lifecycle(full_scan=True)
+        self.assertEqual(transitions['to_archived'], [])
+        self.assertEqual(metadata.stage, LifecycleStage.CREATED)
+        self.assertGreaterEqual(self.lifecycle_manager.next_deadline(), before + self.policy.retry_after)
+        
+        # 退避期内不再重试
+        _, processed = self.lifecycle_manager._process_due(datetime.now(), None)
+        self.assertEqual(processed, 0)
+    
+    def test_background_processing(self):
+        """测试后台线程增量处理"""
+        ids = self.track_episodes(3)
+        self.lifecycle_manager.start_background_processing(interval=0.05, budget=1)
+        
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            stages = {self.lifecycle_manager.lifecycle_metadata[i].stage for i in ids}
+            if stages == {LifecycleStage.ARCHIVED}:
+                break
+            time.sleep(0.05)
+        self.lifecycle_manager.stop_background_processing(timeout=1)
+        
+        self.assertEqual({self.lifecycle_manager.lifecycle_metadata[i].stage for i in ids},
+                         {LifecycleStage.ARCHIVED})
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Neo4j批量写入测试（使用进程内假驱动，不需要Neo4j服务）
+"""
+
+import time
+import unittest
+
+from ..neo4j_batch_writer import Neo4jBatchWriter, Neo4jBatchWriteError, PHASE_NODES, PHASE_RELATIONSHIPS
+from ..neo4j_config import Neo4jConfig, CypherQueries
+from ..interfaces import Concept
+
+try:
+    from ..semantic_memory_neo4j import Neo4jSemanticMemory
+    NEO4J_INSTALLED = True
+except ImportError:
+    NEO4J_INSTALLED = False
+
+
+class FakeResult:
+    def single(self):
+        return None
+
+    def __iter__(self):
+        return iter([])
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+        self.closed = False
+
+    def run(self, statement, parameters=None, **kwargs):
+        if statement in self.driver.failing_statements:
+            raise RuntimeError("write failed")
+        if any(row.get('id') in self.driver.failing_ids for row in kwargs.get('rows', [])):
+            raise RuntimeError("constraint violation")
+        self.driver.calls.append((statement, (parameters or {}) | kwargs))
+        return FakeResult()
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class FakeDriver:
+    """记录执行语句的假驱动"""
+
+    def __init__(self):
+        self.calls = []
+        self.sessions = 0
+        self.failing_statements = set()
+        self.failing_ids = set()
+
+    def session(self, database=None):
+        self.sessions += 1
+        return FakeSession(self)
+
+    def close(self):
+        pass
+
+
+NODE = "UNWIND $rows AS row CREATE (n:Node {id: row.id})"
+EDGE = "UNWIND $rows AS row MATCH (a {id: row.source}), (b {id: row.target}) CREATE (a)-[:R]->(b)"
+
+
+class TestNeo4jBatchWriter(unittest.TestCase):
+    """批量写入器测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.driver = FakeDriver()
+
+    def test_rows_coalesced_into_batches(self):
+        """测试写入合并为批次并复用会话"""
+        writer = Neo4jBatchWriter(self.driver, batch_size=500, flush_interval=None)
+        for i in range(1200):
+            writer.enqueue(NODE, {'id': i})
+        writer.close()
+
+        self.assertEqual([len(params['rows']) for _, params in self.driver.calls], [500, 500, 200])
+        self.assertEqual(self.driver.sessions, 1)
+        stats = writer.stats()
+        self.assertEqual(stats['flushed_rows'], 1200)
+        self.assertEqual(stats['batches'], 3)
+        self.assertEqual(stats['pending_rows'], 0)
+
+    def test_nodes_flushed_before_relationships(self):
+        """测试同一次刷新中节点先于关系提交"""
+        writer = Neo4jBatchWriter(self.driver, flush_interval=None)
+        writer.enqueue(EDGE, {'source': 1, 'target': 2}, phase=PHASE_RELATIONSHIPS)
+        writer.enqueue(NODE, {'id': 1}, phase=PHASE_NODES)
+        writer.enqueue(NODE, {'id': 2}, phase=PHASE_NODES)
+        self.assertEqual(writer.flush(), 3)
+
+        self.assertEqual([statement for statement, _ in self.driver.calls], [NODE, EDGE])
+        self.assertEqual(self.driver.calls[0][1]['rows'], [{'id': 1}, {'id': 2}])
+
+    def test_background_flush_and_backpressure(self):
+        """测试后台按间隔刷新，以及超过上限时写入方同步刷新"""
+        writer = Neo4jBatchWriter(self.driver, batch_size=10, flush_interval=0.05, max_pending=10)
+        writer.enqueue(NODE, {'id': 0})
+        deadline = time.time() + 2
+        while writer.pending and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(writer.stats()['flushed_rows'], 1)
+
+        for i in range(25):
+            writer.enqueue(NODE, {'id': i})
+        writer.close()
+        stats = writer.stats()
+        self.assertEqual(stats['flushed_rows'], 26)
+        self.assertLessEqual(stats['max_pending'], 10)
+        self.assertGreater(stats['backpressure_waits'], 0)
+
+    def test_failed_batch_is_raised(self):
+        """测试失败的行重试后由 flush() 抛出，重建会话后继续写入"""
+        self.driver.failing_statements.add(EDGE)
+        writer = Neo4jBatchWriter(self.driver, flush_interval=None)
+        writer.enqueue(EDGE, {'source': 1, 'target': 2}, phase=PHASE_RELATIONSHIPS)
+        writer.enqueue(NODE, {'id': 1})
+        with self.assertRaises(Neo4jBatchWriteError) as context:
+            writer.flush()
+        self.assertEqual([(statement, row) for statement, row, _ in context.exception.failed_rows],
+                         [(EDGE, {'source': 1, 'target': 2})])
+        writer.enqueue(NODE, {'id': 2})
+        self.assertEqual(writer.flush(), 1)
+
+        stats = writer.stats()
+        self.assertEqual(stats['failed_rows'], 1)
+        self.assertEqual(stats['retried_batches'], 1)
+        self.assertEqual(stats['flushed_rows'], 2)
+        self.assertIsInstance(writer.last_error, RuntimeError)
+        self.assertEqual(self.driver.sessions, 3)
+
+    def test_bad_row_does_not_lose_batchmates(self):
+        """测试一行出错时同批其他行仍然写入"""
+        self.driver.failing_ids.add(2)
+        writer = Neo4jBatchWriter(self.driver, batch_size=10, flush_interval=None)
+        for i in range(5):
+            writer.enqueue(NODE, {'id': i})
+        with self.assertRaises(Neo4jBatchWriteError) as context:
+            writer.close()
+
+        written = [row['id'] for _, params in self.driver.calls for row in params['rows']]
+        self.assertEqual(written, [0, 1, 3, 4])
+        self.assertEqual([row for _, row, _ in context.exception.failed_rows], [{'id': 2}])
+        self.assertEqual(writer.stats()['flushed_rows'], 4)
+
+    def test_background_failures_reported(self):
+        """测试后台刷新失败的行交给回调，或保留到下一次显式刷新时抛出"""
+        self.driver.failing_ids.add(1)
+        errors = []
+        writer = Neo4jBatchWriter(self.driver, flush_interval=0.01,
+                                  on_error=lambda statement, row, error: errors.append(row))
+        writer.enqueue(NODE, {'id': 1})
+        writer.enqueue(NODE, {'id': 2})
+        writer.close()
+        self.assertEqual(errors, [{'id': 1}])
+
+        writer = Neo4jBatchWriter(self.driver, flush_interval=0.01)
+        writer.enqueue(NODE, {'id': 1})
+        deadline = time.time() + 2
+        while writer.stats()['failed_rows'] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        with self.assertRaises(Neo4jBatchWriteError):
+            writer.flush()
+        writer.close()
+
+
+@unittest.skipUnless(NEO4J_INSTALLED, "需要 neo4j 驱动包")
+class TestNeo4jSemanticMemoryBatching(unittest.TestCase):
+    """Neo4j语义记忆批量写入测试类"""
+
+    def test_add_concepts_uses_unwind_batches(self):
+        """测试批量加载知识只产生少量往返"""
+        driver = FakeDriver()
+        memory = Neo4jSemanticMemory(Neo4jConfig(create_indexes=False, write_batch_size=100), driver=driver)
+        concepts = [Concept(id=f"c{i}", name=f"concept {i}", category="test", attributes={},
+                            relationships={'RELATED_TO': [f"c{i - 1}"]} if i else {})
+                    for i in range(250)]
+        memory.add_concepts(concepts)
+
+        statements = [statement for statement, _ in driver.calls]
+        self.assertEqual(statements.count(CypherQueries.CREATE_CONCEPTS_BATCH), 3)
+        self.assertEqual(statements.count(CypherQueries.CREATE_RELATIONSHIPS_BATCH % 'RELATED_TO'), 3)
+        self.assertEqual(statements[:3], [CypherQueries.CREATE_CONCEPTS_BATCH] * 3)
+
+    def test_reads_flush_pending_writes(self):
+        """测试读取前提交缓冲中的写入"""
+        driver = FakeDriver()
+        memory = Neo4jSemanticMemory(Neo4jConfig(create_indexes=False, batch_writes=True,
+                                                 write_flush_interval=60), driver=driver)
+        memory.add_concept(Concept(id="c1", name="n", category="test", attributes={}))
+        self.assertEqual(driver.calls, [])
+
+        memory.get("c1")
+        self.assertEqual(driver.calls[0][1]['rows'][0]['id'], "c1")
+        self.assertEqual(memory.get_write_stats()['flushed_rows'], 1)
+        memory.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+子图缓存测试
+"""
+
+import unittest
+
+from ..subgraph_cache import SubgraphCache
+from ..semantic_memory import SemanticMemory
+from ..neo4j_config import Neo4jConfig
+from ..interfaces import Concept
+from .test_neo4j_batch_writer import FakeDriver, NEO4J_INSTALLED
+
+if NEO4J_INSTALLED:
+    from ..semantic_memory_neo4j import Neo4jSemanticMemory
+
+
+def make_concept(concept_id, relationships=None, confidence=0.5):
+    return Concept(id=concept_id, name=concept_id, category="test", attributes={},
+                   relationships=relationships or {}, confidence=confidence)
+
+
+class TestSubgraphCache(unittest.TestCase):
+    """子图缓存测试类"""
+
+    def test_version_invalidation(self):
+        """测试依赖节点版本变化后失效"""
+        cache = SubgraphCache()
+        cache.put(('graph', 'a', 2), "ab", depends_on=['a', 'b'])
+        cache.put(('graph', 'c', 2), "c", depends_on=['c'])
+
+        self.assertEqual(cache.get(('graph', 'a', 2)), "ab")
+        cache.invalidate(['b'])
+        self.assertIsNone(cache.get(('graph', 'a', 2)))
+        self.assertEqual(cache.get(('graph', 'c', 2)), "c")
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stale']), (2, 1, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+
+    def test_lru_eviction(self):
+        """测试超过容量时淘汰最久未使用的项"""
+        cache = SubgraphCache(max_entries=2)
+        cache.put('k1', 1, [])
+        cache.put('k2', 2, [])
+        cache.get('k1')
+        cache.put('k3', 3, [])
+
+        self.assertEqual(cache.get('k1'), 1)
+        self.assertIsNone(cache.get('k2'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+
+class TestSemanticMemoryGraphCache(unittest.TestCase):
+    """语义记忆知识图谱缓存测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.sm = SemanticMemory()
+        self.sm.add_concept(make_concept("root", {'has': ['child', 'missing']}))
+        self.sm.add_concept(make_concept("child", {'uses': ['leaf']}))
+        self.sm.add_concept(make_concept("leaf"))
+        self.sm.add_concept(make_concept("other"))
+
+    def test_repeated_queries_hit_cache(self):
+        """测试重复查询命中缓存，无关概念变化不影响缓存"""
+        first = self.sm.get_knowledge_graph("root", depth=2)
+        self.sm.update_concept_confidence("other", 0.2)
+        second = self.sm.get_knowledge_graph("root", depth=2)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.sm.get_cache_stats()['hits'], 1)
+
+    def test_neighbourhood_changes_invalidate(self):
+        """测试邻域内概念变化后重新遍历"""
+        graph = self.sm.get_knowledge_graph("root", depth=2)
+        self.assertNotIn("missing", [node['id'] for node in graph['nodes']])
+
+        self.sm.update_concept_confidence("child", 0.3)
+        graph = self.sm.get_knowledge_graph("root", depth=2)
+        child = next(node for node in graph['nodes'] if node['id'] == "child")
+        self.assertAlmostEqual(child['confidence'], 0.8)
+
+        # 之前不存在的目标概念被添加
+        self.sm.add_concept(make_concept("missing"))
+        graph = self.sm.get_knowledge_graph("root", depth=2)
+        self.assertIn("missing", [node['id'] for node in graph['nodes']])
+        self.assertEqual(self.sm.get_cache_stats()['hits'], 0)
+
+
+@unittest.skipUnless(NEO4J_INSTALLED, "需要 neo4j 驱动包")
+class TestNeo4jGraphCache(unittest.TestCase):
+    """Neo4j语义记忆子图缓存测试类"""
+
+    def test_similarity_cached_until_write(self):
+        """测试相似度缓存在写入涉及的节点后失效"""
+        driver = FakeDriver()
+        memory = Neo4jSemanticMemory(Neo4jConfig(create_indexes=False), driver=driver)
+        memory.calculate_concept_similarity("a", "b")
+        calls = len(driver.calls)
+        memory.calculate_concept_similarity("b", "a")
+        self.assertEqual(len(driver.calls), calls)
+
+        memory.add_concept(make_concept("c", {'RELATED_TO': ['a']}))
+        calls = len(driver.calls)
+        memory.calculate_concept_similarity("a", "b")
+        self.assertGreater(len(driver.calls), calls)
+        self.assertEqual(memory.get_cache_stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -75,6 +75,31 @@ def calculate_similarity(text1: str, text2: str) -> float:
     return len(intersection) / len(union)
 
 
+# 停用词（简化版）
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'been', 'be',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these',
+    'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what', 'which',
+    'when', 'where', 'why', 'how', 'all', 'each', 'every', 'some', 'any'
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    将文本切分为检索词（小写，去掉停用词和单字符词）
+    
+    Args:
+        text: 输入文本
+        
+    Returns:
+        检索词列表（保留重复，用于统计词频）
+    """
+    return [word for word in re.findall(r'\w+', text.lower())
+            if len(word) > 1 and word not in STOP_WORDS]
+
+
 def extract_keywords(text: str, max_keywords: int = 10) -> Set[str]:
     """
     从文本中提取关键词（简单实现）
@@ -92,20 +117,10 @@ def extract_keywords(text: str, max_keywords: int = 10) -> Set[str]:
     # 提取单词
     words = re.findall(r'\w+', text)
     
-    # 过滤停用词（简化版）
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-        'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'been', 'be',
-        'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-        'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these',
-        'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what', 'which',
-        'when', 'where', 'why', 'how', 'all', 'each', 'every', 'some', 'any'
-    }
-    
     # 统计词频
     word_freq = {}
     for word in words:
-        if len(word) > 2 and word not in stop_words:
+        if len(word) > 2 and word not in STOP_WORDS:
             word_freq[word] = word_freq.get(word, 0) + 1
     
     # 选择频率最高的词作为关键词
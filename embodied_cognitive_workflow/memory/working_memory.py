@@ -11,6 +11,7 @@ from collections import deque
 
 from .interfaces import IWorkingMemory, MemoryItem, TriggerType
 from .base_memory import BaseMemory, InMemoryStorage
+from .embedding_index import EmbeddingIndex
 from .utils import calculate_importance, generate_memory_id
 
 
@@ -20,7 +21,8 @@ class WorkingMemory(BaseMemory, IWorkingMemory):
     def __init__(self, 
                  capacity: int = 7,
                  decay_threshold: timedelta = timedelta(minutes=30),
-                 min_importance: float = 0.3):
+                 min_importance: float = 0.3,
+                 embedding_index: Optional[EmbeddingIndex] = None):
         """
         初始化工作记忆
         
@@ -28,9 +30,11 @@ class WorkingMemory(BaseMemory, IWorkingMemory):
             capacity: 容量限制（默认7±2）
             decay_threshold: 衰减时间阈值
             min_importance: 最小重要性阈值
+            embedding_index: 向量索引，设置后使用向量相似度召回
         """
         # 使用有容量限制的存储
-        super().__init__(InMemoryStorage(max_size=capacity * 2))  # 留一些缓冲空间
+        super().__init__(InMemoryStorage(max_size=capacity * 2,  # 留一些缓冲空间
+                                         embedding_index=embedding_index))
         
         self.capacity = capacity
         self.decay_threshold = decay_threshold
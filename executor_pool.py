@@ -0,0 +1,244 @@
+"""
+StatefulExecutor 执行器池
+
+预先创建若干个相互隔离、已完成环境初始化的 IPython 执行器，按需租借给 Agent；
+归还时重置命名空间，超过最大使用次数或最大存活时间的执行器会被回收并在后台补充新实例。
+这样创建 Agent 时不必再等待 IPython 启动。
+
+用法:
+    pool = StatefulExecutorPool(size=4)
+    with pool.lease() as executor:
+        agent = Agent(llm=llm, device=executor)
+        agent.execute_sync("...")
+
+通过 executor_factory 可以池化其他 Device 实现（例如运行在子进程中的执行器）。
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Any, Optional
+
+from python_core import Device, StatefulExecutor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PooledExecutor:
+    """池中的执行器及其元数据"""
+    executor: Device
+    created_at: float = field(default_factory=time.time)
+    uses: int = 0
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+class StatefulExecutorPool:
+    """
+    预热的执行器池
+
+    Args:
+        size: 池中执行器的最大数量
+        executor_factory: 创建执行器的工厂函数，默认创建独立的 StatefulExecutor
+        max_uses: 执行器被租借的最大次数，达到后回收
+        max_age: 执行器的最大存活时间（秒），超过后回收
+        prewarm: 是否在构造时就创建全部执行器
+        reset_on_release: 归还时是否重置执行器的命名空间
+    """
+
+    def __init__(self, size: int = 4,
+                 executor_factory: Optional[Callable[[], Device]] = None,
+                 max_uses: int = 100,
+                 max_age: float = 3600.0,
+                 prewarm: bool = True,
+                 reset_on_release: bool = True):
+        if size < 1:
+            raise ValueError("size 必须大于 0")
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.reset_on_release = reset_on_release
+        self._factory = executor_factory or (lambda: StatefulExecutor(isolated=True))
+
+        self._cond = threading.Condition()
+        self._idle: Deque[_PooledExecutor] = deque()
+        self._in_use: Dict[int, _PooledExecutor] = {}
+        self._total = 0  # 已创建或正在创建的执行器数量
+        self._closed = False
+
+        # 指标
+        self._created = 0
+        self._recycled = 0
+        self._leases = 0
+        self._wait_times_ms: Deque[float] = deque(maxlen=1000)
+        self._max_wait_ms = 0.0
+
+        if prewarm:
+            for _ in range(size):
+                self._total += 1
+                self._idle.append(self._create_entry())
+
+    def _create_entry(self) -> _PooledExecutor:
+        start = time.perf_counter()
+        executor = self._factory()
+        with self._cond:
+            self._created += 1
+        logger.debug(f"执行器创建完成，耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+        return _PooledExecutor(executor)
+
+    def acquire(self, timeout: Optional[float] = None) -> Device:
+        """
+        租借一个执行器，池已满且没有空闲执行器时阻塞等待
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+        Returns:
+            Device: 租借到的执行器，用完后需调用 release 归还
+        Raises:
+            TimeoutError: 等待超时
+            RuntimeError: 池已关闭
+        """
+        start = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        entry = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("执行器池已关闭")
+                if self._idle:
+                    entry = self._idle.popleft()
+                    break
+                if self._total < self.size:
+                    # 预留名额，在锁外创建执行器
+                    self._total += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"等待执行器超时（{timeout}秒）")
+                self._cond.wait(remaining)
+
+        if entry is None:
+            try:
+                entry = self._create_entry()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._cond:
+            entry.uses += 1
+            self._in_use[id(entry.executor)] = entry
+            self._leases += 1
+            self._wait_times_ms.append(wait_ms)
+            self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+        return entry.executor
+
+    def release(self, executor: Device, discard: bool = False) -> None:
+        """
+        归还执行器
+
+        Args:
+            executor: acquire 返回的执行器
+            discard: 为 True 时直接回收该执行器（例如执行器状态已损坏）
+        """
+        with self._cond:
+            entry = self._in_use.pop(id(executor), None)
+        if entry is None:
+            raise ValueError("该执行器不属于此执行器池或已被归还")
+
+        recycle = discard or self._closed or entry.uses >= self.max_uses or entry.age >= self.max_age
+        if not recycle and self.reset_on_release:
+            reset = getattr(entry.executor, 'reset', None)
+            if reset is not None and reset() is False:
+                recycle = True
+
+        with self._cond:
+            if recycle:
+                self._total -= 1
+                self._recycled += 1
+            else:
+                self._idle.append(entry)
+            self._cond.notify()
+
+        if recycle and not self._closed:
+            self._refill_async()
+
+    def _refill_async(self) -> None:
+        """在后台线程中补充执行器，保持池处于预热状态"""
+        def refill():
+            with self._cond:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            try:
+                entry = self._create_entry()
+            except Exception as e:
+                logger.warning(f"补充执行器失败: {e}")
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                return
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+        threading.Thread(target=refill, name="executor-pool-refill", daemon=True).start()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """以上下文管理器的方式租借执行器，执行过程中出现异常时回收该执行器"""
+        executor = self.acquire(timeout)
+        try:
+            yield executor
+        except BaseException:
+            self.release(executor, discard=True)
+            raise
+        else:
+            self.release(executor)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取池的运行指标：租借等待时间、执行器存活时间、数量统计"""
+        with self._cond:
+            waits = sorted(self._wait_times_ms)
+            ages = [entry.age for entry in list(self._idle) + list(self._in_use.values())]
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'created': self._created,
+                'recycled': self._recycled,
+                'leases': self._leases,
+                'lease_wait_ms': {
+                    'count': len(waits),
+                    'avg': sum(waits) / len(waits) if waits else 0.0,
+                    'p95': waits[int(len(waits) * 0.95)] if waits else 0.0,
+                    'max': self._max_wait_ms,
+                },
+                'kernel_age_s': {
+                    'min': min(ages) if ages else 0.0,
+                    'avg': sum(ages) / len(ages) if ages else 0.0,
+                    'max': max(ages) if ages else 0.0,
+                },
+            }
+
+    def close(self) -> None:
+        """关闭执行器池，丢弃空闲执行器，已租出的执行器归还时直接回收"""
+        with self._cond:
+            self._closed = True
+            self._total -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
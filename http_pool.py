@@ -0,0 +1,247 @@
+"""
+共享HTTP连接池
+
+连接设置（代理、证书校验、超时）相同的语言模型共用一个同步 httpx.Client 和一个异步 httpx.AsyncClient：
+    - 连接池容量和keep-alive可配置，重复请求复用TCP/TLS连接
+    - 按主机限制并发请求数，避免并行步骤同时向同一个服务商发起大量请求触发429
+    - 默认直连并校验证书；只有显式传入代理设置的调用方（如旧版 Gemini 模型）才走代理
+
+用法:
+    from http_pool import get_http_client, get_async_http_client, LEGACY_PROXY_SETTINGS
+    llm = ChatOpenAI(..., http_client=get_http_client(), http_async_client=get_async_http_client())
+    gemini = ChatOpenAI(..., http_client=get_http_client(**LEGACY_PROXY_SETTINGS))
+
+修改配置（之后获取的客户端按新配置创建）:
+    from http_pool import configure_http_pool
+    configure_http_pool(max_connections=50, per_host_limit=4)
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 连接池默认配置
+DEFAULT_POOL_CONFIG: Dict[str, Any] = {
+    'max_connections': 100,            # 连接池最大连接数
+    'max_keepalive_connections': 20,   # 保持空闲的keep-alive连接数
+    'keepalive_expiry': 60.0,          # 空闲连接的保持时间（秒）
+    'per_host_limit': 8,               # 每个主机的最大并发请求数，None 表示不限制
+}
+
+# 默认请求超时（秒），与 openai 客户端的默认值一致
+DEFAULT_TIMEOUT = 600.0
+
+# 旧版 Gemini 模型使用的本地代理设置，只有显式要求的客户端才使用
+LEGACY_PROXY_SETTINGS: Dict[str, Any] = {
+    'proxy': 'socks5://127.0.0.1:7890',
+    'verify': False,
+    'timeout': 10,
+}
+
+_config: Dict[str, Any] = dict(DEFAULT_POOL_CONFIG)
+_lock = threading.Lock()
+# (代理, 证书校验, 超时) -> 客户端
+_http_clients: Dict[Tuple[Optional[str], bool, float], httpx.Client] = {}
+_async_http_clients: Dict[Tuple[Optional[str], bool, float], httpx.AsyncClient] = {}
+
+
+def _host_key(request: httpx.Request) -> str:
+    return f"{request.url.host}:{request.url.port or request.url.scheme}"
+
+
+class _ReleasingByteStream(httpx.SyncByteStream):
+    """响应体读完或关闭时释放主机并发许可"""
+
+    def __init__(self, stream: httpx.SyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class _AsyncReleasingByteStream(httpx.AsyncByteStream):
+    """_ReleasingByteStream 的异步版本"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class HostLimitedTransport(httpx.BaseTransport):
+    """按主机限制并发请求数的传输层，许可在响应关闭时释放（流式响应在读完后释放）"""
+
+    def __init__(self, transport: httpx.BaseTransport, per_host_limit: Optional[int]):
+        self._transport = transport
+        self.per_host_limit = per_host_limit
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_limit)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.per_host_limit:
+            return self._transport.handle_request(request)
+
+        semaphore = self._semaphore(_host_key(request))
+        semaphore.acquire()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingByteStream(response.stream, semaphore.release),
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncHostLimitedTransport(httpx.AsyncBaseTransport):
+    """HostLimitedTransport 的异步版本，信号量按事件循环分别创建"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, per_host_limit: Optional[int]):
+        self._transport = transport
+        self.per_host_limit = per_host_limit
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        per_loop = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        semaphore = per_loop.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            per_loop[host] = semaphore
+        return semaphore
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.per_host_limit:
+            return await self._transport.handle_async_request(request)
+
+        semaphore = self._semaphore(_host_key(request))
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_AsyncReleasingByteStream(response.stream, semaphore.release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_config['max_connections'],
+        max_keepalive_connections=_config['max_keepalive_connections'],
+        keepalive_expiry=_config['keepalive_expiry'],
+    )
+
+
+def _build_transport(transport_class, proxy: Optional[str], verify: bool):
+    """创建底层传输层，代理不可用（例如缺少socks支持）时退回直连"""
+    if proxy:
+        try:
+            return transport_class(proxy=proxy, limits=_limits(), verify=verify)
+        except Exception as e:
+            logger.warning(f"HTTP代理 {proxy} 不可用，使用直连: {e}")
+    return transport_class(limits=_limits(), verify=verify)
+
+
+def get_http_client(proxy: Optional[str] = None, verify: bool = True,
+                    timeout: float = DEFAULT_TIMEOUT) -> httpx.Client:
+    """
+    获取共享的同步HTTP客户端，连接设置相同的调用方共用同一个客户端
+
+    参数:
+    proxy: 代理地址，None 表示直连
+    verify: 是否校验TLS证书
+    timeout: 请求超时（秒）
+    """
+    key = (proxy, verify, timeout)
+    with _lock:
+        client = _http_clients.get(key)
+        if client is None or client.is_closed:
+            transport = HostLimitedTransport(_build_transport(httpx.HTTPTransport, proxy, verify),
+                                             _config['per_host_limit'])
+            client = _http_clients[key] = httpx.Client(transport=transport, timeout=timeout)
+        return client
+
+
+def get_async_http_client(proxy: Optional[str] = None, verify: bool = True,
+                          timeout: float = DEFAULT_TIMEOUT) -> httpx.AsyncClient:
+    """获取共享的异步HTTP客户端，参数同 get_http_client"""
+    key = (proxy, verify, timeout)
+    with _lock:
+        client = _async_http_clients.get(key)
+        if client is None or client.is_closed:
+            transport = AsyncHostLimitedTransport(_build_transport(httpx.AsyncHTTPTransport, proxy, verify),
+                                                  _config['per_host_limit'])
+            client = _async_http_clients[key] = httpx.AsyncClient(transport=transport, timeout=timeout)
+        return client
+
+
+def get_pool_config() -> Dict[str, Any]:
+    """获取当前连接池配置"""
+    return dict(_config)
+
+
+def configure_http_pool(**options: Any) -> Dict[str, Any]:
+    '''
+    修改连接池配置，可用的键见 DEFAULT_POOL_CONFIG。
+    只影响之后获取的客户端；已创建的模型仍使用原来的客户端，不会被关闭。
+
+    返回:
+    Dict[str, Any]: 修改后的配置
+    '''
+    unknown = set(options) - set(DEFAULT_POOL_CONFIG)
+    if unknown:
+        raise ValueError(f"未知的连接池配置项: {', '.join(sorted(unknown))}")
+    with _lock:
+        _config.update(options)
+        _http_clients.clear()
+        _async_http_clients.clear()
+    logger.info(f"HTTP连接池配置已更新: {options}")
+    return dict(_config)
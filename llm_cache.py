@@ -0,0 +1,435 @@
+"""
+LLM响应缓存
+
+按 模型名 + temperature + 规范化后的消息 计算缓存键，缓存LLM的文本响应，
+避免重跑同一工作流（例如回归测试回放）时重复发送相同的提示。
+
+缓存分为两层：
+    MemoryCacheTier   进程内LRU，容量和TTL可配置
+    SQLiteCacheTier   磁盘SQLite，跨进程/跨运行持久化，容量和TTL可配置
+LLMResponseCache 依次查询各层，低层命中时回填到高层；命中/未命中次数
+通过 performance_monitor.PerformanceMonitor.record_cache_hit/record_cache_miss 上报。
+
+默认不启用缓存。启用方式：
+    from llm_cache import configure_llm_cache
+    configure_llm_cache(sqlite_path=".llm_response_cache.db", ttl=7 * 24 * 3600)
+或设置环境变量 LLM_RESPONSE_CACHE（"memory" 表示只用内存层，其他值作为SQLite文件路径）。
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_SQLITE_ENTRIES = 100000
+CACHE_ENV_VAR = "LLM_RESPONSE_CACHE"
+
+
+def _normalize_text(text: str) -> str:
+    """去掉每行行尾空白和首尾空行，缩进等有意义的空白保持不变"""
+    return "\n".join(line.rstrip() for line in text.strip().splitlines())
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return _normalize_text(content)
+    # 多模态消息等非字符串内容，按JSON序列化保证键稳定
+    return json.loads(json.dumps(content, ensure_ascii=False, sort_keys=True, default=str))
+
+
+def normalize_messages(messages: Any) -> List[List[Any]]:
+    """
+    把 invoke 接受的各种输入（字符串、PromptValue、消息列表、(role, content) 元组）
+    规范化为 [[角色, 内容], ...]
+    """
+    if hasattr(messages, 'to_messages'):
+        messages = messages.to_messages()
+    if isinstance(messages, str):
+        return [["human", _normalize_text(messages)]]
+
+    normalized = []
+    for message in messages:
+        if isinstance(message, str):
+            normalized.append(["human", _normalize_text(message)])
+        elif isinstance(message, (tuple, list)) and len(message) == 2:
+            normalized.append([str(message[0]), _normalize_content(message[1])])
+        else:
+            role = getattr(message, 'type', type(message).__name__)
+            normalized.append([role, _normalize_content(getattr(message, 'content', str(message)))])
+    return normalized
+
+
+def _model_name(llm: Any) -> str:
+    for attr in ('model_name', 'model', 'model_id'):
+        value = getattr(llm, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return type(llm).__name__
+
+
+def make_cache_key(llm: Any, messages: Any, **extra: Any) -> str:
+    """
+    计算缓存键：模型名 + temperature + 规范化消息（以及调用方附加的参数）的SHA-256
+
+    参数:
+    llm: 语言模型实例，读取其 model_name/model 和 temperature 属性
+    messages: 传给 llm.invoke 的输入
+    extra: 其他会影响响应的参数，例如 response_format
+    """
+    payload = {
+        "model": _model_name(llm),
+        "temperature": getattr(llm, 'temperature', None),
+        "messages": normalize_messages(messages),
+    }
+    if extra:
+        payload["extra"] = extra
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class CacheTier:
+    """缓存层接口"""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCacheTier(CacheTier):
+    """进程内LRU缓存层"""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES, ttl: Optional[float] = None):
+        '''
+        参数:
+        max_entries (int): 最多缓存的条目数，超出时淘汰最久未使用的条目
+        ttl (float): 条目存活时间（秒），None 表示不过期
+        '''
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheTier(CacheTier):
+    """SQLite磁盘缓存层，按最近访问时间淘汰"""
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_SQLITE_ENTRIES, ttl: Optional[float] = None):
+        '''
+        参数:
+        path (str): SQLite数据库文件路径
+        max_entries (int): 最多缓存的条目数，超出时淘汰最久未访问的条目
+        ttl (float): 条目存活时间（秒），None 表示不过期
+        '''
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_accessed "
+                "ON llm_response_cache(accessed_at)"
+            )
+            self._count = self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+                self._count -= 1
+                return None
+            self._conn.execute("UPDATE llm_response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock, self._conn:
+            existed = self._conn.execute(
+                "SELECT 1 FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, value, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, expires_at, now)
+            )
+            if not existed:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """先清理过期条目，仍超出容量时淘汰最久未访问的条目（调用方持有锁）"""
+        self._conn.execute(
+            "DELETE FROM llm_response_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+        overflow = self._count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE key IN "
+                "(SELECT key FROM llm_response_cache ORDER BY accessed_at LIMIT ?)", (overflow,)
+            )
+            self._count -= overflow
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            if self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,)).rowcount:
+                self._count -= 1
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_response_cache")
+            self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    """分层LLM响应缓存"""
+
+    def __init__(self, tiers: List[CacheTier], monitor: Any = None):
+        '''
+        参数:
+        tiers (List[CacheTier]): 缓存层，按查询顺序排列（通常内存层在前）
+        monitor: PerformanceMonitor 实例，用于上报命中/未命中，None 表示不上报
+        '''
+        self.tiers = list(tiers)
+        self.monitor = monitor
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        '''查询缓存，低层命中时回填到前面的层'''
+        for index, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(key)
+            except Exception as e:
+                logger.warning(f"LLM响应缓存读取失败 ({type(tier).__name__}): {e}")
+                continue
+            if value is not None:
+                for upper in self.tiers[:index]:
+                    upper.set(key, value)
+                self._record(hit=True)
+                return value
+        self._record(hit=False)
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        '''写入所有缓存层'''
+        if not isinstance(value, str):
+            return
+        for tier in self.tiers:
+            try:
+                tier.set(key, value)
+            except Exception as e:
+                logger.warning(f"LLM响应缓存写入失败 ({type(tier).__name__}): {e}")
+
+    def delete(self, key: str) -> None:
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def close(self) -> None:
+        for tier in self.tiers:
+            tier.close()
+
+    def _record(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if self.monitor is not None:
+            try:
+                if hit:
+                    self.monitor.record_cache_hit()
+                else:
+                    self.monitor.record_cache_miss()
+            except Exception as e:
+                logger.debug(f"上报缓存指标失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        '''获取命中统计和各层条目数'''
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": {type(tier).__name__: len(tier) for tier in self.tiers},
+        }
+
+
+def invoke_with_cache(llm: Any, messages: Any, cache: Optional[LLMResponseCache] = None, **kwargs: Any) -> str:
+    '''
+    调用 llm.invoke 并返回响应文本，命中缓存时不调用LLM
+
+    参数:
+    llm: 语言模型实例
+    messages: 传给 llm.invoke 的输入
+    cache (LLMResponseCache): 使用的缓存，None 时使用全局缓存（未配置则直接调用LLM）
+    kwargs: 透传给 llm.invoke 的参数，同时参与缓存键计算
+    '''
+    cache = cache if cache is not None else get_llm_cache()
+    if cache is None:
+        return llm.invoke(messages, **kwargs).content
+
+    key = make_cache_key(llm, messages, **kwargs)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    content = llm.invoke(messages, **kwargs).content
+    cache.set(key, content)
+    return content
+
+
+async def ainvoke_with_cache(llm: Any, messages: Any, cache: Optional[LLMResponseCache] = None, **kwargs: Any) -> str:
+    '''invoke_with_cache 的异步版本'''
+    cache = cache if cache is not None else get_llm_cache()
+    if cache is None:
+        return (await llm.ainvoke(messages, **kwargs)).content
+
+    key = make_cache_key(llm, messages, **kwargs)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    content = (await llm.ainvoke(messages, **kwargs)).content
+    cache.set(key, content)
+    return content
+
+
+def _default_monitor() -> Any:
+    try:
+        from performance_monitor import get_performance_monitor
+        return get_performance_monitor()
+    except ImportError:
+        logger.debug("性能监控不可用，LLM响应缓存不上报指标")
+        return None
+
+
+# 全局缓存实例
+_global_cache: Optional[LLMResponseCache] = None
+_env_checked = False
+
+
+def configure_llm_cache(enabled: bool = True, sqlite_path: Optional[str] = None,
+                        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                        sqlite_entries: int = DEFAULT_SQLITE_ENTRIES,
+                        ttl: Optional[float] = None,
+                        report_metrics: bool = True) -> Optional[LLMResponseCache]:
+    '''
+    配置全局LLM响应缓存
+
+    参数:
+    enabled (bool): 是否启用，False 时关闭全局缓存
+    sqlite_path (str): SQLite缓存文件路径，None 表示只使用内存层
+    memory_entries (int): 内存层容量
+    sqlite_entries (int): SQLite层容量
+    ttl (float): 条目存活时间（秒），None 表示不过期
+    report_metrics (bool): 是否向全局性能监控上报命中/未命中
+
+    返回:
+    LLMResponseCache: 新的全局缓存实例，未启用时返回 None
+    '''
+    global _global_cache, _env_checked
+    _env_checked = True
+    if _global_cache is not None:
+        _global_cache.close()
+        _global_cache = None
+    if not enabled:
+        return None
+
+    tiers: List[CacheTier] = [MemoryCacheTier(max_entries=memory_entries, ttl=ttl)]
+    if sqlite_path:
+        tiers.append(SQLiteCacheTier(sqlite_path, max_entries=sqlite_entries, ttl=ttl))
+    _global_cache = LLMResponseCache(tiers, monitor=_default_monitor() if report_metrics else None)
+    logger.info(f"LLM响应缓存已启用: {sqlite_path or '仅内存'}")
+    return _global_cache
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """获取全局LLM响应缓存，未配置时返回 None（首次调用时读取环境变量）"""
+    global _env_checked
+    if not _env_checked:
+        _env_checked = True
+        setting = os.getenv(CACHE_ENV_VAR)
+        if setting:
+            configure_llm_cache(sqlite_path=None if setting == "memory" else setting)
+    return _global_cache
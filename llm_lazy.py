@@ -5,12 +5,20 @@
 """
 
 import os
+import sys
+import threading
 from functools import lru_cache
 from typing import Dict, Optional
-from dotenv import load_dotenv
 
-# 加载环境变量
-load_dotenv()
+# 环境变量在第一次创建模型时才加载
+_env_loaded = False
+
+def _ensure_env_loaded():
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
 
 # 模型配置字典（不包含实际的模型实例）
 MODEL_CONFIGS = {
@@ -137,24 +145,68 @@ MODEL_CONFIGS = {
     }
 }
 
-# 创建HTTP客户端（懒加载）
-_http_client = None
+# HTTP客户端（懒加载），所有模型共享 http_pool 中的连接池
+def _proxy_settings(use_proxy: bool) -> Dict:
+    from http_pool import LEGACY_PROXY_SETTINGS
+    return LEGACY_PROXY_SETTINGS if use_proxy else {}
+
+def _get_http_client(use_proxy: bool = False):
+    """懒加载共享的同步HTTP客户端，use_proxy 时使用旧版代理设置，否则直连并校验证书"""
+    from http_pool import get_http_client
+    return get_http_client(**_proxy_settings(use_proxy))
+
+def _get_async_http_client(use_proxy: bool = False):
+    """懒加载共享的异步HTTP客户端"""
+    from http_pool import get_async_http_client
+    return get_async_http_client(**_proxy_settings(use_proxy))
 
-def _get_http_client():
-    """懒加载HTTP客户端"""
-    global _http_client
-    if _http_client is None:
-        try:
-            import httpx
-            _http_client = httpx.Client(
-                proxy='socks5://127.0.0.1:7890',
-                timeout=10,
-                verify=False
-            )
-        except Exception:
-            import httpx
-            _http_client = httpx.Client(timeout=10, verify=False)
-    return _http_client
+def create_chat_model(spec: Dict):
+    """
+    按模型定义创建ChatOpenAI实例（首次调用时才导入langchain_openai）
+    
+    Args:
+        spec: 模型定义，api_key_env 指定读取API密钥的环境变量，use_proxy 为 True 时通过本地代理连接，
+              其余键直接传给ChatOpenAI
+        
+    Returns:
+        ChatOpenAI实例
+    """
+    from langchain_openai import ChatOpenAI
+    
+    _ensure_env_loaded()
+    kwargs = dict(spec)
+    api_key_env = kwargs.pop('api_key_env', None)
+    use_proxy = kwargs.pop('use_proxy', False)
+    if api_key_env:
+        kwargs['api_key'] = os.getenv(api_key_env)
+    kwargs.setdefault('http_client', _get_http_client(use_proxy))
+    kwargs.setdefault('http_async_client', _get_async_http_client(use_proxy))
+    return ChatOpenAI(**kwargs)
+
+def lazy_model_attributes(module_name: str, specs: Dict[str, Dict]):
+    """
+    生成模块级 __getattr__：首次访问模型变量时才创建模型，并写回模块命名空间，之后直接命中
+    
+    Args:
+        module_name: 模块名（__name__）
+        specs: 变量名 -> 模型定义
+        
+    用法（模块末尾）:
+        __getattr__ = lazy_model_attributes(__name__, _MODEL_SPECS)
+    """
+    lock = threading.Lock()
+    
+    def __getattr__(name: str):
+        spec = specs.get(name)
+        if spec is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        module = sys.modules[module_name]
+        with lock:
+            if name not in module.__dict__:
+                module.__dict__[name] = create_chat_model(spec)
+        return module.__dict__[name]
+    
+    return __getattr__
 
 @lru_cache(maxsize=None)
 def get_model(model_name: str):
@@ -174,6 +226,7 @@ def get_model(model_name: str):
         return None
     
     config = MODEL_CONFIGS[model_name]
+    _ensure_env_loaded()
     api_key = os.getenv(config['api_key_env'])
     
     if not api_key:
@@ -181,17 +234,8 @@ def get_model(model_name: str):
         return None
     
     try:
-        # 只在需要时才导入ChatOpenAI
-        from langchain_openai import ChatOpenAI
-        
-        model = ChatOpenAI(
-            temperature=config.get('temperature', 0),
-            model=config['model'],
-            base_url=config['base_url'],
-            api_key=api_key,
-            max_tokens=config.get('max_tokens', 4096),
-            http_client=_get_http_client()
-        )
+        # get_model 的模型一直通过本地代理连接
+        model = create_chat_model(dict(config, use_proxy=True))
         print(f"✅ 成功加载模型: {model_name}")
         return model
     except Exception as e:
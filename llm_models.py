@@ -2,326 +2,283 @@
 语言模型定义模块
 
 将所有语言模型定义集中在此文件中，与核心业务逻辑分离。
-使用时按需导入，避免不必要的模型初始化。
+模型变量（如 llm_deepseek）在首次访问时才创建，导入本模块不会导入langchain_openai。
 """
 
-import os
-import httpx
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
-
-# 加载环境变量
-load_dotenv()
-
-# 创建HTTP客户端
-http_client = httpx.Client(
-    proxy='socks5://127.0.0.1:7890',
-    timeout=10,
-    verify=False
-)
-
-# ============================================================================
-# Gemini 系列模型
-# ============================================================================
-
-llm_gemini_2_flash_lite_google = ChatOpenAI(
-    temperature=0,
-    model="gemini-2.0-flash-lite-preview-02-05",
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    http_client=http_client
-)
-
-llm_gemini_2_5_pro_exp_03_25_google = ChatOpenAI(
-    temperature=0,
-    model="gemini-2.5-pro-exp-03-25",
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    http_client=http_client
-)
-
-llm_gemini_2_5_pro_preview_05_06_google = ChatOpenAI(
-    temperature=0,
-    model="gemini-2.5-pro-preview-05-06",
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    http_client=http_client
-)
-
-llm_gemini_2_5_pro_preview_06_05_google = ChatOpenAI(
-    temperature=0,
-    model="gemini-2.5-pro-preview-06-05",
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    http_client=http_client
-)
-
-llm_gemini_2_flash_google = ChatOpenAI(
-    temperature=0,
-    model="gemini-2.0-flash",
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    max_tokens=4096,
-    http_client=http_client
-)
-
-llm_gemini_2_5_flash_google = ChatOpenAI(
-    temperature=0,
-    model="models/gemini-2.5-flash",
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    max_tokens=4096,
-    http_client=http_client
-)
-
-llm_gemini_2_5_pro_google = ChatOpenAI(
-    temperature=0,
-    model="gemini-2.5-pro",
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    max_tokens=4096,
-    http_client=http_client
-)
-
-# ============================================================================
-# DeepSeek 系列模型
-# ============================================================================
-
-llm_Qwen_QwQ_32B_siliconflow = ChatOpenAI(
-    temperature=0,
-    model="Qwen/QwQ-32B",
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_DeepSeek_R1_Distill_Qwen_32B = ChatOpenAI(
-    temperature=0,
-    model="deepseek-ai/DeepSeek-R1-Distill-Qwen-32B",
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_DeepSeek_V3_siliconflow = ChatOpenAI(
-    temperature=0,
-    model="deepseek-ai/DeepSeek-V3",
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=4096
-)
-
-llm_Pro_DeepSeek_V3_siliconflow = ChatOpenAI(
-    temperature=0,
-    model="Pro/deepseek-ai/DeepSeek-V3",
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=4096
-)
-
-llm_DeepSeek_R1_siliconflow = ChatOpenAI(
-    temperature=0,
-    model="deepseek-ai/DeepSeek-R1",
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_Pro_DeepSeek_R1_siliconflow = ChatOpenAI(
-    temperature=0,
-    model="Pro/deepseek-ai/DeepSeek-R1",
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_Qwen_2_5_Coder_32B_Instruct_siliconflow = ChatOpenAI(
-    temperature=0,
-    model="Qwen/Qwen2.5-Coder-32B-Instruct",
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_DeepSeek_R1_Distill_Qwen_32B_siliconflow = ChatOpenAI(
-    temperature=0,
-    model="deepseek-ai/DeepSeek-R1-Distill-Qwen-32B",
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_deepseek = ChatOpenAI(
-    temperature=0,
-    model="deepseek-chat",
-    base_url="https://api.deepseek.com",
-    api_key=os.getenv('DEEPSEEK_API_KEY'),
-    max_tokens=8192
-)
-
-llm_deepseek_r1 = ChatOpenAI(
-    temperature=0.6,
-    model="deepseek-reasoner",
-    base_url="https://api.deepseek.com",
-    api_key=os.getenv('DEEPSEEK_API_KEY'),
-    max_tokens=8192
-)
-
-# ============================================================================
-# OpenRouter 系列模型
-# ============================================================================
-
-llm_qwen_2_5_72b_instruct = ChatOpenAI(
-    temperature=0,
-    model="qwen/qwen-2.5-72b-instruct",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gpt_4o_mini_openrouter = ChatOpenAI(
-    temperature=0,
-    model="openai/gpt-4o-mini",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_5_flash_preview_thinking_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.5-flash-preview:thinking",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_5_flash_preview_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.5-flash-preview",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_5_pro_exp_03_25_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.5-pro-exp-03-25:free",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_llama_4_scout_openrouter = ChatOpenAI(
-    temperature=0,
-    model="meta-llama/llama-4-scout",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_llama_4_maverick_openrouter = ChatOpenAI(
-    temperature=0,
-    model="meta-llama/llama-4-maverick",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_qwen_2_5_coder_32b_instruct = ChatOpenAI(
-    temperature=0,
-    model="qwen/qwen-2.5-coder-32b-instruct",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_qwq_32b = ChatOpenAI(
-    temperature=0,
-    model="qwen/qwq-32b",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_claude_35_sonnet = ChatOpenAI(
-    temperature=0,
-    model="anthropic/claude-3.5-sonnet:beta",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_claude_37_sonnet = ChatOpenAI(
-    temperature=0,
-    model="anthropic/claude-3.7-sonnet",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_claude_sonnet_4 = ChatOpenAI(
-    temperature=0,
-    model="anthropic/claude-sonnet-4",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_deepseek_r1_free_openrouter = ChatOpenAI(
-    temperature=0,
-    model="deepseek/deepseek-r1:free",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_claude_37_sonnet_thinking = ChatOpenAI(
-    temperature=0,
-    model="anthropic/claude-3.7-sonnet:thinking",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_o3_mini = ChatOpenAI(
-    temperature=0,
-    model="openai/o3-mini",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_flash_thinking_exp_free_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.0-flash-thinking-exp:free",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_flash_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.0-flash-001",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_flash_lite_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.0-flash-lite-preview-02-05:free",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_deepseek_openrouter = ChatOpenAI(
-    temperature=0,
-    model="deepseek/deepseek-chat-v3-0324:NovitaAI",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_deepseek_r1_openrouter = ChatOpenAI(
-    temperature=0,
-    model="deepseek/deepseek-r1",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_optimus_alpha_openrouter = ChatOpenAI(
-    temperature=0,
-    model="openrouter/optimus-alpha",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
+from llm_lazy import lazy_model_attributes
+
+# 模型定义：变量名 -> ChatOpenAI参数（api_key_env 为API密钥所在的环境变量），
+# 创建模型时才加载 .env，所有模型共享 http_pool 中的HTTP连接池；
+# use_proxy 的模型（Gemini 官方接口）走本地代理，其余模型直连
+_MODEL_SPECS = {
+    # ============================================================================
+    # Gemini 系列模型
+    # ============================================================================
+    'llm_gemini_2_flash_lite_google': {
+        'model': 'gemini-2.0-flash-lite-preview-02-05',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_exp_03_25_google': {
+        'model': 'gemini-2.5-pro-exp-03-25',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_preview_05_06_google': {
+        'model': 'gemini-2.5-pro-preview-05-06',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_preview_06_05_google': {
+        'model': 'gemini-2.5-pro-preview-06-05',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'temperature': 0,
+    },
+    'llm_gemini_2_flash_google': {
+        'model': 'gemini-2.0-flash',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_flash_google': {
+        'model': 'models/gemini-2.5-flash',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_google': {
+        'model': 'gemini-2.5-pro',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+
+    # ============================================================================
+    # DeepSeek 系列模型
+    # ============================================================================
+    'llm_Qwen_QwQ_32B_siliconflow': {
+        'model': 'Qwen/QwQ-32B',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_DeepSeek_R1_Distill_Qwen_32B': {
+        'model': 'deepseek-ai/DeepSeek-R1-Distill-Qwen-32B',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_DeepSeek_V3_siliconflow': {
+        'model': 'deepseek-ai/DeepSeek-V3',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+    'llm_Pro_DeepSeek_V3_siliconflow': {
+        'model': 'Pro/deepseek-ai/DeepSeek-V3',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+    'llm_DeepSeek_R1_siliconflow': {
+        'model': 'deepseek-ai/DeepSeek-R1',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_Pro_DeepSeek_R1_siliconflow': {
+        'model': 'Pro/deepseek-ai/DeepSeek-R1',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_Qwen_2_5_Coder_32B_Instruct_siliconflow': {
+        'model': 'Qwen/Qwen2.5-Coder-32B-Instruct',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_DeepSeek_R1_Distill_Qwen_32B_siliconflow': {
+        'model': 'deepseek-ai/DeepSeek-R1-Distill-Qwen-32B',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_deepseek': {
+        'model': 'deepseek-chat',
+        'base_url': 'https://api.deepseek.com',
+        'api_key_env': 'DEEPSEEK_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_deepseek_r1': {
+        'model': 'deepseek-reasoner',
+        'base_url': 'https://api.deepseek.com',
+        'api_key_env': 'DEEPSEEK_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0.6,
+    },
+
+    # ============================================================================
+    # OpenRouter 系列模型
+    # ============================================================================
+    'llm_qwen_2_5_72b_instruct': {
+        'model': 'qwen/qwen-2.5-72b-instruct',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gpt_4o_mini_openrouter': {
+        'model': 'openai/gpt-4o-mini',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_flash_preview_thinking_openrouter': {
+        'model': 'google/gemini-2.5-flash-preview:thinking',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_flash_preview_openrouter': {
+        'model': 'google/gemini-2.5-flash-preview',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_exp_03_25_openrouter': {
+        'model': 'google/gemini-2.5-pro-exp-03-25:free',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_llama_4_scout_openrouter': {
+        'model': 'meta-llama/llama-4-scout',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_llama_4_maverick_openrouter': {
+        'model': 'meta-llama/llama-4-maverick',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_qwen_2_5_coder_32b_instruct': {
+        'model': 'qwen/qwen-2.5-coder-32b-instruct',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_qwq_32b': {
+        'model': 'qwen/qwq-32b',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_claude_35_sonnet': {
+        'model': 'anthropic/claude-3.5-sonnet:beta',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_claude_37_sonnet': {
+        'model': 'anthropic/claude-3.7-sonnet',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_claude_sonnet_4': {
+        'model': 'anthropic/claude-sonnet-4',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_deepseek_r1_free_openrouter': {
+        'model': 'deepseek/deepseek-r1:free',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_claude_37_sonnet_thinking': {
+        'model': 'anthropic/claude-3.7-sonnet:thinking',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_o3_mini': {
+        'model': 'openai/o3-mini',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_flash_thinking_exp_free_openrouter': {
+        'model': 'google/gemini-2.0-flash-thinking-exp:free',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_flash_openrouter': {
+        'model': 'google/gemini-2.0-flash-001',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_flash_lite_openrouter': {
+        'model': 'google/gemini-2.0-flash-lite-preview-02-05:free',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_deepseek_openrouter': {
+        'model': 'deepseek/deepseek-chat-v3-0324:NovitaAI',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_deepseek_r1_openrouter': {
+        'model': 'deepseek/deepseek-r1',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_optimus_alpha_openrouter': {
+        'model': 'openrouter/optimus-alpha',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+}
 
 # ============================================================================
 # 懒加载支持
 # ============================================================================
 
+# 访问模型变量时按 _MODEL_SPECS 创建模型
+__getattr__ = lazy_model_attributes(__name__, _MODEL_SPECS)
+
 # 模型映射表
 MODEL_MAPPING = {
     # Gemini 系列
@@ -364,12 +321,11 @@ def get_model(model_name: str):
     Returns:
         ChatOpenAI实例或None
     """
-    if model_name in MODEL_MAPPING:
-        attr_name = MODEL_MAPPING[model_name]
-        return globals().get(attr_name)
-    else:
-        # 尝试直接按属性名获取
-        return globals().get(model_name)
+    # 未在映射表中时尝试直接按属性名获取
+    attr_name = MODEL_MAPPING.get(model_name, model_name)
+    if attr_name in _MODEL_SPECS:
+        return __getattr__(attr_name)
+    return globals().get(attr_name)
 
 def list_models():
     """列出所有可用模型"""
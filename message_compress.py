@@ -1,28 +1,26 @@
-import os
 from typing import List
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
+from llm_lazy import lazy_model_attributes
 
-# 加载环境变量
-load_dotenv()
+# 压缩使用的语言模型，首次调用 compress_messages 时才创建（不在导入时初始化）
+_MODEL_SPECS = {
+    'llm_gemini_25_flash_openrouter': {
+        'model': 'google/gemini-2.5-flash-preview-05-20',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    # DeepSeek模型配置
+    'llm_deepseek': {
+        'model': 'deepseek-chat',
+        'base_url': 'https://api.deepseek.com',
+        'api_key_env': 'DEEPSEEK_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+}
 
-# 初始化语言模型
-llm_gemini_25_flash_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.5-flash-preview-05-20", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY')
-)
-
-# DeepSeek模型配置
-llm_deepseek = ChatOpenAI(
-    temperature=0,
-    model="deepseek-chat",  
-    base_url="https://api.deepseek.com",
-    api_key=os.getenv('DEEPSEEK_API_KEY'),
-    max_tokens=8192
-)
+__getattr__ = lazy_model_attributes(__name__, _MODEL_SPECS)
 
 def compress_messages(messages: List[BaseMessage], use_deepseek: bool = False) -> List[BaseMessage]:
     '''
@@ -99,7 +97,7 @@ def compress_messages(messages: List[BaseMessage], use_deepseek: bool = False) -
 {conversation_text}"""
     
     # 选择语言模型并调用生成摘要
-    selected_llm = llm_deepseek if use_deepseek else llm_gemini_25_flash_openrouter
+    selected_llm = __getattr__('llm_deepseek' if use_deepseek else 'llm_gemini_25_flash_openrouter')
     summary = selected_llm.invoke(prompt).content
     
     # 更清晰地打印摘要内容
@@ -0,0 +1,249 @@
+"""
+进程隔离的有状态执行器
+
+ProcessStatefulExecutor 与 StatefulExecutor 一样在IPython中保持状态，但IPython运行在独立的子进程中。
+代码输出通过管道增量地传回父进程，不再替换父进程的 sys.stdout/sys.stderr，
+因此多个执行器可以在不同线程中同时执行代码而输出互不干扰
+（例如静态工作流中 ParallelExecutor 并行执行的步骤）。
+
+支持每次执行的CPU时间限制（子进程内通过 RLIMIT_CPU 实现，仅限POSIX）和墙钟时间限制
+（超时先发送SIGINT中断，仍未结束则重启子进程，此时执行器状态会丢失）。
+
+用法:
+    executor = ProcessStatefulExecutor(wall_timeout=60, cpu_timeout=30)
+    agent = Agent(llm=llm, device=executor)
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+from typing import Any, Callable, Optional
+
+from agent_base import Result
+from python_core import Device, BoundedOutputCapture, DEFAULT_OUTPUT_HEAD_CHARS, DEFAULT_OUTPUT_TAIL_CHARS
+import process_kernel
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessStatefulExecutor(Device):
+    '''
+    进程隔离的有状态执行器，执行Python代码。
+    使用运行在子进程中的IPython实现状态保持。
+    '''
+    def __init__(self, wall_timeout: Optional[float] = None, cpu_timeout: Optional[float] = None,
+                 echo: bool = True, on_output: Optional[Callable[[str], None]] = None,
+                 interrupt_grace: float = 2.0, start_method: str = 'spawn',
+                 output_head_chars: Optional[int] = DEFAULT_OUTPUT_HEAD_CHARS,
+                 output_tail_chars: Optional[int] = DEFAULT_OUTPUT_TAIL_CHARS,
+                 spill_output: bool = False, spill_dir: Optional[str] = None):
+        '''
+        参数:
+        wall_timeout (float): 每次执行的墙钟时间限制（秒），None 表示不限制
+        cpu_timeout (float): 每次执行的CPU时间限制（秒），None 表示不限制
+        echo (bool): 是否把子进程输出同时写到父进程的标准输出
+        on_output (Callable[[str], None]): 收到增量输出时的回调
+        interrupt_grace (float): 墙钟超时发送SIGINT后等待子进程响应的时间（秒）
+        start_method (str): multiprocessing 的进程启动方式
+        output_head_chars / output_tail_chars / spill_output / spill_dir:
+            输出捕获的截断与溢出设置，含义同 StatefulExecutor
+        '''
+        self.output_head_chars = output_head_chars
+        self.output_tail_chars = output_tail_chars
+        self.spill_output = spill_output
+        self.spill_dir = spill_dir
+        self.wall_timeout = wall_timeout
+        self.cpu_timeout = cpu_timeout
+        self.echo = echo
+        self.on_output = on_output
+        self.interrupt_grace = interrupt_grace
+        self._context = multiprocessing.get_context(start_method)
+        self._lock = threading.RLock()
+        self._process = None
+        self._conn = None
+        self.created_at = time.time()
+        self._start()
+
+    def _start(self) -> None:
+        """启动子进程并等待IPython初始化完成"""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=process_kernel.kernel_main, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        ready = parent_conn.recv()
+        if ready[0] != 'ok':
+            raise RuntimeError(f"执行器子进程启动失败: {ready}")
+        self._process = process
+        self._conn = parent_conn
+        self.created_at = time.time()
+
+    def _restart(self) -> None:
+        """终止当前子进程并启动新的子进程（状态丢失）"""
+        self._terminate()
+        self._start()
+
+    def _terminate(self) -> None:
+        if self._process is not None and self._process.is_alive():
+            self._process.kill()
+            self._process.join(5)
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def _ensure_alive(self) -> None:
+        if self._process is None or not self._process.is_alive():
+            logger.warning("执行器子进程不可用，正在重启")
+            self._restart()
+
+    def _interrupt(self) -> None:
+        if hasattr(signal, 'SIGINT') and self._process is not None and self._process.pid:
+            try:
+                os.kill(self._process.pid, signal.SIGINT)
+            except OSError:
+                pass
+
+    def _emit(self, text: str, on_output: Optional[Callable[[str], None]]) -> None:
+        if self.echo:
+            stream = sys.__stdout__ or sys.stdout
+            stream.write(text)
+            stream.flush()
+        if on_output is not None:
+            on_output(text)
+
+    def execute_code(self, code: str, on_output: Optional[Callable[[str], None]] = None,
+                     wall_timeout: Optional[float] = None, cpu_timeout: Optional[float] = None) -> Result:
+        '''
+        执行给定的Python代码，并返回执行结果。
+
+        参数:
+        code (str): 要执行的Python代码。
+        on_output (Callable[[str], None]): 本次执行的增量输出回调，默认使用构造时的回调
+        wall_timeout (float): 本次执行的墙钟时间限制，默认使用构造时的设置
+        cpu_timeout (float): 本次执行的CPU时间限制，默认使用构造时的设置
+
+        返回:
+        Result: 执行结果对象，与 StatefulExecutor.execute_code 的约定一致。
+        '''
+        # 编译检查
+        try:
+            compile(code, '<string>', 'exec')
+        except SyntaxError as e:
+            error_msg = f"语法错误: {str(e)}"
+            return Result(False, code, stdout="", stderr=error_msg, return_value=None)
+
+        on_output = on_output if on_output is not None else self.on_output
+        wall_timeout = wall_timeout if wall_timeout is not None else self.wall_timeout
+        cpu_timeout = cpu_timeout if cpu_timeout is not None else self.cpu_timeout
+
+        with self._lock:
+            captured_output = BoundedOutputCapture(self.output_head_chars, self.output_tail_chars,
+                                                   spill=self.spill_output, spill_dir=self.spill_dir)
+            try:
+                return self._execute_locked(code, on_output, wall_timeout, cpu_timeout, captured_output)
+            finally:
+                captured_output.close()
+
+    def _execute_locked(self, code: str, on_output: Optional[Callable[[str], None]],
+                        wall_timeout: Optional[float], cpu_timeout: Optional[float],
+                        captured_output: BoundedOutputCapture) -> Result:
+        """在持有锁的情况下执行代码并收集子进程的增量输出"""
+        try:
+            self._ensure_alive()
+            self._conn.send(('exec', code, cpu_timeout))
+            deadline = None if wall_timeout is None else time.monotonic() + wall_timeout
+            interrupted = False
+
+            while True:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not self._conn.poll(remaining):
+                    if not interrupted:
+                        # 墙钟超时：先尝试中断，保留执行器状态
+                        logger.warning(f"代码执行超过 {wall_timeout} 秒，发送中断信号")
+                        self._interrupt()
+                        interrupted = True
+                        deadline = time.monotonic() + self.interrupt_grace
+                        continue
+                    logger.warning("子进程未响应中断，重启执行器")
+                    self._restart()
+                    error_msg = f"执行超时: 超过 {wall_timeout} 秒，执行器已重启，之前的状态已丢失"
+                    return Result(False, code, stdout=captured_output.getvalue(), stderr=error_msg,
+                                  return_value=None, **captured_output.result_kwargs())
+
+                message = self._conn.recv()
+                if message[0] == 'out':
+                    captured_output.write(message[1])
+                    self._emit(message[1], on_output)
+                elif message[0] == 'done':
+                    break
+                else:
+                    logger.warning(f"忽略执行器子进程的意外消息: {message[0]}")
+        except (EOFError, OSError, BrokenPipeError) as e:
+            self._terminate()
+            return Result(False, code, stdout=captured_output.getvalue(),
+                          stderr=f"执行异常: 执行器子进程异常退出 ({e})", return_value=None,
+                          **captured_output.result_kwargs())
+
+        _, success, cell_repr, error_msg, return_value = message
+        if success:
+            if cell_repr is not None:
+                if captured_output.total_chars:
+                    captured_output.write("\n")
+                captured_output.write(cell_repr)
+            return Result(True, code, stdout=captured_output.getvalue(), stderr=None,
+                          return_value=return_value, **captured_output.result_kwargs())
+
+        if interrupted:
+            # 中断信号可能在子进程发送结果时才到达，丢弃由此产生的多余消息
+            while self._conn.poll(0.1):
+                self._conn.recv()
+            error_msg = f"执行超时: 超过 {wall_timeout} 秒，执行已被中断"
+        output = captured_output.getvalue()
+        if output:
+            error_msg = f"{output}\n{error_msg}"
+        return Result(False, code, stdout=output, stderr=error_msg, return_value=None,
+                      **captured_output.result_kwargs())
+
+    def _request(self, message: tuple) -> tuple:
+        with self._lock:
+            self._ensure_alive()
+            self._conn.send(message)
+            return self._conn.recv()
+
+    def get_variable(self, var_name: str) -> Any:
+        '''获取子进程IPython环境中的变量值（无法序列化的值以repr返回）'''
+        reply = self._request(('get', var_name))
+        return reply[1] if reply[0] == 'value' else None
+
+    def set_variable(self, var_name: str, value: Any) -> bool:
+        '''在子进程IPython环境中设置变量值，值必须可以被pickle序列化'''
+        return self._request(('set', var_name, value))[0] == 'ok'
+
+    def reset(self) -> bool:
+        '''清空子进程的IPython命名空间，返回是否成功'''
+        try:
+            return self._request(('reset',))[0] == 'ok'
+        except Exception as e:
+            logger.warning(f"重置执行器子进程失败: {e}")
+            return False
+
+    def close(self) -> None:
+        '''关闭子进程'''
+        with self._lock:
+            if self._conn is not None and self._process is not None and self._process.is_alive():
+                try:
+                    self._conn.send(('shutdown',))
+                    self._process.join(2)
+                except (OSError, BrokenPipeError):
+                    pass
+            self._terminate()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
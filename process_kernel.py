@@ -0,0 +1,196 @@
+"""
+进程隔离执行器的子进程端
+
+在独立进程中运行一个IPython实例，通过multiprocessing管道接收命令，
+执行代码时把标准输出/标准错误增量地写回管道。该模块只依赖标准库和IPython，
+以便子进程快速启动；父进程端见 process_executor.py。
+
+管道协议（父进程 -> 子进程）:
+    ('exec', code, cpu_timeout)   执行代码
+    ('get', name)                 读取变量
+    ('set', name, value)          设置变量
+    ('reset',)                    清空命名空间
+    ('shutdown',)                 退出
+
+管道协议（子进程 -> 父进程）:
+    ('out', text)                                     增量输出
+    ('done', success, cell_repr, error, return_value) 执行结束
+    ('value', value)                                  变量值
+    ('ok',) / ('error', message)                      其他命令的结果
+"""
+
+import os
+import sys
+import time
+import math
+import pickle
+import signal
+
+try:
+    import resource
+except ImportError:  # Windows 不支持 CPU 时间限制
+    resource = None
+
+
+class CpuTimeExceeded(Exception):
+    """执行代码的CPU时间超过限制"""
+
+
+class PipeWriter:
+    """替换子进程的 sys.stdout/sys.stderr，把输出分块写回管道"""
+
+    def __init__(self, conn, flush_size: int = 8192, flush_interval: float = 0.05):
+        self.conn = conn
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, text):
+        if not text:
+            return 0
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if (self._buffered >= self.flush_size or '\n' in text
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            self.conn.send(('out', ''.join(self._buffer)))
+            self._buffer = []
+            self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def isatty(self):
+        return False
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+    @property
+    def errors(self):
+        return 'strict'
+
+
+def _picklable(value):
+    """返回值需要跨进程传递，无法序列化时退化为 repr"""
+    try:
+        pickle.dumps(value)
+        return value
+    except Exception:
+        return repr(value)
+
+
+def _create_shell():
+    from IPython.core.interactiveshell import InteractiveShell
+    from traitlets.config import Config
+    c = Config()
+    c.InteractiveShell.autoindent = False
+    c.InteractiveShell.colors = 'NoColor'
+    c.HistoryManager.enabled = False
+    shell = InteractiveShell(config=c)
+    _setup_environment(shell)
+    return shell
+
+
+def _setup_environment(shell):
+    os.environ['MPLBACKEND'] = 'Agg'
+    os.environ['MATPLOTLIBRC'] = '/dev/null'
+    try:
+        shell.run_cell("import matplotlib\nmatplotlib.use('Agg')", silent=True)
+    except Exception:
+        pass
+
+
+def _on_cpu_limit(signum, frame):
+    raise CpuTimeExceeded("CPU时间超过限制")
+
+
+def _set_cpu_limit(cpu_timeout):
+    """把 RLIMIT_CPU 的软限制设为当前已用CPU时间加上 cpu_timeout，返回原限制"""
+    if resource is None or not cpu_timeout:
+        return None
+    previous = resource.getrlimit(resource.RLIMIT_CPU)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(math.ceil(usage.ru_utime + usage.ru_stime + cpu_timeout))
+    hard = previous[1]
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    return previous
+
+
+def _execute(shell, conn, code, cpu_timeout):
+    writer = PipeWriter(conn)
+    original_stdout, original_stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = writer
+    previous_limit = None
+    try:
+        previous_limit = _set_cpu_limit(cpu_timeout)
+        result = shell.run_cell(code)
+    except BaseException as e:  # CPU超限或中断发生在 run_cell 之外
+        writer.flush()
+        conn.send(('done', False, None, f"执行异常: {type(e).__name__}: {e}", None))
+        return
+    finally:
+        if previous_limit is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, previous_limit)
+        sys.stdout, sys.stderr = original_stdout, original_stderr
+    writer.flush()
+
+    if result.success and result.error_in_exec is None:
+        cell_repr = repr(result.result) if result.result is not None else None
+        return_value = _picklable(shell.user_ns.get('return_value'))
+        conn.send(('done', True, cell_repr, None, return_value))
+    else:
+        error = result.error_in_exec if result.error_in_exec is not None else result.error_before_exec
+        if isinstance(error, CpuTimeExceeded):
+            error_msg = f"执行超时: CPU时间超过 {cpu_timeout} 秒"
+        else:
+            error_msg = str(error)
+        conn.send(('done', False, None, error_msg, None))
+
+
+def kernel_main(conn):
+    """子进程入口：循环处理父进程发来的命令"""
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    shell = _create_shell()
+    conn.send(('ok',))
+
+    while True:
+        try:
+            message = conn.recv()
+        except KeyboardInterrupt:
+            # 父进程在执行结束的瞬间发来的中断，忽略
+            continue
+        except EOFError:
+            break
+
+        command = message[0]
+        try:
+            if command == 'exec':
+                _execute(shell, conn, message[1], message[2])
+            elif command == 'get':
+                conn.send(('value', _picklable(shell.user_ns.get(message[1]))))
+            elif command == 'set':
+                shell.user_ns[message[1]] = message[2]
+                conn.send(('ok',))
+            elif command == 'reset':
+                shell.reset(new_session=False)
+                _setup_environment(shell)
+                conn.send(('ok',))
+            elif command == 'shutdown':
+                break
+            else:
+                conn.send(('error', f"未知命令: {command}"))
+        except KeyboardInterrupt:
+            conn.send(('done', False, None, "执行被中断", None))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+    conn.close()
@@ -81,16 +81,13 @@ def execute_code(code: str, work_dir: str = None):
             'stderr': str(e)
         }
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage,SystemMessage,BaseMessage,FunctionMessage
 from langchain_core.language_models import BaseChatModel
 from typing import Callable, Dict, List, Optional, Tuple, Union,Literal, Iterator
-from langchain.prompts import ChatPromptTemplate,PromptTemplate
+from langchain_core.prompts import ChatPromptTemplate,PromptTemplate
 import subprocess
 import time
 import inspect
-from IPython.terminal.interactiveshell import TerminalInteractiveShell
-from IPython.utils.capture import capture_output
 import prompts
 # from jupyterNotebookAutomation import CodeTracker,create_ipython_wrapper,get_functions,get_user_variables
 import tempfile
@@ -98,7 +95,6 @@ from dotenv import load_dotenv
 from importlib import import_module
 from types import ModuleType
 import inspect
-import IPython
 from functools import wraps  # 确保这行存在于导入部分
 import sys
 import logging
@@ -141,24 +137,15 @@ from prompts import default_evaluate_message
 # 导入AgentBase和Result
 from agent_base import AgentBase, Result,reduce_memory_decorator,reduce_memory_decorator_compress
 
-from langchain_community.cache import SQLiteCache
-from langchain_core.globals import set_llm_cache
-set_llm_cache(SQLiteCache(database_path=".langchain.db"))
+# 全局LLM缓存由 python_core 在导入时安装（第一次调用LLM时才创建 SQLiteCache），两个模块共用同一个缓存
+import python_core  # noqa: F401
 
 # from langchain_community.cache import InMemoryCache
 # from langchain_core.globals import set_llm_cache
 
 # set_llm_cache(InMemoryCache())
-import httpx
-# 创建一个httpx.Client
-http_client=httpx.Client(
-    proxy='socks5://127.0.0.1:7890',
-    timeout=10,
-    verify=False
-)
-
-from langchain_cohere import ChatCohere
 from abc import abstractmethod
+from llm_lazy import lazy_model_attributes
 
 max_messages=50
 
@@ -177,301 +164,268 @@ max_messages=50
 #     max_tokens=8192,
 # )
 
-llm_gemini_2_flash_lite_google=ChatOpenAI(
-    temperature=0,
-    model="gemini-2.0-flash-lite-preview-02-05", # deepseek-chat deepseek-coder 
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    http_client=http_client
-)
-
-llm_gemini_2_5_pro_exp_03_25_google=ChatOpenAI(
-    temperature=0,
-    model="gemini-2.5-pro-exp-03-25", 
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    http_client=http_client
-)
-
-llm_gemini_2_5_pro_preview_05_06_google=ChatOpenAI(
-    temperature=0,
-    model="gemini-2.5-pro-preview-05-06", 
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    http_client=http_client
-)
-
-llm_gemini_2_5_pro_preview_06_05_google=ChatOpenAI(
-    temperature=0,
-    model="gemini-2.5-pro-preview-06-05", 
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    http_client=http_client
-)
-
-
-llm_gemini_2_flash_google=ChatOpenAI(
-    temperature=0,
-    model="gemini-2.0-flash", # deepseek-chat deepseek-coder 
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    max_tokens=4096,
-    http_client=http_client
-)
-
-llm_gemini_2_5_flash_google=ChatOpenAI(
-    temperature=0,
-    model="models/gemini-2.5-flash",  
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    max_tokens=4096,
-    http_client=http_client
-)
-
-llm_gemini_2_5_pro_google=ChatOpenAI(
-    temperature=0,
-    model="gemini-2.5-pro",  
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=os.getenv('GEMINI_API_KEY'),
-    max_tokens=4096,
-    http_client=http_client
-)
-
-
-llm_Qwen_QwQ_32B_siliconflow=ChatOpenAI(
-    temperature=0,
-    model="Qwen/QwQ-32B", # deepseek-chat deepseek-coder 
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_DeepSeek_R1_Distill_Qwen_32B=ChatOpenAI(
-    temperature=0,
-    model="deepseek-ai/DeepSeek-R1-Distill-Qwen-32B", # deepseek-chat deepseek-coder 
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_DeepSeek_V3_siliconflow=ChatOpenAI(
-    temperature=0,
-    model="deepseek-ai/DeepSeek-V3", 
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=4096
-)
-
-llm_Pro_DeepSeek_V3_siliconflow=ChatOpenAI(
-    temperature=0,
-    model="Pro/deepseek-ai/DeepSeek-V3", 
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=4096
-)
-
-llm_DeepSeek_R1_siliconflow=ChatOpenAI(
-    temperature=0,
-    model="deepseek-ai/DeepSeek-R1", 
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_Pro_DeepSeek_R1_siliconflow=ChatOpenAI(
-    temperature=0,
-    model="Pro/deepseek-ai/DeepSeek-R1", 
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_Qwen_2_5_Coder_32B_Instruct_siliconflow=ChatOpenAI(
-    temperature=0,
-    model="Qwen/Qwen2.5-Coder-32B-Instruct", 
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_DeepSeek_R1_Distill_Qwen_32B_siliconflow=ChatOpenAI(
-    temperature=0,
-    model="deepseek-ai/DeepSeek-R1-Distill-Qwen-32B", 
-    base_url="https://api.siliconflow.cn/v1",
-    api_key=os.getenv('SILICONFLOW_API_KEY'),
-    max_tokens=8192
-)
-
-llm_deepseek=ChatOpenAI(
-    temperature=0,
-    model="deepseek-chat",  
-    base_url="https://api.deepseek.com",
-    api_key=os.getenv('DEEPSEEK_API_KEY'),
-    max_tokens=8192
-)
-
-llm_deepseek_r1=ChatOpenAI(
-    temperature=0.6,
-    model="deepseek-reasoner",  
-    base_url="https://api.deepseek.com",
-    api_key=os.getenv('DEEPSEEK_API_KEY'),
-    max_tokens=8192
-)
-
-# llm_gemini_25_pro_requesty=ChatOpenAI(
-#     temperature=0,
-#     model="google/gemini-2.5-pro-exp-03-25",  
-#     base_url="https://router.requesty.ai/v1",
-#     api_key=os.getenv('REQUESTY_API_KEY'),
-# )
+# 模型定义：变量名 -> ChatOpenAI参数（api_key_env 为API密钥所在的环境变量）。
+# 模型变量在首次访问 pythonTask.llm_xxx 时才创建，共享 http_pool 中的HTTP连接池，
+# use_proxy 的模型（Gemini 官方接口）走本地代理，其余模型直连
+_MODEL_SPECS = {
+    'llm_gemini_2_flash_lite_google': {
+        'model': 'gemini-2.0-flash-lite-preview-02-05',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_exp_03_25_google': {
+        'model': 'gemini-2.5-pro-exp-03-25',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_preview_05_06_google': {
+        'model': 'gemini-2.5-pro-preview-05-06',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_preview_06_05_google': {
+        'model': 'gemini-2.5-pro-preview-06-05',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'temperature': 0,
+    },
+    'llm_gemini_2_flash_google': {
+        'model': 'gemini-2.0-flash',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_flash_google': {
+        'model': 'models/gemini-2.5-flash',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_google': {
+        'model': 'gemini-2.5-pro',
+        'base_url': 'https://generativelanguage.googleapis.com/v1beta/openai/',
+        'api_key_env': 'GEMINI_API_KEY',
+        'use_proxy': True,
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+    'llm_Qwen_QwQ_32B_siliconflow': {
+        'model': 'Qwen/QwQ-32B',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_DeepSeek_R1_Distill_Qwen_32B': {
+        'model': 'deepseek-ai/DeepSeek-R1-Distill-Qwen-32B',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_DeepSeek_V3_siliconflow': {
+        'model': 'deepseek-ai/DeepSeek-V3',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+    'llm_Pro_DeepSeek_V3_siliconflow': {
+        'model': 'Pro/deepseek-ai/DeepSeek-V3',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 4096,
+        'temperature': 0,
+    },
+    'llm_DeepSeek_R1_siliconflow': {
+        'model': 'deepseek-ai/DeepSeek-R1',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_Pro_DeepSeek_R1_siliconflow': {
+        'model': 'Pro/deepseek-ai/DeepSeek-R1',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_Qwen_2_5_Coder_32B_Instruct_siliconflow': {
+        'model': 'Qwen/Qwen2.5-Coder-32B-Instruct',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_DeepSeek_R1_Distill_Qwen_32B_siliconflow': {
+        'model': 'deepseek-ai/DeepSeek-R1-Distill-Qwen-32B',
+        'base_url': 'https://api.siliconflow.cn/v1',
+        'api_key_env': 'SILICONFLOW_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_deepseek': {
+        'model': 'deepseek-chat',
+        'base_url': 'https://api.deepseek.com',
+        'api_key_env': 'DEEPSEEK_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0,
+    },
+    'llm_deepseek_r1': {
+        'model': 'deepseek-reasoner',
+        'base_url': 'https://api.deepseek.com',
+        'api_key_env': 'DEEPSEEK_API_KEY',
+        'max_tokens': 8192,
+        'temperature': 0.6,
+    },
+
+    # llm_gemini_25_pro_requesty=ChatOpenAI(
+    #     temperature=0,
+    #     model="google/gemini-2.5-pro-exp-03-25",
+    #     base_url="https://router.requesty.ai/v1",
+    #     api_key=os.getenv('REQUESTY_API_KEY'),
+    # )
+    'llm_qwen_2_5_72b_instruct': {
+        'model': 'qwen/qwen-2.5-72b-instruct',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gpt_4o_mini_openrouter': {
+        'model': 'openai/gpt-4o-mini',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_flash_preview_thinking_openrouter': {
+        'model': 'google/gemini-2.5-flash-preview:thinking',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_flash_preview_openrouter': {
+        'model': 'google/gemini-2.5-flash-preview',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_5_pro_exp_03_25_openrouter': {
+        'model': 'google/gemini-2.5-pro-exp-03-25:free',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_llama_4_scout_openrouter': {
+        'model': 'meta-llama/llama-4-scout',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_llama_4_maverick_openrouter': {
+        'model': 'meta-llama/llama-4-maverick',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_qwen_2_5_coder_32b_instruct': {
+        'model': 'qwen/qwen-2.5-coder-32b-instruct',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_qwq_32b': {
+        'model': 'qwen/qwq-32b',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_claude_35_sonnet': {
+        'model': 'anthropic/claude-3.5-sonnet:beta',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_claude_37_sonnet': {
+        'model': 'anthropic/claude-3.7-sonnet',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_claude_sonnet_4': {
+        'model': 'anthropic/claude-sonnet-4',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_deepseek_r1_free_openrouter': {
+        'model': 'deepseek/deepseek-r1:free',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_claude_37_sonnet_thinking': {
+        'model': 'anthropic/claude-3.7-sonnet:thinking',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_o3_mini': {
+        'model': 'openai/o3-mini',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_flash_thinking_exp_free_openrouter': {
+        'model': 'google/gemini-2.0-flash-thinking-exp:free',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_flash_openrouter': {
+        'model': 'google/gemini-2.0-flash-001',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_gemini_2_flash_lite_openrouter': {
+        'model': 'google/gemini-2.0-flash-lite-preview-02-05:free',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_deepseek_openrouter': {
+        'model': 'deepseek/deepseek-chat-v3-0324:NovitaAI',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_deepseek_r1_openrouter': {
+        'model': 'deepseek/deepseek-r1',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+    'llm_optimus_alpha_openrouter': {
+        'model': 'openrouter/optimus-alpha',
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'temperature': 0,
+    },
+}
 
-llm_qwen_2_5_72b_instruct = ChatOpenAI(
-    temperature=0,
-    model="qwen/qwen-2.5-72b-instruct", #"openai/gpt-4o-mini", #"openai/gpt-4o",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gpt_4o_mini_openrouter = ChatOpenAI(
-    temperature=0,
-    model="openai/gpt-4o-mini", #"openai/gpt-4o-mini", #"openai/gpt-4o",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_5_flash_preview_thinking_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.5-flash-preview:thinking", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_5_flash_preview_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.5-flash-preview", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_5_pro_exp_03_25_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.5-pro-exp-03-25:free", #"openai/gpt-4o-mini", #"openai/gpt-4o",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_llama_4_scout_openrouter = ChatOpenAI(
-    temperature=0,
-    model="meta-llama/llama-4-scout", #"openai/gpt-4o-mini", #"openai/gpt-4o",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_llama_4_maverick_openrouter = ChatOpenAI(
-    temperature=0,
-    model="meta-llama/llama-4-maverick", #"openai/gpt-4o-mini", #"openai/gpt-4o",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_qwen_2_5_coder_32b_instruct = ChatOpenAI(
-    temperature=0,
-    model="qwen/qwen-2.5-coder-32b-instruct", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_qwq_32b = ChatOpenAI(
-    temperature=0,
-    model="qwen/qwq-32b", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_claude_35_sonnet = ChatOpenAI(
-    temperature=0,
-    model="anthropic/claude-3.5-sonnet:beta", #"openai/gpt-4o-mini", #"openai/gpt-4o",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_claude_37_sonnet = ChatOpenAI(
-    temperature=0,
-    model="anthropic/claude-3.7-sonnet", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_claude_sonnet_4 = ChatOpenAI(
-    temperature=0,
-    model="anthropic/claude-sonnet-4", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_deepseek_r1_free_openrouter = ChatOpenAI(
-    temperature=0,
-    model="deepseek/deepseek-r1:free",
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_claude_37_sonnet_thinking = ChatOpenAI(
-    temperature=0,
-    model="anthropic/claude-3.7-sonnet:thinking", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_o3_mini = ChatOpenAI(
-    temperature=0,
-    model="openai/o3-mini", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_flash_thinking_exp_free_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.0-flash-thinking-exp:free", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-
-
-llm_gemini_2_flash_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.0-flash-001", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_gemini_2_flash_lite_openrouter = ChatOpenAI(
-    temperature=0,
-    model="google/gemini-2.0-flash-lite-preview-02-05:free", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_deepseek_openrouter = ChatOpenAI(
-    temperature=0,
-    model="deepseek/deepseek-chat-v3-0324:NovitaAI", 
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_deepseek_r1_openrouter = ChatOpenAI(
-    temperature=0,
-    model="deepseek/deepseek-r1",     base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-)
-
-llm_optimus_alpha_openrouter = ChatOpenAI(
-        temperature=0,
-        model="openrouter/optimus-alpha", #"openai/gpt-4o-mini", #"openai/gpt-4o",
-        base_url='https://openrouter.ai/api/v1',
-        api_key=os.getenv('OPENROUTER_API_KEY'),
-)
+__getattr__ = lazy_model_attributes(__name__, _MODEL_SPECS)
 
 class Device:
     '''
@@ -2054,8 +2008,8 @@ def get_llm_lazy(model_name: str):
     attr_name = _LAZY_MODEL_MAPPING[model_name]
     
     # 检查模型是否已经在当前模块中定义
-    if attr_name in globals():
-        model = globals()[attr_name]
+    if attr_name in _MODEL_SPECS:
+        model = __getattr__(attr_name)
         print(f"✅ 成功获取模型: {model_name} -> {attr_name}")
         return model
     else:
@@ -13,9 +13,13 @@ import tempfile
 import subprocess
 import time
 import inspect
+import asyncio
+import threading
 from importlib import import_module
-from typing import Callable, Dict, List, Optional, Tuple, Union, Literal, Iterator
+from typing import Callable, Dict, List, Optional, Tuple, Union, Literal, Iterator, AsyncIterator
 from functools import wraps
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from dotenv import load_dotenv
 
 # 导入psutil补丁
@@ -67,11 +71,11 @@ def extract_code(text: str, lang: str = None):
 # 导入核心依赖
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, SystemMessage, BaseMessage, FunctionMessage
 from langchain_core.language_models import BaseChatModel
-from langchain.prompts import ChatPromptTemplate, PromptTemplate
-from IPython.terminal.interactiveshell import TerminalInteractiveShell
-from IPython.utils.capture import capture_output
+from langchain_core.caches import BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 import prompts
-import IPython
+# IPython 只在创建 StatefulExecutor 时导入（见 StatefulExecutor._create_ipython_instance）
 
 # 配置日志
 if not logging.getLogger().handlers:
@@ -102,11 +106,36 @@ max_turn = 5
 # 导入AgentBase和Result
 from agent_base import AgentBase, Result, reduce_memory_decorator, reduce_memory_decorator_compress
 from prompts import default_evaluate_message
+from llm_cache import LLMResponseCache, get_llm_cache, make_cache_key, invoke_with_cache, ainvoke_with_cache
 
-# 缓存配置
-from langchain_community.cache import SQLiteCache
-from langchain_core.globals import set_llm_cache
-set_llm_cache(SQLiteCache(database_path=".langchain.db"))
+# 缓存配置：导入时安装全局缓存，但 langchain_community 导入较慢，
+# 第一次查询或写入缓存（即第一次调用LLM）时才创建 SQLiteCache
+class _LazySQLiteCache(BaseCache):
+    """首次使用时才创建 SQLiteCache 的全局LLM缓存"""
+
+    def __init__(self, database_path: str):
+        self._database_path = database_path
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def _get_cache(self):
+        if self._cache is None:
+            with self._lock:
+                if self._cache is None:
+                    from langchain_community.cache import SQLiteCache
+                    self._cache = SQLiteCache(database_path=self._database_path)
+        return self._cache
+
+    def lookup(self, prompt, llm_string):
+        return self._get_cache().lookup(prompt, llm_string)
+
+    def update(self, prompt, llm_string, return_val):
+        self._get_cache().update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs):
+        self._get_cache().clear(**kwargs)
+
+set_llm_cache(_LazySQLiteCache(database_path=".langchain.db"))
 
 max_messages = 50
 
@@ -145,15 +174,144 @@ class Device:
                 except:
                     pass
 
+# 执行输出默认保留的开头/结尾字符数
+DEFAULT_OUTPUT_HEAD_CHARS = 10000
+DEFAULT_OUTPUT_TAIL_CHARS = 10000
+
+class BoundedOutputCapture:
+    '''
+    有界的输出捕获缓冲区。
+    
+    只保留输出开头的 head_chars 个字符和结尾的 tail_chars 个字符（结尾部分是按块存放的环形缓冲），
+    同时统计输出的总字符数和总字节数。无论代码打印多少内容，内存占用都保持不变。
+    启用 spill 时，超出保留范围后会把完整输出写入临时文件。
+    head_chars 或 tail_chars 为 None 时不做截断。
+    '''
+    def __init__(self, head_chars: Optional[int] = DEFAULT_OUTPUT_HEAD_CHARS,
+                 tail_chars: Optional[int] = DEFAULT_OUTPUT_TAIL_CHARS,
+                 spill: bool = False, spill_dir: Optional[str] = None):
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.unbounded = head_chars is None or tail_chars is None
+        self.spill = spill
+        self.spill_dir = spill_dir
+        self.total_chars = 0
+        self.total_bytes = 0
+        self.spill_path = None
+        self._spill_file = None
+        self._head = []
+        self._head_len = 0
+        self._tail = deque()
+        self._tail_len = 0
+    
+    @property
+    def truncated(self) -> bool:
+        return self.total_chars > self._head_len + self._tail_len
+    
+    def write(self, text: str) -> int:
+        if not text:
+            return 0
+        written = len(text)
+        self.total_chars += written
+        self.total_bytes += len(text.encode('utf-8', errors='replace'))
+        if self._spill_file is not None:
+            self._spill_file.write(text)
+        
+        if self.unbounded:
+            self._head.append(text)
+            self._head_len += len(text)
+            return written
+        
+        # 先填满开头部分
+        if self._head_len < self.head_chars:
+            room = self.head_chars - self._head_len
+            self._head.append(text[:room])
+            self._head_len += len(text[:room])
+            text = text[room:]
+            if not text:
+                return written
+        
+        # 结尾部分：按块追加，超出 tail_chars 时从左侧丢弃
+        if self.spill and self._spill_file is None and self._tail_len + len(text) > self.tail_chars:
+            self._open_spill_file()
+            self._spill_file.write(text)
+        self._tail.append(text)
+        self._tail_len += len(text)
+        while self._tail_len > self.tail_chars:
+            overflow = self._tail_len - self.tail_chars
+            first = self._tail[0]
+            if len(first) <= overflow:
+                self._tail.popleft()
+                self._tail_len -= len(first)
+            else:
+                self._tail[0] = first[overflow:]
+                self._tail_len -= overflow
+        return written
+    
+    def _open_spill_file(self) -> None:
+        """第一次溢出时创建文件，并写入此前保留的全部输出（此时尚未丢弃任何内容）"""
+        fd, self.spill_path = tempfile.mkstemp(prefix='agent_stdout_', suffix='.log', dir=self.spill_dir)
+        self._spill_file = os.fdopen(fd, 'w', encoding='utf-8', errors='replace')
+        self._spill_file.write(''.join(self._head))
+        self._spill_file.write(''.join(self._tail))
+    
+    def flush(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.flush()
+    
+    def close(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+    
+    def getvalue(self) -> str:
+        '''返回截断后的输出视图：开头 + 省略说明 + 结尾'''
+        head = ''.join(self._head)
+        tail = ''.join(self._tail)
+        if not self.truncated:
+            return head + tail
+        omitted = self.total_chars - self._head_len - self._tail_len
+        note = f"\n...[输出过长，已省略中间 {omitted} 个字符"
+        if self.spill_path:
+            note += f"，完整输出见 {self.spill_path}"
+        note += "]...\n"
+        return head + note + tail
+    
+    def result_kwargs(self) -> Dict[str, object]:
+        '''构造 Result 的截断信息参数'''
+        return {
+            'stdout_total_bytes': self.total_bytes,
+            'stdout_truncated': self.truncated,
+            'stdout_file': self.spill_path,
+        }
+
 class StatefulExecutor(Device):
     '''
     有状态的执行器，执行Python代码。
     使用IPython实现状态保持。
     '''
-    def __init__(self):
+    def __init__(self, isolated: bool = False,
+                 output_head_chars: Optional[int] = DEFAULT_OUTPUT_HEAD_CHARS,
+                 output_tail_chars: Optional[int] = DEFAULT_OUTPUT_TAIL_CHARS,
+                 spill_output: bool = False, spill_dir: Optional[str] = None):
+        '''
+        参数:
+        isolated (bool): 为True时创建独立的IPython实例（拥有自己的命名空间），
+            默认共享进程级的IPython单例。执行器池中的执行器需要相互隔离。
+        output_head_chars (int): 捕获输出时保留的开头字符数，None 表示不截断
+        output_tail_chars (int): 捕获输出时保留的结尾字符数，None 表示不截断
+        spill_output (bool): 输出被截断时是否把完整输出写入临时文件（路径见 Result.stdout_file）
+        spill_dir (str): 溢出文件所在目录，默认使用系统临时目录
+        '''
         # 预先配置matplotlib使用非交互式后端
         os.environ['MPLBACKEND'] = 'Agg'
         os.environ['MATPLOTLIBRC'] = '/dev/null'
+        self.isolated = isolated
+        self.output_head_chars = output_head_chars
+        self.output_tail_chars = output_tail_chars
+        self.spill_output = spill_output
+        self.spill_dir = spill_dir
+        self.created_at = time.time()
         self.ipython = self._create_ipython_instance()
     
     def execute_code(self, code: str) -> Result:
@@ -161,7 +319,6 @@ class StatefulExecutor(Device):
         执行给定的Python代码，并返回执行结果。
         '''
         import sys
-        from io import StringIO
         
         output = ""
         
@@ -173,7 +330,7 @@ class StatefulExecutor(Device):
                 error_msg = f"语法错误: {str(e)}"
                 return Result(False, code, stdout="", stderr=error_msg, return_value=None)
             
-            captured_output = StringIO()
+            captured_output = self._create_output_capture()
             original_stdout = sys.stdout
             original_stderr = sys.stderr
             
@@ -219,33 +376,50 @@ class StatefulExecutor(Device):
             
             try:
                 result = self.ipython.run_cell(code)
-                output = captured_output.getvalue()
+                sys.stdout = original_stdout
+                sys.stderr = original_stderr
                 
                 if result.success and result.error_in_exec is None:
                     cell_result = result.result
                     
                     if cell_result is not None:
-                        if output:
-                            output += "\n"
-                        output += repr(cell_result)
+                        if captured_output.total_chars:
+                            captured_output.write("\n")
+                        captured_output.write(repr(cell_result))
+                    output = captured_output.getvalue()
                     return_value = self.get_variable('return_value')
-                    return Result(True, code, stdout=output, stderr=None, return_value=return_value)
+                    return Result(True, code, stdout=output, stderr=None, return_value=return_value,
+                                  **captured_output.result_kwargs())
                 else:
+                    output = captured_output.getvalue()
                     error_msg = str(result.error_in_exec)
                     if output:
                         error_msg = f"{output}\n{error_msg}"
-                    return Result(False, code, stdout=output, stderr=error_msg, return_value=None)
+                    return Result(False, code, stdout=output, stderr=error_msg, return_value=None,
+                                  **captured_output.result_kwargs())
             except Exception as e:
+                output = captured_output.getvalue()
                 error_msg = f"执行异常: {str(e)}"
-                return Result(False, code, stdout=output, stderr=error_msg, return_value=None)
+                return Result(False, code, stdout=output, stderr=error_msg, return_value=None,
+                              **captured_output.result_kwargs())
             finally:
                 sys.stdout = original_stdout
                 sys.stderr = original_stderr
+                captured_output.close()
             
         except Exception as e:
             error_msg = f"执行异常: {str(e)}"
             return Result(False, code, stdout=output, stderr=error_msg, return_value=None)
     
+    def _create_output_capture(self) -> BoundedOutputCapture:
+        '''为一次执行创建输出捕获缓冲区'''
+        return BoundedOutputCapture(
+            head_chars=self.output_head_chars,
+            tail_chars=self.output_tail_chars,
+            spill=self.spill_output,
+            spill_dir=self.spill_dir,
+        )
+    
     def get_variable(self, var_name):
         '''获取IPython环境中的变量值'''
         return self.ipython.user_ns.get(var_name)
@@ -254,6 +428,18 @@ class StatefulExecutor(Device):
         '''在IPython环境中设置变量值'''
         self.ipython.user_ns[var_name] = value
         return True
+    
+    def reset(self) -> bool:
+        '''清空IPython命名空间并重新完成环境初始化，返回是否成功'''
+        if self.ipython is None:
+            return False
+        try:
+            self.ipython.reset(new_session=False)
+            self._setup_environment(self.ipython)
+            return True
+        except Exception as e:
+            logging.warning(f"重置IPython实例失败: {e}")
+            return False
       
     def _create_ipython_instance(self):
         """创建一个IPython实例用于执行代码"""
@@ -263,17 +449,25 @@ class StatefulExecutor(Device):
             c = Config()
             c.InteractiveShell.autoindent = False
             c.InteractiveShell.colors = 'NoColor'
-            ipython = InteractiveShell.instance(config=c, display_banner=False)
+            if self.isolated:
+                # 独立实例可能在其他线程中创建，不使用基于SQLite的历史记录
+                c.HistoryManager.enabled = False
+                ipython = InteractiveShell(config=c)
+            else:
+                ipython = InteractiveShell.instance(config=c, display_banner=False)
             
-            try:
-                ipython.run_cell("import matplotlib\nmatplotlib.use('Agg')")
-            except Exception:
-                pass
-                
+            self._setup_environment(ipython)
             return ipython
         except ImportError:
             logging.error("无法导入IPython，某些功能可能不可用")
             return None
+    
+    def _setup_environment(self, ipython):
+        """在IPython实例中完成matplotlib等环境初始化"""
+        try:
+            ipython.run_cell("import matplotlib\nmatplotlib.use('Agg')")
+        except Exception:
+            pass
 
 class Thinker(AgentBase):
     '''
@@ -282,9 +476,11 @@ class Thinker(AgentBase):
     def __init__(self, llm: BaseChatModel, max_retries: int = 10, 
                  thinker_system_message: str = None,
                  thinker_chat_system_message: str = None,
-                 device: Device = None):
+                 device: Device = None, response_cache: LLMResponseCache = None):
         super().__init__(llm, thinker_system_message)
         self.llm = llm
+        # 生成最终结果的响应缓存，None 时使用 llm_cache 的全局缓存
+        self.response_cache = response_cache
         self.thinker_system_message = thinker_system_message
         self.thinker_chat_system_message = thinker_chat_system_message
         self.device = device
@@ -471,52 +667,197 @@ class Thinker(AgentBase):
         
         yield Result(False, self.current_code, None, None, "超过最大尝试次数，编程失败。")
 
-    def generateResult_sync(self, instruction: str, result: Result) -> str:
-        '''生成最终结果'''
-        logger.info('开始生成指令最终结果')
-        logger.info(f'result.success: {result.success}')
-        logger.info(f'result.code: {result.code}')
-        logger.info(f'result.stdout: {result.stdout}')
-        logger.info(f'result.stderr: {result.stderr}')
-        logger.info(f'result.return_value: {result.return_value}')
-        
-        stdout = result.stdout or ""
-        stderr = result.stderr or ""
-        return_value = result.return_value or ""
-        code = result.code or ""
+    @reduce_memory_decorator_compress
+    async def chat_async(self, message: str, response_format: Optional[Dict] = None) -> Result:
+        """chat_sync 的异步版本，使用 llm.ainvoke"""
+        original_system = None
+        if len(self.memory) > 0 and isinstance(self.memory[0], SystemMessage):
+            original_system = self.memory[0]
+            self.memory.remove(original_system)
+            
+        self.memory.insert(0, SystemMessage(self.thinker_chat_system_message))
+        self.memory.append(HumanMessage(message))
         
-        last_5000_chars = stdout[-5000:] if len(stdout) > 5000 else stdout
+        try:
+            if response_format is not None:
+                response = (await self.llm.ainvoke(self.memory, response_format=response_format)).content
+            else:
+                response = (await self.llm.ainvoke(self.memory)).content
+            self.memory.append(AIMessage(response))
+        finally:
+            self.memory.remove(self.memory[0])
+            if original_system:
+                self.memory.insert(0, original_system)
+            if len(self.memory) > 0 and isinstance(self.memory[-1], HumanMessage):
+                self.memory.pop()
         
-        generate_result_prompt = f'''
-        我是个语言模型，根据用户的指令，我生成了Python代码，并执行了代码。
-        请根据用户指令给用户生成回复。
+        return Result(True, "", "", None, response)
 
-        # 用户指令：
-        
-        {instruction}
+    @reduce_memory_decorator_compress
+    async def chat_astream(self, message: str, response_format: Optional[Dict] = None) -> AsyncIterator[object]:
+        """chat_stream 的异步版本，使用 llm.astream"""
+        original_system = None
+        if len(self.memory) > 0 and isinstance(self.memory[0], SystemMessage):
+            original_system = self.memory[0]
+            self.memory.remove(original_system)
+        try:
+            self.memory.insert(0, SystemMessage(self.thinker_chat_system_message))
+            self.memory.append(HumanMessage(message))
+            content = ''
+            stream_kwargs = {'response_format': response_format} if response_format is not None else {}
+            async for chunk in self.llm.astream(self.memory, **stream_kwargs):
+                content += chunk.content
+                yield chunk.content
+            self.memory.append(AIMessage(content))
+        finally:
+            self.memory.remove(self.memory[0])
+            if original_system:
+                self.memory.insert(0, original_system)
+            if len(self.memory) > 0 and isinstance(self.memory[-1], HumanMessage):
+                self.memory.pop()
+        yield Result(True, "", "", None, content)
 
-        # 任务是否执行成功：
-        {result.success}
+    @reduce_memory_decorator_compress
+    async def execute_async(self, instruction: str = None) -> Result:
+        '''execute_sync 的异步版本：LLM 调用使用 ainvoke，代码在工作线程中执行'''
+        current_instruction = instruction
+        
+        for i in range(self.max_retries):
+            # 生成代码
+            self.memory.append(HumanMessage(current_instruction))
+            content = (await self.llm.ainvoke(self.memory)).content
+            self.memory.append(AIMessage(content))
+            
+            # 提取代码
+            try:
+                extracted = extract_code(content)
+                if not extracted:
+                    current_instruction = "无法从响应中提取代码，请重试。"
+                    continue
+                
+                self.current_code = ''
+                for language, code in extracted:
+                    if language == 'python':
+                        self.current_code += '\n' + code
+                
+            except Exception as e:
+                error_msg = f"代码提取失败：{str(e)}"
+                current_instruction = error_msg
+                continue
+            
+            # 执行代码（放到工作线程，避免阻塞事件循环）
+            try:
+                result = await asyncio.to_thread(self.device.execute_code, self.current_code)
+                
+                if result.success:
+                    self.memory.append(HumanMessage(f"当前执行结果：{result}"))
+                    self.memory.append(AIMessage('ok'))
+                    return result
+                else:
+                    self.memory.append(HumanMessage(f"代码执行失败：{result}"))
+                    self.memory.append(AIMessage('failure'))
+                    current_instruction = f"代码执行失败，请修改代码。\n当前代码输出：{result.stdout}\n当前代码错误：{result.stderr}\n当前代码返回值：{result.return_value}"
+                    continue
+            except Exception as e:
+                error_msg = f"执行异常: {str(e)}"
+                current_instruction = error_msg
+                continue
+            
+        return Result(False, self.current_code, "超过最大尝试次数，编程失败。")
 
-        # 代码：
-        {code}
+    @reduce_memory_decorator_compress
+    async def execute_astream(self, instruction: str = None) -> AsyncIterator[object]:
+        '''execute_stream 的异步版本：LLM 调用使用 astream，代码在工作线程中执行'''
+        current_instruction = instruction
+        
+        for i in range(self.max_retries):
+            # 生成代码
+            self.memory.append(HumanMessage(current_instruction))
+            content = ''
+            async for chunk in self.llm.astream(self.memory):
+                content += chunk.content
+                yield chunk.content
+            self.memory.append(AIMessage(content))
 
-        # 代码执行的标准输出：
+            # 提取代码
+            try:
+                extracted = extract_code(content)
+                if not extracted:
+                    current_instruction = "无法从响应中提取代码，请重试。"
+                    yield Result(False, '', '', '', "无法从响应中提取代码，请重试。")
+                    continue
 
-        {last_5000_chars}
+                self.current_code = extracted[0][1]
+            except Exception as e:
+                error_msg = f"代码提取失败：{str(e)}"
+                current_instruction = error_msg
+                yield Result(False, '', '', '', error_msg)
+                continue
+            
+            try:
+                # 执行代码（放到工作线程，避免阻塞事件循环）
+                result = await asyncio.to_thread(self.device.execute_code, self.current_code)
+                
+                stdout = result.stdout or ""
+                stderr = result.stderr or ""
+                try:
+                    return_value = result.return_value or ""
+                except:
+                    return_value = ""
+                
+                yield 'Thinker execute_astream'
+                yield "\n当前命令：" + current_instruction
+                yield "\n当前代码：" + self.current_code
+                yield "\n当前标准输出：" + stdout
+                yield "\n当前标准错误：" + stderr
+                try:
+                    yield "\n当前返回值：" + str(return_value)
+                except:
+                    yield "\n当前返回值：无法转换为字符串的结果"
+                
+                if result.success:
+                    self.memory.append(HumanMessage(f"当前执行结果：{result}"))
+                    self.memory.append(AIMessage('ok'))
+                    yield result
+                    return
+                else:
+                    self.memory.append(HumanMessage(f"代码执行失败：{result}"))
+                    self.memory.append(AIMessage('failure'))
+                    yield result
+                    current_instruction = f"代码执行失败，请修改代码。\n当前代码输出：{result.stdout}\n当前代码错误：{result.stderr}\n当前代码返回值：{result.return_value}"
+                    continue
+            except Exception as e:
+                error_msg = "执行异常: " + str(e)
+                yield error_msg
+                current_instruction = error_msg
+                continue
+        
+        yield Result(False, self.current_code, None, None, "超过最大尝试次数，编程失败。")
 
-        # 代码执行的标准错误：
+    def generateResult_sync(self, instruction: str, result: Result) -> str:
+        '''生成最终结果'''
+        generate_result_prompt = self._build_generate_result_prompt(instruction, result)
+        content = invoke_with_cache(self.llm, generate_result_prompt, self.response_cache)
+        return content
 
-        {stderr}
+    def generateResult_stream(self, instruction: str, result: Result) -> Iterator[str]:
+        generate_result_prompt = self._build_generate_result_prompt(instruction, result, stream=True)
+        for chunk in self.llm.stream(generate_result_prompt):
+            yield chunk.content
 
-        # 代码执行的返回值：
+    async def generateResult_async(self, instruction: str, result: Result) -> str:
+        '''generateResult_sync 的异步版本'''
+        generate_result_prompt = self._build_generate_result_prompt(instruction, result)
+        return await ainvoke_with_cache(self.llm, generate_result_prompt, self.response_cache)
 
-        {return_value}
-        '''
-        content = self.llm.invoke(generate_result_prompt).content
-        return content
+    async def generateResult_astream(self, instruction: str, result: Result) -> AsyncIterator[str]:
+        '''generateResult_stream 的异步版本'''
+        generate_result_prompt = self._build_generate_result_prompt(instruction, result, stream=True)
+        async for chunk in self.llm.astream(generate_result_prompt):
+            yield chunk.content
 
-    def generateResult_stream(self, instruction: str, result: Result) -> Iterator[str]:
+    def _build_generate_result_prompt(self, instruction: str, result: Result, stream: bool = False) -> str:
+        '''构建生成最终结果的提示（流式与非流式提示保持原有文本，以免破坏LLM缓存）'''
         logger.info('开始生成指令最终结果')
         logger.info(f'result.success: {result.success}')
         logger.info(f'result.code: {result.code}')
@@ -556,18 +897,20 @@ class Thinker(AgentBase):
         # 代码执行的返回值：
 
         {return_value}
-        
         '''
-        
-        for chunk in self.llm.stream(generate_result_prompt):
-            yield chunk.content
+        if stream:
+            generate_result_prompt += "\n        "
+        return generate_result_prompt
 
 class Evaluator:
     '''行为评估器'''
-    def __init__(self, llm: BaseChatModel, systemMessage: str, thinker: Thinker = None):
+    def __init__(self, llm: BaseChatModel, systemMessage: str, thinker: Thinker = None,
+                 response_cache: LLMResponseCache = None):
         self.llm = llm
         self.knowledges = []
         self.thinker = thinker
+        # 评估响应缓存，None 时使用 llm_cache 的全局缓存
+        self.response_cache = response_cache
         self.system_message = systemMessage
         if self.system_message is None:
             self.system_message = default_evaluate_message
@@ -577,16 +920,84 @@ class Evaluator:
         
     def evaluate(self, instruction: str, result: Result) -> Tuple[bool, str]:
         '''评估任务是否完成，返回值：是否完成，原因'''
-        import re
-        import json
+        prompt, early_result = self._prepare_evaluation(instruction, result)
+        if early_result is not None:
+            return early_result
         
-        code = result.code or ""
-        stdout = result.stdout or ""
+        cache, cache_key, evaluation = self._lookup_cached_evaluation(prompt)
+        if evaluation is not None:
+            return evaluation
+        
+        # 尝试使用LLM进行评估
+        counter = 0
+        while counter < 3:
+            try:
+                logging.debug(f"尝试LLM评估 (第{counter+1}次)")
+                x = self.llm.invoke(prompt)
+                evaluation = self._parse_evaluation(x.content)
+                if evaluation is None:
+                    counter += 1
+                    continue
+                if cache is not None:
+                    cache.set(cache_key, x.content)
+                return evaluation
+                
+            except Exception as e:
+                logging.error(f"评估过程出错: {str(e)}")
+                counter += 1
+        
+        return self._fallback_evaluation(result)
+
+    async def evaluate_async(self, instruction: str, result: Result) -> Tuple[bool, str]:
+        '''evaluate 的异步版本，使用 llm.ainvoke，不阻塞事件循环'''
+        prompt, early_result = self._prepare_evaluation(instruction, result)
+        if early_result is not None:
+            return early_result
+        
+        cache, cache_key, evaluation = self._lookup_cached_evaluation(prompt)
+        if evaluation is not None:
+            return evaluation
+        
+        counter = 0
+        while counter < 3:
+            try:
+                logging.debug(f"尝试LLM异步评估 (第{counter+1}次)")
+                x = await self.llm.ainvoke(prompt)
+                evaluation = self._parse_evaluation(x.content)
+                if evaluation is None:
+                    counter += 1
+                    continue
+                if cache is not None:
+                    cache.set(cache_key, x.content)
+                return evaluation
+                
+            except Exception as e:
+                logging.error(f"评估过程出错: {str(e)}")
+                counter += 1
+        
+        return self._fallback_evaluation(result)
+
+    def _lookup_cached_evaluation(self, prompt: str) -> Tuple[Optional[LLMResponseCache], Optional[str], Optional[Tuple[bool, str]]]:
+        '''查询评估响应缓存，返回 (缓存, 缓存键, 缓存的评估结果)；只有能解析的响应才会写入缓存'''
+        cache = self.response_cache if self.response_cache is not None else get_llm_cache()
+        if cache is None:
+            return None, None, None
+        cache_key = make_cache_key(self.llm, prompt)
+        cached = cache.get(cache_key)
+        if cached is None:
+            return cache, cache_key, None
+        evaluation = self._parse_evaluation(cached)
+        if evaluation is None:
+            cache.delete(cache_key)
+        return cache, cache_key, evaluation
+
+    def _prepare_evaluation(self, instruction: str, result: Result) -> Tuple[Optional[str], Optional[Tuple[bool, str]]]:
+        '''构建评估提示，返回 (提示, 提前结束的评估结果)'''
         stderr = result.stderr or ""
         
         # 检查是否有明显错误
         if stderr and ("Error" in stderr or "Exception" in stderr):
-            return False, f"代码执行出错: {stderr}"
+            return None, (False, f"代码执行出错: {stderr}")
         
         # 使用系统消息模板格式化提示
         try:
@@ -600,87 +1011,83 @@ class Evaluator:
             logging.debug(f"系统消息前100字符: {self.system_message[:100]}...")
         except Exception as e:
             logging.error(f"模板格式化错误: {str(e)}")
-            return False, f"评估模板格式化失败: {str(e)}"
+            return None, (False, f"评估模板格式化失败: {str(e)}")
         
-        # 尝试使用LLM进行评估
-        counter = 0
-        while counter < 3:
+        return prompt, None
+
+    def _parse_evaluation(self, content: str) -> Optional[Tuple[bool, str]]:
+        '''解析LLM评估响应，返回 (是否完成, 原因)，无法解析需要重试时返回 None'''
+        logging.debug(f"LLM评估响应长度: {len(content)} 字符")
+        logging.debug(f"LLM评估响应前200字符:\n{content[:200]}...")
+        
+        # 尝试从内容中提取代码块
+        extracted = extract_code(content)
+        if not extracted or len(extracted) == 0:
+            logging.debug("未从响应中提取到代码块，尝试直接解析JSON")
             try:
-                logging.debug(f"尝试LLM评估 (第{counter+1}次)")
-                x = self.llm.invoke(prompt)
-                content = x.content
-                logging.debug(f"LLM评估响应长度: {len(content)} 字符")
-                logging.debug(f"LLM评估响应前200字符:\n{content[:200]}...")
+                json_pattern = r'(\{.*"taskIsComplete"\s*:\s*(true|false).*\})'
+                match = re.search(json_pattern, content, re.DOTALL)
                 
-                # 尝试从内容中提取代码块
-                extracted = extract_code(content)
-                if not extracted or len(extracted) == 0:
-                    logging.debug("未从响应中提取到代码块，尝试直接解析JSON")
-                    try:
-                        json_pattern = r'(\{.*"taskIsComplete"\s*:\s*(true|false).*\})'
-                        match = re.search(json_pattern, content, re.DOTALL)
-                        
-                        if match:
-                            json_str = match.group(1)
-                            logging.debug(f"找到JSON字符串: {json_str}")
-                            j = json.loads(json_str)
-                        else:
-                            braces_pattern = r'(\{.*\})'
-                            match = re.search(braces_pattern, content, re.DOTALL)
-                            if match:
-                                json_str = match.group(1)
-                                logging.debug(f"找到可能的JSON字符串: {json_str}")
-                                try:
-                                    j = json.loads(json_str)
-                                except:
-                                    logging.debug("发现花括号内容，但非有效JSON")
-                                    is_complete = "true" in content.lower() and "false" not in content.lower()
-                                    reason = "无法解析评估结果，基于文本判断"
-                                    return is_complete, reason
-                            else:
-                                logging.debug("未找到JSON格式内容，尝试基于文本判断")
-                                is_complete = "true" in content.lower() and "false" not in content.lower()
-                                reason = "无法解析评估结果，基于文本判断"
-                                return is_complete, reason
-                    except Exception as e:
-                        logging.error(f"JSON解析失败(直接): {str(e)}")
-                        counter += 1
-                        continue
+                if match:
+                    json_str = match.group(1)
+                    logging.debug(f"找到JSON字符串: {json_str}")
+                    j = json.loads(json_str)
                 else:
-                    logging.debug(f"从响应中提取到代码块，语言: {extracted[0][0]}")
-                    try:
-                        j = json.loads(extracted[0][1])
-                    except:
-                        logging.debug("代码块不是有效的JSON，尝试清理后重新解析")
+                    braces_pattern = r'(\{.*\})'
+                    match = re.search(braces_pattern, content, re.DOTALL)
+                    if match:
+                        json_str = match.group(1)
+                        logging.debug(f"找到可能的JSON字符串: {json_str}")
                         try:
-                            cleaned_json = extracted[0][1].strip().replace("```", "").strip()
-                            logging.debug(f"清理后的JSON字符串: {cleaned_json[:100]}...")
-                            j = json.loads(cleaned_json)
-                        except Exception as e:
-                            logging.error(f"JSON解析失败(清理后): {str(e)}")
-                            counter += 1
-                            continue
-                
-                # 提取任务完成状态和原因
-                taskIsComplete = j.get('taskIsComplete', False)
-                reason = j.get('reason', '未提供评估原因')
-                
-                # 处理可能的字符串类型的布尔值
-                if isinstance(taskIsComplete, str):
-                    logging.debug(f"任务完成状态是字符串类型: '{taskIsComplete}'")
-                    taskIsComplete = taskIsComplete.lower() == 'true'
-                
-                logging.debug(f"任务是否完成：{taskIsComplete}")
-                logging.debug(f"原因：{reason}")
-                return taskIsComplete, reason
-                
+                            j = json.loads(json_str)
+                        except:
+                            logging.debug("发现花括号内容，但非有效JSON")
+                            is_complete = "true" in content.lower() and "false" not in content.lower()
+                            reason = "无法解析评估结果，基于文本判断"
+                            return is_complete, reason
+                    else:
+                        logging.debug("未找到JSON格式内容，尝试基于文本判断")
+                        is_complete = "true" in content.lower() and "false" not in content.lower()
+                        reason = "无法解析评估结果，基于文本判断"
+                        return is_complete, reason
             except Exception as e:
-                logging.error(f"评估过程出错: {str(e)}")
-                counter += 1
+                logging.error(f"JSON解析失败(直接): {str(e)}")
+                return None
+        else:
+            logging.debug(f"从响应中提取到代码块，语言: {extracted[0][0]}")
+            try:
+                j = json.loads(extracted[0][1])
+            except:
+                logging.debug("代码块不是有效的JSON，尝试清理后重新解析")
+                try:
+                    cleaned_json = extracted[0][1].strip().replace("```", "").strip()
+                    logging.debug(f"清理后的JSON字符串: {cleaned_json[:100]}...")
+                    j = json.loads(cleaned_json)
+                except Exception as e:
+                    logging.error(f"JSON解析失败(清理后): {str(e)}")
+                    return None
         
-        # 如果LLM评估失败，使用兜底规则
+        # 提取任务完成状态和原因
+        taskIsComplete = j.get('taskIsComplete', False)
+        reason = j.get('reason', '未提供评估原因')
+        
+        # 处理可能的字符串类型的布尔值
+        if isinstance(taskIsComplete, str):
+            logging.debug(f"任务完成状态是字符串类型: '{taskIsComplete}'")
+            taskIsComplete = taskIsComplete.lower() == 'true'
+        
+        logging.debug(f"任务是否完成：{taskIsComplete}")
+        logging.debug(f"原因：{reason}")
+        return taskIsComplete, reason
+
+    def _fallback_evaluation(self, result: Result) -> Tuple[bool, str]:
+        '''LLM评估失败时的兜底规则'''
         logging.info("LLM评估尝试均失败，使用兜底规则")
         
+        code = result.code or ""
+        stdout = result.stdout or ""
+        stderr = result.stderr or ""
+        
         if "任务完成" in stdout and not stderr:
             logging.info("兜底判断: 检测到任务完成标记且无错误")
             return True, "任务执行成功并输出了完成标记（兜底判断）"
@@ -703,8 +1110,12 @@ class Agent(AgentBase):
     def __init__(self, llm: BaseChatModel, stateful: bool = True, evaluate_llm: BaseChatModel = None, 
                  max_retries: int = 10, skip_evaluation: bool = False, skip_generation: bool = False,
                  thinker_system_message: str = None, evaluation_system_messages: List[str] = None,
-                 thinker_chat_system_message: str = None):
+                 thinker_chat_system_message: str = None,
+                 parallel_evaluation: bool = False, max_evaluation_workers: int = 4,
+                 device: Device = None, response_cache: LLMResponseCache = None):
         self.llm = llm
+        # 评估器与结果生成共用的LLM响应缓存，None 时使用 llm_cache 的全局缓存
+        self.response_cache = response_cache
         self.name = ''
         self.api_specification = None
         if not evaluate_llm:
@@ -714,21 +1125,29 @@ class Agent(AgentBase):
         self.max_retries = max_retries
         self.skip_evaluation = skip_evaluation
         self.skip_generation = skip_generation
-        self.device = Device() if not stateful else StatefulExecutor()
+        # 并行评估：所有评估器同时发起，任一评估器判定失败即提前返回
+        self.parallel_evaluation = parallel_evaluation
+        self.max_evaluation_workers = max_evaluation_workers
+        # 可传入预先创建的执行器（例如从 executor_pool.StatefulExecutorPool 租用的执行器）
+        if device is not None:
+            self.device = device
+        else:
+            self.device = Device() if not stateful else StatefulExecutor()
         self.thinker = Thinker(llm=self.llm, 
                               max_retries=max_retries,
                               thinker_system_message=thinker_system_message,
                               thinker_chat_system_message=thinker_chat_system_message,
-                              device=self.device)
+                              device=self.device,
+                              response_cache=response_cache)
         
         # 初始化多个评估器
         self.evaluators = []
         if evaluation_system_messages:
             for system_message in evaluation_system_messages:
-                evaluator = Evaluator(llm=self.evaluate_llm, systemMessage=system_message, thinker=self.thinker)
+                evaluator = Evaluator(llm=self.evaluate_llm, systemMessage=system_message, thinker=self.thinker, response_cache=self.response_cache)
                 self.evaluators.append(evaluator)
         else:
-            self.evaluators.append(Evaluator(llm=self.evaluate_llm, systemMessage=default_evaluate_message, thinker=self.thinker))
+            self.evaluators.append(Evaluator(llm=self.evaluate_llm, systemMessage=default_evaluate_message, thinker=self.thinker, response_cache=self.response_cache))
 
     def chat_stream(self, message: str, response_format: Optional[Dict] = None) -> Iterator[object]:
         '''与LLM进行流式对话'''
@@ -752,9 +1171,31 @@ class Agent(AgentBase):
         '''与LLM进行同步对话'''
         return self.thinker.chat_sync(message, response_format)
     
+    async def chat_astream(self, message: str, response_format: Optional[Dict] = None) -> AsyncIterator[object]:
+        '''chat_stream 的异步版本'''
+        content = ""
+        async for chunk in self.thinker.chat_astream(message, response_format):
+            if isinstance(chunk, str):
+                content += chunk
+                yield chunk
+            elif isinstance(chunk, Result):
+                yield chunk
+            else:
+                try:
+                    chunk_str = str(chunk)
+                    content += chunk_str
+                    yield chunk_str
+                except:
+                    pass
+        yield Result(True, "", "", None, content)
+    
+    async def chat_async(self, message: str, response_format: Optional[Dict] = None) -> Result:
+        '''chat_sync 的异步版本'''
+        return await self.thinker.chat_async(message, response_format)
+    
     def loadEvaluationSystemMessage(self, evaluationSystemMessage: str):
         '''添加新的评估系统消息'''
-        new_evaluator = Evaluator(llm=self.evaluate_llm, systemMessage=evaluationSystemMessage, thinker=self.thinker)
+        new_evaluator = Evaluator(llm=self.evaluate_llm, systemMessage=evaluationSystemMessage, thinker=self.thinker, response_cache=self.response_cache)
         self.evaluators.append(new_evaluator)
         logging.info(f"已添加新的评估系统消息，当前评估器数量: {len(self.evaluators)}")
         return len(self.evaluators)
@@ -786,22 +1227,16 @@ class Agent(AgentBase):
         if instruction is None:
             instruction = "执行任务"
         
-        stdout = result.stdout or ""
-        last_5000_chars = stdout[-5000:] if len(stdout) > 5000 else stdout
-        logging.debug(f'执行结果最后5000个字符:\n{last_5000_chars}')
-        
-        result_for_eval = Result(
-            result.success,
-            result.code,
-            last_5000_chars,
-            result.stderr,
-            result.return_value
-        )
+        result_for_eval, last_5000_chars = self._prepare_result_for_eval(result)
 
         reasons = []
         failures = []
         
-        if self.evaluators:
+        if self.evaluators and self.parallel_evaluation and len(self.evaluators) > 1:
+            failed, reasons = self._evaluate_parallel(instruction, result_for_eval)
+            if failed:
+                return False, reasons
+        elif self.evaluators:
             logging.info(f"使用 {len(self.evaluators)} 个评估器进行评估...")
             for i, evaluator in enumerate(self.evaluators):
                 try:
@@ -830,6 +1265,140 @@ class Agent(AgentBase):
         logging.info("没有评估器返回结果，使用兜底逻辑...")
         return self._apply_fallback_logic(result, last_5000_chars)
     
+    async def evaluate_all_async(self, result: Result, instruction: str = None) -> Tuple[bool, List[str]]:
+        '''evaluate_all 的异步版本'''
+        logging.info('=== 开始评估 ===')
+        
+        if instruction is None:
+            instruction = "执行任务"
+        
+        result_for_eval, last_5000_chars = self._prepare_result_for_eval(result)
+
+        reasons = []
+        failures = []
+        
+        if self.evaluators and self.parallel_evaluation and len(self.evaluators) > 1:
+            failed, reasons = await self._evaluate_parallel_async(instruction, result_for_eval)
+            if failed:
+                return False, reasons
+        elif self.evaluators:
+            logging.info(f"使用 {len(self.evaluators)} 个评估器进行评估...")
+            for i, evaluator in enumerate(self.evaluators):
+                try:
+                    logging.info(f"执行评估器 #{i+1}:")
+                    is_complete, reason = await evaluator.evaluate_async(instruction, result_for_eval)
+                    
+                    if is_complete:
+                        logging.info(f"评估器 #{i+1} 评估结果: 成功")
+                        reasons.append(reason)
+                    else:
+                        logging.info(f"评估器 #{i+1} 评估结果: 失败 - {reason}")
+                        failures.append(reason)
+                        self._log_evaluation_summary("失败", f"评估器 #{i+1} 失败: {reason}")
+                        return False, failures + reasons
+                    
+                except Exception as e:
+                    error_msg = f"评估器 #{i+1} 异常: {str(e)}"
+                    logging.error(error_msg)
+                    reasons.append(error_msg)
+        
+        if reasons:
+            success_reasons = "\n".join([f"#{i+1}: {reason}" for i, reason in enumerate(reasons)])
+            self._log_evaluation_summary("成功", f"所有评估器都通过\n{success_reasons}")
+            return True, reasons
+        
+        logging.info("没有评估器返回结果，使用兜底逻辑...")
+        return self._apply_fallback_logic(result, last_5000_chars)
+    
+    def _evaluate_parallel(self, instruction: str, result_for_eval: Result) -> Tuple[bool, List[str]]:
+        '''
+        在有界线程池上同时运行所有评估器，任一评估器判定失败时立即返回并取消尚未开始的评估。
+        
+        返回 (是否有评估器失败, 原因列表)。失败时原因列表为失败原因在前、已完成的成功原因在后；
+        全部通过时原因列表按评估器顺序排列，与串行评估一致。
+        '''
+        logging.info(f"使用 {len(self.evaluators)} 个评估器并行评估...")
+        outcomes: Dict[int, str] = {}
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_evaluation_workers, len(self.evaluators))))
+        try:
+            futures = {
+                executor.submit(evaluator.evaluate, instruction, result_for_eval): i
+                for i, evaluator in enumerate(self.evaluators)
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = futures[future]
+                    failure = self._record_parallel_outcome(i, future, outcomes)
+                    if failure is not None:
+                        return True, [failure] + [outcomes[k] for k in sorted(outcomes)]
+        finally:
+            # 提前返回时不等待仍在运行的评估器，未开始的直接取消
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return False, [outcomes[k] for k in sorted(outcomes)]
+
+    async def _evaluate_parallel_async(self, instruction: str, result_for_eval: Result) -> Tuple[bool, List[str]]:
+        '''_evaluate_parallel 的异步版本，提前返回时取消其余评估任务'''
+        logging.info(f"使用 {len(self.evaluators)} 个评估器并行评估...")
+        outcomes: Dict[int, str] = {}
+        semaphore = asyncio.Semaphore(max(1, self.max_evaluation_workers))
+        
+        async def run(evaluator: Evaluator):
+            async with semaphore:
+                return await evaluator.evaluate_async(instruction, result_for_eval)
+        
+        tasks = {asyncio.ensure_future(run(evaluator)): i for i, evaluator in enumerate(self.evaluators)}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i = tasks[task]
+                    failure = self._record_parallel_outcome(i, task, outcomes)
+                    if failure is not None:
+                        return True, [failure] + [outcomes[k] for k in sorted(outcomes)]
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        return False, [outcomes[k] for k in sorted(outcomes)]
+
+    def _record_parallel_outcome(self, i: int, future, outcomes: Dict[int, str]) -> Optional[str]:
+        '''记录单个并行评估器的结果，评估失败时返回失败原因'''
+        try:
+            is_complete, reason = future.result()
+        except Exception as e:
+            error_msg = f"评估器 #{i+1} 异常: {str(e)}"
+            logging.error(error_msg)
+            outcomes[i] = error_msg
+            return None
+        
+        if is_complete:
+            logging.info(f"评估器 #{i+1} 评估结果: 成功")
+            outcomes[i] = reason
+            return None
+        
+        logging.info(f"评估器 #{i+1} 评估结果: 失败 - {reason}")
+        self._log_evaluation_summary("失败", f"评估器 #{i+1} 失败: {reason}")
+        return reason
+
+    def _prepare_result_for_eval(self, result: Result) -> Tuple[Result, str]:
+        """截取标准输出的最后5000个字符，构造用于评估的结果对象"""
+        stdout = result.stdout or ""
+        last_5000_chars = stdout[-5000:] if len(stdout) > 5000 else stdout
+        logging.debug(f'执行结果最后5000个字符:\n{last_5000_chars}')
+        
+        result_for_eval = Result(
+            result.success,
+            result.code,
+            last_5000_chars,
+            result.stderr,
+            result.return_value
+        )
+        return result_for_eval, last_5000_chars
+    
     def _log_evaluation_summary(self, status: str, details: str):
         """统一的评估总结日志输出"""
         logging.info("=== 评估总结 ===")
@@ -992,6 +1561,112 @@ class Agent(AgentBase):
         prompt = '''把上一步的出现错误的代码输出出来，以供调试'''
         yield from self.chat_stream(prompt)
     
+    async def execute_async(self, instruction: str) -> Result:
+        """execute_sync 的异步版本，可在同一事件循环中并发运行多个智能体会话"""
+        current_instruction = instruction
+        
+        # 跳过评估循环
+        if self.skip_evaluation:
+            if self.skip_generation:
+                return await self.thinker.execute_async(current_instruction)
+            else:
+                result = await self.thinker.execute_async(current_instruction)
+                if isinstance(result, Result):
+                    finalResult = await self.generateResult_async(instruction, result)
+                    return Result(result.success, result.code, result.stdout, result.stderr, finalResult)
+            return
+        
+        # 评估循环
+        for i in range(self.max_retries):
+            result = await self.thinker.execute_async(current_instruction)
+            
+            if result.success:
+                taskIsComplete, reasons = await self.evaluate_all_async(result, instruction)
+                
+                if taskIsComplete:
+                    if not self.skip_generation:
+                        finalResult = await self.generateResult_async(instruction, result)
+                        return Result(True, result.code, result.stdout, result.stderr, finalResult)
+                    else:
+                        return Result(True, result.code, result.stdout, result.stderr, result.return_value)
+                else:
+                    failure_reason = reasons[0] if reasons else "未提供具体原因"
+                    current_instruction = f"评估失败，请修改代码。原因：{failure_reason}\n当前代码输出：{result.stdout}\n当前代码错误：{result.stderr}\n当前代码返回值：{result.return_value}"
+                    
+            else:
+                if not self.skip_generation:
+                    finalResult = await self.generateResult_async(instruction, result)
+                    return Result(False, result.code, result.stdout, result.stderr, finalResult)
+                else:
+                    return Result(False, result.code, result.stdout, result.stderr, result.return_value)
+        
+        logging.info('超过最大尝试次数，编程失败。')
+        return Result(False, '', '', '', '超过最大尝试次数，编程失败。')
+
+    async def execute_astream(self, instruction: str) -> AsyncIterator[object]:
+        '''execute_stream 的异步版本，返回异步迭代器'''
+        current_instruction = instruction
+        
+        # 跳过评估循环
+        if self.skip_evaluation:
+            result = None
+            async for r in self.thinker.execute_astream(current_instruction):
+                yield r
+                if isinstance(r, Result):
+                    result = r
+            if not isinstance(result, Result):
+                yield Result(False, '', '', '', '未能获取到有效的执行结果')
+            elif not self.skip_generation:
+                finalResult = ''
+                async for chunk in self.generateResult_astream(instruction, result):
+                    finalResult += chunk
+                    yield chunk
+                yield Result(result.success, result.code, result.stdout, result.stderr, finalResult)
+            return
+        
+        # 评估循环
+        for i in range(self.max_retries):
+            result = None
+            async for r in self.thinker.execute_astream(current_instruction):
+                yield r
+                if isinstance(r, Result):
+                    result = r
+            
+            if not isinstance(result, Result):
+                yield Result(False, '', '', '', '未能获取到有效的执行结果')
+                continue
+            
+            try:
+                if result.success:
+                    taskIsComplete, reasons = await self.evaluate_all_async(result, instruction)
+                    if not taskIsComplete:
+                        stdout = result.stdout or ""
+                        stderr = result.stderr or ""
+                        return_value = result.return_value or ""
+                        
+                        failure_reason = reasons[0] if reasons else "未提供具体原因"
+                        current_instruction = f"评估失败，请修改代码。原因：{failure_reason}\n当前代码输出：{stdout}\n当前代码错误：{stderr}\n当前代码返回值：{return_value}"
+                        continue
+                
+                if not self.skip_generation:
+                    finalResult = ''
+                    async for chunk in self.generateResult_astream(instruction, result):
+                        finalResult += chunk
+                        yield chunk
+                    yield Result(result.success, result.code, result.stdout, result.stderr, finalResult)
+                else:
+                    yield Result(result.success, result.code, result.stdout, result.stderr, result.return_value)
+                return
+            except Exception as e:
+                error_msg = f"评估或结果处理过程中出现错误: {str(e)}"
+                logging.error(error_msg)
+                yield error_msg
+                yield Result(result.success, result.code, result.stdout, result.stderr, result.return_value)
+                return
+            
+        logging.info('超过最大尝试次数，编程失败。')
+        yield Result(False, '', '', '', '超过最大尝试次数，编程失败。')
+    
     def generateResult_sync(self, instruction: str, result: Result) -> str:
         '''生成最终结果'''
         return self.thinker.generateResult_sync(instruction, result)
@@ -1000,16 +1675,24 @@ class Agent(AgentBase):
         '''生成最终结果流式'''
         return self.thinker.generateResult_stream(instruction, result)
 
+    async def generateResult_async(self, instruction: str, result: Result) -> str:
+        '''生成最终结果（异步）'''
+        return await self.thinker.generateResult_async(instruction, result)
+    
+    def generateResult_astream(self, instruction: str, result: Result) -> AsyncIterator[str]:
+        '''生成最终结果异步流式'''
+        return self.thinker.generateResult_astream(instruction, result)
+
     def resetEvaluators(self, evaluationSystemMessage: str = None):
         '''重置所有评估器'''
         self.evaluators = []
         logging.info("已清除所有评估器")
         
         if evaluationSystemMessage is not None:
-            self.evaluators.append(Evaluator(llm=self.llm, systemMessage=evaluationSystemMessage, thinker=self.thinker))
+            self.evaluators.append(Evaluator(llm=self.llm, systemMessage=evaluationSystemMessage, thinker=self.thinker, response_cache=self.response_cache))
             logging.info(f"已创建新评估器，当前评估器数量: {len(self.evaluators)}")
         else:
-            self.evaluators.append(Evaluator(llm=self.llm, systemMessage=default_evaluate_message, thinker=self.thinker))
+            self.evaluators.append(Evaluator(llm=self.llm, systemMessage=default_evaluate_message, thinker=self.thinker, response_cache=self.response_cache))
             logging.info(f"已创建默认评估器，当前评估器数量: {len(self.evaluators)}")
 
     def set_api_specification(self, api_spec: str):
@@ -17,7 +17,7 @@ from datetime import datetime as dt
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agent_base import Result, reduce_memory_decorator_compress
-from python_core import Agent
+from python_core import Agent, StatefulExecutor
 from langchain_core.language_models import BaseChatModel
 try:
     # 尝试相对导入（当作为包使用时）
@@ -25,6 +25,7 @@ try:
     from .workflow_definitions import WorkflowDefinition, WorkflowStep, WorkflowLoader
     from .static_workflow_engine import StaticWorkflowEngine, WorkflowExecutionResult
     from .control_flow_evaluator import ControlFlowEvaluator
+    from .workflow_checkpoint import WorkflowCheckpointStore
 except ImportError:
     # 回退到绝对导入（当直接运行时）
     import sys
@@ -35,6 +36,7 @@ except ImportError:
     from workflow_definitions import WorkflowDefinition, WorkflowStep, WorkflowLoader
     from static_workflow_engine import StaticWorkflowEngine, WorkflowExecutionResult
     from control_flow_evaluator import ControlFlowEvaluator
+    from workflow_checkpoint import WorkflowCheckpointStore
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +66,10 @@ class MultiStepAgent_v3(Agent):
         max_parallel_workers: int = 4,
         workflow_base_path: str = None,
         planning_prompt_template: Optional[str] = None,
-        use_mock_evaluator: bool = False
+        use_mock_evaluator: bool = False,
+        enable_dag_scheduling: bool = False,
+        checkpoint_path: Optional[str] = None,
+        async_state_updates: bool = False
     ):
         """
         初始化静态工作流智能体
@@ -82,6 +87,14 @@ class MultiStepAgent_v3(Agent):
                                False: 尝试使用AI评估器(通过DEEPSEEK_API_KEY环境变量)，
                                      如无API key则自动降级为模拟评估器
                                True: 强制使用模拟评估器(开发/测试/离线环境)
+            enable_dag_scheduling: 是否启用DAG调度，并发执行互不依赖的顺序步骤。
+                                   并发步骤开始时看到的全局状态不包含同批其他步骤的结果。
+                                   使用进程内 StatefulExecutor 的智能体之间不会并发（共享IPython单例
+                                   和进程级 sys.stdout），需要并发的智能体应使用 ProcessStatefulExecutor
+            checkpoint_path: 检查点SQLite文件路径。设置后每个步骤完成都会保存检查点，
+                             进程中断后可通过 resume_workflow 继续执行
+            async_state_updates: 是否在后台更新全局状态。启用后步骤完成不再等待LLM生成新状态，
+                                 多个步骤的完成合并为一次更新；步骤提示中的全局状态可能落后一到几个步骤
         """
         
         # 使用默认的系统消息
@@ -132,7 +145,11 @@ class MultiStepAgent_v3(Agent):
             max_parallel_workers=max_parallel_workers, 
             ai_evaluator=self.result_evaluator,
             llm=llm,  # 传递LLM用于状态更新
-            enable_state_updates=True  # 默认启用状态更新
+            enable_state_updates=True,  # 默认启用状态更新
+            enable_dag_scheduling=enable_dag_scheduling,
+            checkpoint_store=WorkflowCheckpointStore(checkpoint_path) if checkpoint_path else None,
+            async_state_updates=async_state_updates,
+            step_resource_key=self._step_execution_resource
         )
         self.workflow_loader = WorkflowLoader()
         
@@ -248,6 +265,37 @@ class MultiStepAgent_v3(Agent):
             logger.error(f"工作流执行异常: {e}")
             raise
     
+    def resume_workflow(self, workflow_id: str) -> WorkflowExecutionResult:
+        """
+        从检查点恢复中断的工作流
+        
+        已完成步骤的结果从检查点恢复，不会重新调用智能体。
+        智能体的Python内核状态（已完成步骤定义的变量、导入的模块）不会恢复，
+        使用这些变量的后续步骤会执行失败，需要在步骤中重新计算或通过 ${step_id_result} 传递结果。
+        
+        Args:
+            workflow_id: 工作流执行ID（WorkflowExecutionResult.workflow_id，
+                         或 checkpoint_store.list_workflows() 列出的中断工作流）
+            
+        Returns:
+            工作流执行结果
+        """
+        checkpoint = self.workflow_engine.load_checkpoint(workflow_id)
+        workflow_definition = checkpoint.workflow_definition
+        
+        logger.info(f"恢复静态工作流: {workflow_definition.workflow_metadata.name} ({workflow_id})")
+        self._validate_agents_availability(workflow_definition)
+        self.workflow_definition = workflow_definition
+        
+        result = self.workflow_engine.resume_from_checkpoint(checkpoint)
+        if result.success:
+            logger.info(f"工作流执行成功: {workflow_definition.workflow_metadata.name}")
+            logger.info(f"完成步骤: {result.completed_steps}/{result.total_steps}")
+        else:
+            logger.error(f"工作流执行失败: {workflow_definition.workflow_metadata.name}")
+            logger.error(f"错误信息: {result.error_message}")
+        return result
+    
     def create_workflow_from_dict(self, workflow_dict: Dict[str, Any]) -> WorkflowDefinition:
         """
         从字典创建工作流定义
@@ -386,6 +434,22 @@ class MultiStepAgent_v3(Agent):
             logger.error(error_msg)
             return Result(False, instruction, "", error_msg)
     
+    def _step_execution_resource(self, step: WorkflowStep) -> Any:
+        """
+        DAG调度中步骤使用的执行资源，相同资源的步骤按顺序执行
+        
+        进程内的 StatefulExecutor 都映射到同一个资源：非隔离的执行器共享IPython单例，
+        隔离的执行器执行代码时也会替换进程级的 sys.stdout/sys.stderr。
+        其他执行器（如 ProcessStatefulExecutor）按执行器实例区分。
+        """
+        for spec in self.registered_agents:
+            if spec.name == step.agent_name:
+                device = getattr(spec.instance, 'device', None)
+                if isinstance(device, StatefulExecutor):
+                    return StatefulExecutor
+                return id(device) if device is not None else ('agent', step.agent_name)
+        return ('agent', step.agent_name)
+    
     def evaluate_condition_with_ai(self, condition: str, last_result: Result) -> bool:
         """
         使用AI智能评估条件表达式
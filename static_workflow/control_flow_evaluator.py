@@ -9,7 +9,10 @@ import re
 import ast
 import operator
 import logging
-from typing import Dict, Any, Union, Optional
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Union, Optional, Callable, Mapping
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
@@ -57,32 +60,65 @@ class SafeEvaluator:
         'getattr': getattr,
     }
     
-    def __init__(self):
-        self.variables = {}
+    def __init__(self, cache_size: int = 256):
+        self.variables: Mapping[str, Any] = MappingProxyType({})
+        # 已验证并编译的表达式：表达式文本 -> 闭包，按LRU淘汰
+        self.cache_size = cache_size
+        self._compiled: "OrderedDict[str, Callable[[Mapping[str, Any]], Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
     
-    def set_variables(self, variables: Dict[str, Any]) -> None:
-        """设置可用变量"""
-        self.variables = variables.copy()
+    def set_variables(self, variables: Mapping[str, Any]) -> None:
+        """设置可用变量（只读视图，不复制）"""
+        self.variables = MappingProxyType(variables)
     
     def evaluate(self, expression: str) -> Any:
         """安全评估表达式"""
         try:
-            # 预处理表达式：将AND/OR转换为Python的and/or
-            processed_expr = self._preprocess_expression(expression)
-            
-            # 解析表达式
-            tree = ast.parse(processed_expr, mode='eval')
-            
-            # 验证表达式安全性
-            self._validate_ast(tree)
-            
-            # 评估表达式
-            return self._eval_node(tree.body)
-            
+            return self.compile(expression)(self.variables)
         except Exception as e:
             logger.error(f"表达式评估失败: {expression}, 错误: {e}")
             raise ValueError(f"表达式评估失败: {e}")
     
+    def compile(self, expression: str) -> Callable[[Mapping[str, Any]], Any]:
+        """
+        获取表达式编译后的闭包
+        
+        表达式只在第一次出现时预处理、解析、验证并编译，之后从LRU缓存中取出。
+        闭包接收变量映射，求值语义与逐节点解释一致：未定义的变量、不支持的节点
+        只在实际求值到时才报错。
+        """
+        with self._cache_lock:
+            compiled = self._compiled.get(expression)
+            if compiled is not None:
+                self._compiled.move_to_end(expression)
+                self.cache_hits += 1
+                return compiled
+            self.cache_misses += 1
+        
+        # 预处理表达式：将AND/OR转换为Python的and/or
+        processed_expr = self._preprocess_expression(expression)
+        
+        # 解析表达式
+        tree = ast.parse(processed_expr, mode='eval')
+        
+        # 验证表达式安全性
+        self._validate_ast(tree)
+        
+        compiled = self._compile_node(tree.body)
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._compiled[expression] = compiled
+                while len(self._compiled) > self.cache_size:
+                    self._compiled.popitem(last=False)
+        return compiled
+    
+    def clear_cache(self) -> None:
+        """清空已编译表达式缓存"""
+        with self._cache_lock:
+            self._compiled.clear()
+    
     def _preprocess_expression(self, expression: str) -> str:
         """预处理表达式，转换逻辑操作符"""
         # 将SQL风格的逻辑操作符转换为Python风格
@@ -120,91 +156,116 @@ class SafeEvaluator:
         }
         return node.attr in safe_attributes
     
-    def _eval_node(self, node: ast.AST) -> Any:
-        """递归评估AST节点"""
+    def _compile_node(self, node: ast.AST) -> Callable[[Mapping[str, Any]], Any]:
+        """把AST节点编译为接收变量映射的闭包"""
         if isinstance(node, ast.Constant):
-            return node.value
+            value = node.value
+            return lambda variables: value
         
         elif isinstance(node, ast.Name):
-            if node.id in self.variables:
-                return self.variables[node.id]
-            elif node.id in self.ALLOWED_FUNCTIONS:
-                return self.ALLOWED_FUNCTIONS[node.id]
-            elif node.id == 'True':
-                return True
-            elif node.id == 'False':
-                return False
-            elif node.id == 'None':
-                return None
-            else:
-                raise ValueError(f"未定义的变量: {node.id}")
+            name = node.id
+            functions = self.ALLOWED_FUNCTIONS
+            constants = {'True': True, 'False': False, 'None': None}
+            
+            def load_name(variables):
+                if name in variables:
+                    return variables[name]
+                elif name in functions:
+                    return functions[name]
+                elif name in constants:
+                    return constants[name]
+                raise ValueError(f"未定义的变量: {name}")
+            return load_name
         
         elif isinstance(node, ast.BinOp):
-            left = self._eval_node(node.left)
-            right = self._eval_node(node.right)
+            left, right = self._compile_node(node.left), self._compile_node(node.right)
             op = self.ALLOWED_OPERATORS.get(type(node.op))
             if op is None:
-                raise ValueError(f"不支持的二元操作符: {type(node.op)}")
-            return op(left, right)
+                return self._unsupported(f"不支持的二元操作符: {type(node.op)}", left, right)
+            return lambda variables: op(left(variables), right(variables))
         
         elif isinstance(node, ast.UnaryOp):
-            operand = self._eval_node(node.operand)
+            operand = self._compile_node(node.operand)
             op = self.ALLOWED_OPERATORS.get(type(node.op))
             if op is None:
-                raise ValueError(f"不支持的一元操作符: {type(node.op)}")
-            return op(operand)
+                return self._unsupported(f"不支持的一元操作符: {type(node.op)}", operand)
+            return lambda variables: op(operand(variables))
         
         elif isinstance(node, ast.Compare):
-            left = self._eval_node(node.left)
+            first = self._compile_node(node.left)
+            pairs = []
             for op, comparator in zip(node.ops, node.comparators):
-                right = self._eval_node(comparator)
                 op_func = self.ALLOWED_OPERATORS.get(type(op))
                 if op_func is None:
-                    raise ValueError(f"不支持的比较操作符: {type(op)}")
-                if not op_func(left, right):
-                    return False
-                left = right
-            return True
+                    op_func = self._unsupported_operator(f"不支持的比较操作符: {type(op)}")
+                pairs.append((op_func, self._compile_node(comparator)))
+            
+            def compare(variables):
+                left = first(variables)
+                for op_func, comparator in pairs:
+                    right = comparator(variables)
+                    if not op_func(left, right):
+                        return False
+                    left = right
+                return True
+            return compare
         
         elif isinstance(node, ast.BoolOp):
+            values = [self._compile_node(value) for value in node.values]
             if isinstance(node.op, ast.And):
                 # 对于AND操作，如果任何一个为False，立即返回False
-                for value in node.values:
-                    if not self._eval_node(value):
-                        return False
-                return True
+                return lambda variables: all(value(variables) for value in values)
             elif isinstance(node.op, ast.Or):
                 # 对于OR操作，如果任何一个为True，立即返回True
-                for value in node.values:
-                    if self._eval_node(value):
-                        return True
-                return False
+                return lambda variables: any(value(variables) for value in values)
             else:
-                raise ValueError(f"不支持的布尔操作符: {type(node.op)}")
+                return self._unsupported(f"不支持的布尔操作符: {type(node.op)}")
         
         elif isinstance(node, ast.Call):
-            func = self._eval_node(node.func)
-            args = [self._eval_node(arg) for arg in node.args]
-            kwargs = {kw.arg: self._eval_node(kw.value) for kw in node.keywords}
-            return func(*args, **kwargs)
+            func = self._compile_node(node.func)
+            args = [self._compile_node(arg) for arg in node.args]
+            kwargs = [(kw.arg, self._compile_node(kw.value)) for kw in node.keywords]
+            return lambda variables: func(variables)(
+                *[arg(variables) for arg in args],
+                **{name: value(variables) for name, value in kwargs}
+            )
         
         elif isinstance(node, ast.Attribute):
-            obj = self._eval_node(node.value)
-            return getattr(obj, node.attr)
+            obj = self._compile_node(node.value)
+            attr = node.attr
+            return lambda variables: getattr(obj(variables), attr)
         
         elif isinstance(node, ast.List):
-            return [self._eval_node(elt) for elt in node.elts]
+            elements = [self._compile_node(elt) for elt in node.elts]
+            return lambda variables: [element(variables) for element in elements]
         
         elif isinstance(node, ast.Tuple):
-            return tuple(self._eval_node(elt) for elt in node.elts)
+            elements = [self._compile_node(elt) for elt in node.elts]
+            return lambda variables: tuple(element(variables) for element in elements)
         
         elif isinstance(node, ast.Dict):
-            keys = [self._eval_node(k) for k in node.keys]
-            values = [self._eval_node(v) for v in node.values]
-            return dict(zip(keys, values))
+            keys = [self._compile_node(k) for k in node.keys]
+            values = [self._compile_node(v) for v in node.values]
+            return lambda variables: dict(zip([key(variables) for key in keys],
+                                              [value(variables) for value in values]))
         
         else:
-            raise ValueError(f"不支持的AST节点类型: {type(node)}")
+            return self._unsupported(f"不支持的AST节点类型: {type(node)}")
+    
+    @staticmethod
+    def _unsupported(message: str, *operands: Callable[[Mapping[str, Any]], Any]):
+        """求值到不支持的节点时才报错（先求值操作数，与逐节点解释的顺序一致）"""
+        def fail(variables):
+            for operand in operands:
+                operand(variables)
+            raise ValueError(message)
+        return fail
+    
+    @staticmethod
+    def _unsupported_operator(message: str):
+        def fail(left, right):
+            raise ValueError(message)
+        return fail
 
 
 class VariableInterpolator:
@@ -244,6 +305,8 @@ class ControlFlowEvaluator:
         self.current_step_result = None   # 保存当前步骤结果用于AI评估
         self.llm = llm  # 用于自然语言条件评估
         self.current_global_state = ""  # 当前全局状态
+        # 获取最新全局状态的回调（异步状态更新时由引擎设置，只在LLM评估条件时调用）
+        self.global_state_provider: Optional[Callable[[], str]] = None
     
     def set_context(self, 
                    global_variables: Dict[str, Any] = None,
@@ -550,6 +613,8 @@ class ControlFlowEvaluator:
         """构建条件评估的提示词"""
         
         # 构建当前状态信息
+        if self.global_state_provider is not None:
+            self.current_global_state = self.global_state_provider()
         state_info = ""
         if self.current_global_state:
             state_info = f"""
@@ -0,0 +1,151 @@
+"""
+步骤依赖分析模块
+==============
+
+为DAG调度推导步骤之间的依赖关系。
+
+执行模型仍然是控制流状态机，这里只找出可以安全并发的片段：
+从当前步骤出发，沿着"无条件后继"（成功和失败都走向同一个下一步）向前展开，
+直到遇到条件分支、循环、并行或终止步骤为止，得到一个执行区间。
+区间内的后续步骤一定会执行，因此只要它们之间没有数据依赖就可以提前并发执行；
+区间最后一个步骤的控制流在整个区间提交后再由引擎正常求值，
+因此条件分支和循环语义保持不变。
+
+区间内步骤 B 依赖于排在它前面的步骤 A，当且仅当：
+- A 和 B 使用同一个执行资源（共享执行器状态，必须按顺序执行）
+- B 读取了 A 写入的变量（如 ${A_result}、${A_success}）或在指令中直接引用了 A 的ID
+- B 读取了 last_result 等每个步骤都会覆盖的变量（依赖于前面所有步骤）
+
+执行资源由 resource_key 给出，默认是步骤的 agent_name，只适用于各智能体的执行器互不共享状态的情况。
+进程内的 StatefulExecutor 即使是不同的智能体也不能并发：非隔离的执行器共享同一个 IPython 单例，
+而且所有 StatefulExecutor 执行代码时都会替换进程级的 sys.stdout/sys.stderr，
+因此它们必须映射到同一个执行资源（见 MultiStepAgent_v3._step_execution_resource），
+只有 ProcessStatefulExecutor 等不在本进程内执行代码的执行器可以并发。
+"""
+
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional, Set
+
+try:
+    from .workflow_definitions import WorkflowDefinition, WorkflowStep, ControlFlowType
+except ImportError:
+    from workflow_definitions import WorkflowDefinition, WorkflowStep, ControlFlowType
+
+logger = logging.getLogger(__name__)
+
+# ${variable} 引用，变量名取到第一个 . 或 [ 之前
+_VARIABLE_PATTERN = re.compile(r'\$\{\s*([A-Za-z_][\w]*)')
+
+# 每个步骤完成后都会覆盖的变量（见 StaticWorkflowEngine._update_runtime_variables_from_result）
+ORDER_SENSITIVE_VARIABLES = frozenset({
+    'last_result', 'last_success', 'last_returncode', 'test_passed', 'test_success_rate'
+})
+
+# 步骤写入的变量后缀
+STEP_VARIABLE_SUFFIXES = ('_result', '_success', '_returncode')
+
+
+@dataclass
+class ExecutionRegion:
+    """执行区间：按控制流顺序排列的步骤及区间内的依赖关系"""
+    steps: List[WorkflowStep]
+    dependencies: Dict[str, Set[str]] = field(default_factory=dict)  # 步骤ID -> 依赖的步骤ID
+
+    @property
+    def is_parallelizable(self) -> bool:
+        """区间内是否存在可以并发执行的步骤"""
+        return len(self.steps) > 1
+
+
+class StepDependencyGraph:
+    """步骤依赖图，按起始步骤缓存执行区间"""
+
+    def __init__(self, workflow_definition: WorkflowDefinition,
+                 resource_key: Optional[Callable[[WorkflowStep], Hashable]] = None):
+        """
+        参数:
+        workflow_definition: 工作流定义
+        resource_key: 步骤使用的执行资源，返回值相同的步骤按顺序执行；默认使用 agent_name
+        """
+        self.workflow_definition = workflow_definition
+        self.resource_key = resource_key or (lambda step: step.agent_name)
+        self._regions: Dict[str, ExecutionRegion] = {}
+
+    def region_from(self, step_id: str) -> ExecutionRegion:
+        """获取从指定步骤开始的执行区间"""
+        region = self._regions.get(step_id)
+        if region is None:
+            steps = self._collect_region_steps(step_id)
+            region = ExecutionRegion(steps=steps, dependencies=self._build_dependencies(steps))
+            self._regions[step_id] = region
+            if region.is_parallelizable:
+                logger.debug(f"执行区间 {step_id}: {[step.id for step in steps]}, 依赖: {region.dependencies}")
+        return region
+
+    def unconditional_next(self, step: WorkflowStep) -> Optional[str]:
+        '''
+        获取步骤的无条件后继：无论成功还是失败都会执行的下一步
+
+        返回:
+        Optional[str]: 下一步ID；后继取决于运行结果（或没有后继）时返回 None
+        '''
+        control_flow = step.control_flow
+        transitions = self.workflow_definition.get_transitions(step.id)
+        if transitions is None:
+            return None
+        if not control_flow:
+            return transitions.sequential_next
+        if control_flow.type != ControlFlowType.SEQUENTIAL:
+            return None
+
+        return transitions.success_next if transitions.success_next == transitions.failure_next else None
+
+    def _collect_region_steps(self, step_id: str) -> List[WorkflowStep]:
+        """沿无条件后继展开区间；并行步骤由引擎的并行处理负责，不放入区间"""
+        steps = []
+        visited = set()
+        current_id = step_id
+        while current_id and current_id not in visited:
+            step = self.workflow_definition.get_step_by_id(current_id)
+            if step is None:
+                break
+            if step.control_flow and step.control_flow.type == ControlFlowType.PARALLEL:
+                break
+            steps.append(step)
+            visited.add(current_id)
+            current_id = self.unconditional_next(step)
+        return steps
+
+    def _build_dependencies(self, steps: List[WorkflowStep]) -> Dict[str, Set[str]]:
+        dependencies = {}
+        resources = [self.resource_key(step) for step in steps]
+        for index, step in enumerate(steps):
+            reads = self.read_variables(step)
+            text = self._step_text(step)
+            depends_on = set()
+            for previous_index, previous in enumerate(steps[:index]):
+                if resources[previous_index] == resources[index]:
+                    depends_on.add(previous.id)
+                elif reads & self.written_variables(previous):
+                    depends_on.add(previous.id)
+                elif re.search(rf'(?<![A-Za-z0-9_]){re.escape(previous.id)}(?![A-Za-z0-9_])', text):
+                    depends_on.add(previous.id)
+            dependencies[step.id] = depends_on
+        return dependencies
+
+    @staticmethod
+    def _step_text(step: WorkflowStep) -> str:
+        return f"{step.instruction or ''}\n{step.expected_output or ''}"
+
+    @classmethod
+    def read_variables(cls, step: WorkflowStep) -> Set[str]:
+        """步骤指令中通过 ${...} 引用的变量"""
+        return set(_VARIABLE_PATTERN.findall(cls._step_text(step)))
+
+    @staticmethod
+    def written_variables(step: WorkflowStep) -> Set[str]:
+        """步骤完成后写入的运行时变量"""
+        written = {f'{step.id}{suffix}' for suffix in STEP_VARIABLE_SUFFIXES}
+        return written | ORDER_SENSITIVE_VARIABLES
@@ -4,11 +4,16 @@
 ================
 
 使用LLM智能更新工作流的自然语言全局状态。
+
+BackgroundStateUpdater 把状态更新移出步骤执行的关键路径：步骤完成事件进入队列，
+由后台线程把若干个事件合并成一次LLM调用。
 """
 
+import time
 import logging
 import json
-from typing import Any, Optional, Dict
+import threading
+from typing import Any, Optional, Dict, List, Tuple, Callable
 from datetime import datetime
 
 try:
@@ -97,6 +102,40 @@ class GlobalStateUpdater:
             logger.warning(f"LLM状态更新失败，使用简单更新: {e}")
             return self._simple_state_update(current_state, step, execution)
     
+    def update_state_batch(self,
+                           current_state: str,
+                           completions: List[Tuple[WorkflowStep, StepExecution]],
+                           workflow_context: str = "") -> str:
+        """
+        基于多个步骤的执行结果一次性更新全局状态
+        
+        Args:
+            current_state: 当前全局状态
+            completions: 按完成顺序排列的 (步骤定义, 执行实例)
+            workflow_context: 额外的工作流上下文信息
+            
+        Returns:
+            更新后的全局状态
+        """
+        completions = [(step, execution) for step, execution in completions
+                       if self.should_update_state(step, execution)]
+        if not completions:
+            return current_state
+        if len(completions) == 1:
+            step, execution = completions[0]
+            return self.update_state(current_state, step, execution, workflow_context)
+        
+        if self.llm:
+            try:
+                prompt = self._build_update_prompt(current_state, completions, workflow_context)
+                return self._invoke_llm(prompt)
+            except Exception as e:
+                logger.warning(f"LLM状态更新失败，使用简单更新: {e}")
+        
+        for step, execution in completions:
+            current_state = self._simple_state_update(current_state, step, execution)
+        return current_state
+    
     def _simple_state_update(self, 
                             current_state: str,
                             step: WorkflowStep, 
@@ -132,10 +171,12 @@ class GlobalStateUpdater:
         
         # 构建更新提示
         update_prompt = self._build_update_prompt(
-            current_state, step, execution, workflow_context
+            current_state, [(step, execution)], workflow_context
         )
-        
-        # 调用LLM
+        return self._invoke_llm(update_prompt)
+    
+    def _invoke_llm(self, update_prompt: str) -> str:
+        """调用LLM生成新的状态描述"""
         messages = [
             {
                 "role": "system",
@@ -174,36 +215,26 @@ class GlobalStateUpdater:
     
     def _build_update_prompt(self,
                             current_state: str,
-                            step: WorkflowStep,
-                            execution: StepExecution,
+                            completions: List[Tuple[WorkflowStep, StepExecution]],
                             workflow_context: str = "") -> str:
         """
-        构建状态更新的提示词
+        构建状态更新的提示词，多个完成的步骤按完成顺序列出
         """
         
-        # 获取执行结果信息
-        result_info = ""
-        if execution.result:
-            result_info = f"执行结果: {str(execution.result)[:500]}"
-        
-        duration_info = ""
-        if execution.duration:
-            duration_info = f"执行耗时: {execution.duration:.2f}秒"
+        if len(completions) == 1:
+            step_sections = "## 新完成的步骤信息\n" + self._format_step_info(*completions[0])
+        else:
+            step_sections = "## 新完成的步骤信息（按完成顺序）\n" + "\n".join(
+                f"### 步骤 {index}\n{self._format_step_info(step, execution)}"
+                for index, (step, execution) in enumerate(completions, 1)
+            )
             
         prompt = f"""# 工作流状态更新任务
 
 ## 当前全局状态
 {current_state if current_state else "工作流刚开始，尚无状态信息"}
 
-## 新完成的步骤信息
-- 步骤名称: {step.name}
-- 步骤ID: {step.id}
-- 执行者: {step.agent_name}
-- 指令: {step.instruction}
-- 预期输出: {step.expected_output}
-- 迭代次数: {execution.iteration}
-{result_info}
-{duration_info}
+{step_sections}
 
 ## 工作流上下文
 {workflow_context}
@@ -222,6 +253,28 @@ class GlobalStateUpdater:
         
         return prompt
     
+    def _format_step_info(self, step: WorkflowStep, execution: StepExecution) -> str:
+        """格式化单个步骤的执行信息"""
+        
+        # 获取执行结果信息
+        result_info = ""
+        if execution.result:
+            result_info = f"执行结果: {str(execution.result)[:500]}"
+        
+        duration_info = ""
+        if execution.duration:
+            duration_info = f"执行耗时: {execution.duration:.2f}秒"
+        
+        return f"""- 步骤名称: {step.name}
+- 步骤ID: {step.id}
+- 执行者: {step.agent_name}
+- 指令: {step.instruction}
+- 预期输出: {step.expected_output}
+- 迭代次数: {execution.iteration}
+{result_info}
+{duration_info}
+"""
+    
     def extract_structured_data(self, global_state: str) -> Dict[str, Any]:
         """
         从自然语言全局状态中提取结构化数据
@@ -333,6 +386,204 @@ class GlobalStateUpdater:
             return self._simple_data_extraction(global_state)
 
 
+class BackgroundStateUpdater:
+    """后台全局状态更新管道
+    
+    步骤完成后只把完成事件放入队列，后台线程等待一个防抖间隔收集更多事件，
+    再调用一次 GlobalStateUpdater.update_state_batch 生成新状态。
+    读取方默认拿到最近一次生成的状态（可能落后于已完成的步骤）；
+    需要最新状态的地方调用 wait_for_state()，此时会跳过防抖立即处理队列。
+    """
+    
+    def __init__(self,
+                 updater: GlobalStateUpdater,
+                 apply_state: Optional[Callable[[str], None]] = None,
+                 debounce: float = 0.2,
+                 max_batch: int = 8):
+        """
+        初始化后台状态更新管道
+        
+        Args:
+            updater: 实际执行状态更新的 GlobalStateUpdater
+            apply_state: 新状态生成后的回调（在后台线程中调用）
+            debounce: 收到第一个完成事件后等待更多事件的时间（秒）
+            max_batch: 一次LLM更新最多合并的完成事件数
+        """
+        self.updater = updater
+        self.apply_state = apply_state
+        self.debounce = debounce
+        self.max_batch = max(1, max_batch)
+        
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # (步骤, 执行实例, 工作流上下文, 提交时间)
+        self._pending: List[Tuple[WorkflowStep, StepExecution, str, float]] = []
+        self._in_flight_since: Optional[float] = None
+        self._state = ""
+        self._generation = 0
+        self._waiters = 0
+        self._closed = False
+        self._stats = {
+            'submitted': 0,
+            'applied': 0,
+            'updates': 0,
+            'coalesced': 0,
+            'failed_updates': 0,
+            'blocking_waits': 0,
+            'blocking_wait_seconds': 0.0,
+            'last_lag_seconds': 0.0,
+            'max_lag_seconds': 0.0,
+            'total_lag_seconds': 0.0,
+        }
+        
+        self._worker = threading.Thread(target=self._run, name="global-state-updater", daemon=True)
+        self._worker.start()
+    
+    def reset(self, state: str = "", apply_state: Optional[Callable[[str], None]] = None) -> None:
+        """
+        开始新的工作流：丢弃未处理的事件，之后的更新以 state 为基础
+        
+        Args:
+            state: 初始状态
+            apply_state: 替换新状态回调；旧工作流中正在进行的更新不会再回调
+        """
+        with self._lock:
+            self._generation += 1
+            self._pending.clear()
+            self._state = state
+            if apply_state is not None:
+                self.apply_state = apply_state
+            self._changed.notify_all()
+    
+    def submit(self, step: WorkflowStep, execution: StepExecution, workflow_context: str = "") -> None:
+        """提交一个步骤完成事件，立即返回"""
+        if not self.updater.should_update_state(step, execution):
+            logger.debug(f"跳过状态更新：步骤 {step.name} ({step.id})")
+            return
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BackgroundStateUpdater is closed")
+            self._pending.append((step, execution, workflow_context, time.time()))
+            self._stats['submitted'] += 1
+            self._changed.notify_all()
+    
+    @property
+    def state(self) -> str:
+        """最近一次生成的状态，不等待队列中的事件"""
+        return self._state
+    
+    @property
+    def pending(self) -> int:
+        """尚未反映到状态中的完成事件数（包括正在更新的）"""
+        with self._lock:
+            return self._pending_count()
+    
+    def wait_for_state(self, timeout: Optional[float] = None) -> str:
+        """
+        等待队列中的完成事件全部反映到状态中
+        
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+            
+        Returns:
+            当前状态（超时时可能仍然落后）
+        """
+        with self._lock:
+            if not self._pending_count():
+                return self._state
+            started = time.time()
+            self._waiters += 1
+            self._changed.notify_all()
+            try:
+                self._changed.wait_for(lambda: self._closed or not self._pending_count(), timeout)
+            finally:
+                self._waiters -= 1
+                self._stats['blocking_waits'] += 1
+                self._stats['blocking_wait_seconds'] += time.time() - started
+            return self._state
+    
+    def stats(self) -> Dict[str, Any]:
+        """状态更新的积压和滞后指标"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = self._pending_count()
+            oldest = self._in_flight_since or (self._pending[0][3] if self._pending else None)
+        total_lag = stats.pop('total_lag_seconds')
+        stats['avg_lag_seconds'] = total_lag / stats['applied'] if stats['applied'] else 0.0
+        stats['staleness_seconds'] = time.time() - oldest if oldest else 0.0
+        return stats
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """处理完剩余事件后停止后台线程"""
+        with self._lock:
+            self._closed = True
+            self._changed.notify_all()
+        self._worker.join(timeout)
+    
+    def _pending_count(self) -> int:
+        return len(self._pending) + (1 if self._in_flight_since is not None else 0)
+    
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._changed.wait()
+                if not self._pending:
+                    return
+                
+                # 防抖：等待更多完成事件合并到同一次更新中；有读取方在等待时立即处理
+                deadline = self._pending[0][3] + self.debounce
+                while not self._closed and not self._waiters and len(self._pending) < self.max_batch:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._changed.wait(remaining)
+                
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                if not batch:
+                    continue
+                self._in_flight_since = batch[0][3]
+                generation = self._generation
+                base_state = self._state
+            
+            failed = False
+            try:
+                new_state = self.updater.update_state_batch(
+                    base_state, [(step, execution) for step, execution, _, _ in batch], batch[-1][2]
+                )
+            except Exception as e:
+                logger.warning(f"全局状态更新失败: {e}")
+                new_state = base_state
+                failed = True
+            
+            with self._lock:
+                self._in_flight_since = None
+                if generation == self._generation:
+                    self._record_update(batch, failed)
+                    self._state = new_state
+                    if self.apply_state and new_state != base_state:
+                        try:
+                            self.apply_state(new_state)
+                        except Exception as e:
+                            logger.warning(f"应用全局状态失败: {e}")
+                self._changed.notify_all()
+    
+    def _record_update(self, batch: List[Tuple[WorkflowStep, StepExecution, str, float]], failed: bool) -> None:
+        now = time.time()
+        stats = self._stats
+        stats['updates'] += 1
+        stats['coalesced'] += len(batch) - 1
+        stats['applied'] += len(batch)
+        if failed:
+            stats['failed_updates'] += 1
+        for _, _, _, submitted_at in batch:
+            lag = now - submitted_at
+            stats['total_lag_seconds'] += lag
+            stats['max_lag_seconds'] = max(stats['max_lag_seconds'], lag)
+        stats['last_lag_seconds'] = now - batch[-1][3]
+
+
 # 便捷函数
 def create_state_updater(llm=None, enable_updates: bool = True) -> GlobalStateUpdater:
     """
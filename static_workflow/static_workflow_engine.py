@@ -8,10 +8,10 @@
 import time
 import threading
 import logging
-from typing import Dict, List, Any, Optional, Callable, Set
+from typing import Dict, List, Any, Optional, Callable, Hashable, Set
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field, replace
 
 try:
     # 尝试相对导入（当作为包使用时）
@@ -20,7 +20,9 @@ try:
         StepExecutionStatus, ControlRule, StepExecution, WorkflowExecutionContext
     )
     from .control_flow_evaluator import ControlFlowEvaluator
-    from .global_state_updater import GlobalStateUpdater
+    from .global_state_updater import GlobalStateUpdater, BackgroundStateUpdater
+    from .dag_scheduler import StepDependencyGraph, ExecutionRegion
+    from .workflow_checkpoint import WorkflowCheckpointStore, WorkflowCheckpoint
 except ImportError:
     # 回退到绝对导入（当直接运行时）
     import sys
@@ -31,7 +33,9 @@ except ImportError:
         StepExecutionStatus, ControlRule, StepExecution, WorkflowExecutionContext
     )
     from control_flow_evaluator import ControlFlowEvaluator
-    from global_state_updater import GlobalStateUpdater
+    from global_state_updater import GlobalStateUpdater, BackgroundStateUpdater
+    from dag_scheduler import StepDependencyGraph, ExecutionRegion
+    from workflow_checkpoint import WorkflowCheckpointStore, WorkflowCheckpoint
 
 logger = logging.getLogger(__name__)
 
@@ -51,16 +55,35 @@ class WorkflowExecutionResult:
     final_result: Any = None
     error_message: Optional[str] = None
     step_results: Dict[str, Any] = field(default_factory=dict)
+    workflow_id: Optional[str] = None    # 工作流执行ID，配置检查点存储时可用于 resume_workflow
 
 
 # WorkflowState 类已被移除，由 WorkflowExecutionContext 替代
 
 
 class ParallelExecutor:
-    """并行步骤执行器"""
+    """并行步骤执行器，持有一个长期复用的线程池"""
     
     def __init__(self, max_workers: int = 4):
         self.max_workers = max_workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+    
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        """获取线程池（首次使用时创建，之后在各次并行执行和工作流之间复用）"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="workflow-step")
+            return self._pool
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭线程池，之后再次使用时会重新创建"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
     
     def execute_parallel_steps(self, 
                              steps: List[WorkflowStep],
@@ -69,40 +92,42 @@ class ParallelExecutor:
         """执行并行步骤"""
         results = {}
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # 提交所有并行任务
-            future_to_step = {
-                executor.submit(step_executor, step): step 
-                for step in steps
-            }
-            
-            # 根据合并条件处理结果
-            if join_condition == "any_complete":
-                # 任意一个完成即可
-                for future in as_completed(future_to_step):
-                    step = future_to_step[future]
-                    try:
-                        result = future.result()
-                        results[step.id] = result
-                        # 取消其他任务
-                        for f in future_to_step:
-                            if f != future:
-                                f.cancel()
-                        break
-                    except Exception as e:
-                        logger.error(f"并行步骤 {step.id} 执行失败: {e}")
-                        results[step.id] = None
-            
-            else:  # all_complete（默认）
-                # 等待所有任务完成
-                for future in as_completed(future_to_step):
-                    step = future_to_step[future]
-                    try:
-                        result = future.result()
-                        results[step.id] = result
-                    except Exception as e:
-                        logger.error(f"并行步骤 {step.id} 执行失败: {e}")
-                        results[step.id] = None
+        # 提交所有并行任务
+        future_to_step = {
+            self.pool.submit(step_executor, step): step 
+            for step in steps
+        }
+        
+        # 根据合并条件处理结果
+        if join_condition == "any_complete":
+            # 任意一个完成即可
+            for future in as_completed(future_to_step):
+                step = future_to_step[future]
+                try:
+                    result = future.result()
+                    results[step.id] = result
+                    # 取消其他任务
+                    for f in future_to_step:
+                        if f != future:
+                            f.cancel()
+                    break
+                except Exception as e:
+                    logger.error(f"并行步骤 {step.id} 执行失败: {e}")
+                    results[step.id] = None
+            
+            # 已经开始运行的任务无法取消，等待其结束后再继续后续步骤
+            wait([f for f in future_to_step if not f.cancelled()])
+        
+        else:  # all_complete（默认）
+            # 等待所有任务完成
+            for future in as_completed(future_to_step):
+                step = future_to_step[future]
+                try:
+                    result = future.result()
+                    results[step.id] = result
+                except Exception as e:
+                    logger.error(f"并行步骤 {step.id} 执行失败: {e}")
+                    results[step.id] = None
         
         return results
 
@@ -110,14 +135,33 @@ class ParallelExecutor:
 class StaticWorkflowEngine:
     """静态工作流执行引擎"""
     
-    def __init__(self, max_parallel_workers: int = 4, ai_evaluator=None, llm=None, enable_state_updates: bool = True):
+    def __init__(self, max_parallel_workers: int = 4, ai_evaluator=None, llm=None, enable_state_updates: bool = True,
+                 enable_dag_scheduling: bool = False,
+                 checkpoint_store: Optional[WorkflowCheckpointStore] = None,
+                 async_state_updates: bool = False, state_update_debounce: float = 0.2,
+                 step_resource_key: Optional[Callable[[WorkflowStep], Hashable]] = None):
         self.evaluator = ControlFlowEvaluator(ai_evaluator=ai_evaluator, llm=llm)
         self.parallel_executor = ParallelExecutor(max_parallel_workers)
         self.step_executor = None  # 将由MultiStepAgent_v3设置
         
+        # DAG调度：并发执行一定会执行且互不依赖的步骤（见 dag_scheduler 模块）
+        # step_resource_key 给出步骤使用的执行资源，相同资源的步骤不会并发（默认按 agent_name）
+        self.enable_dag_scheduling = enable_dag_scheduling
+        self.step_resource_key = step_resource_key
+        self.dependency_graph = None
+        
+        # 检查点：每个步骤提交后持久化执行上下文，可通过 resume_workflow 继续执行
+        self.checkpoint_store = checkpoint_store
+        
         # 状态更新器
         self.state_updater = GlobalStateUpdater(llm=llm, enable_updates=enable_state_updates)
         
+        # 异步状态更新：步骤完成后不等待LLM生成新状态，只有条件评估需要最新状态时才等待
+        self.background_state_updater = None
+        if async_state_updates and enable_state_updates:
+            self.background_state_updater = BackgroundStateUpdater(self.state_updater, debounce=state_update_debounce)
+            self.evaluator.global_state_provider = self.wait_for_global_state
+        
         # 执行状态
         self.workflow_definition = None
         self.execution_context = None
@@ -133,6 +177,17 @@ class StaticWorkflowEngine:
         """设置步骤执行器"""
         self.step_executor = executor
     
+    def shutdown(self, wait: bool = True) -> None:
+        """释放步骤线程池和后台状态更新线程"""
+        self.parallel_executor.shutdown(wait=wait)
+        if self.background_state_updater is not None:
+            self.background_state_updater.close(timeout=None if wait else 0)
+    
+    def _create_dependency_graph(self, workflow_definition: WorkflowDefinition) -> Optional[StepDependencyGraph]:
+        if not self.enable_dag_scheduling:
+            return None
+        return StepDependencyGraph(workflow_definition, resource_key=self.step_resource_key)
+    
     def execute_workflow(self, 
                         workflow_definition: WorkflowDefinition,
                         initial_variables: Dict[str, Any] = None) -> WorkflowExecutionResult:
@@ -143,8 +198,10 @@ class StaticWorkflowEngine:
         workflow_id = f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
         self.execution_context = WorkflowExecutionContext(workflow_id=workflow_id)
         self.execution_start_time = datetime.now()
+        self.dependency_graph = self._create_dependency_graph(workflow_definition)
+        self._reset_background_state()
         
-        logger.info(f"开始执行工作流: {workflow_definition.workflow_metadata.name}")
+        logger.info(f"开始执行工作流: {workflow_definition.workflow_metadata.name} ({workflow_id})")
         
         try:
             # 初始化上下文变量
@@ -160,16 +217,124 @@ class StaticWorkflowEngine:
             
             current_step_id = workflow_definition.steps[0].id
             
+            if self.checkpoint_store is not None:
+                self.checkpoint_store.start_workflow(workflow_id, workflow_definition, self.execution_start_time)
+                self._save_checkpoint(None, current_step_id)
+            
             # 主执行循环
-            while current_step_id:
-                current_step_id = self._execute_workflow_iteration(current_step_id)
+            return self._run_workflow(current_step_id)
             
-            # 生成执行结果
+        except Exception as e:
+            logger.error(f"工作流执行失败: {e}")
+            return self._finish_workflow(False, str(e))
+    
+    def load_checkpoint(self, workflow_id: str) -> WorkflowCheckpoint:
+        """读取工作流执行的最新检查点"""
+        if self.checkpoint_store is None:
+            raise ValueError("未配置检查点存储，无法恢复工作流")
+        checkpoint = self.checkpoint_store.load(workflow_id)
+        if checkpoint is None:
+            raise ValueError(f"找不到工作流检查点: {workflow_id}")
+        return checkpoint
+    
+    def resume_workflow(self, workflow_id: str) -> WorkflowExecutionResult:
+        """
+        从检查点恢复中断的工作流
+        
+        已提交步骤的结果、运行时变量、循环计数和全局状态从检查点恢复，
+        从中断时的下一步继续执行；中断时正在执行的步骤会重新执行。
+        智能体的Python内核状态不会恢复：依赖已完成步骤在内核中定义的变量的步骤会失败。
+        
+        workflow_id 取自 WorkflowExecutionResult.workflow_id 或 checkpoint_store.list_workflows()。
+        """
+        return self.resume_from_checkpoint(self.load_checkpoint(workflow_id))
+    
+    def resume_from_checkpoint(self, checkpoint: WorkflowCheckpoint) -> WorkflowExecutionResult:
+        """从已读取的检查点恢复工作流"""
+        self.workflow_definition = checkpoint.workflow_definition
+        self.execution_context = checkpoint.execution_context
+        self.execution_start_time = checkpoint.start_time
+        self.dependency_graph = self._create_dependency_graph(self.workflow_definition)
+        self._discard_unfinished_executions()
+        self._reset_background_state()
+        
+        if checkpoint.status == 'completed':
+            logger.info(f"工作流已完成，直接返回结果: {checkpoint.workflow_id}")
             return self._generate_execution_result(True)
-            
+        
+        logger.info(f"恢复工作流: {self.workflow_definition.workflow_metadata.name} ({checkpoint.workflow_id})，"
+                    f"从步骤 {checkpoint.next_step_id} 继续")
+        
+        try:
+            self._update_evaluator_context()
+            return self._run_workflow(checkpoint.next_step_id)
         except Exception as e:
             logger.error(f"工作流执行失败: {e}")
-            return self._generate_execution_result(False, str(e))
+            return self._finish_workflow(False, str(e))
+    
+    def _run_workflow(self, current_step_id: Optional[str]) -> WorkflowExecutionResult:
+        """主执行循环：每次迭代后保存检查点"""
+        while current_step_id:
+            step_id = current_step_id
+            current_step_id = self._execute_workflow_iteration(current_step_id)
+            self._save_checkpoint(step_id, current_step_id)
+        
+        # 生成执行结果
+        return self._finish_workflow(True)
+    
+    def _finish_workflow(self, success: bool, error_message: str = None) -> WorkflowExecutionResult:
+        """生成执行结果并记录工作流结束状态"""
+        # 结束前等待后台状态更新，最终状态包含所有步骤
+        self.wait_for_global_state()
+        result = self._generate_execution_result(success, error_message)
+        if self.checkpoint_store is not None:
+            try:
+                self.checkpoint_store.finish_workflow(self.execution_context.workflow_id, success, error_message)
+            except Exception as e:
+                logger.warning(f"记录工作流结束状态失败: {e}")
+        return result
+    
+    def _save_checkpoint(self, step_id: Optional[str], next_step_id: Optional[str],
+                         uncommitted: Optional[Dict[str, int]] = None) -> None:
+        """
+        保存检查点；检查点写入失败不影响工作流执行
+        
+        uncommitted: DAG区间内尚未提交的步骤 -> 区间开始前的执行实例数，
+                     这些步骤在快照中回退到区间开始前的状态，恢复后重新执行
+        """
+        if self.checkpoint_store is None:
+            return
+        context = self.execution_context
+        if uncommitted:
+            step_executions = dict(context.step_executions)
+            current_iteration = dict(context.current_iteration)
+            for uncommitted_step_id, count in uncommitted.items():
+                executions = step_executions.get(uncommitted_step_id, [])[:count]
+                self._replace_executions(step_executions, current_iteration, uncommitted_step_id, executions)
+            context = replace(context, step_executions=step_executions, current_iteration=current_iteration)
+        try:
+            self.checkpoint_store.save_checkpoint(context.workflow_id, context, step_id, next_step_id)
+        except Exception as e:
+            logger.warning(f"保存检查点失败 (步骤: {step_id}): {e}")
+    
+    def _discard_unfinished_executions(self) -> None:
+        """丢弃中断时尚未结束的执行实例，这些步骤恢复后会重新执行"""
+        context = self.execution_context
+        for step_id, executions in list(context.step_executions.items()):
+            finished = [execution for execution in executions if execution.is_finished]
+            if len(finished) < len(executions):
+                self._replace_executions(context.step_executions, context.current_iteration, step_id, finished)
+    
+    @staticmethod
+    def _replace_executions(step_executions: Dict[str, List[StepExecution]], current_iteration: Dict[str, int],
+                            step_id: str, executions: List[StepExecution]) -> None:
+        """替换步骤的执行历史，并让迭代计数与之保持一致"""
+        if executions:
+            step_executions[step_id] = executions
+            current_iteration[step_id] = max(execution.iteration for execution in executions)
+        else:
+            step_executions.pop(step_id, None)
+            current_iteration.pop(step_id, None)
     
     def _execute_workflow_iteration(self, step_id: str) -> Optional[str]:
         """执行一个工作流迭代（简化版，基于执行上下文）"""
@@ -186,8 +351,13 @@ class StaticWorkflowEngine:
         # 使用新的执行模型：总是尝试执行步骤，让控制流决定是否需要重新执行
         if step.control_flow and step.control_flow.type == ControlFlowType.PARALLEL:
             return self._handle_parallel_execution(step)
-        else:
-            return self._execute_single_step(step)
+        
+        if self.dependency_graph is not None:
+            region = self.dependency_graph.region_from(step_id)
+            if region.is_parallelizable:
+                return self._execute_region(region)
+        
+        return self._execute_single_step(step)
     
     def _execute_single_step(self, step: WorkflowStep) -> Optional[str]:
         """执行单个步骤（基于执行实例）"""
@@ -240,6 +410,157 @@ class StaticWorkflowEngine:
             # 处理步骤失败
             return self._handle_step_failure(step, execution, e)
     
+    def _execute_region(self, region: ExecutionRegion) -> Optional[str]:
+        '''
+        按DAG并发执行一个执行区间
+        
+        依赖已提交的步骤立即提交到线程池；结果按控制流顺序提交（更新运行时变量、回调、全局状态），
+        因此步骤开始时能看到所有依赖步骤的结果，区间结束时 last_result 等变量与顺序执行一致。
+        失败重试在调度线程中重新提交，执行上下文只在调度线程中修改。
+        每个步骤提交后检查全局控制规则；规则终止工作流时，后续步骤与顺序执行一样视为未执行：
+        未开始的步骤被取消，正在执行的步骤等待结束后丢弃其执行实例。
+        
+        返回:
+        Optional[str]: 区间最后一个步骤的控制流决定的下一步ID
+        '''
+        steps = region.steps
+        committed: Set[str] = set()
+        running: Dict[Future, int] = {}
+        executions: Dict[int, StepExecution] = {}
+        finished: Dict[int, Optional[Exception]] = {}
+        next_step_id = None
+        commit_index = 0
+        # 区间开始前各步骤的执行实例数，用于检查点中回退未提交的步骤
+        execution_counts = {step.id: len(self.execution_context.step_executions.get(step.id, []))
+                            for step in steps}
+        
+        logger.info(f"DAG调度执行区间: {[step.id for step in steps]}")
+        
+        while commit_index < len(steps):
+            # 提交依赖已满足的步骤
+            for index, step in enumerate(steps):
+                if index in executions or not region.dependencies[step.id] <= committed:
+                    continue
+                executions[index] = self._submit_region_step(step, running, index)
+            
+            # 按顺序提交已完成的步骤
+            if commit_index in finished:
+                step = steps[commit_index]
+                next_step_id = self._commit_region_step(step, executions[commit_index], finished[commit_index])
+                committed.add(step.id)
+                commit_index += 1
+                if commit_index < len(steps):
+                    # 与顺序执行一致：下一个步骤生效前检查全局控制规则
+                    # （区间第一个步骤已在 _execute_workflow_iteration 中检查过）
+                    if self._check_global_control_rules(
+                            on_terminate=lambda: self._abandon_region_steps(steps, commit_index, running,
+                                                                            execution_counts)):
+                        return None
+                    if self.checkpoint_store is not None:
+                        # 区间最后一个步骤的检查点由主执行循环保存
+                        uncommitted = {pending.id: execution_counts[pending.id] for pending in steps[commit_index:]}
+                        self._save_checkpoint(step.id, next_step_id, uncommitted)
+                continue
+            
+            if not running:
+                # 待提交的步骤的依赖都在它之前，正常情况下不会出现
+                logger.error(f"DAG调度没有可执行的步骤: {steps[commit_index].id}")
+                break
+            
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                step = steps[index]
+                execution = executions[index]
+                error = future.exception()
+                if error is not None and execution.retry_count < step.max_retries:
+                    logger.error(f"步骤失败: {step.name}, 错误: {error}")
+                    retry_count = execution.retry_count + 1
+                    executions[index] = self._submit_region_step(step, running, index, retry_count)
+                    logger.info(f"重试步骤: {step.name} (第{retry_count}次)")
+                    continue
+                finished[index] = error
+        
+        return next_step_id
+    
+    def _abandon_region_steps(self, steps: List[WorkflowStep], commit_index: int, running: Dict[Future, int],
+                              execution_counts: Dict[str, int]) -> None:
+        """
+        全局控制规则终止工作流时作废区间内未提交的步骤：取消未开始的，等待正在执行的结束，再移除它们的执行实例
+        
+        已经开始的步骤无法中断，会执行到结束，它们对智能体和外部环境的副作用会保留，只是结果不再提交。
+        """
+        for future, index in running.items():
+            if not future.cancel():
+                logger.warning(f"全局控制规则终止工作流，步骤 {steps[index].name} 已在执行，无法取消；"
+                               f"等待其结束，其副作用会保留但结果不再提交")
+        wait(list(running))
+        running.clear()
+        
+        context = self.execution_context
+        for step in steps[commit_index:]:
+            executions = context.step_executions.get(step.id, [])
+            if len(executions) > execution_counts[step.id]:
+                logger.info(f"全局控制规则终止工作流，丢弃未提交的步骤: {step.name}")
+                self._replace_executions(context.step_executions, context.current_iteration, step.id,
+                                         executions[:execution_counts[step.id]])
+    
+    def _submit_region_step(self, step: WorkflowStep, running: Dict[Future, int], index: int,
+                            retry_count: int = 0) -> StepExecution:
+        """创建执行实例并把步骤提交到线程池（执行实例在提交前初始化完毕）"""
+        execution = self.execution_context.create_execution(step.id)
+        execution.retry_count = retry_count
+        logger.info(f"执行步骤: {step.name} ({step.id}) - 第{execution.iteration}次迭代")
+        
+        if self.on_step_start:
+            self.on_step_start(step)
+        
+        future = self.parallel_executor.pool.submit(self._run_step_execution, step, execution)
+        running[future] = index
+        return execution
+    
+    def _run_step_execution(self, step: WorkflowStep, execution: StepExecution) -> Any:
+        """在工作线程中执行步骤，只修改自己的执行实例"""
+        execution.status = StepExecutionStatus.RUNNING
+        execution.start_time = datetime.now()
+        try:
+            # 检查超时（与顺序执行相同）
+            if step.timeout and self._check_step_timeout(execution):
+                raise TimeoutError(f"步骤 {step.id} 执行超时")
+            
+            if not self.step_executor:
+                raise ValueError("未设置步骤执行器")
+            result = self.step_executor(step)
+        except Exception as e:
+            execution.status = StepExecutionStatus.FAILED
+            execution.end_time = datetime.now()
+            execution.error_message = str(e)
+            raise
+        
+        execution.result = result
+        execution.status = StepExecutionStatus.COMPLETED
+        execution.end_time = datetime.now()
+        return result
+    
+    def _commit_region_step(self, step: WorkflowStep, execution: StepExecution,
+                            error: Optional[Exception]) -> Optional[str]:
+        """提交区间内已完成的步骤，返回其控制流决定的下一步ID"""
+        if error is not None:
+            logger.error(f"步骤失败: {step.name}, 错误: {error}")
+            if self.on_step_failed:
+                self.on_step_failed(step, error)
+            return self._get_next_step_id(step, execution, False)
+        
+        self._update_runtime_variables_from_result(step.id, execution.result)
+        
+        if self.on_step_complete:
+            self.on_step_complete(step, execution.result)
+        
+        self._update_global_state(step, execution)
+        
+        logger.info(f"步骤完成: {step.name} (用时: {execution.duration:.2f}s)")
+        return self._get_next_step_id(step, execution, True)
+    
     def _handle_step_failure(self, step: WorkflowStep, execution: StepExecution, error: Exception) -> Optional[str]:
         """处理步骤失败（基于执行实例）"""
         
@@ -343,9 +664,15 @@ class StaticWorkflowEngine:
         """根据控制流确定下一步骤ID（简化版）"""
         
         control_flow = current_step.control_flow
+        # 预计算的后继：未指定的目标已解析为顺序执行的下一步
+        transitions = self.workflow_definition.get_transitions(current_step.id)
+        if transitions is None:
+            logger.warning(f"步骤不在工作流定义中: {current_step.id}")
+            return None
+        
         if not control_flow:
             # 没有控制流定义，执行下一个步骤
-            return self._get_sequential_next_step(current_step.id)
+            return transitions.sequential_next
         
         # 更新评估器上下文
         self._update_evaluator_context(execution.result)
@@ -354,31 +681,29 @@ class StaticWorkflowEngine:
             return None
         
         elif control_flow.type == ControlFlowType.SEQUENTIAL:
-            next_step_id = control_flow.success_next if success else control_flow.failure_next
-            return next_step_id or self._get_sequential_next_step(current_step.id)
+            return transitions.success_next if success else transitions.failure_next
         
         elif control_flow.type == ControlFlowType.CONDITIONAL:
             # 评估条件（使用混合方案）
             condition_result = self.evaluator.evaluate_control_flow_condition(control_flow, success)
-            next_step_id = control_flow.success_next if condition_result else control_flow.failure_next
-            return next_step_id or self._get_sequential_next_step(current_step.id)
+            return transitions.success_next if condition_result else transitions.failure_next
         
         elif control_flow.type == ControlFlowType.LOOP:
             return self._handle_loop_control(current_step, execution, success)
         
         elif control_flow.type == ControlFlowType.PARALLEL:
             # 并行步骤的后续步骤
-            next_step_id = control_flow.success_next if success else control_flow.failure_next
-            return next_step_id or self._get_sequential_next_step(current_step.id)
+            return transitions.success_next if success else transitions.failure_next
         
         else:
             logger.warning(f"未知的控制流类型: {control_flow.type}")
-            return self._get_sequential_next_step(current_step.id)
+            return transitions.sequential_next
     
     def _handle_loop_control(self, current_step: WorkflowStep, execution: StepExecution, success: bool) -> Optional[str]:
         """处理循环控制（简化版）"""
         
         control_flow = current_step.control_flow
+        transitions = self.workflow_definition.get_transitions(current_step.id)
         loop_key = f"loop_{current_step.id}"
         
         # 获取当前循环计数（使用执行上下文）
@@ -393,7 +718,7 @@ class StaticWorkflowEngine:
             
             if current_count >= max_iter_value:
                 logger.info(f"达到最大循环次数 {max_iter_value}，退出循环")
-                return control_flow.exit_on_max or self._get_sequential_next_step(current_step.id)
+                return transitions.loop_exit
         
         # 评估循环条件
         should_continue_loop = True
@@ -404,28 +729,22 @@ class StaticWorkflowEngine:
             # 继续循环
             self.execution_context.loop_counters[loop_key] = current_count + 1
             
-            logger.info(f"循环回到步骤: {control_flow.loop_target} (第{current_count + 1}次)")
-            return control_flow.loop_target
+            logger.info(f"循环回到步骤: {transitions.loop_target} (第{current_count + 1}次)")
+            return transitions.loop_target
         
         # 退出循环
-        next_step_id = control_flow.success_next if success else control_flow.failure_next
-        return next_step_id or self._get_sequential_next_step(current_step.id)
+        return transitions.success_next if success else transitions.failure_next
     
-    def _get_sequential_next_step(self, current_step_id: str) -> Optional[str]:
-        """获取顺序执行的下一步骤"""
-        current_index = self.workflow_definition.get_step_index(current_step_id)
-        if current_index >= 0 and current_index < len(self.workflow_definition.steps) - 1:
-            return self.workflow_definition.steps[current_index + 1].id
-        return None
-    
-    def _check_global_control_rules(self) -> bool:
-        """检查全局控制规则"""
+    def _check_global_control_rules(self, on_terminate: Optional[Callable[[], None]] = None) -> bool:
+        """检查全局控制规则；on_terminate 在终止工作流、执行清理步骤之前调用"""
         
         for rule in self.workflow_definition.control_rules:
             if self.evaluator.evaluate_condition(rule.trigger):
                 logger.info(f"触发全局控制规则: {rule.action}")
                 
                 if rule.action == "terminate":
+                    if on_terminate:
+                        on_terminate()
                     if rule.cleanup_steps:
                         self._execute_cleanup_steps(rule.cleanup_steps)
                     return True
@@ -574,11 +893,20 @@ class StaticWorkflowEngine:
             start_time=self.execution_start_time,
             end_time=end_time,
             error_message=error_message,
-            step_results=step_results
+            step_results=step_results,
+            workflow_id=self.execution_context.workflow_id
         )
     
     def _update_global_state(self, step: WorkflowStep, execution: StepExecution) -> None:
         """更新全局状态"""
+        if self.background_state_updater is not None:
+            # 只提交完成事件，由后台线程合并后更新
+            try:
+                self.background_state_updater.submit(step, execution, self._build_workflow_context())
+            except Exception as e:
+                logger.warning(f"全局状态更新失败: {e}")
+            return
+        
         try:
             # 获取当前状态
             current_state = self.execution_context.current_global_state
@@ -629,12 +957,47 @@ class StaticWorkflowEngine:
         
         return " | ".join(context_parts)
     
-    def get_current_global_state(self) -> str:
-        """获取当前全局状态"""
+    def _reset_background_state(self) -> None:
+        """新的执行上下文开始时重置后台状态更新的基础状态"""
+        if self.background_state_updater is not None:
+            context = self.execution_context
+            self.background_state_updater.reset(
+                context.current_global_state or self.workflow_definition.global_state,
+                apply_state=lambda new_state: self._apply_global_state(context, new_state)
+            )
+    
+    @staticmethod
+    def _apply_global_state(context: WorkflowExecutionContext, new_state: str) -> None:
+        """后台状态更新完成后写入执行上下文"""
+        context.update_global_state(new_state)
+        logger.info("全局状态已更新 (后台)")
+        logger.debug(f"新状态: {new_state[:200]}...")
+    
+    def wait_for_global_state(self, timeout: Optional[float] = None) -> str:
+        """等待后台状态更新处理完已完成的步骤，返回最新的全局状态"""
+        if self.background_state_updater is not None:
+            self.background_state_updater.wait_for_state(timeout)
+        return self.get_current_global_state()
+    
+    def get_current_global_state(self, wait: bool = False) -> str:
+        """
+        获取当前全局状态
+        
+        启用异步状态更新时默认返回最近一次生成的状态，可能尚未包含刚完成的步骤；
+        wait=True 时等待后台更新完成。
+        """
+        if wait:
+            return self.wait_for_global_state()
         if self.execution_context:
             return self.execution_context.current_global_state
         return ""
     
+    def get_state_update_stats(self) -> Dict[str, Any]:
+        """异步状态更新的积压和滞后指标，未启用异步状态更新时返回空字典"""
+        if self.background_state_updater is None:
+            return {}
+        return self.background_state_updater.stats()
+    
     def get_state_summary(self) -> str:
         """获取状态摘要"""
         if self.execution_context:
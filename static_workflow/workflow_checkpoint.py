@@ -0,0 +1,308 @@
+"""
+工作流检查点模块
+==============
+
+把工作流执行进度按步骤持久化到本地 SQLite 文件，进程崩溃或重启后可以从最后一个
+已提交的步骤继续执行，已完成步骤的结果直接从检查点恢复，不再重新执行（及调用LLM）。
+
+每个步骤提交（更新运行时变量、全局状态、确定下一步）后追加一条检查点，内容是
+相对上一条检查点的增量（有变化的步骤执行记录和运行时变量、新增的状态更新历史）和下一步ID，
+存储量随步骤数线性增长；恢复时按顺序重放该工作流的所有增量。
+增量使用 pickle 序列化，无法序列化的步骤结果和变量退化为字符串表示。
+检查点文件只应写入和读取本机可信的数据。
+
+检查点只保存执行上下文，不保存智能体的Python内核状态（已完成步骤定义的变量、导入的模块等）。
+"""
+
+import hashlib
+import pickle
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .workflow_definitions import WorkflowDefinition, WorkflowExecutionContext
+except ImportError:
+    from workflow_definitions import WorkflowDefinition, WorkflowExecutionContext
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkflowCheckpoint:
+    """工作流检查点"""
+    workflow_id: str
+    workflow_definition: WorkflowDefinition
+    execution_context: WorkflowExecutionContext
+    next_step_id: Optional[str]
+    start_time: datetime
+    status: str                      # running / completed / failed
+    sequence: int = 0                # 检查点序号
+
+
+class WorkflowCheckpointStore:
+    """基于 SQLite 的工作流检查点存储"""
+
+    def __init__(self, path: str = "workflow_checkpoints.db"):
+        '''
+        初始化检查点存储
+
+        参数:
+        path: SQLite 文件路径，":memory:" 表示只保存在内存中（用于测试）
+        '''
+        self.path = path
+        self._lock = threading.Lock()
+        # 工作流ID -> 最近一条检查点中各部分的摘要，用于计算下一条检查点的增量
+        self._saved_digests: Dict[str, Dict[str, Any]] = {}
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS workflows (
+                workflow_id TEXT PRIMARY KEY,
+                workflow_name TEXT,
+                definition BLOB NOT NULL,
+                status TEXT NOT NULL,
+                start_time TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                error_message TEXT
+            );
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                workflow_id TEXT NOT NULL,
+                sequence INTEGER NOT NULL,
+                step_id TEXT,
+                next_step_id TEXT,
+                context BLOB NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (workflow_id, sequence)
+            );
+        """)
+        self._connection.commit()
+
+    def start_workflow(self, workflow_id: str, workflow_definition: WorkflowDefinition,
+                       start_time: datetime) -> None:
+        """登记一次新的工作流执行"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO workflows VALUES (?, ?, ?, 'running', ?, ?, NULL)",
+                (workflow_id, workflow_definition.workflow_metadata.name,
+                 pickle.dumps(workflow_definition), start_time.isoformat(), now)
+            )
+            # 同一ID重新开始执行时丢弃旧的增量
+            self._connection.execute("DELETE FROM checkpoints WHERE workflow_id = ?", (workflow_id,))
+            self._connection.commit()
+            self._saved_digests[workflow_id] = _empty_digests()
+
+    def save_checkpoint(self, workflow_id: str, execution_context: WorkflowExecutionContext,
+                        step_id: Optional[str], next_step_id: Optional[str]) -> int:
+        '''
+        追加一条检查点
+
+        参数:
+        step_id: 刚提交的步骤ID
+        next_step_id: 接下来要执行的步骤ID
+
+        返回:
+        int: 检查点序号
+        '''
+        now = datetime.now().isoformat()
+        with self._lock:
+            saved = self._saved_digests.get(workflow_id)
+            if saved is None:
+                # 其他存储实例写入的工作流：重放已有增量得到基准
+                saved = _context_delta(self._replay(workflow_id)[0], _empty_digests())[1]
+            delta, digests = _context_delta(execution_context, saved)
+            context_blob = pickle.dumps(delta)
+            row = self._connection.execute(
+                "SELECT COALESCE(MAX(sequence), 0) FROM checkpoints WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            sequence = row[0] + 1
+            self._connection.execute(
+                "INSERT INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+                (workflow_id, sequence, step_id, next_step_id, context_blob, now)
+            )
+            self._connection.execute(
+                "UPDATE workflows SET updated_at = ? WHERE workflow_id = ?", (now, workflow_id)
+            )
+            self._connection.commit()
+            self._saved_digests[workflow_id] = digests
+        return sequence
+
+    def finish_workflow(self, workflow_id: str, success: bool, error_message: Optional[str] = None) -> None:
+        """记录工作流结束状态"""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE workflows SET status = ?, updated_at = ?, error_message = ? WHERE workflow_id = ?",
+                ('completed' if success else 'failed', datetime.now().isoformat(), error_message, workflow_id)
+            )
+            self._connection.commit()
+
+    def load(self, workflow_id: str) -> Optional[WorkflowCheckpoint]:
+        """读取工作流最新的检查点，工作流不存在时返回None"""
+        with self._lock:
+            workflow = self._connection.execute(
+                "SELECT definition, status, start_time FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            if workflow is None:
+                return None
+            context, latest = self._replay(workflow_id)
+            self._saved_digests[workflow_id] = _context_delta(context, _empty_digests())[1]
+
+        definition = pickle.loads(workflow[0])
+        if latest is None:
+            # 第一个步骤提交前中断：从入口步骤开始
+            next_step_id = definition.steps[0].id if definition.steps else None
+            sequence = 0
+        else:
+            sequence, next_step_id = latest
+
+        return WorkflowCheckpoint(
+            workflow_id=workflow_id,
+            workflow_definition=definition,
+            execution_context=context,
+            next_step_id=next_step_id,
+            start_time=datetime.fromisoformat(workflow[2]),
+            status=workflow[1],
+            sequence=sequence
+        )
+
+    def list_workflows(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """列出已登记的工作流执行"""
+        query = "SELECT workflow_id, workflow_name, status, start_time, updated_at FROM workflows"
+        params = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY start_time", params).fetchall()
+        return [dict(zip(('workflow_id', 'workflow_name', 'status', 'start_time', 'updated_at'), row))
+                for row in rows]
+
+    def delete_workflow(self, workflow_id: str) -> None:
+        """删除工作流及其检查点"""
+        with self._lock:
+            self._connection.execute("DELETE FROM checkpoints WHERE workflow_id = ?", (workflow_id,))
+            self._connection.execute("DELETE FROM workflows WHERE workflow_id = ?", (workflow_id,))
+            self._connection.commit()
+            self._saved_digests.pop(workflow_id, None)
+
+    def _replay(self, workflow_id: str) -> Tuple[WorkflowExecutionContext, Optional[Tuple[int, Optional[str]]]]:
+        """按顺序重放工作流的所有增量（调用方持有锁），返回执行上下文和最新的 (序号, 下一步ID)"""
+        context = WorkflowExecutionContext(workflow_id=workflow_id)
+        latest = None
+        rows = self._connection.execute(
+            "SELECT sequence, next_step_id, context FROM checkpoints WHERE workflow_id = ? ORDER BY sequence",
+            (workflow_id,)
+        )
+        for sequence, next_step_id, blob in rows:
+            context = _apply_delta(context, pickle.loads(blob))
+            latest = (sequence, next_step_id)
+        return context, latest
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def _empty_digests() -> Dict[str, Any]:
+    return {'steps': {}, 'variables': {}, 'global_state': "", 'history': 0}
+
+
+def _digest(blob: bytes) -> bytes:
+    return hashlib.sha1(blob).digest()
+
+
+def _dump_executions(executions: List[Any]) -> bytes:
+    """序列化一个步骤的执行记录，无法序列化的结果退化为字符串表示"""
+    try:
+        return pickle.dumps(executions)
+    except Exception as e:
+        logger.debug(f"步骤执行记录无法直接序列化，转换不可序列化的结果: {e}")
+        return pickle.dumps([replace(execution, result=_picklable(execution.result)) for execution in executions])
+
+
+def _dump_value(value: Any) -> bytes:
+    """序列化运行时变量，无法序列化的值退化为字符串表示"""
+    try:
+        return pickle.dumps(value)
+    except Exception:
+        return pickle.dumps(repr(value))
+
+
+def _context_delta(context: WorkflowExecutionContext,
+                   saved: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    计算执行上下文相对上一条检查点的增量
+
+    步骤执行记录和运行时变量按序列化结果的摘要比较，原地修改的值也能被发现。
+
+    返回:
+    Tuple[Dict, Dict]: (增量, 本次检查点的摘要)
+    """
+    steps, step_digests = {}, {}
+    for step_id, executions in context.step_executions.items():
+        blob = _dump_executions(executions)
+        step_digests[step_id] = _digest(blob)
+        if saved['steps'].get(step_id) != step_digests[step_id]:
+            steps[step_id] = blob
+
+    variables, variable_digests = {}, {}
+    for key, value in context.runtime_variables.items():
+        blob = _dump_value(value)
+        variable_digests[key] = _digest(blob)
+        if saved['variables'].get(key) != variable_digests[key]:
+            variables[key] = blob
+
+    history = context.state_update_history
+    history_start = saved['history'] if len(history) >= saved['history'] else 0
+
+    delta = {
+        'steps': steps,
+        'removed_steps': [step_id for step_id in saved['steps'] if step_id not in step_digests],
+        'variables': variables,
+        'removed_variables': [key for key in saved['variables'] if key not in variable_digests],
+        'current_iteration': dict(context.current_iteration),
+        'loop_counters': dict(context.loop_counters),
+        'history': (history_start, list(history[history_start:])),
+    }
+    if context.current_global_state != saved['global_state']:
+        delta['global_state'] = context.current_global_state
+
+    digests = {'steps': step_digests, 'variables': variable_digests,
+               'global_state': context.current_global_state, 'history': len(history)}
+    return delta, digests
+
+
+def _apply_delta(context: WorkflowExecutionContext, delta: Any) -> WorkflowExecutionContext:
+    """把一条检查点增量应用到执行上下文"""
+    if isinstance(delta, WorkflowExecutionContext):
+        # 旧版检查点保存的是完整快照
+        return delta
+
+    for step_id in delta['removed_steps']:
+        context.step_executions.pop(step_id, None)
+    for step_id, blob in delta['steps'].items():
+        context.step_executions[step_id] = pickle.loads(blob)
+    for key in delta['removed_variables']:
+        context.runtime_variables.pop(key, None)
+    for key, blob in delta['variables'].items():
+        context.runtime_variables[key] = pickle.loads(blob)
+    context.current_iteration = dict(delta['current_iteration'])
+    context.loop_counters = dict(delta['loop_counters'])
+    if 'global_state' in delta:
+        context.current_global_state = delta['global_state']
+    history_start, entries = delta['history']
+    context.state_update_history[history_start:] = entries
+    return context
+
+
+def _picklable(value: Any) -> Any:
+    try:
+        pickle.dumps(value)
+        return value
+    except Exception:
+        return repr(value)
@@ -7,7 +7,8 @@
 
 import json
 import yaml
-from typing import Dict, List, Any, Optional, Union
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Union, Mapping, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
@@ -141,6 +142,118 @@ class WorkflowMetadata:
             self.created_at = datetime.now()
 
 
+@dataclass(frozen=True)
+class StepTransitions:
+    """步骤的预计算后继，未指定目标时已解析为顺序执行的下一步"""
+    index: int                                # 步骤在列表中的索引
+    sequential_next: Optional[str]            # 列表中的下一步
+    success_next: Optional[str]               # 成功（条件为真）后的下一步
+    failure_next: Optional[str]               # 失败（条件为假）后的下一步
+    loop_target: Optional[str] = None         # 循环目标
+    loop_exit: Optional[str] = None           # 达到最大循环次数后的下一步
+    parallel_steps: Tuple[str, ...] = ()      # 并行步骤
+
+
+class _StepList(list):
+    """记录修改次数的步骤列表，步骤索引据此判断是否需要重建"""
+    
+    version = 0
+    
+    def _changed(self):
+        self.version += 1
+    
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+    
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+    
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._changed()
+        return result
+    
+    def __imul__(self, count):
+        result = super().__imul__(count)
+        self._changed()
+        return result
+    
+    def append(self, step):
+        super().append(step)
+        self._changed()
+    
+    def extend(self, steps):
+        super().extend(steps)
+        self._changed()
+    
+    def insert(self, index, step):
+        super().insert(index, step)
+        self._changed()
+    
+    def pop(self, index=-1):
+        step = super().pop(index)
+        self._changed()
+        return step
+    
+    def remove(self, step):
+        super().remove(step)
+        self._changed()
+    
+    def clear(self):
+        super().clear()
+        self._changed()
+    
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+    
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+
+@dataclass
+class _StepIndex:
+    """步骤ID到步骤、索引和后继的只读映射"""
+    steps: List[WorkflowStep]
+    version: int
+    by_id: Mapping[str, WorkflowStep]
+    transitions: Mapping[str, StepTransitions]
+    
+    @classmethod
+    def build(cls, steps: "_StepList") -> "_StepIndex":
+        by_id: Dict[str, WorkflowStep] = {}
+        indexes: Dict[str, int] = {}
+        for index, step in enumerate(steps):
+            # ID重复时与按顺序查找一致，使用第一个
+            if step.id not in by_id:
+                by_id[step.id] = step
+                indexes[step.id] = index
+        
+        transitions = {}
+        for step_id, index in indexes.items():
+            step = by_id[step_id]
+            sequential_next = steps[index + 1].id if index + 1 < len(steps) else None
+            cf = step.control_flow
+            if cf is None:
+                transitions[step_id] = StepTransitions(index, sequential_next, sequential_next, sequential_next)
+            elif cf.type == ControlFlowType.TERMINAL:
+                transitions[step_id] = StepTransitions(index, sequential_next, None, None)
+            else:
+                transitions[step_id] = StepTransitions(
+                    index=index,
+                    sequential_next=sequential_next,
+                    success_next=cf.success_next or sequential_next,
+                    failure_next=cf.failure_next or sequential_next,
+                    loop_target=cf.loop_target,
+                    loop_exit=cf.exit_on_max or sequential_next,
+                    parallel_steps=tuple(cf.parallel_steps or ())
+                )
+        return cls(steps, steps.version, MappingProxyType(by_id), MappingProxyType(transitions))
+
+
 @dataclass
 class WorkflowDefinition:
     """完整的工作流定义"""
@@ -170,28 +283,64 @@ class WorkflowDefinition:
         # 转换error_handling
         if isinstance(self.error_handling, dict):
             self.error_handling = ErrorHandling(**self.error_handling)
+        
+        self._build_step_index()
+    
+    def __setattr__(self, name, value):
+        # 步骤列表替换为可追踪修改的列表，列表被修改后步骤索引自动重建
+        if name == 'steps' and not isinstance(value, _StepList):
+            value = _StepList(value)
+        object.__setattr__(self, name, value)
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_step_index', None)
+        return state
+    
+    def _build_step_index(self) -> _StepIndex:
+        index = _StepIndex.build(self.steps)
+        object.__setattr__(self, '_step_index', index)
+        return index
+    
+    def _get_step_index(self) -> _StepIndex:
+        index = self.__dict__.get('_step_index')
+        if index is None or index.steps is not self.steps or index.version != self.steps.version:
+            index = self._build_step_index()
+        return index
+    
+    def invalidate_step_index(self) -> None:
+        """
+        重建步骤索引
+        
+        增删、替换步骤会自动重建；直接修改步骤的 id 或 control_flow 后需要调用此方法。
+        """
+        self._build_step_index()
     
     def get_step_by_id(self, step_id: str) -> Optional[WorkflowStep]:
         """根据ID获取步骤"""
-        for step in self.steps:
-            if step.id == step_id:
-                return step
-        return None
+        return self._get_step_index().by_id.get(step_id)
     
     def get_step_index(self, step_id: str) -> int:
         """获取步骤在列表中的索引"""
-        for i, step in enumerate(self.steps):
-            if step.id == step_id:
-                return i
-        return -1
+        transitions = self._get_step_index().transitions.get(step_id)
+        return transitions.index if transitions else -1
+    
+    def get_transitions(self, step_id: str) -> Optional[StepTransitions]:
+        """获取步骤的预计算后继"""
+        return self._get_step_index().transitions.get(step_id)
+    
+    def get_sequential_next(self, step_id: str) -> Optional[str]:
+        """获取列表中的下一个步骤ID"""
+        transitions = self._get_step_index().transitions.get(step_id)
+        return transitions.sequential_next if transitions else None
     
     def validate(self) -> List[str]:
         """验证工作流定义的完整性"""
         errors = []
         
         # 检查步骤ID唯一性
-        step_ids = [step.id for step in self.steps]
-        if len(step_ids) != len(set(step_ids)):
+        step_ids = self._build_step_index().by_id
+        if len(step_ids) != len(self.steps):
             errors.append("步骤ID必须唯一")
         
         # 检查控制流引用
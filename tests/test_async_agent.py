@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agent/Thinker 异步执行路径单元测试（使用模拟LLM，不需要API密钥）
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_core import Agent, Thinker, StatefulExecutor
+from agent_base import Result
+
+
+class MockMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class MockAsyncLLM:
+    """按顺序返回预设响应的模拟LLM，只实现异步接口"""
+    model_name = "gpt-3.5-turbo"
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        return self.responses.pop(0) if self.responses else '{"taskIsComplete": true, "reason": "ok"}'
+
+    async def ainvoke(self, messages, **kwargs):
+        await asyncio.sleep(0)
+        return MockMessage(self._next())
+
+    async def astream(self, messages, **kwargs):
+        for part in self._next().split(' '):
+            await asyncio.sleep(0)
+            yield MockMessage(part + ' ')
+
+
+CODE_RESPONSE = "```python\nreturn_value = 6 * 7\nprint('任务完成')\n```"
+EVAL_RESPONSE = '{"taskIsComplete": true, "reason": "结果正确"}'
+
+
+class TestThinkerAsync(unittest.TestCase):
+    """Thinker 异步接口测试"""
+
+    def test_execute_async(self):
+        llm = MockAsyncLLM([CODE_RESPONSE])
+        thinker = Thinker(llm=llm, device=StatefulExecutor())
+
+        result = asyncio.run(thinker.execute_async("计算6乘7"))
+
+        self.assertIsInstance(result, Result)
+        self.assertTrue(result.success)
+        self.assertEqual(result.return_value, 42)
+
+    def test_execute_astream(self):
+        llm = MockAsyncLLM([CODE_RESPONSE])
+        thinker = Thinker(llm=llm, device=StatefulExecutor())
+
+        async def collect():
+            return [chunk async for chunk in thinker.execute_astream("计算6乘7")]
+
+        chunks = asyncio.run(collect())
+        self.assertIsInstance(chunks[-1], Result)
+        self.assertTrue(chunks[-1].success)
+
+    def test_chat_async_restores_system_message(self):
+        llm = MockAsyncLLM(["你好"])
+        thinker = Thinker(llm=llm, device=StatefulExecutor())
+        original_system = thinker.memory[0]
+
+        result = asyncio.run(thinker.chat_async("打个招呼"))
+
+        self.assertEqual(result.return_value, "你好")
+        self.assertIs(thinker.memory[0], original_system)
+
+
+class TestAgentAsync(unittest.TestCase):
+    """Agent 异步接口测试"""
+
+    def test_execute_async_with_evaluation(self):
+        llm = MockAsyncLLM([CODE_RESPONSE, EVAL_RESPONSE, "计算结果是42"])
+        agent = Agent(llm=llm)
+
+        result = asyncio.run(agent.execute_async("计算6乘7"))
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.return_value, "计算结果是42")
+
+    def test_concurrent_sessions(self):
+        """多个智能体会话可以在同一事件循环中并发执行"""
+        agents = [Agent(llm=MockAsyncLLM([CODE_RESPONSE]), stateful=False, skip_evaluation=True, skip_generation=True)
+                  for _ in range(3)]
+
+        async def run_all():
+            return await asyncio.gather(*(agent.execute_async("计算6乘7") for agent in agents))
+
+        results = asyncio.run(run_all())
+        self.assertTrue(all(r.success for r in results))
+
+    def test_chat_astream(self):
+        llm = MockAsyncLLM(["你好 世界"])
+        agent = Agent(llm=llm)
+
+        async def collect():
+            return [chunk async for chunk in agent.chat_astream("打个招呼")]
+
+        chunks = asyncio.run(collect())
+        self.assertIsInstance(chunks[-1], Result)
+        self.assertEqual(chunks[-1].return_value.strip(), "你好 世界")
+
+
+if __name__ == '__main__':
+    unittest.main()
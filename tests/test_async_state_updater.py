@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步全局状态更新单元测试（使用模拟LLM，不需要API密钥）
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from static_workflow.workflow_definitions import (
+    WorkflowDefinition, WorkflowStep, WorkflowMetadata, StepExecution, StepExecutionStatus
+)
+from static_workflow.global_state_updater import GlobalStateUpdater, BackgroundStateUpdater
+from static_workflow.static_workflow_engine import StaticWorkflowEngine
+
+
+class MockResult:
+    def __init__(self, success=True, stdout=""):
+        self.success = success
+        self.stdout = stdout
+
+
+class MockResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class SlowLLM:
+    """记录调用次数的慢速LLM"""
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def invoke(self, messages):
+        time.sleep(self.delay)
+        with self.lock:
+            self.prompts.append(messages[-1]["content"])
+            return MockResponse(f"状态{len(self.prompts)}")
+
+
+def make_workflow(count=3):
+    steps = [WorkflowStep(id=f"s{i}", name=f"步骤{i}", agent_name="coder", instruction=f"任务{i}")
+             for i in range(count)]
+    return WorkflowDefinition(workflow_metadata=WorkflowMetadata(name="state_test"), steps=steps)
+
+
+def completed(step):
+    execution = StepExecution(f"exec_{step.id}", step.id, 1)
+    execution.status = StepExecutionStatus.COMPLETED
+    execution.result = MockResult(stdout=step.id)
+    return execution
+
+
+class TestBackgroundStateUpdater(unittest.TestCase):
+    """后台状态更新管道测试"""
+
+    def test_completions_are_coalesced(self):
+        llm = SlowLLM(delay=0.05)
+        applied = []
+        pipeline = BackgroundStateUpdater(GlobalStateUpdater(llm=llm), apply_state=applied.append, debounce=0.2)
+        try:
+            pipeline.reset("初始状态")
+            started = time.time()
+            for step in make_workflow().steps:
+                pipeline.submit(step, completed(step))
+            self.assertLess(time.time() - started, 0.05)
+            self.assertEqual(pipeline.state, "初始状态")
+
+            self.assertEqual(pipeline.wait_for_state(), "状态1")
+            self.assertEqual(len(llm.prompts), 1)
+            self.assertIn("步骤2", llm.prompts[0])
+            self.assertEqual(applied, ["状态1"])
+
+            stats = pipeline.stats()
+            self.assertEqual(stats['pending'], 0)
+            self.assertEqual(stats['coalesced'], 2)
+            self.assertEqual(stats['applied'], 3)
+            self.assertEqual(stats['blocking_waits'], 1)
+            self.assertGreater(stats['max_lag_seconds'], 0)
+        finally:
+            pipeline.close()
+
+    def test_reset_discards_previous_workflow(self):
+        pipeline = BackgroundStateUpdater(GlobalStateUpdater(llm=SlowLLM(delay=0.05)), debounce=1.0)
+        try:
+            step = make_workflow(1).steps[0]
+            pipeline.submit(step, completed(step))
+            pipeline.reset("新工作流")
+            self.assertEqual(pipeline.pending, 0)
+            self.assertEqual(pipeline.wait_for_state(), "新工作流")
+        finally:
+            pipeline.close()
+
+
+class TestAsyncStateUpdatesInEngine(unittest.TestCase):
+    """引擎异步状态更新测试"""
+
+    def run_workflow(self, async_updates):
+        llm = SlowLLM(delay=0.1)
+        engine = StaticWorkflowEngine(llm=llm, async_state_updates=async_updates, state_update_debounce=0.05)
+        prompt_states = []
+
+        def executor(step):
+            prompt_states.append(engine.get_current_global_state())
+            return MockResult(stdout=step.id)
+
+        engine.set_step_executor(executor)
+        started = time.time()
+        try:
+            result = engine.execute_workflow(make_workflow(4))
+            return engine, llm, result, time.time() - started, prompt_states
+        finally:
+            engine.shutdown()
+
+    def test_steps_do_not_wait_for_state_updates(self):
+        _, sync_llm, sync_result, sync_time, _ = self.run_workflow(False)
+        engine, llm, result, elapsed, _ = self.run_workflow(True)
+
+        self.assertTrue(sync_result.success)
+        self.assertTrue(result.success)
+        self.assertEqual(len(sync_llm.prompts), 4)
+        self.assertLess(len(llm.prompts), 4)
+        self.assertLess(elapsed, sync_time)
+
+        # 工作流结束前等待后台更新，最终状态包含所有步骤
+        self.assertEqual(engine.get_current_global_state(), f"状态{len(llm.prompts)}")
+        self.assertIn("步骤3", llm.prompts[-1])
+        stats = engine.get_state_update_stats()
+        self.assertEqual(stats['pending'], 0)
+        self.assertEqual(stats['applied'], 4)
+
+    def test_condition_evaluation_waits_for_fresh_state(self):
+        llm = SlowLLM(delay=0.05)
+        engine = StaticWorkflowEngine(llm=llm, async_state_updates=True, state_update_debounce=1.0)
+        try:
+            workflow = make_workflow(1)
+            engine.set_step_executor(lambda step: MockResult(stdout=step.id))
+            engine.execute_workflow(workflow)
+
+            step = workflow.steps[0]
+            engine._update_global_state(step, completed(step))
+            started = time.time()
+            prompt = engine.evaluator._build_condition_evaluation_prompt("任务已完成")
+            self.assertLess(time.time() - started, 0.5)
+            self.assertIn("状态2", prompt)
+        finally:
+            engine.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
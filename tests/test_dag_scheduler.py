@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DAG调度单元测试（使用模拟步骤执行器，不需要API密钥）
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from static_workflow.workflow_definitions import WorkflowDefinition, WorkflowStep, WorkflowMetadata, ControlRule
+from static_workflow.static_workflow_engine import StaticWorkflowEngine
+from static_workflow.dag_scheduler import StepDependencyGraph
+
+
+class MockResult:
+    def __init__(self, success=True, stdout=""):
+        self.success = success
+        self.stdout = stdout
+
+
+def make_workflow(steps):
+    return WorkflowDefinition(workflow_metadata=WorkflowMetadata(name="dag_test"),
+                              steps=[WorkflowStep(**step) for step in steps])
+
+
+class RecordingExecutor:
+    """记录执行顺序和并发峰值的步骤执行器"""
+    def __init__(self, delay=0.1, failures=None):
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, step):
+        with self.lock:
+            self.calls.append(step.id)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            with self.lock:
+                if self.failures.get(step.id, 0) > 0:
+                    self.failures[step.id] -= 1
+                    raise RuntimeError(f"{step.id} 失败")
+            return MockResult(stdout=step.id)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class TestStepDependencyGraph(unittest.TestCase):
+    """依赖分析测试"""
+
+    def test_region_and_dependencies(self):
+        workflow = make_workflow([
+            {"id": "fetch", "name": "获取", "agent_name": "coder", "instruction": "获取数据"},
+            {"id": "docs", "name": "文档", "agent_name": "writer", "instruction": "编写文档"},
+            {"id": "report", "name": "报告", "agent_name": "analyst", "instruction": "汇总 ${fetch_result}"},
+            {"id": "clean", "name": "清理", "agent_name": "coder", "instruction": "清理临时文件"},
+            {"id": "check", "name": "检查", "agent_name": "tester", "instruction": "检查 ${last_result}",
+             "control_flow": {"type": "conditional", "condition": "last_success == True",
+                              "success_next": "done", "failure_next": "fetch"}},
+            {"id": "done", "name": "完成", "agent_name": "writer", "instruction": "完成",
+             "control_flow": {"type": "terminal"}},
+        ])
+        region = StepDependencyGraph(workflow).region_from("fetch")
+
+        self.assertEqual([step.id for step in region.steps], ["fetch", "docs", "report", "clean", "check"])
+        self.assertEqual(region.dependencies["docs"], set())
+        self.assertEqual(region.dependencies["report"], {"fetch"})
+        self.assertEqual(region.dependencies["clean"], {"fetch"})
+        self.assertEqual(region.dependencies["check"], {"fetch", "docs", "report", "clean"})
+
+    def test_branching_step_is_not_unconditional(self):
+        workflow = make_workflow([
+            {"id": "a", "name": "a", "agent_name": "x", "instruction": "a",
+             "control_flow": {"type": "sequential", "success_next": "c", "failure_next": "b"}},
+            {"id": "b", "name": "b", "agent_name": "y", "instruction": "b"},
+            {"id": "c", "name": "c", "agent_name": "z", "instruction": "c"},
+        ])
+        graph = StepDependencyGraph(workflow)
+        self.assertEqual([step.id for step in graph.region_from("a").steps], ["a"])
+        self.assertEqual([step.id for step in graph.region_from("b").steps], ["b", "c"])
+
+    def test_shared_resource_serializes_agents(self):
+        workflow = make_workflow([
+            {"id": "a", "name": "a", "agent_name": "x", "instruction": "a"},
+            {"id": "b", "name": "b", "agent_name": "y", "instruction": "b"},
+            {"id": "c", "name": "c", "agent_name": "z", "instruction": "c"},
+        ])
+        # x 和 y 共用进程内执行器，z 使用独立进程的执行器
+        resources = {"x": "in_process", "y": "in_process", "z": "process_z"}
+        region = StepDependencyGraph(workflow, resource_key=lambda step: resources[step.agent_name]).region_from("a")
+        self.assertEqual(region.dependencies, {"a": set(), "b": {"a"}, "c": set()})
+
+    def test_in_process_executors_share_resource(self):
+        from types import SimpleNamespace
+        from python_core import Device, StatefulExecutor
+        from static_workflow.MultiStepAgent_v3 import MultiStepAgent_v3
+
+        # 不启动IPython，只需要执行器的类型
+        shared, isolated = StatefulExecutor.__new__(StatefulExecutor), StatefulExecutor.__new__(StatefulExecutor)
+        process_a, process_b = Device(), Device()
+        agents = SimpleNamespace(registered_agents=[
+            SimpleNamespace(name=name, instance=SimpleNamespace(device=device))
+            for name, device in [("x", shared), ("y", isolated), ("p", process_a), ("q", process_b)]
+        ])
+        resource = {name: MultiStepAgent_v3._step_execution_resource(agents, SimpleNamespace(agent_name=name))
+                    for name in ("x", "y", "p", "q")}
+        self.assertEqual(resource["x"], resource["y"])
+        self.assertEqual(len({resource["x"], resource["p"], resource["q"]}), 3)
+
+
+class TestDAGExecution(unittest.TestCase):
+    """DAG调度执行测试"""
+
+    def setUp(self):
+        self.engines = []
+
+    def tearDown(self):
+        for engine in self.engines:
+            engine.shutdown()
+
+    def run_workflow(self, workflow, executor, dag=True):
+        engine = StaticWorkflowEngine(max_parallel_workers=4, enable_state_updates=False,
+                                      enable_dag_scheduling=dag)
+        self.engines.append(engine)
+        engine.set_step_executor(executor)
+        return engine, engine.execute_workflow(workflow)
+
+    def test_independent_steps_run_concurrently(self):
+        workflow = make_workflow([
+            {"id": f"s{i}", "name": f"s{i}", "agent_name": f"agent{i}", "instruction": "独立任务"}
+            for i in range(4)
+        ])
+        executor = RecordingExecutor(delay=0.2)
+        start = time.time()
+        engine, result = self.run_workflow(workflow, executor)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.completed_steps, 4)
+        self.assertEqual(executor.peak, 4)
+        self.assertLess(time.time() - start, 0.6)
+        # 结果按顺序提交，last_result 与顺序执行一致
+        self.assertEqual(engine.execution_context.runtime_variables['last_result'].stdout, "s3")
+
+    def test_dependent_step_waits_for_dependency(self):
+        workflow = make_workflow([
+            {"id": "a", "name": "a", "agent_name": "x", "instruction": "a"},
+            {"id": "b", "name": "b", "agent_name": "y", "instruction": "使用 ${a_result}"},
+            {"id": "c", "name": "c", "agent_name": "z", "instruction": "c"},
+        ])
+        seen = {}
+
+        def executor(step):
+            if step.id == "b":
+                seen["a_result"] = engine.execution_context.runtime_variables.get("a_result")
+            time.sleep(0.05)
+            return MockResult(stdout=step.id)
+
+        engine = StaticWorkflowEngine(enable_state_updates=False, enable_dag_scheduling=True)
+        self.engines.append(engine)
+        engine.set_step_executor(executor)
+        result = engine.execute_workflow(workflow)
+
+        self.assertTrue(result.success)
+        self.assertEqual(seen["a_result"].stdout, "a")
+
+    def test_loop_semantics_match_sequential_execution(self):
+        workflow = make_workflow([
+            {"id": "build", "name": "构建", "agent_name": "coder", "instruction": "构建"},
+            {"id": "lint", "name": "检查", "agent_name": "linter", "instruction": "检查"},
+            {"id": "test_all", "name": "测试", "agent_name": "tester", "instruction": "测试",
+             "control_flow": {"type": "loop", "loop_target": "build", "max_iterations": 2}},
+        ])
+        sequential = RecordingExecutor(delay=0.01)
+        concurrent = RecordingExecutor(delay=0.01)
+        self.run_workflow(workflow, sequential, dag=False)
+        self.run_workflow(workflow, concurrent)
+
+        self.assertEqual(sorted(concurrent.calls), sorted(sequential.calls))
+        self.assertEqual(concurrent.calls.count("test_all"), 3)
+
+    def test_failed_step_is_retried(self):
+        workflow = make_workflow([
+            {"id": "a", "name": "a", "agent_name": "x", "instruction": "a", "max_retries": 2},
+            {"id": "b", "name": "b", "agent_name": "y", "instruction": "b"},
+        ])
+        executor = RecordingExecutor(delay=0.01, failures={"a": 1})
+        engine, result = self.run_workflow(workflow, executor)
+
+        self.assertTrue(result.success)
+        self.assertEqual(executor.calls.count("a"), 2)
+        self.assertEqual(result.step_results["a"]["status"], "completed")
+        self.assertTrue(engine.execution_context.runtime_variables["a_success"])
+
+    def test_terminate_rule_stops_later_steps(self):
+        workflow = make_workflow([
+            {"id": "a", "name": "a", "agent_name": "x", "instruction": "a",
+             "control_flow": {"type": "sequential"}},
+            {"id": "b", "name": "b", "agent_name": "y", "instruction": "b"},
+            {"id": "c", "name": "c", "agent_name": "z", "instruction": "c"},
+        ])
+        workflow.control_rules = [ControlRule(trigger="last_success == True", action="terminate")]
+        running = []
+
+        def executor(step):
+            running.append(step.id)
+            time.sleep(0.01 if step.id == "a" else 0.2)
+            running.remove(step.id)
+            return MockResult(stdout=step.id)
+
+        engine, result = self.run_workflow(workflow, executor)
+
+        # a 提交后触发终止规则：与顺序执行一样 b、c 视为未执行，并且返回前已等待正在执行的步骤结束
+        self.assertEqual(running, [])
+        self.assertEqual(sorted(engine.execution_context.step_executions), ["a"])
+        self.assertNotIn("b_result", engine.execution_context.runtime_variables)
+        self.assertEqual(result.step_results["b"]["status"], "not_executed")
+
+
+if __name__ == '__main__':
+    unittest.main()
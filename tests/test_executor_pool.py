@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+StatefulExecutorPool 执行器池单元测试
+"""
+
+import unittest
+import os
+import sys
+import threading
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor_pool import StatefulExecutorPool
+from python_core import StatefulExecutor
+
+
+class TestStatefulExecutorPool(unittest.TestCase):
+    """执行器池测试"""
+
+    def setUp(self):
+        self.pool = StatefulExecutorPool(size=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_prewarm(self):
+        metrics = self.pool.get_metrics()
+        self.assertEqual(metrics['idle'], 2)
+        self.assertEqual(metrics['created'], 2)
+
+    def test_executors_are_isolated(self):
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        try:
+            first.execute_code("x = 1")
+            second.execute_code("x = 2")
+            self.assertEqual(first.get_variable('x'), 1)
+            self.assertEqual(second.get_variable('x'), 2)
+        finally:
+            self.pool.release(first)
+            self.pool.release(second)
+
+    def test_reset_on_release(self):
+        with self.pool.lease() as executor:
+            executor.execute_code("leaked = 42")
+        # 同一个执行器被重新租出时命名空间已被清空
+        with self.pool.lease() as executor:
+            self.assertIsNone(executor.get_variable('leaked'))
+
+    def test_acquire_timeout(self):
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        try:
+            with self.assertRaises(TimeoutError):
+                self.pool.acquire(timeout=0.05)
+        finally:
+            self.pool.release(first)
+            self.pool.release(second)
+
+    def test_waiting_lease_is_served_on_release(self):
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        acquired = []
+
+        def waiter():
+            executor = self.pool.acquire(timeout=5)
+            acquired.append(executor)
+            self.pool.release(executor)
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        self.pool.release(first)
+        thread.join(5)
+        self.pool.release(second)
+
+        self.assertEqual(acquired, [first])
+        self.assertGreater(self.pool.get_metrics()['lease_wait_ms']['max'], 0)
+
+    def test_recycle_after_max_uses(self):
+        pool = StatefulExecutorPool(size=1, max_uses=1, prewarm=False)
+        try:
+            executor = pool.acquire()
+            pool.release(executor)
+            replacement = pool.acquire(timeout=30)
+            self.assertIsNot(replacement, executor)
+            self.assertIsInstance(replacement, StatefulExecutor)
+            pool.release(replacement)
+            self.assertGreaterEqual(pool.get_metrics()['recycled'], 1)
+        finally:
+            pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+控制流表达式编译缓存单元测试
+"""
+
+import unittest
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from static_workflow.control_flow_evaluator import SafeEvaluator
+
+
+class Result:
+    def __init__(self, success, stdout=""):
+        self.success = success
+        self.stdout = stdout
+
+
+class TestCompiledExpressions(unittest.TestCase):
+    """表达式编译与缓存测试"""
+
+    def setUp(self):
+        self.evaluator = SafeEvaluator(cache_size=2)
+
+    def test_compiled_expression_is_reused(self):
+        variables = {'loop_count': 0, 'last_result': Result(False)}
+        self.evaluator.set_variables(variables)
+        condition = "loop_count < 3 AND not last_result.success"
+
+        results = []
+        for count in range(5):
+            variables['loop_count'] = count
+            results.append(self.evaluator.evaluate(condition))
+
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertEqual(self.evaluator.cache_misses, 1)
+        self.assertEqual(self.evaluator.cache_hits, 4)
+
+    def test_semantics_match_interpreter(self):
+        self.evaluator.set_variables({'a': 2, 'b': 5, 'items': [1, 2, 3], 'len': lambda value: 99})
+        self.assertTrue(self.evaluator.evaluate("1 < a <= 2 < b"))
+        self.assertEqual(self.evaluator.evaluate("a * b + -a"), 8)
+        self.assertIs(self.evaluator.evaluate("a OR b"), True)
+        self.assertEqual(self.evaluator.evaluate("[a, (b, None)]"), [2, (5, None)])
+        self.assertEqual(self.evaluator.evaluate("{'x': max(a, b)}"), {'x': 5})
+        # 变量优先于内置函数
+        self.assertEqual(self.evaluator.evaluate("len(items)"), 99)
+        # 短路分支中的未定义变量和不支持的节点不会被求值
+        self.assertTrue(self.evaluator.evaluate("a == 2 or missing > 1"))
+        self.assertFalse(self.evaluator.evaluate("a == 3 and items[0] == 1"))
+
+    def test_errors(self):
+        self.evaluator.set_variables({'a': 1})
+        for expression in ["missing > 1", "__import__('os')", "a.__class__", "a in [1]", "a +"]:
+            with self.assertRaises(ValueError):
+                self.evaluator.evaluate(expression)
+
+    def test_cache_is_bounded(self):
+        self.evaluator.set_variables({'a': 1})
+        for expression in ["a == 1", "a == 2", "a == 1", "a == 3"]:
+            self.evaluator.evaluate(expression)
+        self.assertEqual(list(self.evaluator._compiled), ["a == 1", "a == 3"])
+
+    def test_variables_are_not_copied(self):
+        variables = {'a': 1}
+        self.evaluator.set_variables(variables)
+        variables['a'] = 2
+        self.assertTrue(self.evaluator.evaluate("a == 2"))
+        with self.assertRaises(TypeError):
+            self.evaluator.variables['a'] = 3
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享HTTP连接池单元测试（使用 httpx.MockTransport，不发起真实网络请求）
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+import time
+import threading
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ssl
+import httpcore
+import httpx
+import http_pool
+from http_pool import HostLimitedTransport, AsyncHostLimitedTransport
+
+
+class ConcurrencyTracker:
+    """记录同一时刻处理中的请求数峰值"""
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def exit(self):
+        with self.lock:
+            self.active -= 1
+
+
+class TestHostLimitedTransport(unittest.TestCase):
+    """按主机并发限制测试"""
+
+    def test_sync_per_host_limit(self):
+        tracker = ConcurrencyTracker()
+
+        def handler(request):
+            tracker.enter()
+            time.sleep(0.05)
+            tracker.exit()
+            return httpx.Response(200, text=request.url.host)
+
+        client = httpx.Client(transport=HostLimitedTransport(httpx.MockTransport(handler), per_host_limit=2))
+        threads = [threading.Thread(target=client.get, args=("http://api.example.com/v1",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        client.close()
+
+        self.assertEqual(tracker.peak, 2)
+
+    def test_sync_streaming_releases_permit_on_close(self):
+        transport = HostLimitedTransport(httpx.MockTransport(lambda request: httpx.Response(200, text="data")),
+                                         per_host_limit=1)
+        client = httpx.Client(transport=transport)
+        for _ in range(3):
+            with client.stream("GET", "http://api.example.com/") as response:
+                self.assertEqual(response.read(), b"data")
+        client.close()
+
+    def test_async_per_host_limit(self):
+        tracker = ConcurrencyTracker()
+
+        async def handler(request):
+            tracker.enter()
+            await asyncio.sleep(0.05)
+            tracker.exit()
+            return httpx.Response(200, text="ok")
+
+        async def run():
+            transport = AsyncHostLimitedTransport(httpx.MockTransport(handler), per_host_limit=3)
+            async with httpx.AsyncClient(transport=transport) as client:
+                responses = await asyncio.gather(*[client.get("http://api.example.com/") for _ in range(9)])
+                # 不同主机互不影响
+                await asyncio.gather(*[client.get(f"http://host{i}.example.com/") for i in range(4)])
+            return responses
+
+        responses = asyncio.run(run())
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(tracker.peak, 4)
+
+
+class TestSharedClients(unittest.TestCase):
+    """共享客户端测试"""
+
+    def setUp(self):
+        self.original_config = http_pool.get_pool_config()
+
+    def tearDown(self):
+        http_pool.configure_http_pool(**self.original_config)
+
+    def test_clients_are_shared(self):
+        self.assertIs(http_pool.get_http_client(), http_pool.get_http_client())
+        self.assertIs(http_pool.get_async_http_client(), http_pool.get_async_http_client())
+
+    def test_default_client_is_direct_and_verifies(self):
+        client = http_pool.get_http_client()
+        pool = client._transport._transport._pool
+        self.assertEqual(pool._ssl_context.verify_mode, ssl.CERT_REQUIRED)
+        self.assertIs(type(pool), httpcore.ConnectionPool)  # 没有经过代理
+
+    def test_settings_select_separate_clients(self):
+        legacy = http_pool.get_http_client(**http_pool.LEGACY_PROXY_SETTINGS)
+        self.assertIs(http_pool.get_http_client(**http_pool.LEGACY_PROXY_SETTINGS), legacy)
+        self.assertIsNot(legacy, http_pool.get_http_client())
+        self.assertEqual(legacy.timeout.read, 10)
+
+    def test_configure_creates_new_client(self):
+        client = http_pool.get_http_client()
+        http_pool.configure_http_pool(per_host_limit=2)
+        self.assertIsNot(http_pool.get_http_client(), client)
+        self.assertFalse(client.is_closed)
+        self.assertEqual(http_pool.get_pool_config()['per_host_limit'], 2)
+
+    def test_unknown_option(self):
+        with self.assertRaises(ValueError):
+            http_pool.configure_http_pool(max_conections=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟导入单元测试：导入框架模块时不创建模型、不加载重量级依赖
+"""
+
+import unittest
+import os
+import sys
+import types
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm_lazy
+import llm_models
+from benchmark_import_time import measure_import
+
+
+class TestLazyImports(unittest.TestCase):
+    """冷导入测试"""
+
+    def test_framework_modules_do_not_load_heavy_dependencies(self):
+        for module in ['llm_lazy', 'llm_models', 'message_compress', 'agent_base', 'python_core']:
+            with self.subTest(module=module):
+                self.assertEqual(measure_import(module)['heavy'], [])
+
+
+class TestLazyModelAttributes(unittest.TestCase):
+    """模块级 __getattr__ 按需创建模型"""
+
+    def setUp(self):
+        self.created = []
+        self.original_factory = llm_lazy.create_chat_model
+        llm_lazy.create_chat_model = lambda spec: self.created.append(spec) or object()
+
+    def tearDown(self):
+        llm_lazy.create_chat_model = self.original_factory
+        llm_models.__dict__.pop('llm_deepseek', None)
+        llm_models.get_model.cache_clear()
+
+    def test_model_created_once_on_first_access(self):
+        self.assertNotIn('llm_deepseek', llm_models.__dict__)
+        first = llm_models.llm_deepseek
+        second = llm_models.get_model('deepseek_chat')
+
+        self.assertIs(first, second)
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(self.created[0]['model'], 'deepseek-chat')
+        self.assertEqual(self.created[0]['api_key_env'], 'DEEPSEEK_API_KEY')
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            llm_models.llm_does_not_exist
+
+
+
+class TestModelHttpClients(unittest.TestCase):
+    """只有 use_proxy 的模型使用代理客户端"""
+
+    def create(self, spec):
+        fake_openai = types.SimpleNamespace(ChatOpenAI=lambda **kwargs: kwargs)
+        with patch.dict(sys.modules, {'langchain_openai': fake_openai}):
+            return llm_lazy.create_chat_model(spec)
+
+    def test_proxy_only_for_flagged_specs(self):
+        import http_pool
+        gemini = self.create(llm_models._MODEL_SPECS['llm_gemini_2_5_flash_google'])
+        deepseek = self.create(llm_models._MODEL_SPECS['llm_deepseek'])
+
+        self.assertNotIn('use_proxy', gemini)
+        self.assertIs(gemini['http_client'], http_pool.get_http_client(**http_pool.LEGACY_PROXY_SETTINGS))
+        self.assertIs(deepseek['http_client'], http_pool.get_http_client())
+        self.assertIs(deepseek['http_async_client'], http_pool.get_async_http_client())
+
+
+class TestSharedLLMCache(unittest.TestCase):
+    """pythonTask 与 python_core 共用导入时安装的全局LLM缓存"""
+
+    def test_python_task_uses_python_core_cache(self):
+        from langchain_core.globals import get_llm_cache
+        import python_core
+        cache = get_llm_cache()
+        import pythonTask
+
+        self.assertIsInstance(cache, python_core._LazySQLiteCache)
+        self.assertIs(get_llm_cache(), cache)
+        self.assertFalse(hasattr(pythonTask, '_ensure_langchain_cache'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM响应缓存单元测试（使用模拟LLM，不需要API密钥）
+"""
+
+import unittest
+import os
+import sys
+import time
+import tempfile
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import (LLMResponseCache, MemoryCacheTier, SQLiteCacheTier,
+                       make_cache_key, invoke_with_cache)
+from python_core import Evaluator
+from agent_base import Result
+
+
+class MockResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class MockLLM:
+    """按顺序返回预设响应并记录调用次数的模拟LLM"""
+    def __init__(self, responses, model_name="mock-model", temperature=0):
+        self.responses = list(responses)
+        self.model_name = model_name
+        self.temperature = temperature
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        content = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        return MockResponse(content)
+
+
+class MockMonitor:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def record_cache_hit(self):
+        self.hits += 1
+
+    def record_cache_miss(self):
+        self.misses += 1
+
+
+class TestCacheKey(unittest.TestCase):
+    """缓存键测试"""
+
+    def test_trailing_whitespace_is_normalized(self):
+        llm = MockLLM(["x"])
+        self.assertEqual(make_cache_key(llm, "  hello  \n  world \n"), make_cache_key(llm, "hello\n  world"))
+
+    def test_model_and_temperature_are_part_of_key(self):
+        prompt = "hello"
+        base = make_cache_key(MockLLM(["x"]), prompt)
+        self.assertNotEqual(base, make_cache_key(MockLLM(["x"], model_name="other"), prompt))
+        self.assertNotEqual(base, make_cache_key(MockLLM(["x"], temperature=0.7), prompt))
+
+    def test_message_roles_are_part_of_key(self):
+        llm = MockLLM(["x"])
+        self.assertNotEqual(make_cache_key(llm, [("system", "hi")]), make_cache_key(llm, [("human", "hi")]))
+
+
+class TestCacheTiers(unittest.TestCase):
+    """缓存层测试"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "cache.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_memory_lru_eviction(self):
+        tier = MemoryCacheTier(max_entries=2)
+        tier.set("a", "1")
+        tier.set("b", "2")
+        tier.get("a")
+        tier.set("c", "3")
+        self.assertEqual(tier.get("a"), "1")
+        self.assertIsNone(tier.get("b"))
+        self.assertEqual(len(tier), 2)
+
+    def test_memory_ttl(self):
+        tier = MemoryCacheTier(ttl=0.05)
+        tier.set("a", "1")
+        time.sleep(0.1)
+        self.assertIsNone(tier.get("a"))
+
+    def test_sqlite_persists_across_instances(self):
+        tier = SQLiteCacheTier(self.db_path)
+        tier.set("a", "1")
+        tier.close()
+
+        reopened = SQLiteCacheTier(self.db_path)
+        try:
+            self.assertEqual(reopened.get("a"), "1")
+            self.assertEqual(len(reopened), 1)
+        finally:
+            reopened.close()
+
+    def test_sqlite_size_eviction(self):
+        tier = SQLiteCacheTier(self.db_path, max_entries=2)
+        try:
+            tier.set("a", "1")
+            time.sleep(0.01)
+            tier.set("b", "2")
+            time.sleep(0.01)
+            tier.get("a")
+            tier.set("c", "3")
+            self.assertEqual(len(tier), 2)
+            self.assertIsNone(tier.get("b"))
+            self.assertEqual(tier.get("a"), "1")
+        finally:
+            tier.close()
+
+    def test_sqlite_ttl(self):
+        tier = SQLiteCacheTier(self.db_path, ttl=0.05)
+        try:
+            tier.set("a", "1")
+            time.sleep(0.1)
+            self.assertIsNone(tier.get("a"))
+            self.assertEqual(len(tier), 0)
+        finally:
+            tier.close()
+
+    def test_lower_tier_hit_is_promoted(self):
+        memory = MemoryCacheTier()
+        sqlite_tier = SQLiteCacheTier(self.db_path)
+        monitor = MockMonitor()
+        cache = LLMResponseCache([memory, sqlite_tier], monitor=monitor)
+        try:
+            sqlite_tier.set("a", "1")
+            self.assertEqual(cache.get("a"), "1")
+            self.assertEqual(memory.get("a"), "1")
+            self.assertIsNone(cache.get("missing"))
+            self.assertEqual((monitor.hits, monitor.misses), (1, 1))
+            self.assertEqual(cache.get_stats()["hit_rate"], 0.5)
+        finally:
+            cache.close()
+
+
+class TestCachedInvocation(unittest.TestCase):
+    """缓存与LLM调用集成测试"""
+
+    def setUp(self):
+        self.cache = LLMResponseCache([MemoryCacheTier()])
+
+    def test_invoke_with_cache(self):
+        llm = MockLLM(["answer"])
+        self.assertEqual(invoke_with_cache(llm, "question", self.cache), "answer")
+        self.assertEqual(invoke_with_cache(llm, "question", self.cache), "answer")
+        self.assertEqual(llm.calls, 1)
+
+    def test_evaluator_reuses_cached_evaluation(self):
+        llm = MockLLM(['{"taskIsComplete": true, "reason": "完成"}'])
+        evaluator = Evaluator(llm=llm, systemMessage=None, response_cache=self.cache)
+        result = Result(True, "print('ok')", "ok", None, None)
+
+        self.assertEqual(evaluator.evaluate("打印ok", result), (True, "完成"))
+        self.assertEqual(evaluator.evaluate("打印ok", result), (True, "完成"))
+        self.assertEqual(llm.calls, 1)
+
+    def test_evaluator_does_not_cache_unparsable_response(self):
+        llm = MockLLM(['```json\n{broken\n```', '{"taskIsComplete": false, "reason": "未完成"}'])
+        evaluator = Evaluator(llm=llm, systemMessage=None, response_cache=self.cache)
+        result = Result(True, "print('ok')", "ok", None, None)
+
+        self.assertEqual(evaluator.evaluate("打印ok", result), (False, "未完成"))
+        self.assertEqual(llm.calls, 2)
+        self.assertEqual(evaluator.evaluate("打印ok", result), (False, "未完成"))
+        self.assertEqual(llm.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
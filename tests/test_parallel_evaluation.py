@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agent.evaluate_all 并行评估模式单元测试（使用模拟评估器，不需要API密钥）
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_core import Agent
+from agent_base import Result
+
+
+class MockEvaluator:
+    """在指定延迟后返回预设结果的模拟评估器"""
+    def __init__(self, is_complete, reason, delay=0.0, raises=False):
+        self.is_complete = is_complete
+        self.reason = reason
+        self.delay = delay
+        self.raises = raises
+        self.calls = 0
+
+    def evaluate(self, instruction, result):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.raises:
+            raise RuntimeError(self.reason)
+        return self.is_complete, self.reason
+
+    async def evaluate_async(self, instruction, result):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.raises:
+            raise RuntimeError(self.reason)
+        return self.is_complete, self.reason
+
+
+class TestParallelEvaluation(unittest.TestCase):
+    """并行评估测试"""
+
+    def setUp(self):
+        self.agent = Agent(llm=None, stateful=False, parallel_evaluation=True)
+        self.result = Result(True, "print('任务完成')", "任务完成", None, None)
+
+    def test_all_pass_keeps_evaluator_order(self):
+        self.agent.evaluators = [
+            MockEvaluator(True, "第一个通过", delay=0.2),
+            MockEvaluator(True, "第二个通过", delay=0.1),
+            MockEvaluator(True, "第三个通过"),
+        ]
+
+        start = time.time()
+        is_complete, reasons = self.agent.evaluate_all(self.result, "测试")
+        elapsed = time.time() - start
+
+        self.assertTrue(is_complete)
+        self.assertEqual(reasons, ["第一个通过", "第二个通过", "第三个通过"])
+        self.assertLess(elapsed, 0.3)
+
+    def test_failure_returns_early(self):
+        slow = MockEvaluator(True, "慢评估器", delay=1.0)
+        self.agent.evaluators = [slow, MockEvaluator(False, "结果不正确", delay=0.05)]
+
+        start = time.time()
+        is_complete, reasons = self.agent.evaluate_all(self.result, "测试")
+        elapsed = time.time() - start
+
+        self.assertFalse(is_complete)
+        self.assertEqual(reasons[0], "结果不正确")
+        self.assertLess(elapsed, 0.5)
+
+    def test_exception_is_not_a_failure(self):
+        self.agent.evaluators = [
+            MockEvaluator(True, "通过"),
+            MockEvaluator(None, "网络错误", raises=True),
+        ]
+
+        is_complete, reasons = self.agent.evaluate_all(self.result, "测试")
+
+        self.assertTrue(is_complete)
+        self.assertEqual(reasons[0], "通过")
+        self.assertIn("评估器 #2 异常", reasons[1])
+
+    def test_async_failure_cancels_pending(self):
+        slow = MockEvaluator(True, "慢评估器", delay=1.0)
+        self.agent.evaluators = [slow, MockEvaluator(False, "结果不正确", delay=0.05)]
+
+        start = time.time()
+        is_complete, reasons = asyncio.run(self.agent.evaluate_all_async(self.result, "测试"))
+        elapsed = time.time() - start
+
+        self.assertFalse(is_complete)
+        self.assertEqual(reasons, ["结果不正确"])
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ProcessStatefulExecutor 进程隔离执行器单元测试
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from process_executor import ProcessStatefulExecutor
+from agent_base import Result
+
+
+class TestProcessStatefulExecutor(unittest.TestCase):
+    """进程隔离执行器测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessStatefulExecutor(echo=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.close()
+
+    def test_state_persists(self):
+        self.executor.execute_code("counter = 41")
+        result = self.executor.execute_code("counter += 1\nreturn_value = counter\nprint('done')")
+
+        self.assertIsInstance(result, Result)
+        self.assertTrue(result.success)
+        self.assertEqual(result.return_value, 42)
+        self.assertIn("done", result.stdout)
+        self.assertEqual(self.executor.get_variable('counter'), 42)
+
+    def test_runtime_error(self):
+        result = self.executor.execute_code("1 / 0")
+        self.assertFalse(result.success)
+        self.assertIn("division by zero", result.stderr)
+
+    def test_syntax_error(self):
+        result = self.executor.execute_code("def broken(:")
+        self.assertFalse(result.success)
+        self.assertIn("语法错误", result.stderr)
+
+    def test_streaming_output(self):
+        chunks = []
+        result = self.executor.execute_code(
+            "import time\nfor i in range(3):\n    print(f'line {i}')\n    time.sleep(0.05)",
+            on_output=chunks.append
+        )
+        self.assertTrue(result.success)
+        self.assertEqual(''.join(chunks), result.stdout)
+        self.assertGreater(len(chunks), 1)
+
+    def test_unpicklable_return_value(self):
+        result = self.executor.execute_code("import threading\nreturn_value = threading.Lock()")
+        self.assertTrue(result.success)
+        self.assertIsInstance(result.return_value, str)
+
+    def test_wall_timeout_interrupts(self):
+        self.executor.execute_code("kept = 'still here'")
+        result = self.executor.execute_code("import time\ntime.sleep(30)", wall_timeout=0.5)
+
+        self.assertFalse(result.success)
+        self.assertIn("执行超时", result.stderr)
+        # 中断后执行器状态仍然保留
+        self.assertEqual(self.executor.get_variable('kept'), 'still here')
+
+    @unittest.skipIf(sys.platform == 'win32', "CPU时间限制仅支持POSIX")
+    def test_cpu_timeout(self):
+        result = self.executor.execute_code("while True:\n    pass", cpu_timeout=1)
+        self.assertFalse(result.success)
+        self.assertIn("CPU时间", result.stderr)
+
+
+class TestParallelProcessExecutors(unittest.TestCase):
+    """多个执行器在不同线程中并行执行"""
+
+    def test_parallel_execution(self):
+        executors = [ProcessStatefulExecutor(echo=False) for _ in range(3)]
+        results = [None] * len(executors)
+
+        def run(i):
+            results[i] = executors[i].execute_code(f"import time\ntime.sleep(0.5)\nprint('worker {i}')")
+
+        try:
+            start = time.time()
+            threads = [threading.Thread(target=run, args=(i,)) for i in range(len(executors))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.time() - start
+        finally:
+            for executor in executors:
+                executor.close()
+
+        self.assertLess(elapsed, 1.4)
+        for i, result in enumerate(results):
+            self.assertTrue(result.success)
+            self.assertEqual(result.stdout.strip(), f"worker {i}")
+
+
+if __name__ == '__main__':
+    unittest.main()
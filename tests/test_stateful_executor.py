@@ -12,7 +12,7 @@ import time
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from python_core import StatefulExecutor
+from python_core import StatefulExecutor, BoundedOutputCapture
 from agent_base import Result
 
 
@@ -423,6 +423,60 @@ print(f"当前的值: {return_value}")
         self.assertEqual(self.executor.get_variable('return_value'), "second_execution")
 
 
+class TestStatefulExecutorBoundedOutput(unittest.TestCase):
+    """StatefulExecutor有界输出捕获测试"""
+    
+    def test_capture_keeps_head_and_tail(self):
+        """测试缓冲区只保留开头和结尾"""
+        capture = BoundedOutputCapture(head_chars=10, tail_chars=10)
+        for i in range(1000):
+            capture.write(f"{i:04d}\n")
+        
+        view = capture.getvalue()
+        self.assertTrue(capture.truncated)
+        self.assertEqual(capture.total_chars, 5000)
+        self.assertEqual(capture.total_bytes, 5000)
+        self.assertTrue(view.startswith("0000\n0001\n"))
+        self.assertTrue(view.endswith("0998\n0999\n"))
+        self.assertIn("已省略中间 4980 个字符", view)
+    
+    def test_capture_spill_to_file(self):
+        """测试溢出时完整输出写入文件"""
+        capture = BoundedOutputCapture(head_chars=5, tail_chars=5, spill=True)
+        text = "".join(f"line {i}\n" for i in range(100))
+        for line in text.splitlines(keepends=True):
+            capture.write(line)
+        capture.close()
+        
+        try:
+            self.assertIsNotNone(capture.spill_path)
+            with open(capture.spill_path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), text)
+        finally:
+            os.unlink(capture.spill_path)
+    
+    def test_large_output_is_truncated(self):
+        """测试大量输出时stdout保持有界"""
+        executor = StatefulExecutor(output_head_chars=100, output_tail_chars=100)
+        result = executor.execute_code("for i in range(100000):\n    print(i)")
+        
+        self.assertTrue(result.success)
+        self.assertTrue(result.stdout_truncated)
+        self.assertLess(len(result.stdout), 300)
+        self.assertGreater(result.stdout_total_bytes, 500000)
+        self.assertTrue(result.stdout.rstrip().endswith("99999"))
+        self.assertIsNone(result.stdout_file)
+    
+    def test_small_output_unchanged(self):
+        """测试少量输出不受影响"""
+        executor = StatefulExecutor()
+        result = executor.execute_code("print('hello')")
+        
+        self.assertEqual(result.stdout, "hello\n")
+        self.assertFalse(result.stdout_truncated)
+        self.assertNotIn('stdout_truncated', result.to_dict())
+
+
 if __name__ == '__main__':
     print("🚀 开始StatefulExecutor类单元测试...")
     print("="*60)
@@ -436,6 +490,7 @@ if __name__ == '__main__':
     suite.addTests(loader.loadTestsFromTestCase(TestStatefulExecutorComplexTypes))
     suite.addTests(loader.loadTestsFromTestCase(TestStatefulExecutorErrorHandling))
     suite.addTests(loader.loadTestsFromTestCase(TestStatefulExecutorReturnValue))
+    suite.addTests(loader.loadTestsFromTestCase(TestStatefulExecutorBoundedOutput))
     
     print("="*60)
     
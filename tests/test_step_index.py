@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作流步骤索引和预计算后继单元测试
+"""
+
+import unittest
+import os
+import sys
+import pickle
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from static_workflow.workflow_definitions import WorkflowDefinition, WorkflowStep, WorkflowMetadata
+
+
+def make_workflow():
+    return WorkflowDefinition(workflow_metadata=WorkflowMetadata(name="index_test"), steps=[
+        {"id": "build", "name": "构建", "agent_name": "coder", "instruction": "构建"},
+        {"id": "test", "name": "测试", "agent_name": "tester", "instruction": "测试",
+         "control_flow": {"type": "loop", "loop_target": "build", "max_iterations": 3,
+                          "failure_next": "report"}},
+        {"id": "check", "name": "检查", "agent_name": "tester", "instruction": "检查",
+         "control_flow": {"type": "conditional", "condition": "last_success", "success_next": "done"}},
+        {"id": "report", "name": "报告", "agent_name": "writer", "instruction": "报告"},
+        {"id": "done", "name": "完成", "agent_name": "writer", "instruction": "完成",
+         "control_flow": {"type": "terminal"}},
+    ])
+
+
+class TestStepIndex(unittest.TestCase):
+    """步骤索引测试"""
+
+    def test_lookup_and_transitions(self):
+        workflow = make_workflow()
+        self.assertEqual(workflow.get_step_by_id("report").name, "报告")
+        self.assertEqual(workflow.get_step_index("check"), 2)
+        self.assertIsNone(workflow.get_step_by_id("missing"))
+        self.assertEqual(workflow.get_step_index("missing"), -1)
+
+        loop = workflow.get_transitions("test")
+        self.assertEqual((loop.loop_target, loop.loop_exit), ("build", "check"))
+        self.assertEqual((loop.success_next, loop.failure_next), ("check", "report"))
+        check = workflow.get_transitions("check")
+        self.assertEqual((check.success_next, check.failure_next), ("done", "report"))
+        done = workflow.get_transitions("done")
+        self.assertEqual((done.success_next, done.sequential_next), (None, None))
+        self.assertEqual(workflow.get_sequential_next("build"), "test")
+
+    def test_index_rebuilt_after_mutation(self):
+        workflow = make_workflow()
+        workflow.steps.insert(1, WorkflowStep(id="lint", name="检查风格", agent_name="linter", instruction="lint"))
+        self.assertEqual(workflow.get_sequential_next("build"), "lint")
+        self.assertEqual(workflow.get_step_index("test"), 2)
+
+        del workflow.steps[0]
+        self.assertIsNone(workflow.get_step_by_id("build"))
+
+        workflow.steps = [WorkflowStep(id="only", name="唯一", agent_name="coder", instruction="x")]
+        self.assertEqual(workflow.get_step_index("only"), 0)
+        self.assertIsNone(workflow.get_step_by_id("lint"))
+
+        workflow.steps[0].control_flow = None
+        workflow.steps[0].id = "renamed"
+        workflow.invalidate_step_index()
+        self.assertEqual(workflow.get_step_index("renamed"), 0)
+
+    def test_duplicate_ids_and_validation(self):
+        workflow = make_workflow()
+        workflow.steps.append(WorkflowStep(id="build", name="重复", agent_name="coder", instruction="x"))
+        self.assertEqual(workflow.get_step_by_id("build").name, "构建")
+        self.assertIn("步骤ID必须唯一", workflow.validate())
+
+    def test_pickle_round_trip(self):
+        workflow = pickle.loads(pickle.dumps(make_workflow()))
+        self.assertEqual(workflow.get_transitions("check").success_next, "done")
+        workflow.steps.pop()
+        self.assertIsNone(workflow.get_step_by_id("done"))
+
+
+if __name__ == '__main__':
+    unittest.main()
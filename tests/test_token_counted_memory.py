@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+测试AgentBase.memory的增量token计数
+验证TokenCountedMemory在追加/移除消息时正确维护token总数，且不会重复编码历史消息
+"""
+
+import copy
+import tiktoken
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from agent_base import AgentBase, TokenCountedMemory, reduce_memory_decorator
+
+
+class MockLLM:
+    model_name = "gpt-3.5-turbo"
+
+    def invoke(self, messages):
+        class MockResponse:
+            content = "模拟响应"
+        return MockResponse()
+
+
+class CountingEncoding:
+    """包装tiktoken编码器，统计encode调用次数"""
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.name = encoding.name
+        self.calls = 0
+
+    def encode(self, text):
+        self.calls += 1
+        return self.encoding.encode(text)
+
+
+def _full_count(encoding, memory):
+    return sum(len(encoding.encode(msg.content)) for msg in memory)
+
+
+def test_memory_is_token_counted():
+    """AgentBase.memory 始终是 TokenCountedMemory，整体赋值也会被包装"""
+    agent = AgentBase(llm=MockLLM(), system_message="你是一个助手")
+    assert isinstance(agent.memory, TokenCountedMemory)
+
+    agent.memory = [SystemMessage("新的系统消息")]
+    assert isinstance(agent.memory, TokenCountedMemory)
+
+
+def test_incremental_total_matches_full_count():
+    """各种列表操作后，增量总数与全量重算一致"""
+    encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+    agent = AgentBase(llm=MockLLM(), system_message="你是一个助手")
+    agent.memory.bind_encoding(encoding)
+
+    agent.memory.append(HumanMessage("用户对话1"))
+    agent.memory.append(AIMessage("AI响应1"))
+    agent.memory.extend([HumanMessage("用户对话2"), AIMessage("AI响应2")])
+    agent.memory.insert(0, SystemMessage("临时系统消息"))
+    assert agent.memory.token_total == _full_count(encoding, agent.memory)
+
+    agent.memory.remove(agent.memory[0])
+    agent.memory.pop()
+    del agent.memory[1:2]
+    agent.memory[0] = SystemMessage("替换后的系统消息")
+    assert agent.memory.token_total == _full_count(encoding, agent.memory)
+
+    agent.reset()
+    assert agent.memory.token_total == _full_count(encoding, agent.memory)
+    assert agent.calculate_memory_tokens() == agent.memory.token_total
+
+
+def test_history_encoded_once():
+    """每条消息只在追加时编码一次，装饰器检查不会重新编码历史"""
+    encoding = CountingEncoding(tiktoken.encoding_for_model("gpt-3.5-turbo"))
+
+    class DemoAgent(AgentBase):
+        @reduce_memory_decorator(max_tokens=100000)
+        def step(self, text):
+            self.memory.append(HumanMessage(text))
+            self.memory.append(AIMessage(text))
+
+    agent = DemoAgent(llm=MockLLM(), system_message="你是一个助手")
+    agent._token_encoding = (MockLLM.model_name, encoding)
+
+    for i in range(50):
+        agent.step(f"第{i}轮对话")
+
+    # 系统消息 + 每轮两条新消息
+    assert encoding.calls == 1 + 50 * 2
+    assert agent.memory.token_total == _full_count(encoding.encoding, agent.memory)
+
+
+def test_copy_rebuilds_index():
+    """复制后的memory不携带旧的id索引"""
+    encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+    memory = TokenCountedMemory([HumanMessage("你好"), AIMessage("你好！")], encoding=encoding)
+
+    copied = copy.deepcopy(memory)
+    assert isinstance(copied, TokenCountedMemory)
+    copied.bind_encoding(encoding)
+    assert copied.token_total == memory.token_total
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作流检查点和恢复单元测试（使用模拟步骤执行器，不需要API密钥）
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from static_workflow.workflow_definitions import WorkflowDefinition, WorkflowStep, WorkflowMetadata
+from static_workflow.static_workflow_engine import StaticWorkflowEngine
+from static_workflow.workflow_checkpoint import WorkflowCheckpointStore
+
+
+class MockResult:
+    def __init__(self, success=True, stdout=""):
+        self.success = success
+        self.stdout = stdout
+
+
+def make_workflow():
+    steps = [
+        {"id": "fetch", "name": "获取", "agent_name": "coder", "instruction": "获取数据"},
+        {"id": "analyze", "name": "分析", "agent_name": "analyst", "instruction": "分析 ${fetch_result}"},
+        {"id": "report", "name": "报告", "agent_name": "writer", "instruction": "生成报告"},
+    ]
+    return WorkflowDefinition(workflow_metadata=WorkflowMetadata(name="checkpoint_test"),
+                              steps=[WorkflowStep(**step) for step in steps])
+
+
+class CrashingExecutor:
+    """在指定步骤模拟进程中断的步骤执行器"""
+    def __init__(self, crash_on=None):
+        self.crash_on = crash_on
+        self.calls = []
+
+    def __call__(self, step):
+        self.calls.append(step.id)
+        if step.id == self.crash_on:
+            raise KeyboardInterrupt(f"{step.id} 执行时进程中断")
+        return MockResult(stdout=step.id)
+
+
+class TestWorkflowCheckpoint(unittest.TestCase):
+    """检查点恢复测试"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "checkpoints.db")
+        self.engines = []
+        self.stores = []
+
+    def tearDown(self):
+        for engine in self.engines:
+            engine.shutdown()
+        for store in self.stores:
+            store.close()
+        self.temp_dir.cleanup()
+
+    def make_engine(self, executor, dag=False):
+        store = WorkflowCheckpointStore(self.path)
+        engine = StaticWorkflowEngine(enable_state_updates=False, enable_dag_scheduling=dag,
+                                      checkpoint_store=store)
+        engine.set_step_executor(executor)
+        self.stores.append(store)
+        self.engines.append(engine)
+        return engine
+
+    def crash_workflow(self):
+        engine = self.make_engine(CrashingExecutor(crash_on="analyze"))
+        with self.assertRaises(KeyboardInterrupt):
+            engine.execute_workflow(make_workflow(), {"project": "demo"})
+        return engine.execution_context.workflow_id
+
+    def test_resume_skips_completed_steps(self):
+        workflow_id = self.crash_workflow()
+        self.assertEqual(self.stores[0].list_workflows("running")[0]["workflow_id"], workflow_id)
+
+        # 新进程：新的引擎和存储实例读取同一个检查点文件
+        executor = CrashingExecutor()
+        engine = self.make_engine(executor)
+        result = engine.resume_workflow(workflow_id)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.workflow_id, workflow_id)
+        self.assertEqual(executor.calls, ["analyze", "report"])
+        self.assertEqual(result.completed_steps, 3)
+        variables = engine.execution_context.runtime_variables
+        self.assertEqual(variables["project"], "demo")
+        self.assertEqual(variables["fetch_result"].stdout, "fetch")
+        self.assertEqual(engine.execution_context.current_iteration["analyze"], 1)
+        self.assertEqual(self.stores[1].list_workflows("completed")[0]["workflow_id"], workflow_id)
+
+        # 已完成的工作流再次恢复时直接返回结果
+        again = CrashingExecutor()
+        self.assertTrue(self.make_engine(again).resume_workflow(workflow_id).success)
+        self.assertEqual(again.calls, [])
+
+    def test_resume_with_dag_scheduling(self):
+        # DAG调度时步骤在线程池中执行，在调度线程提交 analyze 时模拟进程中断
+        def crash_on_commit(step, result):
+            if step.id == "analyze":
+                raise KeyboardInterrupt("提交结果时进程中断")
+
+        engine = self.make_engine(CrashingExecutor(), dag=True)
+        engine.on_step_complete = crash_on_commit
+        with self.assertRaises(KeyboardInterrupt):
+            engine.execute_workflow(make_workflow())
+        workflow_id = engine.execution_context.workflow_id
+
+        executor = CrashingExecutor()
+        engine = self.make_engine(executor, dag=True)
+        result = engine.resume_workflow(workflow_id)
+
+        self.assertTrue(result.success)
+        self.assertEqual(sorted(executor.calls), ["analyze", "report"])
+        # 中断前已执行但未提交的步骤不会在执行历史中重复出现
+        self.assertEqual(len(engine.execution_context.step_executions["report"]), 1)
+        self.assertEqual(result.step_results["fetch"]["status"], "completed")
+
+    def test_checkpoints_store_step_deltas(self):
+        steps = [WorkflowStep(id=f"s{i}", name=f"步骤{i}", agent_name="coder", instruction=f"步骤{i}")
+                 for i in range(12)]
+        workflow = WorkflowDefinition(workflow_metadata=WorkflowMetadata(name="delta_test"), steps=steps)
+        result = self.make_engine(CrashingExecutor()).execute_workflow(workflow, {"payload": "x" * 10000})
+        self.assertEqual(self.stores[0].list_workflows("completed")[0]["workflow_id"], result.workflow_id)
+
+        # 每条检查点只包含新提交的步骤，大变量只在第一条中出现
+        sizes = [len(row[0]) for row in self.stores[0]._connection.execute(
+            "SELECT context FROM checkpoints WHERE workflow_id = ? ORDER BY sequence", (result.workflow_id,))]
+        self.assertGreater(sizes[0], 10000)
+        self.assertLess(max(sizes[1:]), 5000)
+        self.assertLess(abs(sizes[-1] - sizes[2]), 500)
+
+        # 重放增量得到与最终执行上下文一致的结果
+        self.stores.append(WorkflowCheckpointStore(self.path))
+        checkpoint = self.stores[-1].load(result.workflow_id)
+        context = checkpoint.execution_context
+        self.assertEqual(sorted(context.step_executions), sorted(step.id for step in steps))
+        self.assertEqual(context.runtime_variables["s11_result"].stdout, "s11")
+        self.assertEqual(context.runtime_variables["payload"], "x" * 10000)
+
+    def test_unknown_workflow(self):
+        engine = self.make_engine(CrashingExecutor())
+        with self.assertRaises(ValueError):
+            engine.resume_workflow("missing")
+        self.assertIsNone(self.stores[0].load("missing"))
+
+
+if __name__ == '__main__':
+    unittest.main()